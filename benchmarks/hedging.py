@@ -0,0 +1,101 @@
+"""
+Compares the latency of ``get_object`` calls with & without a
+``HedgingPolicy``, against a fake transport where a small share of requests
+are very slow (as a GC pause or a bad host would make them).
+
+Reports the p50, p99 & max latencies for each, plus how many extra requests
+the hedging cost.
+
+Usage::
+
+    $ PYTHONPATH=. python benchmarks/hedging.py --calls 1000 --slow-share 0.03
+
+"""
+import argparse
+import time
+
+from kotocore.hedging import HedgingPolicy
+from kotocore.session import Session
+from kotocore.testing import Bimodal, FaultInjector, LogNormal
+from kotocore.testing import fake_connection
+
+
+def percentile(ordered, pct):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100.0))]
+
+
+def measure(args, hedging_policy=None):
+    injector = FaultInjector(
+        latency=Bimodal(
+            LogNormal(args.latency, sigma=0.1),
+            args.slow_latency,
+            slow_share=args.slow_share
+        ),
+        seed=args.seed
+    )
+    session = Session(hedging_policy=hedging_policy)
+    s3 = fake_connection(session, 's3', injector=injector, responders={
+        'get_object': lambda **kwargs: {'Body': b'', 'ContentLength': 0},
+    })
+    latencies = []
+
+    try:
+        for i in range(args.calls):
+            start = time.time()
+            s3.get_object(bucket='assets', key='{0}.png'.format(i))
+            latencies.append(time.time() - start)
+    finally:
+        session.close()
+
+    latencies.sort()
+    return {
+        'p50': percentile(latencies, 50),
+        'p99': percentile(latencies, 99),
+        'max': latencies[-1],
+        'requests': injector.stats()['get_object']['calls'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--calls', type=int, default=1000)
+    parser.add_argument('--latency', type=float, default=0.005)
+    parser.add_argument('--slow-latency', type=float, default=0.2)
+    parser.add_argument('--slow-share', type=float, default=0.03)
+    parser.add_argument('--percentile', type=float, default=95)
+    parser.add_argument('--max-ratio', type=float, default=0.1)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    print('{0:>10} {1:>9} {2:>9} {3:>9} {4:>9}'.format(
+        '', 'p50 (ms)', 'p99 (ms)', 'max (ms)', 'requests'
+    ))
+
+    for label, policy in (
+        ('plain', None),
+        ('hedged', HedgingPolicy(
+            percentile=args.percentile,
+            max_ratio=args.max_ratio
+        )),
+    ):
+        result = measure(args, hedging_policy=policy)
+        print('{0:>10} {1:9.1f} {2:9.1f} {3:9.1f} {4:9d}'.format(
+            label,
+            result['p50'] * 1000,
+            result['p99'] * 1000,
+            result['max'] * 1000,
+            result['requests']
+        ))
+
+        if policy is not None:
+            stats = policy.stats()['s3']['get_object']
+            print('{0:>10} hedged {1}, won {2}, denied {3}'.format(
+                '',
+                stats['hedged'],
+                stats['hedge_wins'],
+                stats['denied']
+            ))
+
+
+if __name__ == '__main__':
+    main()
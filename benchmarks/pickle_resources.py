@@ -0,0 +1,60 @@
+"""
+Times pickling & unpickling a large batch of ``S3Object`` instances.
+
+Usage::
+
+    $ PYTHONPATH=. python benchmarks/pickle_resources.py --count 100000
+
+"""
+import argparse
+import pickle
+import time
+
+from kotocore.session import Session, set_default_session
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--count', type=int, default=100000)
+    args = parser.parse_args()
+
+    session = Session()
+    set_default_session(session)
+    conn = session.connect_to('s3', region_name='us-west-2')
+    S3Object = session.get_resource('s3', 'S3Object')
+    objs = [
+        S3Object(
+            connection=conn,
+            bucket='logs',
+            key='2014/01/{0:06d}.log'.format(i),
+            size=1024 + i,
+            etag='"{0:032x}"'.format(i)
+        )
+        for i in range(args.count)
+    ]
+
+    start = time.time()
+    data = pickle.dumps(objs, pickle.HIGHEST_PROTOCOL)
+    dumped = time.time()
+    copied = pickle.loads(data)
+    loaded = time.time()
+
+    assert len(copied) == args.count
+    assert copied[-1].key == objs[-1].key
+
+    print('{0} S3Object instances, {1:.1f} MB pickled'.format(
+        args.count,
+        len(data) / 1024.0 / 1024.0
+    ))
+    print('  dumps: {0:.3f}s ({1:.2f} us/object)'.format(
+        dumped - start,
+        (dumped - start) * 1e6 / args.count
+    ))
+    print('  loads: {0:.3f}s ({1:.2f} us/object)'.format(
+        loaded - dumped,
+        (loaded - dumped) * 1e6 / args.count
+    ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Streams a bucket listing through a ``Pipeline`` (head each object, keep the
+big ones, batch them up & write them to DynamoDB), with a fake transport
+that sleeps to simulate network latency.
+
+Reports the wall time & per-stage stats for increasing numbers of map
+workers, which should scale until the sink (or the pool) becomes the
+bottleneck.
+
+Usage::
+
+    $ PYTHONPATH=. python benchmarks/pipeline.py --objects 2000 --latency 0.01
+
+"""
+import argparse
+import time
+
+from kotocore.session import Session
+from kotocore.testing import FaultInjector, fake_connection
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--objects', type=int, default=2000)
+    parser.add_argument('--latency', type=float, default=0.01)
+    parser.add_argument('--max-workers', type=int, default=64)
+    parser.add_argument('--queue-size', type=int, default=100)
+    args = parser.parse_args()
+
+    session = Session(max_workers=args.max_workers)
+    written = []
+    injector = FaultInjector(latency=args.latency)
+    s3 = fake_connection(session, 's3', injector=injector, responders={
+        'list_objects': lambda **kwargs: {
+            'Contents': [
+                {'Key': '{0:06d}.csv'.format(i), 'Size': i}
+                for i in range(args.objects)
+            ],
+        },
+        'head_object': lambda **kwargs: {
+            'ContentLength': int(kwargs['key'].split('.')[0]) * 7 % 1000,
+        },
+    })
+    dynamodb = fake_connection(
+        session,
+        'dynamodb',
+        injector=injector,
+        responders={
+            'batch_write_item': lambda **kwargs: written.extend(
+                kwargs['request_items']['sizes']
+            ) or {},
+        }
+    )
+    S3ObjectCollection = session.get_collection('s3', 'S3ObjectCollection')
+
+    def head(obj):
+        return (obj.key, s3.head_object(bucket='logs', key=obj.key))
+
+    def write(batch):
+        return dynamodb.batch_write_item(request_items={
+            'sizes': [
+                {'PutRequest': {'Item': {'key': {'S': key}}}}
+                for key, head in batch
+            ],
+        })
+
+    print('{0} objects, {1:.0f}ms latency'.format(
+        args.objects,
+        args.latency * 1000
+    ))
+    workers = 1
+
+    while workers <= args.max_workers:
+        del written[:]
+        pipe = session.pipeline(queue_size=args.queue_size)
+        pipe.source(S3ObjectCollection(connection=s3, bucket='logs'))
+        pipe.map(head, workers=workers, name='head')
+        pipe.filter(lambda item: item[1]['ContentLength'] > 100, name='big')
+        pipe.batch(count=25, name='batch')
+        pipe.sink(write, workers=4, name='write')
+
+        start = time.time()
+        stats = pipe.run()
+        elapsed = time.time() - start
+
+        print('{0:>3} workers: {1:.2f}s, {2} written'.format(
+            workers,
+            elapsed,
+            len(written)
+        ))
+
+        for name in ['head', 'big', 'batch', 'write']:
+            stage = stats[name]
+            line = '      {0:<6} {1:>6} out {2:>9.1f}/s'.format(
+                name,
+                stage['items_out'],
+                stage['throughput']
+            )
+
+            if 'outbox' in stage:
+                line += '  queue max {0:>4} mean {1:>7.1f}'.format(
+                    stage['outbox']['max_depth'],
+                    stage['outbox']['mean_depth']
+                )
+
+            print(line)
+
+        workers *= 4
+
+    session.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Measures how post-processing (building ``S3Object`` instances from listing
+pages) scales across threads sharing one ``Session``.
+
+On a regular interpreter the GIL keeps this near 1x. On a free-threaded
+build (Ex. ``python3.13t``), it should scale with the number of cores.
+
+Usage::
+
+    $ PYTHONPATH=. python3.13t benchmarks/threaded_post_process.py
+
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import sys
+import time
+
+from kotocore.session import Session
+
+
+def build_page(size):
+    return {
+        'Contents': [
+            {
+                'Key': '2014/01/{0:06d}.log'.format(i),
+                'Size': 1024 + i,
+                'ETag': '"{0:032x}"'.format(i),
+                'StorageClass': 'STANDARD',
+            }
+            for i in range(size)
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--pages', type=int, default=64)
+    parser.add_argument('--page-size', type=int, default=1000)
+    parser.add_argument('--max-threads', type=int, default=8)
+    args = parser.parse_args()
+
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print('Python {0} (GIL {1})'.format(
+        sys.version.split()[0],
+        'enabled' if gil else 'disabled'
+    ))
+
+    session = Session(thread_safe=True)
+    S3ObjectCollection = session.get_collection('s3', 'S3ObjectCollection')
+    page = build_page(args.page_size)
+
+    def work(offset):
+        # Each thread uses its own collection, but all the classes, details &
+        # cached data are shared through the session.
+        objects = S3ObjectCollection(
+            connection=session.connect_to('s3'),
+            bucket='logs'
+        )
+        return len(objects.full_post_process('each', page))
+
+    # Warm everything up first.
+    work(0)
+    baseline = None
+    threads = 1
+
+    while threads <= args.max_threads:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            start = time.time()
+            built = sum(executor.map(work, range(args.pages)))
+            elapsed = time.time() - start
+
+        if baseline is None:
+            baseline = elapsed
+
+        print('{0:>3} thread(s): {1:>9.0f} objects/s, {2:.2f}x'.format(
+            threads,
+            built / elapsed,
+            baseline / elapsed
+        ))
+        threads *= 2
+
+
+if __name__ == '__main__':
+    main()
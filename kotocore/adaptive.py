@@ -0,0 +1,267 @@
+"""
+Adaptive concurrency, which finds how many calls a service will take at once
+rather than relying on a fixed guess.
+"""
+import threading
+import time
+
+from kotocore.exceptions import ServerError
+from kotocore.retries import THROTTLING_CODES
+
+
+class AdaptiveLimit(object):
+    """
+    An AIMD (additive increase, multiplicative decrease) limit on concurrent
+    calls.
+
+    While calls succeed within the latency target (& the limit is actually
+    being hit), the limit grows by ``increase`` per round of calls. A
+    throttling error or a call slower than the target cuts it by the
+    ``decrease`` factor, at most once per round, so a burst of failures from
+    calls that were already in flight only counts once.
+
+    Anywhere ``kotocore`` takes a ``max_workers`` (``map``, ``Batch``,
+    ``TaskGraph``, ``FanOut`` & ``Pipeline`` stages), an ``AdaptiveLimit``
+    can be passed instead. Share one between callers to adapt them together.
+
+    Usage::
+
+        >>> limit = AdaptiveLimit(initial=4, maximum=64, latency_target=0.5)
+        >>> results = list(conn.map('get_item', keys, max_workers=limit))
+        >>> limit.current
+        23
+
+    Throttling errors that are retried (see ``kotocore.retries``) never
+    reach the limit, but the backoff shows up as latency, so setting a
+    ``latency_target`` is recommended.
+    """
+    def __init__(self, initial=4, minimum=1, maximum=64, increase=1.0,
+                 decrease=0.5, latency_target=None, codes=None,
+                 clock=time.time):
+        """
+        Creates a new ``AdaptiveLimit`` instance.
+
+        :param initial: (Optional) The starting limit. Default is ``4``.
+        :type initial: integer
+
+        :param minimum: (Optional) The lowest the limit goes. Default is
+            ``1``.
+        :type minimum: integer
+
+        :param maximum: (Optional) The highest the limit goes. Default is
+            ``64``.
+        :type maximum: integer
+
+        :param increase: (Optional) How much the limit grows per round of
+            successful calls. Default is ``1.0``.
+        :type increase: float
+
+        :param decrease: (Optional) The factor the limit is cut by on
+            throttling or slow calls. Default is ``0.5``.
+        :type decrease: float
+
+        :param latency_target: (Optional) Calls slower than this (in seconds)
+            count as overload. Default is ``None`` (only errors count).
+        :type latency_target: float
+
+        :param codes: (Optional) The error codes that mean throttling.
+            Default is ``kotocore.retries.THROTTLING_CODES``.
+        :type codes: set
+
+        :param clock: (Optional) Returns the current time in seconds. Default
+            is ``time.time``.
+        :type clock: callable
+        """
+        if not 1 <= minimum <= initial <= maximum:
+            raise ValueError(
+                "The limits must satisfy 1 <= minimum <= initial <= maximum."
+            )
+
+        if not 0 < decrease < 1:
+            raise ValueError("'decrease' must be between 0 & 1.")
+
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_target = latency_target
+        self.codes = frozenset(codes or THROTTLING_CODES)
+        self.clock = clock
+        self.in_flight = 0
+        self._limit = float(initial)
+        self._last_decrease = None
+        self._condition = threading.Condition()
+        self._stats = {
+            'successes': 0,
+            'throttled': 0,
+            'slow': 0,
+            'increases': 0,
+            'decreases': 0,
+            'lowest': initial,
+            'highest': initial,
+        }
+
+    @property
+    def current(self):
+        """
+        Returns the current limit, as a whole number of calls.
+
+        :rtype: integer
+        """
+        return int(self._limit)
+
+    def start(self):
+        """
+        Records that a call has started.
+
+        :returns: A token to pass to ``finish``
+        """
+        with self._condition:
+            self.in_flight += 1
+            # Only grow the limit if it's what's holding things back.
+            saturated = self.in_flight >= self.current
+            return (self.clock(), saturated)
+
+    def finish(self, token, error=None):
+        """
+        Records that a call has finished, adjusting the limit.
+
+        :param token: The token from ``start``.
+
+        :param error: (Optional) The exception the call failed with.
+        :type error: Exception
+        """
+        started_at, saturated = token
+        latency = self.clock() - started_at
+
+        with self._condition:
+            self.in_flight -= 1
+            stats = self._stats
+            before = self.current
+
+            if self.is_throttling(error):
+                stats['throttled'] += 1
+                self._cut(started_at)
+            elif error is None:
+                if self.latency_target is not None and \
+                        latency > self.latency_target:
+                    stats['slow'] += 1
+                    self._cut(started_at)
+                else:
+                    stats['successes'] += 1
+
+                    if saturated:
+                        self._limit = min(
+                            self.maximum,
+                            self._limit + self.increase / self._limit
+                        )
+
+            if self.current > before:
+                stats['increases'] += 1
+
+            stats['lowest'] = min(stats['lowest'], self.current)
+            stats['highest'] = max(stats['highest'], self.current)
+            self._condition.notify_all()
+
+    def is_throttling(self, error):
+        return isinstance(error, ServerError) and error.code in self.codes
+
+    def track(self, func, *args, **kwargs):
+        """
+        Calls ``func``, feeding the outcome into the limit.
+
+        Doesn't wait for room under the limit (see ``run``), for callers that
+        size their own window by ``current``.
+
+        :returns: Whatever ``func`` returns
+        """
+        token = self.start()
+
+        try:
+            result = func(*args, **kwargs)
+        except Exception as err:
+            self.finish(token, error=err)
+            raise
+
+        self.finish(token)
+        return result
+
+    def run(self, func, *args, **kwargs):
+        """
+        Waits for room under the limit, then calls ``func`` (see ``track``).
+
+        :returns: Whatever ``func`` returns
+        """
+        with self._condition:
+            while self.in_flight >= self.current:
+                self._condition.wait()
+
+        return self.track(func, *args, **kwargs)
+
+    def stats(self):
+        """
+        Returns the ``limit``, ``in_flight``, the ``lowest`` & ``highest``
+        the limit has been, plus counts of ``successes``, ``throttled`` &
+        ``slow`` calls & of the limit's ``increases`` & ``decreases``.
+
+        :rtype: dict
+        """
+        with self._condition:
+            stats = dict(self._stats)
+            stats['limit'] = self.current
+            stats['in_flight'] = self.in_flight
+            return stats
+
+    def _cut(self, started_at):
+        # Called with the lock held. Calls that started before the last cut
+        # were sent at the old limit, so they've already been accounted for.
+        if self._last_decrease is not None and \
+                started_at < self._last_decrease:
+            return
+
+        self._limit = max(self.minimum, self._limit * self.decrease)
+        self._last_decrease = self.clock()
+        self._stats['decreases'] += 1
+
+
+def check_workers(max_workers, name='max_workers'):
+    """
+    Raises ``ValueError`` unless ``max_workers`` is a positive number or an
+    ``AdaptiveLimit``.
+    """
+    if isinstance(max_workers, AdaptiveLimit):
+        return
+
+    if max_workers < 1:
+        raise ValueError("'{0}' must be at least 1.".format(name))
+
+
+def worker_limit(max_workers):
+    """
+    Returns how many workers may run right now, for either a fixed number or
+    an ``AdaptiveLimit``.
+
+    :rtype: integer
+    """
+    if isinstance(max_workers, AdaptiveLimit):
+        return max_workers.current
+
+    return max_workers
+
+
+def tracked(max_workers, func):
+    """
+    Wraps ``func`` to feed its outcomes into ``max_workers`` if it's an
+    ``AdaptiveLimit``. Otherwise, ``func`` is returned as is.
+
+    :rtype: callable
+    """
+    if not isinstance(max_workers, AdaptiveLimit):
+        return func
+
+    def call(*args, **kwargs):
+        return max_workers.track(func, *args, **kwargs)
+
+    # So ``describe_call`` still sees the real operation.
+    call.__wrapped__ = func
+    return call
@@ -0,0 +1,6 @@
+"""
+``asyncio``-native variants of the ``kotocore`` classes.
+
+Requires Python 3.5+. The rest of ``kotocore`` doesn't import anything from
+here, so it remains usable on older versions.
+"""
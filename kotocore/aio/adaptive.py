@@ -0,0 +1,31 @@
+"""
+The ``asyncio`` counterparts to the helpers in ``kotocore.adaptive``.
+"""
+from kotocore.adaptive import AdaptiveLimit
+
+
+def tracked_coroutine(max_workers, func):
+    """
+    Wraps the coroutine function ``func`` to feed its outcomes into
+    ``max_workers`` if it's an ``AdaptiveLimit``. Otherwise, ``func`` is
+    returned as is.
+
+    :rtype: callable
+    """
+    if not isinstance(max_workers, AdaptiveLimit):
+        return func
+
+    async def call(*args, **kwargs):
+        token = max_workers.start()
+
+        try:
+            result = await func(*args, **kwargs)
+        except Exception as err:
+            max_workers.finish(token, error=err)
+            raise
+
+        max_workers.finish(token)
+        return result
+
+    call.__wrapped__ = func
+    return call
@@ -0,0 +1,32 @@
+"""
+The ``asyncio`` counterpart to ``CircuitBreakers.call``.
+"""
+
+
+async def guarded_call(breakers, service_name, region_name, func):
+    """
+    Awaits ``func()`` through the endpoint's breaker (see
+    ``CircuitBreakers.call``). A cancelled call counts for nothing.
+
+    :param breakers: The session's breakers.
+    :type breakers: <kotocore.circuit.CircuitBreakers> instance
+
+    :param func: Returns a new coroutine making the request.
+    :type func: callable
+
+    :returns: Whatever ``func`` returns
+    """
+    breaker = breakers.breaker_for(service_name, region_name)
+    breaker.before_call()
+
+    try:
+        result = await func()
+    except Exception as err:
+        breakers.record(breaker, err)
+        raise
+    except BaseException:
+        breaker.abandoned()
+        raise
+
+    breaker.succeeded()
+    return result
@@ -0,0 +1,71 @@
+"""
+The ``asyncio`` counterpart to ``Coalescer.call``.
+"""
+import asyncio
+import copy
+
+
+async def coalesced_call(coalescer, service_name, operation_name, key, func,
+                         share=copy.deepcopy):
+    """
+    Awaits ``func()``, unless an identical call is already in flight on this
+    loop, in which case its outcome is awaited instead (see
+    ``Coalescer.call``).
+
+    The shared request runs as its own task, so cancelling one caller (Ex.
+    at its deadline) leaves the others waiting on it.
+
+    :param coalescer: The session's coalescer.
+    :type coalescer: <kotocore.coalesce.Coalescer> instance
+
+    :param key: From ``Coalescer.key_for``. If ``None``, ``func()`` is
+        simply awaited.
+    :type key: tuple
+
+    :param func: Returns a new coroutine making the call.
+    :type func: callable
+
+    :returns: Whatever ``func`` returns
+    """
+    if key is None:
+        return await func()
+
+    loop = asyncio.get_running_loop()
+    # Flights on other loops (or threads) can't be awaited from this one.
+    key = (key, loop)
+    flight = loop.create_future()
+    existing = coalescer.claim(key, flight)
+
+    if existing is not flight:
+        coalescer.counted(service_name, operation_name, leader=False)
+        return share(await asyncio.shield(existing))
+
+    coalescer.counted(service_name, operation_name, leader=True)
+    request = asyncio.ensure_future(func())
+
+    def finished(request):
+        coalescer.release(key, flight)
+
+        error = None
+
+        if request.cancelled():
+            flight.cancel()
+            return
+
+        if request.exception() is not None:
+            error = request.exception()
+        else:
+            try:
+                flight.set_result(share(request.result()))
+            except Exception as err:
+                # Ex. a streamed body that can't be copied. The waiting
+                # callers must still be woken.
+                error = err
+
+        if error is not None:
+            flight.set_exception(error)
+            # Marks it as seen, in case no one else was waiting.
+            flight.exception()
+
+    request.add_done_callback(finished)
+    return await asyncio.shield(request)
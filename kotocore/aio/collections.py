@@ -0,0 +1,223 @@
+from kotocore.aio.concurrency import map_coroutines
+from kotocore.collections import Collection, CollectionFactory
+from kotocore.exceptions import NoSuchMethod
+from kotocore.utils.constants import DEFAULT_DOCSTRING
+from kotocore.utils.mangle import to_snake_case
+
+
+class AsyncCollection(Collection):
+    """
+    A common base class for all the ``AsyncCollection`` objects.
+
+    Operation methods are coroutines. Iterating with ``async for`` streams
+    the results of the ``each`` operation page by page::
+
+        >>> async for obj in bucket.objects:
+        ...     print(obj.key)
+
+    """
+    def __init__(self, connection=None, **kwargs):
+        """
+        Creates a new ``AsyncCollection`` instance.
+
+        :param connection: (Optional) Specifies what connection to use.
+            By default, this is a matching ``AsyncConnection`` subclass
+            provided by the ``session``.
+        :type connection: <class kotocore.aio.connection.AsyncConnection>
+            **SUBCLASS**
+
+        :param **kwargs: (Optional) Reserved for future use.
+        :type **kwargs: dict
+        """
+        if connection is None:
+            connection = self._details.session.connect_to_async(
+                self._details.service_name
+            )
+
+        super(AsyncCollection, self).__init__(connection=connection, **kwargs)
+
+    @classmethod
+    def _from_session(cls, session, service_name, name):
+        return session.get_async_collection(
+            service_name,
+            name,
+            base_class=cls
+        )
+
+    def __iter__(self):
+        # ``each`` is a coroutine here, so a plain ``for`` can't work.
+        raise TypeError(
+            "'{0}' objects can't be iterated with 'for'. Use 'async for' "
+            "instead.".format(self.__class__.__name__)
+        )
+
+    def __aiter__(self):
+        return self.iterate()
+
+    async def iterate(self, method_name='each', **kwargs):
+        """
+        Streams ``Resource`` instances from a listing operation, following
+        pagination as needed.
+
+        Each page is run through ``post_process``, then the instances are
+        built one at a time as they're consumed (so ``post_process_each`` is
+        **NOT** used here). The next page is fetched while the current one is
+        being consumed.
+
+        :param method_name: (Optional) The collection operation to list with.
+            Default is ``each``.
+        :type method_name: string
+
+        :param **kwargs: (Optional) Any further parameters for the operation.
+        :type **kwargs: dict
+
+        :returns: An async iterator of ``AsyncResource`` subclass instances
+        """
+        ops = self._details.collection_data.get('operations', {})
+
+        if not method_name in ops:
+            msg = "No operation named '{0}' available on the collection."
+            raise NoSuchMethod(msg.format(method_name))
+
+        conn_method_name = to_snake_case(ops[method_name]['api_name'])
+        result_key = self._details.result_key_for(method_name)
+        params = self.full_update_params(method_name, kwargs)
+        pages = self._connection._iter_pages(conn_method_name, **params)
+
+        async for page in pages:
+            page = self.post_process(method_name, page)
+
+            if not result_key:
+                yield page
+                continue
+
+            for data in page.get(result_key) or []:
+                yield self.build_resource(data)
+
+    def map_resources(self, method_name, resources=None, max_workers=None,
+                      ordered=True, **kwargs):
+        """
+        Calls the same method on many ``AsyncResource`` instances
+        concurrently.
+
+        Like ``Collection.map_resources``, but gives back an async iterator.
+        By default, the resources are everything ``async for`` over the
+        collection produces. They're streamed in as the window has room, so
+        mapping starts with the first page & long listings are never held
+        in memory.
+
+        Usage::
+
+            >>> async for result in bucket.objects.map_resources('get'):
+            ...     print(result)
+
+        :param method_name: The name of the method to call on each resource.
+            Ex. ``get``, ``delete``, etc.
+        :type method_name: string
+
+        :param resources: (Optional) The resources to call the method on.
+        :type resources: iterable or async iterable
+
+        :param max_workers: (Optional) The most calls to have in flight at
+            once, or an ``AdaptiveLimit`` to size that by. Default is the
+            session's ``max_workers``.
+        :type max_workers: integer or <kotocore.adaptive.AdaptiveLimit>
+            instance
+
+        :param ordered: (Optional) Whether results should be yielded in the
+            same order as the resources. Default is ``True``.
+        :type ordered: boolean
+
+        :param **kwargs: (Optional) Any parameters to pass along to every
+            call.
+        :type **kwargs: dict
+
+        :returns: An async generator of results (or ``ServerError``
+            instances)
+        """
+        if max_workers is None:
+            max_workers = self._details.session.max_workers
+
+        async def call(resource):
+            return await getattr(resource, method_name)(**kwargs)
+
+        async def results():
+            to_map = resources
+
+            if to_map is None:
+                to_map = self
+
+            if hasattr(to_map, '__aiter__'):
+                kwargs = ({'resource': resource} async for resource in to_map)
+            else:
+                kwargs = ({'resource': resource} for resource in to_map)
+
+            mapped = map_coroutines(
+                call,
+                kwargs,
+                max_workers,
+                ordered=ordered
+            )
+
+            try:
+                async for result in mapped:
+                    yield result
+            finally:
+                # Stops the calls (& the listing) if the caller bails early.
+                await mapped.aclose()
+
+        return results()
+
+    def _get_resource_class(self):
+        return self._details.session.get_async_resource(
+            self._details.service_name,
+            self._details.resource
+        )
+
+
+class AsyncCollectionFactory(CollectionFactory):
+    """
+    Generates ``AsyncCollection`` classes based off the ``ResourceJSON``
+    included in the SDK.
+
+    Usage::
+
+        >>> acf = AsyncCollectionFactory(session=session)
+        >>> BucketCollection = acf.construct_for('s3', 'BucketCollection')
+        >>> async for bucket in BucketCollection():
+        ...     print(bucket.name)
+
+    """
+    def __init__(self, session=None, loader=None,
+                 base_collection_class=AsyncCollection, **kwargs):
+        """
+        Creates a new ``AsyncCollectionFactory`` instance.
+
+        Takes the same arguments as ``CollectionFactory``, but defaults the
+        ``base_collection_class`` to ``AsyncCollection``.
+        """
+        super(AsyncCollectionFactory, self).__init__(
+            session=session,
+            loader=loader,
+            base_collection_class=base_collection_class,
+            **kwargs
+        )
+
+    def _create_operation_method(factory_self, method_name, op_data):
+        conn_method_name = to_snake_case(op_data['api_name'])
+
+        async def _new_method(self, **kwargs):
+            params = self.full_update_params(method_name, kwargs)
+            method = getattr(self._connection, conn_method_name, None)
+
+            if not method:
+                msg = "Introspected method named '{0}' not available on " + \
+                      "the connection."
+                raise NoSuchMethod(msg.format(conn_method_name))
+
+            result = await method(**params)
+            return self.full_post_process(method_name, result)
+
+        _new_method.__name__ = method_name
+        _new_method.__doc__ = DEFAULT_DOCSTRING
+        return _new_method
@@ -0,0 +1,125 @@
+"""
+Helpers for running coroutines concurrently.
+"""
+import asyncio
+import collections
+
+from kotocore.adaptive import check_workers, worker_limit
+from kotocore.aio.adaptive import tracked_coroutine
+from kotocore.exceptions import ServerError
+
+
+async def map_coroutines(func, kwargs_iterable, max_workers, ordered=True,
+                         catch=(ServerError,)):
+    """
+    The ``async`` counterpart to ``kotocore.utils.concurrency.map_calls``.
+
+    Awaits ``func`` once per set of keyword arguments, with at most
+    ``max_workers`` of them in flight at once, yielding the results as they
+    become available. Exceptions listed in ``catch`` are yielded in place of
+    a result. Anything else is raised.
+
+    Usage::
+
+        >>> async for result in map_coroutines(conn.head_object, kwargs, 8):
+        ...     print(result)
+
+    :param func: The coroutine function to call.
+    :type func: callable
+
+    :param kwargs_iterable: An iterable (or async iterable) of dictionaries,
+        each being the keyword arguments for one call. It's consumed lazily,
+        only as the window has room.
+    :type kwargs_iterable: iterable
+
+    :param max_workers: The most calls to have in flight at once, or an
+        ``AdaptiveLimit`` to size the window by.
+    :type max_workers: integer or <kotocore.adaptive.AdaptiveLimit> instance
+
+    :param ordered: (Optional) Whether the results should be yielded in the
+        same order as the input. If ``False``, results are yielded as they
+        complete. Default is ``True``.
+    :type ordered: boolean
+
+    :param catch: (Optional) The exception classes to yield rather than
+        raise. Default is ``(ServerError,)``.
+    :type catch: tuple
+
+    :returns: An async generator of results (or caught exceptions)
+    """
+    check_workers(max_workers)
+
+    is_async = hasattr(kwargs_iterable, '__aiter__')
+
+    if is_async:
+        kwargs_iter = kwargs_iterable.__aiter__()
+    else:
+        kwargs_iter = iter(kwargs_iterable)
+
+    func = tracked_coroutine(max_workers, func)
+
+    if ordered:
+        pending = collections.deque()
+    else:
+        pending = set()
+
+    async def submit_next():
+        try:
+            if is_async:
+                kwargs = await kwargs_iter.__anext__()
+            else:
+                kwargs = next(kwargs_iter)
+        except (StopIteration, StopAsyncIteration):
+            return False
+
+        task = asyncio.ensure_future(func(**kwargs))
+
+        if ordered:
+            pending.append(task)
+        else:
+            pending.add(task)
+
+        return True
+
+    async def fill():
+        # An adaptive limit may have grown (or shrunk) since the last call.
+        while len(pending) < worker_limit(max_workers):
+            if not await submit_next():
+                break
+
+    def outcome(task):
+        try:
+            return task.result()
+        except catch as err:
+            return err
+
+    try:
+        await fill()
+
+        while pending:
+            if ordered:
+                # Wait on the head of the line, to keep the input order.
+                done = [pending.popleft()]
+                await asyncio.wait(done)
+            else:
+                done, not_done = await asyncio.wait(
+                    pending,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                pending.difference_update(done)
+
+            for task in done:
+                # Keep the window full before handing anything back.
+                await fill()
+                yield outcome(task)
+    finally:
+        # If the caller bailed early, don't leave work running.
+        for task in pending:
+            task.cancel()
+
+        if pending:
+            # Lets them unwind while the loop is still running.
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        if is_async and hasattr(kwargs_iter, 'aclose'):
+            await kwargs_iter.aclose()
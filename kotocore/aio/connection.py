@@ -0,0 +1,496 @@
+import asyncio
+
+from kotocore.aio.circuit import guarded_call
+from kotocore.aio.coalesce import coalesced_call
+from kotocore.aio.concurrency import map_coroutines
+from kotocore.aio.deadlines import within_deadline
+from kotocore.aio.hedging import hedged_call
+from kotocore.aio.inflight import acquire_limits
+from kotocore.connection import Connection, ConnectionFactory
+from kotocore.deadlines import carry_deadline, current_deadline, deadline
+from kotocore.deadlines import resolve_deadline
+from kotocore.exceptions import NoSuchMethod
+from kotocore.utils.constants import DEFAULT_REGION
+from kotocore.utils.mangle import to_snake_case
+
+
+# Sentinel for when the page iterator is exhausted.
+_NO_PAGE = object()
+
+
+class AsyncConnection(Connection):
+    """
+    A common base class for all the ``AsyncConnection`` objects.
+
+    Every operation method is a coroutine. Parameter checking, building &
+    error checking all happen on the event loop, while the blocking
+    transport work is handed off to a bounded executor.
+    """
+    def __init__(self, region_name=DEFAULT_REGION, executor=None,
+                 core_session=None):
+        """
+        Creates a new async connection instance.
+
+        :param region_name: (Optional) The name of the region to connect to.
+            By default, this is the value from
+            ``kotocore.utils.constants.DEFAULT_REGION``.
+        :type region_name: string
+
+        :param executor: (Optional) The executor the blocking transport work
+            should run on. By default, this is the thread pool owned by the
+            ``Session`` (see ``Session.get_executor``).
+        :type executor: <concurrent.futures.Executor> instance
+
+        :param core_session: (Optional) A ``botocore`` session to make the
+            requests with. See ``Connection``.
+        :type core_session: <botocore.session.Session> instance
+        """
+        super(AsyncConnection, self).__init__(
+            region_name=region_name,
+            core_session=core_session
+        )
+        self._executor = executor
+
+    @classmethod
+    def _from_session(cls, session, service_name, name=None):
+        return session.get_async_connection(service_name)
+
+    @property
+    def executor(self):
+        """
+        Returns the executor used for the blocking transport work.
+
+        :rtype: <concurrent.futures.Executor> instance
+        """
+        if self._executor is None:
+            self._executor = self._details.session.get_executor()
+
+        return self._executor
+
+    def map(self, method_name, kwargs_iterable, max_workers=None,
+            ordered=True):
+        """
+        Calls the same operation once per set of keyword arguments,
+        concurrently.
+
+        Like ``Connection.map``, but gives back an async iterator. A
+        ``ServerError`` raised by any one call is yielded in place of its
+        result.
+
+        Usage::
+
+            >>> urls = [{'queue_url': url} for url in queue_urls]
+            >>> async for attrs in conn.map('get_queue_attributes', urls):
+            ...     print(attrs)
+
+        :param method_name: The name of the operation method. Ex.
+            ``head_object``
+        :type method_name: string
+
+        :param kwargs_iterable: An iterable of dictionaries, each being the
+            parameters for one call.
+        :type kwargs_iterable: iterable
+
+        :param max_workers: (Optional) The most calls to have in flight at
+            once, or an ``AdaptiveLimit`` to size that by. Default is the
+            session's ``max_workers``.
+        :type max_workers: integer or <kotocore.adaptive.AdaptiveLimit>
+            instance
+
+        :param ordered: (Optional) Whether results should be yielded in the
+            same order as the input. If ``False``, they're yielded as they
+            complete. Default is ``True``.
+        :type ordered: boolean
+
+        :returns: An async generator of response data (or ``ServerError``
+            instances)
+        """
+        method = getattr(self, method_name, None)
+
+        if method is None:
+            msg = "No operation named '{0}' available on the connection."
+            raise NoSuchMethod(msg.format(method_name))
+
+        if max_workers is None:
+            max_workers = self._details.session.max_workers
+
+        return map_coroutines(
+            method,
+            kwargs_iterable,
+            max_workers,
+            ordered=ordered
+        )
+
+    async def _make_request_async(self, op_data, service_params):
+        """
+        Runs ``_make_request`` on the executor, without blocking the loop.
+        The deadline in effect (if any) goes along, to shorten the socket
+        timeout.
+
+        :param op_data: The introspected data for the operation
+        :type op_data: dict
+
+        :param service_params: The prepared parameters for the call
+        :type service_params: dict
+
+        :returns: The raw ``(http_response, parsed)`` tuple from ``botocore``
+        :rtype: tuple
+        """
+        return await self._run_blocking(
+            to_snake_case(op_data['api_name']),
+            carry_deadline(self._make_request),
+            op_data,
+            service_params
+        )
+
+    async def _send_async(self, method_name, op_data, service_params):
+        """
+        Makes a single attempt at a call (see ``Connection._send``).
+
+        Any waits for the session's ``rate_limiter`` or
+        ``concurrency_limiter`` happen on the loop.
+
+        :returns: The raw ``(http_response, parsed)`` tuple from ``botocore``
+        :rtype: tuple
+        """
+        session = self._details.session
+        service_name = self._details.service_name
+        limiter = getattr(session, 'rate_limiter', None)
+        concurrency = getattr(session, 'concurrency_limiter', None)
+        held = []
+
+        if limiter is not None:
+            delay = limiter.reserve(
+                service_name,
+                self.region_name,
+                method_name
+            )
+
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        if concurrency is not None:
+            held = await acquire_limits(
+                concurrency,
+                service_name,
+                self.region_name,
+                method_name
+            )
+
+        try:
+            results = await self._make_request_async(op_data, service_params)
+        finally:
+            if held:
+                concurrency.release(held)
+
+        self._check_for_errors(results)
+        return results
+
+    async def _call_cached_async(self, method_name, op_data, service_params,
+                                 use_cache=True):
+        """
+        Makes a call (see ``_call_service_async``), answering it from the
+        session's ``response_cache`` (if any) when possible (see
+        ``Connection._call_cached``).
+
+        :returns: The raw ``(http_response, parsed)`` tuple from ``botocore``
+        :rtype: tuple
+        """
+        cache = getattr(self._details.session, 'response_cache', None)
+        key, generation, results = self._check_cache(
+            cache,
+            method_name,
+            op_data,
+            service_params,
+            use_cache
+        )
+
+        if results is not None:
+            return results
+
+        try:
+            results = await self._call_service_async(
+                method_name,
+                op_data,
+                service_params
+            )
+        finally:
+            self._update_cache(
+                cache,
+                key,
+                generation,
+                method_name,
+                service_params,
+                results
+            )
+
+        return results
+
+    async def _call_service_async(self, method_name, op_data, service_params):
+        """
+        Makes a call (see ``_retry_async``), within the deadline in effect
+        (if any). At the deadline, the call is cancelled &
+        ``DeadlineExceeded`` is raised.
+
+        If the session has a ``coalescer``, an identical call already in
+        flight on the loop is shared instead.
+
+        :returns: The raw ``(http_response, parsed)`` tuple from ``botocore``
+        :rtype: tuple
+        """
+        coalescer = getattr(self._details.session, 'coalescer', None)
+        key = self._coalesce_key(
+            coalescer,
+            method_name,
+            op_data,
+            service_params
+        )
+
+        if key is None:
+            call = self._retry_async(method_name, op_data, service_params)
+        else:
+            call = coalesced_call(
+                coalescer,
+                self._details.service_name,
+                method_name,
+                key,
+                lambda: self._retry_async(
+                    method_name,
+                    op_data,
+                    service_params
+                ),
+                share=self._share_results
+            )
+
+        current = current_deadline()
+
+        if current is None:
+            return await call
+
+        return await within_deadline(current, call)
+
+    async def _retry_async(self, method_name, op_data, service_params):
+        """
+        Makes a call, retrying failures as the session's ``retry_policy``
+        allows. Backoff waits on the loop, not the executor. Each attempt is
+        hedged if the session has a ``hedging_policy``, & each request goes
+        through the endpoint's breaker if it has ``circuit_breakers``.
+
+        :returns: The raw ``(http_response, parsed)`` tuple from ``botocore``
+        :rtype: tuple
+        """
+        session = self._details.session
+        service_name = self._details.service_name
+        policy = getattr(session, 'retry_policy', None)
+        hedging = getattr(session, 'hedging_policy', None)
+        breakers = getattr(session, 'circuit_breakers', None)
+
+        def request():
+            if breakers is None:
+                return self._send_async(method_name, op_data, service_params)
+
+            return guarded_call(
+                breakers,
+                service_name,
+                self.region_name,
+                lambda: self._send_async(method_name, op_data, service_params)
+            )
+
+        def send():
+            if hedging is None:
+                return request()
+
+            return hedged_call(hedging, service_name, method_name, request)
+
+        if policy is None:
+            return await send()
+
+        attempt = 1
+
+        while True:
+            try:
+                results = await send()
+            except Exception as err:
+                delay = policy.next_delay(
+                    service_name,
+                    method_name,
+                    err,
+                    attempt
+                )
+
+                if delay is None:
+                    raise
+
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+
+            policy.succeeded(service_name, method_name)
+            return results
+
+    def _run_blocking(self, method_name, func, *args):
+        """
+        Runs a blocking call on the executor, returning an awaitable for the
+        result.
+
+        Priority-aware executors (see ``kotocore.scheduler``) are told which
+        operation the call is for.
+
+        :param method_name: The name of the operation. Ex. ``list_objects``
+        :type method_name: string
+
+        :param func: The blocking callable.
+        :type func: callable
+
+        :rtype: <asyncio.Future> instance
+        """
+        loop = asyncio.get_running_loop()
+        submit_for = getattr(self.executor, 'submit_for', None)
+
+        if submit_for is None:
+            return loop.run_in_executor(self.executor, func, *args)
+
+        return asyncio.wrap_future(
+            submit_for(self._details.service_name, method_name, func, *args),
+            loop=loop
+        )
+
+    async def _iter_pages(self, method_name, **kwargs):
+        """
+        Calls an operation, yielding the post-processed results one page at
+        a time.
+
+        While a page is being consumed, the request for the next one is
+        already in flight on the executor.
+
+        :param method_name: The name of the operation method. Ex.
+            ``list_objects``
+        :type method_name: string
+
+        Each page must arrive within the deadline in effect (or given as
+        ``_deadline``), if any.
+
+        :returns: An async iterator of post-processed pages
+        """
+        current = resolve_deadline(kwargs.pop('_deadline', None))
+        op_data = self._get_operation_data(method_name)
+        self._check_method_params(op_data['params'], **kwargs)
+        service_params = self._build_service_params(
+            op_data['params'],
+            **kwargs
+        )
+
+        # Building the page iterator is lazy (no requests are made until it's
+        # advanced), so it's safe to do on the loop.
+        pages = self._make_paged_request(op_data, service_params)
+        pending = self._run_blocking(method_name, next, pages, _NO_PAGE)
+
+        try:
+            while True:
+                if current is None:
+                    results = await pending
+                else:
+                    results = await within_deadline(current, pending)
+
+                if results is _NO_PAGE:
+                    break
+
+                # Prefetch the next page before handing this one over.
+                pending = self._run_blocking(
+                    method_name,
+                    next,
+                    pages,
+                    _NO_PAGE
+                )
+                self._check_for_errors(results)
+                yield self._post_process_results(
+                    method_name,
+                    op_data['output'],
+                    results
+                )
+        finally:
+            # If the caller stopped early, a prefetch may still be pending.
+            # ``cancel`` only fails if it already finished, in which case its
+            # outcome is retrieved (& dropped) so nothing is left unobserved.
+            if not pending.cancel() and not pending.cancelled():
+                try:
+                    pending.result()
+                except Exception:
+                    pass
+
+
+class AsyncConnectionFactory(ConnectionFactory):
+    """
+    Builds custom ``AsyncConnection`` subclasses based on the service's
+    operations.
+
+    Usage::
+
+        >>> acf = AsyncConnectionFactory(session=session)
+        >>> S3AsyncConnection = acf.construct_for('s3')
+        >>> conn = S3AsyncConnection(region_name='us-west-2')
+        >>> buckets = await conn.list_buckets()
+
+    """
+    def __init__(self, session, base_connection=AsyncConnection, **kwargs):
+        """
+        Creates a new ``AsyncConnectionFactory`` instance.
+
+        Takes the same arguments as ``ConnectionFactory``, but defaults the
+        ``base_connection`` to ``AsyncConnection``.
+        """
+        super(AsyncConnectionFactory, self).__init__(
+            session,
+            base_connection=base_connection,
+            **kwargs
+        )
+
+    def _build_class_name(self, service_name):
+        return '{0}AsyncConnection'.format(service_name.capitalize())
+
+    def _create_operation_method(factory_self, method_name, orig_op_data):
+        async def _new_method(self, **kwargs):
+            # The most seconds the call may take, if given.
+            seconds = kwargs.pop('_deadline', None)
+            # Whether the response cache (if any) may answer the call.
+            use_cache = kwargs.pop('_cache', True)
+
+            # Fetch the information about the operation.
+            op_data = self._get_operation_data(method_name)
+
+            # Check the parameters.
+            self._check_method_params(
+                op_data['params'],
+                **kwargs
+            )
+
+            # Prep the service's parameters.
+            service_params = self._build_service_params(
+                op_data['params'],
+                **kwargs
+            )
+
+            # Actually call the service (off the loop), checking for errors
+            # & retrying.
+            with deadline(seconds):
+                results = await self._call_cached_async(
+                    method_name,
+                    op_data,
+                    service_params,
+                    use_cache=use_cache
+                )
+
+            # Post-process results here
+            post_processed = self._post_process_results(
+                method_name,
+                op_data['output'],
+                results
+            )
+            return post_processed
+
+        # Swap the name, so it looks right.
+        _new_method.__name__ = method_name
+        # Assign docstring.
+        _new_method.__doc__ = factory_self._generate_docstring(orig_op_data)
+        # Return the newly constructed method.
+        return _new_method
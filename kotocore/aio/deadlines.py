@@ -0,0 +1,27 @@
+"""
+The ``asyncio`` side of ``kotocore.deadlines``, where reaching a deadline
+cancels the call.
+"""
+import asyncio
+
+
+async def within_deadline(deadline, awaitable):
+    """
+    Awaits ``awaitable``, cancelling it & raising ``DeadlineExceeded`` if
+    ``deadline`` passes first.
+
+    :param deadline: The deadline to finish by.
+    :type deadline: <kotocore.deadlines.Deadline> instance
+
+    :param awaitable: The coroutine or future to await.
+
+    :returns: Whatever ``awaitable`` gives
+    """
+    try:
+        return await asyncio.wait_for(awaitable, deadline.remaining())
+    except asyncio.TimeoutError:
+        if not deadline.expired:
+            # Raised by the call itself, not the deadline.
+            raise
+
+        raise deadline.exceeded()
@@ -0,0 +1,77 @@
+"""
+The ``asyncio`` counterpart to ``HedgingPolicy.call``.
+"""
+import asyncio
+import time
+
+
+async def hedged_call(policy, service_name, operation_name, func):
+    """
+    Awaits ``func()``, hedging it if it's slow (see ``HedgingPolicy.call``).
+
+    Both requests run as tasks on the loop & the losing one is cancelled
+    (though a request already running on the executor still finishes there).
+
+    :param policy: The policy deciding when to hedge.
+    :type policy: <kotocore.hedging.HedgingPolicy> instance
+
+    :param func: Returns a new coroutine making the request.
+    :type func: callable
+
+    :returns: Whatever ``func`` returns
+    """
+    if not policy.should_hedge(service_name, operation_name):
+        return await func()
+
+    policy.started(service_name, operation_name)
+    delay = policy.hedge_delay(service_name, operation_name)
+
+    async def timed():
+        start = time.time()
+        result = await func()
+        policy.record(service_name, operation_name, time.time() - start)
+        return result
+
+    if delay is None:
+        return await timed()
+
+    primary = asyncio.ensure_future(timed())
+    done, pending = await asyncio.wait([primary], timeout=delay)
+
+    if done or not policy.allow_hedge(service_name, operation_name):
+        return await primary
+
+    hedge = asyncio.ensure_future(timed())
+    pending = set([primary, hedge])
+    first_error = None
+
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending,
+                return_when=asyncio.FIRST_COMPLETED
+            )
+
+            for task in done:
+                if task.exception() is None:
+                    for other in pending:
+                        other.cancel()
+
+                    policy.finished(
+                        service_name,
+                        operation_name,
+                        hedge_won=task is hedge,
+                        cancelled=bool(pending)
+                    )
+                    pending = set()
+                    return task.result()
+
+                if first_error is None:
+                    first_error = task.exception()
+    finally:
+        # Cancelled ourselves, so don't leave either request behind.
+        for task in pending:
+            task.cancel()
+
+    policy.finished(service_name, operation_name)
+    raise first_error
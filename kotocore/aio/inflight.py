@@ -0,0 +1,107 @@
+"""
+The ``asyncio`` counterparts to the blocking waits in ``kotocore.inflight``.
+"""
+import asyncio
+import time
+
+from kotocore.exceptions import ConcurrencyLimitTimeout
+from kotocore.utils.constants import NOTHING_PROVIDED
+
+
+async def acquire_semaphore(semaphore, timeout=None):
+    """
+    Waits (without blocking the loop) until a slot on an
+    ``EndpointSemaphore`` is free.
+
+    Cancelling the wait gives up the place in line (or the slot, if it was
+    handed over in the meantime).
+
+    :param semaphore: The semaphore to take a slot from.
+    :type semaphore: <kotocore.inflight.EndpointSemaphore> instance
+
+    :param timeout: (Optional) The most seconds to wait. Default is ``None``
+        (wait forever).
+    :type timeout: float
+
+    :returns: How long (in seconds) the caller waited
+    :rtype: float
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    start = time.time()
+
+    def deliver():
+        if not future.done():
+            future.set_result(None)
+
+    def notify():
+        # May be called from any thread.
+        try:
+            loop.call_soon_threadsafe(deliver)
+        except RuntimeError:
+            # The loop has closed, so nobody is waiting anymore.
+            return False
+
+        return True
+
+    waiter = semaphore.request(notify)
+
+    if waiter is None:
+        return 0.0
+
+    try:
+        await asyncio.wait_for(future, timeout)
+    except asyncio.TimeoutError:
+        if semaphore.cancel(waiter):
+            raise ConcurrencyLimitTimeout(
+                "Timed out after {0}s waiting for one of {1} slots.".format(
+                    timeout,
+                    semaphore.limit
+                )
+            )
+    except BaseException:
+        # Cancelled. If the slot arrived anyway, pass it on.
+        if not semaphore.cancel(waiter):
+            semaphore.release()
+
+        raise
+
+    return time.time() - start
+
+
+async def acquire_limits(limiter, service_name, region_name, operation_name,
+                         timeout=NOTHING_PROVIDED):
+    """
+    The ``async`` counterpart to ``ConcurrencyLimiter.acquire``.
+
+    :returns: The semaphores held, to pass to ``limiter.release``
+    :rtype: list
+    """
+    if timeout is NOTHING_PROVIDED:
+        timeout = limiter.timeout
+
+    deadline = None
+
+    if timeout is not None:
+        deadline = time.time() + timeout
+
+    held = []
+
+    try:
+        for semaphore in limiter.semaphores_for(
+            service_name,
+            region_name,
+            operation_name
+        ):
+            remaining = None
+
+            if deadline is not None:
+                remaining = max(0.0, deadline - time.time())
+
+            await acquire_semaphore(semaphore, timeout=remaining)
+            held.append(semaphore)
+    except BaseException:
+        limiter.release(held)
+        raise
+
+    return held
@@ -0,0 +1,102 @@
+from kotocore.exceptions import NoSuchMethod, NoRelation
+from kotocore.resources import Resource, ResourceFactory
+from kotocore.utils.constants import DEFAULT_DOCSTRING
+from kotocore.utils.mangle import to_snake_case
+
+
+class AsyncResource(Resource):
+    """
+    A common base class for all the ``AsyncResource`` objects.
+
+    Operation methods are coroutines & related objects are the async
+    variants as well.
+    """
+    def __init__(self, connection=None, **kwargs):
+        """
+        Creates a new ``AsyncResource`` instance.
+
+        :param connection: (Optional) Specifies what connection to use.
+            By default, this is a matching ``AsyncConnection`` subclass
+            provided by the ``session``.
+        :type connection: <class kotocore.aio.connection.AsyncConnection>
+            **SUBCLASS**
+
+        :param **kwargs: (Optional) Instance data to be specified on the
+            instance itself.
+        :type **kwargs: dict
+        """
+        if connection is None:
+            connection = self._details.session.connect_to_async(
+                self._details.service_name
+            )
+
+        super(AsyncResource, self).__init__(connection=connection, **kwargs)
+
+    @classmethod
+    def _from_session(cls, session, service_name, name):
+        return session.get_async_resource(service_name, name, base_class=cls)
+
+    def _get_relation_class(self, name, rel_data):
+        if rel_data['class_type'] == 'collection':
+            return self._details.session.get_async_collection(
+                self._details.service_name,
+                rel_data['class']
+            )
+        elif rel_data['class_type'] == 'resource':
+            return self._details.session.get_async_resource(
+                self._details.service_name,
+                rel_data['class']
+            )
+
+        msg = "Unknown class '{0}' for '{1}'.".format(
+            rel_data['class_type'],
+            name
+        )
+        raise NoRelation(msg)
+
+
+class AsyncResourceFactory(ResourceFactory):
+    """
+    Generates ``AsyncResource`` classes based off the ``ResourceJSON``
+    included in the SDK.
+
+    Usage::
+
+        >>> arf = AsyncResourceFactory(session=session)
+        >>> Bucket = arf.construct_for('s3', 'Bucket')
+        >>> await Bucket(bucket='my-bucket').delete()
+
+    """
+    def __init__(self, session=None, loader=None,
+                 base_resource_class=AsyncResource, **kwargs):
+        """
+        Creates a new ``AsyncResourceFactory`` instance.
+
+        Takes the same arguments as ``ResourceFactory``, but defaults the
+        ``base_resource_class`` to ``AsyncResource``.
+        """
+        super(AsyncResourceFactory, self).__init__(
+            session=session,
+            loader=loader,
+            base_resource_class=base_resource_class,
+            **kwargs
+        )
+
+    def _create_operation_method(factory_self, method_name, op_data):
+        conn_method_name = to_snake_case(op_data['api_name'])
+
+        async def _new_method(self, **kwargs):
+            params = self.full_update_params(method_name, kwargs)
+            method = getattr(self._connection, conn_method_name, None)
+
+            if not method:
+                msg = "Introspected method named '{0}' not available on " + \
+                      "the connection."
+                raise NoSuchMethod(msg.format(conn_method_name))
+
+            result = await method(**params)
+            return self.full_post_process(method_name, result)
+
+        _new_method.__name__ = method_name
+        _new_method.__doc__ = DEFAULT_DOCSTRING
+        return _new_method
@@ -0,0 +1,233 @@
+import collections
+import threading
+
+from concurrent.futures import Future, wait
+
+from kotocore.adaptive import AdaptiveLimit, check_workers, worker_limit
+from kotocore.exceptions import BatchError
+from kotocore.utils.concurrency import describe_call, on_worker_thread
+from kotocore.utils.concurrency import submit_as
+
+
+class BatchCall(object):
+    """
+    A single call queued on a ``Batch``.
+
+    Mostly here so that failures can be reported meaningfully.
+    """
+    def __init__(self, func, args, kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+
+    def __str__(self):
+        return u'{0}(**{1})'.format(
+            getattr(self.func, '__name__', repr(self.func)),
+            self.kwargs
+        )
+
+    def run(self):
+        # Bail if the caller cancelled it while it was still queued.
+        if not self.future.set_running_or_notify_cancel():
+            return
+
+        try:
+            result = self.func(*self.args, **self.kwargs)
+        except Exception as err:
+            self.future.set_exception(err)
+        else:
+            self.future.set_result(result)
+
+
+class Batch(object):
+    """
+    Runs a group of calls concurrently on a shared executor, handing back a
+    ``Future`` for each.
+
+    Typically created via ``Session.batch``, rather than directly.
+
+    Usage::
+
+        >>> with session.batch(max_workers=16) as b:
+        ...     f1 = b.call(bucket.get)
+        ...     f2 = b.call(queue.get_attributes, attribute_names=['All'])
+        >>> f1.result()
+
+    Leaving the block waits for every call to finish. If any of them failed,
+    a ``BatchError`` is raised listing all the failures.
+
+    Batches opened from within a call that is already running on the pool
+    (say, a batched call that opens its own batch) run their calls inline
+    as they're submitted, rather than risking a deadlock on a full pool.
+    """
+    def __init__(self, executor, max_workers, defer=False):
+        """
+        Creates a new ``Batch`` instance.
+
+        :param executor: The executor to run the calls on.
+        :type executor: <concurrent.futures.Executor> instance
+
+        :param max_workers: The most calls from this batch to have running
+            at once, or an ``AdaptiveLimit`` to size that by.
+        :type max_workers: integer or <kotocore.adaptive.AdaptiveLimit>
+            instance
+
+        :param defer: (Optional) If ``True``, nothing runs until the block
+            exits (or ``run`` is called). Otherwise, calls start as soon as
+            they're submitted. Default is ``False``.
+        :type defer: boolean
+        """
+        check_workers(max_workers)
+
+        self.executor = executor
+        self.max_workers = max_workers
+        self.defer = defer
+        self.calls = []
+        self._queued = collections.deque()
+        self._running = 0
+        self._started = not defer
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            # The block itself blew up. Don't start anything new, but let
+            # what's already running finish.
+            self.cancel()
+            wait([call.future for call in self.calls])
+            return False
+
+        self.run()
+        self.wait()
+        errors = self.errors
+
+        if errors:
+            raise BatchError(errors)
+
+        return False
+
+    def call(self, func, *args, **kwargs):
+        """
+        Queues a call as part of the batch.
+
+        :param func: The callable to run. Typically a ``Connection``,
+            ``Resource`` or ``Collection`` method.
+        :type func: callable
+
+        :param *args: (Optional) Positional arguments for the call.
+
+        :param **kwargs: (Optional) Keyword arguments for the call.
+
+        :returns: A ``Future`` for the call's result
+        :rtype: <concurrent.futures.Future> instance
+        """
+        call = BatchCall(func, args, kwargs)
+
+        if on_worker_thread():
+            # Nested within pooled work. Queueing onto the same pool could
+            # deadlock, so just run it here.
+            self.calls.append(call)
+            call.run()
+            return call.future
+
+        with self._lock:
+            self.calls.append(call)
+            self._queued.append(call)
+
+        self._dispatch()
+        return call.future
+
+    def run(self):
+        """
+        Starts any deferred calls.
+        """
+        self._started = True
+        self._dispatch()
+
+    def wait(self, timeout=None):
+        """
+        Waits for all the calls submitted so far to finish.
+
+        :param timeout: (Optional) The most seconds to wait.
+        :type timeout: float
+        """
+        self.run()
+        wait([call.future for call in self.calls], timeout=timeout)
+
+    def cancel(self):
+        """
+        Cancels any calls that haven't started yet.
+        """
+        with self._lock:
+            queued = list(self._queued)
+            self._queued.clear()
+
+        for call in queued:
+            call.future.cancel()
+            # Nothing will ever pick these up, so notify any waiters now.
+            call.future.set_running_or_notify_cancel()
+
+    @property
+    def errors(self):
+        """
+        Returns the failures from calls that have finished.
+
+        :returns: A list of ``(BatchCall, exception)`` tuples
+        :rtype: list
+        """
+        errors = []
+
+        for call in self.calls:
+            future = call.future
+
+            if future.done() and not future.cancelled():
+                if future.exception() is not None:
+                    errors.append((call, future.exception()))
+
+        return errors
+
+    def _dispatch(self):
+        if not self._started:
+            return
+
+        to_start = []
+
+        with self._lock:
+            while self._queued and \
+                    self._running < worker_limit(self.max_workers):
+                to_start.append(self._queued.popleft())
+                self._running += 1
+
+        for call in to_start:
+            submit_as(
+                self.executor,
+                describe_call(call.func),
+                self._run,
+                call
+            )
+
+    def _run(self, call):
+        adaptive = isinstance(self.max_workers, AdaptiveLimit)
+
+        if adaptive:
+            token = self.max_workers.start()
+
+        try:
+            call.run()
+        finally:
+            if adaptive:
+                error = None
+
+                if call.future.done() and not call.future.cancelled():
+                    error = call.future.exception()
+
+                self.max_workers.finish(token, error=error)
+
+            with self._lock:
+                self._running -= 1
+
+            # A slot opened up. Start whatever is next in line.
+            self._dispatch()
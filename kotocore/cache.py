@@ -1,4 +1,14 @@
+import collections
+import threading
+
 from kotocore.exceptions import NotCached
+from kotocore.utils.constants import NOTHING_PROVIDED
+
+
+DEFAULT_CLASSPATHS = (
+    'kotocore.resources.Resource',
+    'kotocore.collections.Collection',
+)
 
 
 class ServiceCache(object):
@@ -26,12 +36,34 @@ class ServiceCache(object):
         >>> res_class = sc.get_resource('s3', 'Bucket')
         >>> sc.del_resource('s3', 'Bucket')
 
+    The ``services`` data is never changed in place. Writes (made under a
+    lock) swap in an updated copy, so lookups need no locking & always see a
+    consistent snapshot, even without a GIL.
+
+    Pass ``max_classes`` to bound how many classes are kept, evicting the
+    least recently used. Classes are always held strongly, so they're only
+    rebuilt once evicted (or deleted).
+
     """
-    # TODO: We may want to add LRU/expiration behavior in the future, to
-    #       prevent the cache from taking up too much space.
-    #       Unlikely, but potential.
-    def __init__(self):
+    def __init__(self, max_classes=None):
+        """
+        Creates a new ``ServiceCache`` instance.
+
+        :param max_classes: (Optional) The most classes to keep. Default is
+            ``None`` (no limit).
+        :type max_classes: integer
+        """
+        if max_classes is not None and max_classes < 1:
+            raise ValueError("'max_classes' must be at least 1.")
+
         self.services = {}
+        self.max_classes = max_classes
+        self._lock = threading.Lock()
+        # Guards the stats & recency, which lookups update.
+        self._usage_lock = threading.Lock()
+        # The path of every cached class, least recently used first.
+        self._recency = collections.OrderedDict()
+        self._stats = {}
 
     def __str__(self):
         return 'ServiceCache: {0}'.format(
@@ -44,6 +76,217 @@ class ServiceCache(object):
     def __contains__(self, service_name):
         return service_name in self.services
 
+    def _replace(self, keys, value=NOTHING_PROVIDED):
+        """
+        Swaps in a new copy of ``services`` with the value at the (nested)
+        ``keys`` set, or removed if no ``value`` is given.
+
+        Only the dictionaries along the path are copied. Removing something
+        that isn't present is a no-op.
+
+        Setting a value may evict others, to stay within ``max_classes``.
+
+        :param keys: The path to the value. Ex. ``['s3', 'connection']``
+        :type keys: list
+
+        :param value: (Optional) The value to set.
+        :type value: anything
+        """
+        with self._lock:
+            if value is NOTHING_PROVIDED:
+                self._forget(tuple(keys))
+                return
+
+            self._swap(keys, value)
+            self._touch(tuple(keys), add=True)
+            self._evict()
+
+    def _swap(self, keys, value=NOTHING_PROVIDED):
+        # Called with the lock held. Does the copying for ``_replace``.
+        services = dict(self.services)
+        level = services
+
+        for key in keys[:-1]:
+            if value is NOTHING_PROVIDED and not key in level:
+                return
+
+            level[key] = dict(level.get(key, {}))
+            level = level[key]
+
+        if value is not NOTHING_PROVIDED:
+            level[keys[-1]] = value
+        elif keys[-1] in level:
+            del level[keys[-1]]
+        else:
+            return
+
+        self.services = services
+
+    def _find(self, path):
+        # Returns the stored value at ``path``, or ``None``.
+        level = self.services
+
+        for key in path:
+            if not hasattr(level, 'get'):
+                return None
+
+            level = level.get(key)
+
+            if level is None:
+                return None
+
+        return level
+
+    def path_for(self, service_name, kind, name=None, base_class=None):
+        """
+        Returns where a class lives within ``services``, for use with
+        ``find``.
+
+        :param kind: ``connection``, ``async_connection``, ``resources`` or
+            ``collections``.
+        :type kind: string
+
+        :param name: (Optional) The name of the resource or collection.
+        :type name: string
+
+        :param base_class: (Optional) The base class of the resource or
+            collection. Default is ``default``.
+        :type base_class: class
+
+        :rtype: tuple
+        """
+        if name is None:
+            return (service_name, kind)
+
+        return (service_name, kind, name, self.build_classpath(base_class))
+
+    def find(self, path, record=True):
+        """
+        Returns the class at ``path`` (see ``path_for``), or ``None`` if it
+        isn't cached. Unlike the ``get_*`` methods, a miss doesn't raise.
+
+        :param record: (Optional) Whether to count the hit or miss in the
+            stats. Default is ``True``.
+        :type record: boolean
+
+        :returns: The class, or ``None``
+        """
+        found = self._find(path)
+
+        if not found:
+            if record:
+                self._count(path[0], 'misses')
+
+            return None
+
+        if record:
+            self._count(path[0], 'hits')
+
+        if self.max_classes is not None:
+            self._touch(path)
+
+        return found
+
+    def _leaf_paths(self):
+        # Called with the lock held. Every cached class' path.
+        for service_name, service in self.services.items():
+            for kind in ('connection', 'async_connection'):
+                if service.get(kind) is not None:
+                    yield (service_name, kind)
+
+            for kind in ('resources', 'collections'):
+                for name, options in service.get(kind, {}).items():
+                    for classpath in options:
+                        yield (service_name, kind, name, classpath)
+
+    def _touch(self, path, add=False):
+        # Marks ``path`` as the most recently used. Unless ``add`` is given,
+        # a path that's gone meanwhile (Ex. evicted) isn't brought back.
+        with self._usage_lock:
+            if self._recency.pop(path, None) is not None or add:
+                self._recency[path] = True
+
+    def _evict(self):
+        # Called with the lock held. Drops the least recently used classes
+        # until within ``max_classes``. The class just set is the most
+        # recently used, so is never dropped.
+        if self.max_classes is None:
+            return
+
+        evicted = []
+
+        with self._usage_lock:
+            while len(self._recency) > self.max_classes:
+                evicted.append(self._recency.popitem(last=False)[0])
+
+        for path in evicted:
+            self._swap(list(path))
+            self._count(path[0], 'evictions')
+
+    def _forget(self, path):
+        # Called with the lock held.
+        self._swap(list(path))
+
+        with self._usage_lock:
+            self._recency.pop(path, None)
+
+    def _count(self, service_name, outcome, amount=1):
+        with self._usage_lock:
+            if service_name not in self._stats:
+                self._stats[service_name] = self._empty_stats()
+
+            self._stats[service_name][outcome] += amount
+
+    def _empty_stats(self):
+        return {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'hit_time': 0.0,
+            'miss_time': 0.0,
+        }
+
+    def timed(self, service_name, hit, seconds):
+        """
+        Records how long a request for a class took (Ex. in
+        ``Session.get_connection``), as either a hit or a miss (which
+        includes building the class).
+
+        :param hit: Whether the class came from the cache.
+        :type hit: boolean
+
+        :param seconds: How long it took.
+        :type seconds: float
+        """
+        outcome = 'hit_time' if hit else 'miss_time'
+        self._count(service_name, outcome, seconds)
+
+    def stats(self):
+        """
+        Returns the stats per service: the ``hits``, ``misses`` &
+        ``evictions``, how many ``classes`` are cached, plus the total
+        ``hit_time`` & ``miss_time`` (in seconds) recorded via ``timed``.
+
+        :rtype: dict
+        """
+        with self._lock:
+            sizes = {}
+
+            for path in self._leaf_paths():
+                sizes[path[0]] = sizes.get(path[0], 0) + 1
+
+        with self._usage_lock:
+            stats = dict([
+                (service_name, dict(values))
+                for service_name, values in self._stats.items()
+            ])
+
+        for service_name in set(stats) | set(sizes):
+            stats.setdefault(service_name, self._empty_stats())
+            stats[service_name]['classes'] = sizes.get(service_name, 0)
+
+        return stats
+
     def get_connection(self, service_name):
         """
         Retrieves a connection class from the cache, if available.
@@ -54,8 +297,9 @@ class ServiceCache(object):
 
         :returns: A <kotocore.connection.Connection> subclass
         """
-        service = self.services.get(service_name, {})
-        connection_class = service.get('connection', None)
+        connection_class = self.find(
+            self.path_for(service_name, 'connection')
+        )
 
         if not connection_class:
             msg = "Connection for '{0}' is not present in the cache."
@@ -76,8 +320,7 @@ class ServiceCache(object):
         :param to_cache: The class to be cached for the service.
         :type to_cache: class
         """
-        self.services.setdefault(service_name, {})
-        self.services[service_name]['connection'] = to_cache
+        self._replace([service_name, 'connection'], to_cache)
 
     def del_connection(self, service_name):
         """
@@ -91,10 +334,54 @@ class ServiceCache(object):
         """
         # Unlike ``get_connection``, this should be fire & forget.
         # We don't really care, as long as it's not in the cache any longer.
-        try:
-            del self.services[service_name]['connection']
-        except KeyError:
-            pass
+        self._replace([service_name, 'connection'])
+
+    def get_async_connection(self, service_name):
+        """
+        Retrieves an async connection class from the cache, if available.
+
+        :param service_name: The service a given ``AsyncConnection`` talks to.
+            Ex. ``sqs``, ``sns``, ``dynamodb``, etc.
+        :type service_name: string
+
+        :returns: A <kotocore.aio.connection.AsyncConnection> subclass
+        """
+        connection_class = self.find(
+            self.path_for(service_name, 'async_connection')
+        )
+
+        if not connection_class:
+            msg = "Async connection for '{0}' is not present in the cache."
+            raise NotCached(msg.format(
+                service_name
+            ))
+
+        return connection_class
+
+    def set_async_connection(self, service_name, to_cache):
+        """
+        Sets an async connection class within the cache.
+
+        :param service_name: The service a given ``AsyncConnection`` talks to.
+            Ex. ``sqs``, ``sns``, ``dynamodb``, etc.
+        :type service_name: string
+
+        :param to_cache: The class to be cached for the service.
+        :type to_cache: class
+        """
+        self._replace([service_name, 'async_connection'], to_cache)
+
+    def del_async_connection(self, service_name):
+        """
+        Deletes an async connection for a given service.
+
+        Fails silently if no async connection is found in the cache.
+
+        :param service_name: The service a given ``AsyncConnection`` talks to.
+            Ex. ``sqs``, ``sns``, ``dynamodb``, etc.
+        :type service_name: string
+        """
+        self._replace([service_name, 'async_connection'])
 
     def build_classpath(self, klass=None):
         if not klass:
@@ -105,6 +392,11 @@ class ServiceCache(object):
                 klass.__name__
             )
 
+        # The stock base classes are what ``default`` means, so asking for
+        # them by name should find the same classes.
+        if classpath in DEFAULT_CLASSPATHS:
+            classpath = 'default'
+
         return classpath
 
     def get_resource(self, service_name, resource_name, base_class=None):
@@ -126,11 +418,12 @@ class ServiceCache(object):
 
         :returns: A <kotocore.resources.Resource> subclass
         """
-        classpath = self.build_classpath(base_class)
-        service = self.services.get(service_name, {})
-        resources = service.get('resources', {})
-        resource_options = resources.get(resource_name, {})
-        resource_class = resource_options.get(classpath, None)
+        resource_class = self.find(self.path_for(
+            service_name,
+            'resources',
+            resource_name,
+            base_class=base_class
+        ))
 
         if not resource_class:
             msg = "Resource '{0}' for {1} is not present in the cache."
@@ -156,16 +449,11 @@ class ServiceCache(object):
         :param to_cache: The class to be cached for the service.
         :type to_cache: class
         """
-        self.services.setdefault(service_name, {})
-        self.services[service_name].setdefault('resources', {})
-        self.services[service_name]['resources'].setdefault(resource_name, {})
-        options = self.services[service_name]['resources'][resource_name]
         classpath = self.build_classpath(to_cache.__bases__[0])
-
-        if classpath == 'kotocore.resources.Resource':
-            classpath = 'default'
-
-        options[classpath] = to_cache
+        self._replace(
+            [service_name, 'resources', resource_name, classpath],
+            to_cache
+        )
 
     def del_resource(self, service_name, resource_name, base_class=None):
         """
@@ -184,12 +472,8 @@ class ServiceCache(object):
         """
          # Unlike ``get_resource``, this should be fire & forget.
         # We don't really care, as long as it's not in the cache any longer.
-        try:
-            classpath = self.build_classpath(base_class)
-            opts = self.services[service_name]['resources'][resource_name]
-            del opts[classpath]
-        except KeyError:
-            pass
+        classpath = self.build_classpath(base_class)
+        self._replace([service_name, 'resources', resource_name, classpath])
 
     def get_collection(self, service_name, collection_name, base_class=None):
         """
@@ -211,11 +495,12 @@ class ServiceCache(object):
 
         :returns: A <kotocore.collections.Collection> subclass
         """
-        classpath = self.build_classpath(base_class)
-        service = self.services.get(service_name, {})
-        collections = service.get('collections', {})
-        collection_options = collections.get(collection_name, {})
-        collection_class = collection_options.get(classpath, None)
+        collection_class = self.find(self.path_for(
+            service_name,
+            'collections',
+            collection_name,
+            base_class=base_class
+        ))
 
         if not collection_class:
             msg = "Collection '{0}' for {1} is not present in the cache."
@@ -242,16 +527,11 @@ class ServiceCache(object):
         :param to_cache: The class to be cached for the service.
         :type to_cache: class
         """
-        self.services.setdefault(service_name, {})
-        self.services[service_name].setdefault('collections', {})
-        self.services[service_name]['collections'].setdefault(collection_name, {})
-        options = self.services[service_name]['collections'][collection_name]
         classpath = self.build_classpath(to_cache.__bases__[0])
-
-        if classpath == 'kotocore.collections.Collection':
-            classpath = 'default'
-
-        options[classpath] = to_cache
+        self._replace(
+            [service_name, 'collections', collection_name, classpath],
+            to_cache
+        )
 
     def del_collection(self, service_name, collection_name, base_class=None):
         """
@@ -275,9 +555,7 @@ class ServiceCache(object):
         """
          # Unlike ``get_collection``, this should be fire & forget.
         # We don't really care, as long as it's not in the cache any longer.
-        try:
-            classpath = self.build_classpath(base_class)
-            opts = self.services[service_name]['collections'][collection_name]
-            del opts[classpath]
-        except KeyError:
-            pass
+        classpath = self.build_classpath(base_class)
+        self._replace(
+            [service_name, 'collections', collection_name, classpath]
+        )
@@ -0,0 +1,448 @@
+"""
+Circuit breakers per endpoint (service & region), so calls to a degraded
+dependency fail fast instead of tying up threads needed elsewhere.
+"""
+import collections
+import threading
+import time
+
+from kotocore import log
+from kotocore.exceptions import CircuitOpenError, ServerError
+from kotocore.retries import THROTTLING_CODES, TRANSIENT_CODES
+
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# A change of state on one breaker, as handed to listeners.
+CircuitEvent = collections.namedtuple('CircuitEvent', [
+    'service_name',
+    'region_name',
+    'old_state',
+    'new_state',
+    'reason',
+    'time',
+])
+
+
+class CircuitBreaker(object):
+    """
+    The breaker for a single endpoint.
+
+    While ``closed``, calls go through & their outcomes are tracked. Too many
+    failures in a row, or too high a failure rate over the recent calls,
+    trips it ``open``, failing calls fast with ``CircuitOpenError``. After
+    ``reset_timeout`` seconds it goes ``half_open``, letting a few probe
+    calls through. If they succeed, it closes again. If any fail, it
+    reopens.
+
+    Typically created by ``CircuitBreakers``, rather than directly.
+    """
+    def __init__(self, service_name, region_name, failure_threshold=5,
+                 error_rate=0.5, window=20, min_calls=10, reset_timeout=30.0,
+                 half_open_calls=1, clock=time.time, on_change=None):
+        self.service_name = service_name
+        self.region_name = region_name
+        self.failure_threshold = failure_threshold
+        self.error_rate = error_rate
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = half_open_calls
+        self.clock = clock
+        self.on_change = on_change
+        self._state = CLOSED
+        self._opened_at = None
+        self._outcomes = collections.deque(maxlen=window)
+        self._consecutive = 0
+        self._probes = 0
+        self._probe_successes = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            'successes': 0,
+            'failures': 0,
+            'rejected': 0,
+            'opened': 0,
+            'closed': 0,
+        }
+
+    @property
+    def state(self):
+        """
+        Returns ``closed``, ``open`` or ``half_open``.
+
+        :rtype: string
+        """
+        with self._lock:
+            event = self._check_timeout()
+            state = self._state
+
+        self._notify(event)
+        return state
+
+    def before_call(self):
+        """
+        Raises ``CircuitOpenError`` if a call shouldn't be made right now.
+        Otherwise, the call must report back via ``succeeded``, ``failed``
+        or ``abandoned``.
+        """
+        error = None
+
+        with self._lock:
+            event = self._check_timeout()
+
+            if self._state == OPEN:
+                error = self._rejection(
+                    self._opened_at + self.reset_timeout - self.clock()
+                )
+            elif self._state == HALF_OPEN:
+                if self._probes >= self.half_open_calls:
+                    # Enough probes are already out. Wait on their results.
+                    error = self._rejection(0.0)
+                else:
+                    self._probes += 1
+
+        self._notify(event)
+
+        if error is not None:
+            raise error
+
+    def succeeded(self):
+        """
+        Records a successful call.
+        """
+        event = None
+
+        with self._lock:
+            self._stats['successes'] += 1
+            self._consecutive = 0
+
+            if self._state == HALF_OPEN:
+                self._probe_successes += 1
+
+                if self._probe_successes >= self.half_open_calls:
+                    event = self._move(CLOSED, 'probes succeeded')
+            elif self._state == CLOSED:
+                self._outcomes.append(True)
+
+        self._notify(event)
+
+    def failed(self):
+        """
+        Records a failed call, tripping the breaker if need be.
+        """
+        event = None
+
+        with self._lock:
+            self._stats['failures'] += 1
+            self._consecutive += 1
+
+            if self._state == HALF_OPEN:
+                event = self._move(OPEN, 'probe failed')
+            elif self._state == CLOSED:
+                self._outcomes.append(False)
+                failures = self._outcomes.count(False)
+
+                if self._consecutive >= self.failure_threshold:
+                    event = self._move(
+                        OPEN,
+                        '{0} failures in a row'.format(self._consecutive)
+                    )
+                elif len(self._outcomes) >= self.min_calls and \
+                        failures >= self.error_rate * len(self._outcomes):
+                    event = self._move(
+                        OPEN,
+                        '{0} of the last {1} failed'.format(
+                            failures,
+                            len(self._outcomes)
+                        )
+                    )
+
+        self._notify(event)
+
+    def abandoned(self):
+        """
+        Records a call that ended without hearing from the endpoint (Ex.
+        cancelled, or stopped by a local limit), so it says nothing about the
+        endpoint's health. Frees its probe slot, if it was one.
+        """
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def stats(self):
+        """
+        Returns the ``state``, the current ``error_rate`` over the window &
+        the lifetime ``successes``, ``failures``, ``rejected`` calls & times
+        the breaker ``opened`` & ``closed``.
+
+        :rtype: dict
+        """
+        state = self.state
+
+        with self._lock:
+            stats = dict(self._stats)
+            outcomes = list(self._outcomes)
+
+        stats['state'] = state
+        stats['error_rate'] = 0.0
+
+        if outcomes:
+            stats['error_rate'] = (
+                float(outcomes.count(False)) / len(outcomes)
+            )
+
+        return stats
+
+    def _check_timeout(self):
+        # Called with the lock held.
+        if self._state != OPEN:
+            return None
+
+        if self.clock() < self._opened_at + self.reset_timeout:
+            return None
+
+        return self._move(HALF_OPEN, 'reset timeout passed')
+
+    def _move(self, new_state, reason):
+        # Called with the lock held. Returns the event, to be sent once the
+        # lock is released.
+        old_state, self._state = self._state, new_state
+        self._probes = 0
+        self._probe_successes = 0
+
+        if new_state == OPEN:
+            self._opened_at = self.clock()
+            self._stats['opened'] += 1
+        elif new_state == CLOSED:
+            self._outcomes.clear()
+            self._consecutive = 0
+            self._stats['closed'] += 1
+
+        return CircuitEvent(
+            self.service_name,
+            self.region_name,
+            old_state,
+            new_state,
+            reason,
+            self.clock()
+        )
+
+    def _rejection(self, retry_after):
+        # Called with the lock held.
+        self._stats['rejected'] += 1
+        return CircuitOpenError(
+            "The circuit for {0} in {1} is {2}.".format(
+                self.service_name,
+                self.region_name,
+                self._state
+            ),
+            service_name=self.service_name,
+            region_name=self.region_name,
+            retry_after=max(0.0, retry_after)
+        )
+
+    def _notify(self, event):
+        if event is not None and self.on_change is not None:
+            self.on_change(event)
+
+
+class CircuitBreakers(object):
+    """
+    Holds the circuit breakers for a session, one per ``(service_name,
+    region_name)``.
+
+    Only errors that suggest the endpoint itself is struggling count as
+    failures: throttling & transient error codes (see
+    ``kotocore.retries``), plus connection errors. Client errors like
+    ``AccessDenied`` or ``NoSuchKey`` don't.
+
+    Usage::
+
+        >>> breakers = CircuitBreakers(failure_threshold=5, reset_timeout=30)
+        >>> breakers.add_listener(lambda event: alert(event))
+        >>> session = Session(circuit_breakers=breakers)
+        >>> breakers.stats()[('dynamodb', 'us-east-1')]['state']
+        'open'
+
+    """
+    breaker_class = CircuitBreaker
+
+    def __init__(self, failure_threshold=5, error_rate=0.5, window=20,
+                 min_calls=10, reset_timeout=30.0, half_open_calls=1,
+                 codes=None, clock=time.time, history=100):
+        """
+        Creates a new ``CircuitBreakers`` instance.
+
+        :param failure_threshold: (Optional) Failures in a row that trip a
+            breaker. Default is ``5``.
+        :type failure_threshold: integer
+
+        :param error_rate: (Optional) The share of failed calls over the
+            ``window`` that trips a breaker. Default is ``0.5``.
+        :type error_rate: float
+
+        :param window: (Optional) How many recent calls the ``error_rate``
+            covers. Default is ``20``.
+        :type window: integer
+
+        :param min_calls: (Optional) How many calls the window needs before
+            the ``error_rate`` applies. Default is ``10``.
+        :type min_calls: integer
+
+        :param reset_timeout: (Optional) Seconds a breaker stays open before
+            letting probes through. Default is ``30.0``.
+        :type reset_timeout: float
+
+        :param half_open_calls: (Optional) How many probes must succeed (&
+            how many may be in flight at once) to close a breaker. Default
+            is ``1``.
+        :type half_open_calls: integer
+
+        :param codes: (Optional) The error codes that count as failures.
+            Default is the throttling & transient codes from
+            ``kotocore.retries``.
+        :type codes: set
+
+        :param clock: (Optional) Returns the current time in seconds.
+            Default is ``time.time``.
+        :type clock: callable
+
+        :param history: (Optional) How many state changes to keep in
+            ``events``. Default is ``100``.
+        :type history: integer
+        """
+        if failure_threshold < 1:
+            raise ValueError("'failure_threshold' must be at least 1.")
+
+        if half_open_calls < 1:
+            raise ValueError("'half_open_calls' must be at least 1.")
+
+        self.options = {
+            'failure_threshold': failure_threshold,
+            'error_rate': error_rate,
+            'window': window,
+            'min_calls': min_calls,
+            'reset_timeout': reset_timeout,
+            'half_open_calls': half_open_calls,
+            'clock': clock,
+        }
+        self.codes = frozenset(codes or THROTTLING_CODES | TRANSIENT_CODES)
+        self.breakers = {}
+        self.events = collections.deque(maxlen=history)
+        self.listeners = []
+        self._lock = threading.Lock()
+
+    def breaker_for(self, service_name, region_name):
+        """
+        Returns the breaker for an endpoint, creating it on first use.
+
+        :rtype: <kotocore.circuit.CircuitBreaker> instance
+        """
+        key = (service_name, region_name)
+        breaker = self.breakers.get(key)
+
+        if breaker is None:
+            with self._lock:
+                breaker = self.breakers.get(key)
+
+                if breaker is None:
+                    breaker = self.breakers[key] = self.breaker_class(
+                        service_name,
+                        region_name,
+                        on_change=self.changed,
+                        **self.options
+                    )
+
+        return breaker
+
+    def is_failure(self, error):
+        """
+        Returns whether an error counts against the endpoint.
+
+        :rtype: boolean
+        """
+        if isinstance(error, ServerError):
+            return error.code in self.codes
+
+        return isinstance(error, EnvironmentError)
+
+    def call(self, service_name, region_name, func):
+        """
+        Calls ``func`` through the endpoint's breaker.
+
+        :raises: ``CircuitOpenError`` if the breaker is open
+
+        :returns: Whatever ``func`` returns
+        """
+        breaker = self.breaker_for(service_name, region_name)
+        breaker.before_call()
+
+        try:
+            result = func()
+        except Exception as err:
+            self.record(breaker, err)
+            raise
+        except BaseException:
+            breaker.abandoned()
+            raise
+
+        breaker.succeeded()
+        return result
+
+    def record(self, breaker, error=None):
+        """
+        Reports the outcome of a call let through by ``before_call``.
+
+        Service errors that don't count as failures (see ``is_failure``)
+        still count as the endpoint answering. Anything else (Ex. a local
+        ``ConcurrencyLimitTimeout``) is ignored.
+        """
+        if error is None:
+            breaker.succeeded()
+        elif self.is_failure(error):
+            breaker.failed()
+        elif isinstance(error, ServerError):
+            breaker.succeeded()
+        else:
+            breaker.abandoned()
+
+    def add_listener(self, listener):
+        """
+        Registers a callable to be called with a ``CircuitEvent`` whenever a
+        breaker changes state.
+
+        :param listener: The callable.
+        :type listener: callable
+        """
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self.listeners.remove(listener)
+
+    def changed(self, event):
+        # Called by the breakers, outside their locks.
+        self.events.append(event)
+        log.warning(
+            "Circuit for %s in %s went from %s to %s (%s).",
+            event.service_name,
+            event.region_name,
+            event.old_state,
+            event.new_state,
+            event.reason
+        )
+
+        for listener in list(self.listeners):
+            listener(event)
+
+    def stats(self):
+        """
+        Returns the stats (see ``CircuitBreaker.stats``) per endpoint, keyed
+        by ``(service_name, region_name)``.
+
+        :rtype: dict
+        """
+        with self._lock:
+            breakers = list(self.breakers.items())
+
+        return dict([(key, breaker.stats()) for key, breaker in breakers])
@@ -0,0 +1,276 @@
+"""
+Single-flight coalescing, so identical read calls made at the same moment
+share one request rather than each sending their own.
+"""
+import copy
+import threading
+
+from kotocore.deadlines import bound_timeout, current_deadline
+from kotocore.retries import IDEMPOTENT_PREFIXES
+
+
+def canonical(value):
+    """
+    Returns a hashable form of a call's parameters, where equal parameters
+    (regardless of dictionary ordering) give equal results.
+
+    :raises: ``TypeError`` if a value can't be made hashable
+
+    :rtype: tuple
+    """
+    if isinstance(value, dict):
+        return ('dict', tuple(sorted(
+            [(key, canonical(item)) for key, item in value.items()],
+            key=repr
+        )))
+
+    if isinstance(value, (list, tuple)):
+        return ('list', tuple([canonical(item) for item in value]))
+
+    if isinstance(value, (set, frozenset)):
+        return ('set', tuple(sorted(
+            [canonical(item) for item in value],
+            key=repr
+        )))
+
+    # Raises ``TypeError`` for anything else that's unhashable.
+    hash(value)
+    # Keeps ``1``, ``1.0`` & ``True`` apart.
+    return (type(value).__name__, value)
+
+
+class Flight(object):
+    """
+    A call in progress, which any number of identical calls wait on.
+    """
+    def __init__(self):
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+    def finish(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.done.set()
+
+    def wait(self, timeout=None):
+        """
+        Waits for the call to finish.
+
+        :returns: Whether it finished in time
+        :rtype: boolean
+        """
+        return self.done.wait(timeout)
+
+
+class Coalescer(object):
+    """
+    Lets concurrent, identical calls to read-only operations share a single
+    request. The first caller sends it, while any others that arrive before
+    it finishes wait & receive the same result (or error).
+
+    Calls only match if they're for the same service, region, operation &
+    parameters, using the same credentials. Nothing is kept once a call
+    finishes, so there's no staleness, just fewer requests. Connections
+    never coalesce calls with streamed responses (Ex. S3's ``get_object``),
+    since a stream can only be read once.
+
+    By default, the read-only operations (``get_``, ``head_``, ``list_``,
+    ``describe_``, etc.) are coalesced. Pass ``operations`` to choose them
+    explicitly.
+
+    Usage::
+
+        >>> coalescer = Coalescer()
+        >>> session = Session(coalescer=coalescer)
+        >>> coalescer.stats()['sqs']['get_queue_url']['ratio']
+        0.92
+
+    """
+    def __init__(self, operations=None):
+        """
+        Creates a new ``Coalescer`` instance.
+
+        :param operations: (Optional) The operation names to coalesce, keyed
+            by service name. Default is ``None`` (all read-only operations).
+        :type operations: dict
+        """
+        self.operations = None
+
+        if operations is not None:
+            self.operations = dict([
+                (service_name, frozenset(names))
+                for service_name, names in operations.items()
+            ])
+
+        self._flights = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def should_coalesce(self, service_name, operation_name):
+        """
+        Returns whether calls to an operation may be coalesced at all.
+
+        :rtype: boolean
+        """
+        if self.operations is None:
+            return operation_name.startswith(IDEMPOTENT_PREFIXES)
+
+        return operation_name in self.operations.get(service_name, ())
+
+    def key_for(self, service_name, region_name, operation_name, params,
+                identity=None):
+        """
+        Returns the key identical calls share, or ``None`` if the call can't
+        be coalesced (Ex. its parameters aren't hashable).
+
+        :param params: The prepared parameters for the call.
+        :type params: dict
+
+        :param identity: (Optional) Identifies the credentials the call is
+            made with, such as the access key. Default is ``None``.
+        :type identity: string
+
+        :rtype: tuple
+        """
+        try:
+            params = canonical(params)
+        except TypeError:
+            return None
+
+        return (service_name, region_name, operation_name, params, identity)
+
+    def claim(self, key, flight):
+        """
+        Registers ``flight`` for ``key``, unless another call already has.
+
+        :returns: The flight for ``key``. If it's the one passed in, the
+            caller is the leader & must ``release`` it once finished.
+        """
+        with self._lock:
+            existing = self._flights.get(key)
+
+            if existing is None:
+                self._flights[key] = flight
+                return flight
+
+            return existing
+
+    def release(self, key, flight):
+        # Later calls start a new flight from here on.
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def counted(self, service_name, operation_name, leader):
+        # Counts a call, as either sending a request or sharing one.
+        with self._lock:
+            stats = self._stats_for(service_name, operation_name)
+            stats['calls'] += 1
+
+            if leader:
+                stats['requests'] += 1
+            else:
+                stats['coalesced'] += 1
+
+    def call(self, service_name, operation_name, key, func,
+             share=copy.deepcopy):
+        """
+        Calls ``func``, unless an identical call is already in flight, in
+        which case its outcome is waited on instead.
+
+        Waiting respects the deadline in effect (if any). A shared call runs
+        under the deadline of whichever caller sent it.
+
+        :param key: From ``key_for``. If ``None``, ``func`` is simply called.
+        :type key: tuple
+
+        :param func: Makes the call.
+        :type func: callable
+
+        :param share: (Optional) Gives each waiting caller its own copy of
+            the result, so they can't see each other's changes. Default is
+            ``copy.deepcopy``.
+        :type share: callable
+
+        :returns: Whatever ``func`` returns
+        """
+        if key is None:
+            return func()
+
+        flight = Flight()
+        existing = self.claim(key, flight)
+
+        if existing is not flight:
+            self.counted(service_name, operation_name, leader=False)
+            timeout, by_deadline = bound_timeout(None)
+
+            if not existing.wait(timeout):
+                raise current_deadline().exceeded()
+
+            if existing.error is not None:
+                raise existing.error
+
+            return share(existing.result)
+
+        self.counted(service_name, operation_name, leader=True)
+
+        try:
+            result = func()
+        except BaseException as err:
+            flight.finish(error=err)
+            raise
+        else:
+            try:
+                shared = share(result)
+            except Exception as err:
+                # Ex. a streamed body that can't be copied. The waiting
+                # callers must still be woken.
+                flight.finish(error=err)
+            else:
+                flight.finish(result=shared)
+
+            return result
+        finally:
+            self.release(key, flight)
+
+    def stats(self):
+        """
+        Returns the stats per service, then per operation: the ``calls``
+        made, the ``requests`` actually sent, how many calls were
+        ``coalesced`` into another's request & the coalescing ``ratio``
+        (``coalesced / calls``).
+
+        :rtype: dict
+        """
+        with self._lock:
+            stats = dict([
+                (key, dict(values)) for key, values in self._stats.items()
+            ])
+
+        results = {}
+
+        for (service_name, operation_name), values in stats.items():
+            values['ratio'] = 0.0
+
+            if values['calls']:
+                values['ratio'] = (
+                    float(values['coalesced']) / values['calls']
+                )
+
+            results.setdefault(service_name, {})[operation_name] = values
+
+        return results
+
+    def _stats_for(self, service_name, operation_name):
+        # Called with the lock held.
+        key = (service_name, operation_name)
+
+        if key not in self._stats:
+            self._stats[key] = {
+                'calls': 0,
+                'requests': 0,
+                'coalesced': 0,
+            }
+
+        return self._stats[key]
@@ -1,8 +1,12 @@
+import threading
+
 from kotocore.utils.constants import DEFAULT_DOCSTRING
 from kotocore.exceptions import NoSuchMethod
 from kotocore.loader import ResourceJSONLoader
+from kotocore.utils.concurrency import map_calls
 from kotocore.utils.mangle import to_snake_case
 from kotocore.utils import six
+from kotocore.utils.pickling import BuiltClass
 
 
 class CollectionDetails(object):
@@ -14,6 +18,7 @@ class CollectionDetails(object):
     service_name = ''
     collection_name = ''
     session = None
+    docstrings_updated = False
 
     def __init__(self, session, service_name, collection_name, loader=None):
         """
@@ -42,6 +47,7 @@ class CollectionDetails(object):
         self.loader = loader
         self._api_version = None
         self._loaded_data = None
+        self._load_lock = threading.Lock()
 
     def __str__(self):
         return u'<{0}: {1} - {2}>'.format(
@@ -58,9 +64,14 @@ class CollectionDetails(object):
         A decorator to ensure the resource data is loaded.
         """
         def _wrapper(self, *args, **kwargs):
-            # If we don't have data, go load it.
+            # If we don't have data, go load it (once, even if several
+            # threads get here together).
             if self._loaded_data is None:
-                self._loaded_data = self.loader.load(self.service_name)
+                with self._load_lock:
+                    if self._loaded_data is None:
+                        self._loaded_data = self.loader.load(
+                            self.service_name
+                        )
 
             return func(self, *args, **kwargs)
 
@@ -110,7 +121,9 @@ class CollectionDetails(object):
         :returns: The service's version
         :rtype: string
         """
-        self._api_version = self._loaded_data.get('api_version', '')
+        if self._api_version is None:
+            self._api_version = self._loaded_data.get('api_version', '')
+
         return self._api_version
 
     @property
@@ -163,9 +176,14 @@ class CollectionDetails(object):
         return key
 
 
-class Collection(six.Iterator):
+@six.add_metaclass(BuiltClass)
+class Collection(object):
     """
     A common base class for all the ``Collection`` objects.
+
+    Instances can be pickled. Only the instance data & the connection's
+    region are kept, with the class rebuilt by the default session on the
+    receiving side.
     """
     _res_class = None
 
@@ -184,8 +202,6 @@ class Collection(six.Iterator):
         """
         self._data = {}
         self._connection = connection
-        self._active_iter = None
-        self._active_offset = 0
 
         for key, value in kwargs.items():
             self._data[key] = value
@@ -195,8 +211,11 @@ class Collection(six.Iterator):
                 self._details.service_name
             )
 
-        # Now that we have a connection, we can update docstrings.
-        self._update_docstrings()
+        # Now that we have a connection, we can update docstrings. The
+        # methods live on the class, so this only needs doing once.
+        if not self._details.docstrings_updated:
+            self._update_docstrings()
+            self._details.docstrings_updated = True
 
     def __str__(self):
         return "{0}: {1} in {2}".format(
@@ -205,6 +224,18 @@ class Collection(six.Iterator):
             self._connection.region_name
         )
 
+    def __reduce__(self):
+        return (_rebuild_collection, (
+            self.__class__,
+            self._connection,
+            self._data
+        ))
+
+    @classmethod
+    def _from_session(cls, session, service_name, name):
+        # Used when unpickling, to find the matching class in the session.
+        return session.get_collection(service_name, name, base_class=cls)
+
     def __getattr__(self, name):
         """
         Attempts to return instance data for a given name if available.
@@ -218,14 +249,9 @@ class Collection(six.Iterator):
         raise AttributeError("No such attribute '{0}'".format(name))
 
     def __iter__(self):
-        self._active_iter = self.each()
-        self._active_offset = 0
-        return iter(self)
-
-    def __next__(self):
-        res = self._active_iter[self._active_offset]
-        self._active_offset += 1
-        return res
+        # A fresh iterator each time, so no iteration state lives on the
+        # collection itself (& several threads can iterate at once).
+        return iter(self.each())
 
     @classmethod
     def change_resource(cls, resource_class):
@@ -277,6 +303,69 @@ class Collection(six.Iterator):
             else:
                 meth.__func__.__doc__ = conn_meth.__doc__
 
+    def map_resources(self, method_name, resources=None, max_workers=None,
+                      ordered=True, **kwargs):
+        """
+        Calls the same method on many ``Resource`` instances concurrently, on
+        the thread pool owned by the session.
+
+        Results are yielded as they arrive. A ``ServerError`` raised by any
+        one call is yielded in place of its result, so a single failure
+        doesn't abort the rest.
+
+        If called from within work already running on the pool, the calls
+        are made inline instead, since queueing them could deadlock a full
+        pool.
+
+        Usage::
+
+            >>> for result in bucket.objects.map_resources('get'):
+            ...     print(result)
+
+        :param method_name: The name of the method to call on each resource.
+            Ex. ``get``, ``delete``, etc.
+        :type method_name: string
+
+        :param resources: (Optional) The resources to call the method on. By
+            default, this is whatever ``each()`` returns.
+        :type resources: iterable
+
+        :param max_workers: (Optional) The most calls to have in flight at
+            once, or an ``AdaptiveLimit`` to size that by. Default is the
+            session's ``max_workers``.
+        :type max_workers: integer or <kotocore.adaptive.AdaptiveLimit>
+            instance
+
+        :param ordered: (Optional) Whether results should be yielded in the
+            same order as the resources. If ``False``, they're yielded as they
+            complete. Default is ``True``.
+        :type ordered: boolean
+
+        :param **kwargs: (Optional) Any parameters to pass along to every
+            call.
+        :type **kwargs: dict
+
+        :returns: A generator of results (or ``ServerError`` instances)
+        """
+        session = self._details.session
+
+        if resources is None:
+            resources = self.each()
+
+        if max_workers is None:
+            max_workers = session.max_workers
+
+        def call(resource):
+            return getattr(resource, method_name)(**kwargs)
+
+        return map_calls(
+            session.get_executor(),
+            call,
+            ({'resource': resource} for resource in resources),
+            max_workers,
+            ordered=ordered
+        )
+
     def get_identifiers(self):
         """
         Returns the identifier(s) (if present) from the instance data.
@@ -474,10 +563,7 @@ class Collection(six.Iterator):
         :returns: A ``Resource`` subclass
         """
         if self._res_class is None:
-            self._res_class = self._details.session.get_resource(
-                self._details.service_name,
-                self._details.resource
-            )
+            self._res_class = self._get_resource_class()
 
         final_data = {}
 
@@ -487,6 +573,27 @@ class Collection(six.Iterator):
 
         return self._res_class(connection=self._connection, **final_data)
 
+    def _get_resource_class(self):
+        """
+        Looks up the ``Resource`` class the collection builds from the
+        session.
+
+        :returns: A ``Resource`` subclass
+        """
+        return self._details.session.get_resource(
+            self._details.service_name,
+            self._details.resource
+        )
+
+
+def _rebuild_collection(klass, connection, data):
+    # Skips ``__init__``, since the connection is already in hand & the
+    # docstrings are updated by the first regular instance.
+    collection = klass.__new__(klass)
+    collection._data = data
+    collection._connection = connection
+    return collection
+
 
 class CollectionFactory(object):
     """
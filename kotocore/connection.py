@@ -1,8 +1,14 @@
+import copy
+import threading
+
+from kotocore.deadlines import check_deadline, current_deadline, deadline
 from kotocore.utils.constants import DEFAULT_REGION
 from kotocore.utils.constants import NOTHING_PROVIDED
-from kotocore.exceptions import ServerError
+from kotocore.exceptions import NoSuchMethod, ServerError
 from kotocore.introspection import Introspection
 from kotocore.utils import six
+from kotocore.utils.concurrency import map_calls
+from kotocore.utils.pickling import BuiltClass
 
 
 class ConnectionDetails(object):
@@ -30,6 +36,7 @@ class ConnectionDetails(object):
         self.session = session
         self._api_version = None
         self._loaded_service_data = None
+        self._load_lock = threading.Lock()
 
     def __str__(self):
         return u'<{0}: {1} - {2}>'.format(
@@ -53,16 +60,22 @@ class ConnectionDetails(object):
         if self._loaded_service_data is not None:
             return self._loaded_service_data
 
-        # We don't have a cache. Build it.
-        self._loaded_service_data = self._introspect_service(
-            # We care about the ``botocore.session`` here, not the
-            # ``kotocore.session``.
-            self.session.core_session,
-            self.service_name
-        )
-        # Clear out the API version, just in case.
-        self._api_version = None
-        return self._loaded_service_data
+        with self._load_lock:
+            # Another thread may have built it while we waited.
+            if self._loaded_service_data is not None:
+                return self._loaded_service_data
+
+            # We don't have a cache. Build it.
+            service_data = self._introspect_service(
+                # We care about the ``botocore.session`` here, not the
+                # ``kotocore.session``.
+                self.session.core_session,
+                self.service_name
+            )
+            # Clear out the API version, just in case.
+            self._api_version = None
+            self._loaded_service_data = service_data
+            return self._loaded_service_data
 
     @property
     def api_version(self):
@@ -108,11 +121,15 @@ class ConnectionDetails(object):
         return self.service_data
 
 
+@six.add_metaclass(BuiltClass)
 class Connection(object):
     """
     A common base class for all the ``Connection`` objects.
+
+    Instances can be pickled. Only the region is kept, with the class rebuilt
+    by the default session on the receiving side.
     """
-    def __init__(self, region_name=DEFAULT_REGION):
+    def __init__(self, region_name=DEFAULT_REGION, core_session=None):
         """
         Creates a new connection instance.
 
@@ -120,9 +137,16 @@ class Connection(object):
             By default, this is the value from
             ``kotocore.utils.constants.DEFAULT_REGION``.
         :type region_name: string
+
+        :param core_session: (Optional) A ``botocore`` session to make the
+            requests with (Ex. one holding another account's credentials).
+            By default, this is the one from the class' ``Session``, which is
+            still used for introspection either way. Not kept when pickling.
+        :type core_session: <botocore.session.Session> instance
         """
         super(Connection, self).__init__()
         self.region_name = region_name
+        self.core_session = core_session
 
     def __str__(self):
         return u'<{0}: {0}>'.format(
@@ -130,6 +154,14 @@ class Connection(object):
             self.region_name
         )
 
+    def __reduce__(self):
+        return (self.__class__, (self.region_name,))
+
+    @classmethod
+    def _from_session(cls, session, service_name, name=None):
+        # Used when unpickling, to find the matching class in the session.
+        return session.get_connection(service_name)
+
     def _check_method_params(self, op_params, **kwargs):
         # For now, we don't type-check or anything, just check for required
         # params.
@@ -161,6 +193,364 @@ class Connection(object):
 
         return service_params
 
+    def _make_request(self, op_data, service_params):
+        """
+        Performs the (blocking) call to the service for a given operation.
+
+        This is the only place the transport is touched, so subclasses that
+        need to move the I/O elsewhere (threads, event loops, etc.) should
+        lean on this.
+
+        :param op_data: The introspected data for the operation
+        :type op_data: dict
+
+        :param service_params: The prepared parameters for the call
+        :type service_params: dict
+
+        :returns: The raw ``(http_response, parsed)`` tuple from ``botocore``
+        :rtype: tuple
+        """
+        op, endpoint = self._get_core_operation(op_data)
+        current = current_deadline()
+
+        if current is not None and getattr(endpoint, 'timeout', None):
+            # ``botocore`` builds a new endpoint per call, so this only
+            # shortens the socket timeout for this request.
+            endpoint.timeout = min(
+                endpoint.timeout,
+                max(current.remaining(), 0.001)
+            )
+
+        return op.call(endpoint, **service_params)
+
+    def _make_paged_request(self, op_data, service_params):
+        """
+        Performs the (blocking) calls to the service for a given operation,
+        following any pagination tokens ``botocore`` knows about.
+
+        The calls are made lazily, one per page, as the iterator is consumed.
+        Operations that can't be paginated produce a single page.
+
+        :param op_data: The introspected data for the operation
+        :type op_data: dict
+
+        :param service_params: The prepared parameters for the call
+        :type service_params: dict
+
+        :returns: An iterator of raw ``(http_response, parsed)`` tuples
+        """
+        op, endpoint = self._get_core_operation(op_data)
+
+        if not getattr(op, 'can_paginate', False):
+            return self._single_page(op, endpoint, service_params)
+
+        # ``botocore``'s ``PageIterator`` is only iterable, not an iterator.
+        return iter(op.paginate(endpoint, **service_params))
+
+    def _single_page(self, op, endpoint, service_params):
+        # A generator, so the call is still deferred until it's consumed.
+        yield op.call(endpoint, **service_params)
+
+    def _get_core_operation(self, op_data):
+        if self.core_session is not None:
+            service = self.core_session.get_service(
+                self._details.service_name
+            )
+        else:
+            service = self._details.session.get_core_service(
+                self._details.service_name
+            )
+
+        endpoint = service.get_endpoint(self.region_name)
+        op = service.get_operation(
+            op_data['api_name']
+        )
+        return op, endpoint
+
+    def _send(self, method_name, op_data, service_params):
+        """
+        Makes a single attempt at a call, raising ``ServerError`` if the
+        service reports a failure.
+
+        Waits on the session's ``rate_limiter`` (if any) first, then holds a
+        slot from its ``concurrency_limiter`` (if any) for the request.
+
+        Raises ``DeadlineExceeded`` if the deadline in effect (if any) has
+        passed, either before the request or by the time it fails.
+
+        :returns: The raw ``(http_response, parsed)`` tuple from ``botocore``
+        :rtype: tuple
+        """
+        check_deadline()
+        session = self._details.session
+        service_name = self._details.service_name
+        limiter = getattr(session, 'rate_limiter', None)
+        concurrency = getattr(session, 'concurrency_limiter', None)
+        held = []
+
+        if limiter is not None:
+            limiter.acquire(service_name, self.region_name, method_name)
+
+        if concurrency is not None:
+            held = concurrency.acquire(
+                service_name,
+                self.region_name,
+                method_name
+            )
+
+        try:
+            results = self._make_request(op_data, service_params)
+        except Exception:
+            # Typically the socket timing out, having been shortened to fit.
+            check_deadline()
+            raise
+        finally:
+            if held:
+                concurrency.release(held)
+
+        self._check_for_errors(results)
+        return results
+
+    def _call_cached(self, method_name, op_data, service_params,
+                     use_cache=True):
+        """
+        Makes a call (see ``_call_service``), answering it from the
+        session's ``response_cache`` (if any) when possible.
+
+        Responses to read-only operations are cached (unless they're
+        streamed), while other operations invalidate the entries they may
+        have changed.
+
+        :param use_cache: (Optional) Whether a read may be answered from (&
+            stored in) the cache. Default is ``True``.
+        :type use_cache: boolean
+
+        :returns: The raw ``(http_response, parsed)`` tuple from ``botocore``
+        :rtype: tuple
+        """
+        cache = getattr(self._details.session, 'response_cache', None)
+        key, generation, results = self._check_cache(
+            cache,
+            method_name,
+            op_data,
+            service_params,
+            use_cache
+        )
+
+        if results is not None:
+            return results
+
+        try:
+            results = self._call_service(method_name, op_data, service_params)
+        finally:
+            self._update_cache(
+                cache,
+                key,
+                generation,
+                method_name,
+                service_params,
+                results
+            )
+
+        return results
+
+    def _check_cache(self, cache, method_name, op_data, service_params,
+                     use_cache):
+        """
+        Looks a call up in the response cache.
+
+        :returns: The call's cache key (or ``None`` if it isn't cached), the
+            cache's ``generation`` before the call & the cached
+            ``(http_response, parsed)`` tuple (or ``None`` on a miss)
+        :rtype: tuple
+        """
+        service_name = self._details.service_name
+
+        if cache is None or not use_cache:
+            return None, None, None
+
+        if not cache.should_cache(service_name, method_name):
+            return None, None, None
+
+        if self._streams_output(op_data):
+            return None, None, None
+
+        key = cache.key_for(
+            service_name,
+            self.region_name,
+            method_name,
+            service_params,
+            identity=self._credentials_identity()
+        )
+
+        if key is None:
+            return None, None, None
+
+        # Taken before the read is sent, so a write that lands meanwhile
+        # stops its (possibly stale) response being cached.
+        generation = cache.generation(service_name, self.region_name)
+        parsed = cache.get(key)
+
+        if parsed is None:
+            return key, generation, None
+
+        # There's no HTTP response to go with a cached result.
+        return key, generation, (None, parsed)
+
+    def _update_cache(self, cache, key, generation, method_name,
+                      service_params, results):
+        # Stores a read's response, or invalidates what a write may have
+        # changed (whether or not it succeeded).
+        service_name = self._details.service_name
+
+        if cache is None:
+            return
+
+        if key is not None:
+            if results is not None:
+                cache.set(
+                    key,
+                    service_params,
+                    results[1],
+                    generation=generation
+                )
+        elif not cache.should_cache(service_name, method_name):
+            cache.invalidate(service_name, self.region_name, service_params)
+
+    def _call_service(self, method_name, op_data, service_params):
+        """
+        Makes a call, retrying failures as the session's ``retry_policy``
+        allows. Each attempt is hedged if the session has a
+        ``hedging_policy``, & each request goes through the endpoint's
+        breaker if it has ``circuit_breakers``.
+
+        If the session has a ``coalescer``, an identical call already in
+        flight is shared instead.
+
+        :returns: The raw ``(http_response, parsed)`` tuple from ``botocore``
+        :rtype: tuple
+        """
+        session = self._details.session
+        service_name = self._details.service_name
+        coalescer = getattr(session, 'coalescer', None)
+        policy = getattr(session, 'retry_policy', None)
+        hedging = getattr(session, 'hedging_policy', None)
+        breakers = getattr(session, 'circuit_breakers', None)
+
+        def request():
+            if breakers is None:
+                return self._send(method_name, op_data, service_params)
+
+            return breakers.call(
+                service_name,
+                self.region_name,
+                lambda: self._send(method_name, op_data, service_params)
+            )
+
+        def send():
+            if hedging is None:
+                return request()
+
+            return hedging.call(service_name, method_name, request)
+
+        def call():
+            if policy is None:
+                return send()
+
+            return policy.call(service_name, method_name, send)
+
+        key = self._coalesce_key(
+            coalescer,
+            method_name,
+            op_data,
+            service_params
+        )
+
+        if key is None:
+            return call()
+
+        return coalescer.call(
+            service_name,
+            method_name,
+            key,
+            call,
+            share=self._share_results
+        )
+
+    def _coalesce_key(self, coalescer, method_name, op_data,
+                      service_params):
+        """
+        Returns the key identical calls share (see
+        ``kotocore.coalesce.Coalescer``), or ``None`` if the call shouldn't
+        be coalesced.
+
+        :rtype: tuple
+        """
+        service_name = self._details.service_name
+
+        if coalescer is None:
+            return None
+
+        if not coalescer.should_coalesce(service_name, method_name):
+            return None
+
+        if self._streams_output(op_data):
+            return None
+
+        return coalescer.key_for(
+            service_name,
+            self.region_name,
+            method_name,
+            service_params,
+            identity=self._credentials_identity()
+        )
+
+    def _streams_output(self, op_data):
+        # Whether the response has a streamed body (Ex. S3's
+        # ``get_object``), which can only be read once & can't be copied.
+        output = op_data.get('output')
+
+        if not hasattr(output, 'get'):
+            return False
+
+        if output.get('streaming'):
+            return True
+
+        members = output.get('members') or {}
+
+        for member in members.values():
+            if hasattr(member, 'get') and member.get('streaming'):
+                return True
+
+        return False
+
+    def _credentials_identity(self):
+        # The access key requests are signed with, so calls made as
+        # different users are never shared.
+        core_session = self.core_session
+
+        if core_session is None:
+            core_session = self._details.session.core_session
+
+        get_credentials = getattr(core_session, 'get_credentials', None)
+        credentials = None
+
+        if get_credentials is not None:
+            credentials = get_credentials()
+
+        access_key = getattr(credentials, 'access_key', None)
+
+        if access_key is None:
+            # Without credentials to go by, only share within a session.
+            return id(core_session)
+
+        return access_key
+
+    def _share_results(self, results):
+        # Each caller sharing a response gets its own copy of the parsed
+        # data, as they're free to change it.
+        return (results[0], copy.deepcopy(results[1]))
+
     def _check_for_errors(self, results):
         result_data = results[1]
 
@@ -206,6 +596,66 @@ class Connection(object):
         """
         return cls(**kwargs)
 
+    def map(self, method_name, kwargs_iterable, max_workers=None,
+            ordered=True):
+        """
+        Calls the same operation once per set of keyword arguments,
+        concurrently, on the thread pool owned by the session.
+
+        Results are yielded as they arrive. A ``ServerError`` raised by any
+        one call is yielded in place of its result, so a single failure
+        doesn't abort the rest.
+
+        If called from within work already running on the pool (for
+        instance, a batched call), the calls are made inline instead, since
+        queueing them could deadlock a full pool.
+
+        Usage::
+
+            >>> urls = [{'queue_url': url} for url in queue_urls]
+            >>> for attrs in conn.map('get_queue_attributes', urls):
+            ...     print(attrs)
+
+        :param method_name: The name of the operation method. Ex.
+            ``head_object``
+        :type method_name: string
+
+        :param kwargs_iterable: An iterable of dictionaries, each being the
+            parameters for one call.
+        :type kwargs_iterable: iterable
+
+        :param max_workers: (Optional) The most calls to have in flight at
+            once, or an ``AdaptiveLimit`` to size that by. Default is the
+            session's ``max_workers``.
+        :type max_workers: integer or <kotocore.adaptive.AdaptiveLimit>
+            instance
+
+        :param ordered: (Optional) Whether results should be yielded in the
+            same order as the input. If ``False``, they're yielded as they
+            complete. Default is ``True``.
+        :type ordered: boolean
+
+        :returns: A generator of response data (or ``ServerError`` instances)
+        """
+        method = getattr(self, method_name, None)
+
+        if method is None:
+            msg = "No operation named '{0}' available on the connection."
+            raise NoSuchMethod(msg.format(method_name))
+
+        session = self._details.session
+
+        if max_workers is None:
+            max_workers = session.max_workers
+
+        return map_calls(
+            session.get_executor(),
+            method,
+            kwargs_iterable,
+            max_workers,
+            ordered=ordered
+        )
+
     def _get_operation_data(self, method_name):
         """
         Returns all the introspected operation data for a given method.
@@ -320,6 +770,15 @@ class ConnectionFactory(object):
             docstring += param_doc
             docstring += type_doc
 
+        docstring += '\n'
+        docstring += ':param _deadline: (Optional) The most seconds the ' + \
+            'call may take, including retries. Default is ``None``.\n'
+        docstring += ':type _deadline: float\n'
+        docstring += '\n'
+        docstring += ':param _cache: (Optional) Whether the response may ' + \
+            'come from the session\'s ``response_cache``. Default is ' + \
+            '``True``.\n'
+        docstring += ':type _cache: boolean\n'
         docstring += '\n'
         docstring += ':returns: The response data received\n'
         docstring += ':rtype: dict\n'
@@ -330,6 +789,11 @@ class ConnectionFactory(object):
             method_name = str(method_name)
 
         def _new_method(self, **kwargs):
+            # The most seconds the call may take, if given.
+            seconds = kwargs.pop('_deadline', None)
+            # Whether the response cache (if any) may answer the call.
+            use_cache = kwargs.pop('_cache', True)
+
             # Fetch the information about the operation.
             op_data = self._get_operation_data(method_name)
 
@@ -345,18 +809,14 @@ class ConnectionFactory(object):
                 **kwargs
             )
 
-            # Actually call the service.
-            service = self._details.session.get_core_service(
-                self._details.service_name
-            )
-            endpoint = service.get_endpoint(self.region_name)
-            op = service.get_operation(
-                op_data['api_name']
-            )
-            results = op.call(endpoint, **service_params)
-
-            # Check for error conditions.
-            self._check_for_errors(results)
+            # Actually call the service (checking for errors & retrying).
+            with deadline(seconds):
+                results = self._call_cached(
+                    method_name,
+                    op_data,
+                    service_params,
+                    use_cache=use_cache
+                )
 
             # Post-process results here
             post_processed = self._post_process_results(
@@ -0,0 +1,223 @@
+"""
+Deadlines, which bound how long a call may take end to end (including
+retries, backoff & any waits for rate or concurrency limits).
+"""
+import contextlib
+import threading
+import time
+
+from kotocore.exceptions import DeadlineExceeded
+
+try:
+    import contextvars
+except ImportError:
+    # Python 2. Deadlines are per-thread there, which is all that's needed
+    # without ``asyncio``.
+    contextvars = None
+
+
+class Deadline(object):
+    """
+    A point in time a call must finish by.
+
+    Typically created via ``Session.deadline`` or a call's ``_deadline=``
+    argument, rather than directly.
+    """
+    def __init__(self, seconds, clock=time.time):
+        self.seconds = seconds
+        self.clock = clock
+        self.expires_at = clock() + seconds
+
+    def remaining(self):
+        """
+        Returns how many seconds are left (never negative).
+
+        :rtype: float
+        """
+        return max(0.0, self.expires_at - self.clock())
+
+    @property
+    def expired(self):
+        return self.clock() >= self.expires_at
+
+    def exceeded(self):
+        """
+        Returns the error to raise once the deadline has passed.
+
+        :rtype: <kotocore.exceptions.DeadlineExceeded> instance
+        """
+        return DeadlineExceeded(
+            "The {0}s deadline was exceeded.".format(self.seconds),
+            timeout=self.seconds
+        )
+
+    def check(self):
+        """
+        Raises ``DeadlineExceeded`` if the deadline has passed.
+        """
+        if self.expired:
+            raise self.exceeded()
+
+
+if contextvars is not None:
+    _current = contextvars.ContextVar('kotocore_deadline', default=None)
+
+    def current_deadline():
+        """
+        Returns the innermost ``Deadline`` in effect, or ``None``.
+
+        :rtype: <kotocore.deadlines.Deadline> instance
+        """
+        return _current.get()
+
+    def _push(deadline):
+        return _current.set(deadline)
+
+    def _pop(token):
+        _current.reset(token)
+else:
+    _local = threading.local()
+
+    def current_deadline():
+        """
+        Returns the innermost ``Deadline`` in effect, or ``None``.
+
+        :rtype: <kotocore.deadlines.Deadline> instance
+        """
+        return getattr(_local, 'deadline', None)
+
+    def _push(deadline):
+        previous = current_deadline()
+        _local.deadline = deadline
+        return previous
+
+    def _pop(token):
+        _local.deadline = token
+
+
+@contextlib.contextmanager
+def using(deadline):
+    """
+    Puts an existing ``Deadline`` (or ``None``) in effect for a ``with``
+    block. Used to carry a deadline over to work on other threads.
+    """
+    token = _push(deadline)
+
+    try:
+        yield deadline
+    finally:
+        _pop(token)
+
+
+@contextlib.contextmanager
+def deadline(seconds=None, clock=time.time):
+    """
+    Puts a deadline in effect for the calls in a ``with`` block.
+
+    When nested, whichever deadline comes first wins. With ``seconds`` of
+    ``None``, whatever deadline is already in effect is kept.
+
+    Usage::
+
+        >>> with deadline(2.5):
+        ...     conn.get_item(table_name='users', key=key)
+
+    :param seconds: (Optional) How long from now the calls must finish by.
+    :type seconds: float
+
+    :returns: The ``Deadline`` in effect
+    """
+    with using(resolve_deadline(seconds, clock=clock)) as current:
+        yield current
+
+
+def resolve_deadline(seconds=None, clock=time.time):
+    """
+    Returns the ``Deadline`` that would be in effect for a call given
+    ``seconds`` (see ``deadline``), without putting it in effect.
+
+    :rtype: <kotocore.deadlines.Deadline> instance, or ``None``
+    """
+    current = current_deadline()
+
+    if seconds is None:
+        return current
+
+    new = Deadline(seconds, clock=clock)
+
+    if current is not None and current.expires_at <= new.expires_at:
+        return current
+
+    return new
+
+
+def carry_deadline(func):
+    """
+    Wraps ``func`` so the deadline in effect now is also in effect when it's
+    called later (Ex. on a worker thread). If there's no deadline, ``func``
+    is returned as is.
+
+    :rtype: callable
+    """
+    current = current_deadline()
+
+    if current is None:
+        return func
+
+    def call(*args, **kwargs):
+        with using(current):
+            return func(*args, **kwargs)
+
+    # So ``describe_call`` still sees the real operation.
+    call.__wrapped__ = func
+    return call
+
+
+def check_deadline():
+    """
+    Raises ``DeadlineExceeded`` if the deadline in effect has passed.
+    """
+    current = current_deadline()
+
+    if current is not None:
+        current.check()
+
+
+def sleep_within(delay, sleep=time.sleep):
+    """
+    Sleeps for ``delay`` seconds, unless that would run past the deadline in
+    effect, in which case ``DeadlineExceeded`` is raised straight away.
+
+    :param sleep: (Optional) Does the actual sleeping. Default is
+        ``time.sleep``.
+    :type sleep: callable
+    """
+    current = current_deadline()
+
+    if current is not None and delay >= current.remaining():
+        raise current.exceeded()
+
+    sleep(delay)
+
+
+def bound_timeout(timeout):
+    """
+    Shortens a timeout to fit within the deadline in effect.
+
+    :param timeout: The timeout (in seconds), or ``None`` for no timeout.
+    :type timeout: float
+
+    :returns: The timeout to use & whether the deadline is what limits it
+    :rtype: tuple
+    """
+    current = current_deadline()
+
+    if current is None:
+        return timeout, False
+
+    remaining = current.remaining()
+
+    if timeout is None or remaining < timeout:
+        return remaining, True
+
+    return timeout, False
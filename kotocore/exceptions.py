@@ -26,6 +26,93 @@ class ServerError(BotoException):
         )
         super(ServerError, self).__init__(msg)
 
+    def __reduce__(self):
+        # So it survives being sent between processes intact.
+        return (
+            self.__class__,
+            (self.code, self.message, self.full_response)
+        )
+
+
+class BatchError(BotoException):
+    """
+    Thrown when one or more calls within a ``Batch`` failed.
+
+    The individual failures are available as ``errors``, a list of
+    ``(BatchCall, exception)`` tuples.
+    """
+    def __init__(self, errors):
+        self.errors = errors
+        msg = "{0} call(s) in the batch failed: {1}".format(
+            len(self.errors),
+            '; '.join([
+                '{0} -> {1!r}'.format(call, err) for call, err in self.errors
+            ])
+        )
+        super(BatchError, self).__init__(msg)
+
+
+class GraphError(BotoException):
+    """
+    Thrown when a ``TaskGraph`` is invalid or one of its steps failed.
+
+    For failed runs, ``errors`` maps step names to their exceptions,
+    ``results`` holds the outputs of the steps that did succeed & ``skipped``
+    lists the steps that never ran.
+    """
+    def __init__(self, msg, errors=None, results=None, skipped=None):
+        self.errors = errors or {}
+        self.results = results or {}
+        self.skipped = skipped or []
+        super(GraphError, self).__init__(msg)
+
+
+class PipelineError(BotoException):
+    """
+    Thrown when a stage of a ``Pipeline`` fails, stopping the whole run.
+
+    ``errors`` is a list of ``(stage_name, exception)`` tuples & ``stats``
+    holds the per-stage metrics up to the failure.
+    """
+    def __init__(self, msg, errors=None, stats=None):
+        self.errors = errors or []
+        self.stats = stats or {}
+        super(PipelineError, self).__init__(msg)
+
+
+class ConcurrencyLimitTimeout(BotoException):
+    """
+    Thrown when a call waits too long for a slot under a
+    ``ConcurrencyLimiter``.
+    """
+    pass
+
+
+class CircuitOpenError(BotoException):
+    """
+    Thrown (without making a request) when calls to an endpoint are being
+    failed fast, because its circuit breaker is open.
+
+    ``retry_after`` is how many seconds remain until a probe is let through.
+    """
+    def __init__(self, msg, service_name=None, region_name=None,
+                 retry_after=None):
+        self.service_name = service_name
+        self.region_name = region_name
+        self.retry_after = retry_after
+        super(CircuitOpenError, self).__init__(msg)
+
+
+class DeadlineExceeded(BotoException):
+    """
+    Thrown when a call runs past its deadline (see ``Session.deadline``).
+
+    ``timeout`` is the length (in seconds) of the deadline.
+    """
+    def __init__(self, msg, timeout=None):
+        self.timeout = timeout
+        super(DeadlineExceeded, self).__init__(msg)
+
 
 class IncorrectImportPath(BotoException):
     pass
@@ -0,0 +1,404 @@
+"""
+Runs the same calls across many account/region targets at once.
+"""
+import collections
+import threading
+import time
+
+from concurrent.futures import FIRST_COMPLETED, wait
+import botocore.session
+
+from kotocore.adaptive import check_workers, tracked, worker_limit
+from kotocore.utils.concurrency import on_worker_thread, submit_as
+
+
+class Target(collections.namedtuple('Target', [
+    'credentials',
+    'region_name',
+    'name',
+])):
+    """
+    One account/region pair to fan out to.
+
+    ``credentials`` can be any of:
+
+    * ``None``, to use the fan-out's own session
+    * a ``kotocore`` or ``botocore`` ``Session``
+    * a dictionary with ``aws_access_key_id``, ``aws_secret_access_key`` &
+      (optionally) ``aws_session_token``
+
+    Usage::
+
+        >>> Target(None, 'us-west-2')
+        >>> Target(prod_creds, 'eu-west-1', name='prod/eu-west-1')
+
+    :param name: (Optional) A label for the target, used in results & stats.
+        Default is ``<position>/<region_name>``.
+    """
+    def __new__(cls, credentials, region_name, name=None):
+        return super(Target, cls).__new__(cls, credentials, region_name, name)
+
+    def build_core_session(self):
+        """
+        Returns the ``botocore`` session to make this target's requests
+        with, or ``None`` to use the fan-out's own.
+
+        :rtype: <botocore.session.Session> instance
+        """
+        creds = self.credentials
+
+        if creds is None:
+            return None
+
+        if isinstance(creds, dict):
+            core_session = botocore.session.get_session()
+            core_session.set_credentials(
+                creds['aws_access_key_id'],
+                creds['aws_secret_access_key'],
+                token=creds.get('aws_session_token')
+            )
+            return core_session
+
+        # A ``kotocore`` session wraps the ``botocore`` one.
+        return getattr(creds, 'core_session', creds)
+
+
+class FanOutResult(collections.namedtuple('FanOutResult', [
+    'target',
+    'kwargs',
+    'value',
+    'error',
+    'elapsed',
+])):
+    """
+    The outcome of one call against one target.
+
+    Exactly one of ``value`` or ``error`` is set. ``elapsed`` is the time
+    (in seconds) the call took.
+    """
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class FanOut(object):
+    """
+    Runs calls against a list of account/region targets concurrently,
+    streaming back the results as they complete.
+
+    Every target uses the same ``Connection``, ``Resource`` & ``Collection``
+    classes from the session, so nothing is built more than once. Each
+    target only swaps in its own credentials & region.
+
+    A failure against one target doesn't affect the others. It comes back as
+    a result with the ``error`` set.
+
+    Typically created via ``Session.fan_out``, rather than directly.
+
+    Usage::
+
+        >>> fan = session.fan_out([
+        ...     (prod_creds, 'us-east-1'),
+        ...     (prod_creds, 'eu-west-1'),
+        ...     (dev_session, 'us-west-2'),
+        ... ], per_target=2)
+        >>> for result in fan.collection('sqs', 'QueueCollection'):
+        ...     if result.ok:
+        ...         print(result.target.name, len(result.value))
+        ...     else:
+        ...         print(result.target.name, 'failed:', result.error)
+        >>> fan.stats()['0/us-east-1']['elapsed_max']
+        0.213
+    """
+    def __init__(self, session, targets, executor, max_workers,
+                 per_target=1):
+        """
+        Creates a new ``FanOut`` instance.
+
+        :param session: The session that provides the classes.
+        :type session: <kotocore.session.Session> instance
+
+        :param targets: The targets, either ``Target`` instances or
+            ``(credentials, region_name[, name])`` tuples.
+        :type targets: list
+
+        :param executor: The executor to run the calls on.
+        :type executor: <concurrent.futures.Executor> instance
+
+        :param max_workers: The most calls to have running at once, across
+            all targets, or an ``AdaptiveLimit`` to size that by.
+        :type max_workers: integer or <kotocore.adaptive.AdaptiveLimit>
+            instance
+
+        :param per_target: (Optional) The most calls to have running at once
+            against any one target. Default is ``1``.
+        :type per_target: integer
+        """
+        check_workers(max_workers)
+
+        if per_target < 1:
+            raise ValueError("'per_target' must be at least 1.")
+
+        self.session = session
+        self.executor = executor
+        self.max_workers = max_workers
+        self.per_target = per_target
+        self.targets = []
+
+        for offset, target in enumerate(targets):
+            if not isinstance(target, Target):
+                target = Target(*target)
+
+            if target.name is None:
+                target = target._replace(name='{0}/{1}'.format(
+                    offset,
+                    target.region_name
+                ))
+
+            self.targets.append(target)
+
+        names = [target.name for target in self.targets]
+
+        if len(set(names)) != len(names):
+            raise ValueError('Every target needs a unique name.')
+
+        self._lock = threading.Lock()
+        self._core_sessions = {}
+        self._connections = {}
+        self._stats = dict([
+            (name, {
+                'calls': 0,
+                'errors': 0,
+                'elapsed_total': 0.0,
+                'elapsed_max': 0.0,
+            })
+            for name in names
+        ])
+
+    def connect_to(self, target, service_name):
+        """
+        Returns a connection to a service for the given target.
+
+        Connections are made once per target & service, then reused.
+
+        :param target: One of the fan-out's targets.
+        :type target: <kotocore.fanout.Target> instance
+
+        :param service_name: The name of the service. Ex. ``sqs``, ``s3``,
+            etc.
+        :type service_name: string
+
+        :rtype: <kotocore.connection.Connection subclass> instance
+        """
+        key = (target.name, service_name)
+
+        with self._lock:
+            conn = self._connections.get(key)
+
+            if conn is not None:
+                return conn
+
+            if not target.name in self._core_sessions:
+                core_session = target.build_core_session()
+                self._core_sessions[target.name] = core_session
+
+        # Build outside the lock, since the session has its own.
+        conn_class = self.session.get_connection(service_name)
+        conn = conn_class(
+            region_name=target.region_name,
+            core_session=self._core_sessions[target.name]
+        )
+
+        with self._lock:
+            return self._connections.setdefault(key, conn)
+
+    def run(self, func, kwargs_list=None, description=(None, None)):
+        """
+        Calls ``func(target, **kwargs)`` for every target & every set of
+        keyword arguments, yielding ``FanOutResult`` instances as they
+        complete.
+
+        Calls are spread evenly across the targets, with at most
+        ``per_target`` running against any one of them.
+
+        :param func: The callable to run. Use ``connect_to`` within it to
+            talk to the target.
+        :type func: callable
+
+        :param kwargs_list: (Optional) The keyword arguments for each call.
+            Default is a single call with no arguments.
+        :type kwargs_list: list
+
+        :param description: (Optional) The ``(service_name,
+            operation_name)`` being called, for priority-aware executors.
+        :type description: tuple
+
+        :returns: A generator of ``FanOutResult`` instances
+        """
+        if kwargs_list is None:
+            kwargs_list = [{}]
+
+        kwargs_list = list(kwargs_list)
+
+        if on_worker_thread():
+            # Already running on the pool, so don't queue onto it again.
+            return self._run_inline(func, kwargs_list)
+
+        return self._run_on_executor(func, kwargs_list, description)
+
+    def call(self, service_name, method_name, **kwargs):
+        """
+        Calls a ``Connection`` method against every target.
+
+        Usage::
+
+            >>> for result in fan.call('s3', 'list_buckets'):
+            ...     print(result.target.name, result.value)
+
+        :returns: A generator of ``FanOutResult`` instances
+        """
+        def call(target):
+            conn = self.connect_to(target, service_name)
+            return getattr(conn, method_name)(**kwargs)
+
+        return self.run(call, description=(service_name, method_name))
+
+    def map(self, service_name, method_name, kwargs_list):
+        """
+        Calls a ``Connection`` method against every target, once for each
+        set of keyword arguments.
+
+        :returns: A generator of ``FanOutResult`` instances
+        """
+        def call(target, **kwargs):
+            conn = self.connect_to(target, service_name)
+            return getattr(conn, method_name)(**kwargs)
+
+        return self.run(
+            call,
+            kwargs_list=kwargs_list,
+            description=(service_name, method_name)
+        )
+
+    def collection(self, service_name, collection_name, method_name='each',
+                   **kwargs):
+        """
+        Runs a ``Collection`` method (by default, the listing) against every
+        target.
+
+        Usage::
+
+            >>> for result in fan.collection('s3', 'BucketCollection'):
+            ...     print(result.target.name, [b.name for b in result.value])
+
+        :returns: A generator of ``FanOutResult`` instances
+        """
+        collection_class = self.session.get_collection(
+            service_name,
+            collection_name
+        )
+
+        def call(target):
+            conn = self.connect_to(target, service_name)
+            collection = collection_class(connection=conn)
+            return getattr(collection, method_name)(**kwargs)
+
+        return self.run(call, description=(service_name, None))
+
+    def stats(self):
+        """
+        Returns the timings per target, keyed by target name.
+
+        Each has the number of ``calls`` & ``errors``, plus ``elapsed_total``
+        & ``elapsed_max`` (in seconds).
+
+        :rtype: dict
+        """
+        with self._lock:
+            return dict([
+                (name, dict(stats)) for name, stats in self._stats.items()
+            ])
+
+    def _call(self, target, func, kwargs):
+        value = error = None
+        start = time.time()
+
+        try:
+            value = tracked(self.max_workers, func)(target, **kwargs)
+        except Exception as err:
+            error = err
+
+        elapsed = time.time() - start
+
+        with self._lock:
+            stats = self._stats[target.name]
+            stats['calls'] += 1
+            stats['elapsed_total'] += elapsed
+            stats['elapsed_max'] = max(stats['elapsed_max'], elapsed)
+
+            if error is not None:
+                stats['errors'] += 1
+
+        return FanOutResult(target, kwargs, value, error, elapsed)
+
+    def _run_inline(self, func, kwargs_list):
+        for target in self.targets:
+            for kwargs in kwargs_list:
+                yield self._call(target, func, kwargs)
+
+    def _run_on_executor(self, func, kwargs_list, description):
+        waiting = [collections.deque(kwargs_list) for target in self.targets]
+        in_flight = [0] * len(self.targets)
+        running = {}
+
+        def limit():
+            return worker_limit(self.max_workers)
+
+        def fill():
+            # Round-robin over the targets, so none of them is starved.
+            progressed = True
+
+            while progressed and len(running) < limit():
+                progressed = False
+
+                for offset, target in enumerate(self.targets):
+                    if len(running) >= limit():
+                        break
+
+                    if not waiting[offset]:
+                        continue
+
+                    if in_flight[offset] >= self.per_target:
+                        continue
+
+                    future = submit_as(
+                        self.executor,
+                        description,
+                        self._call,
+                        target,
+                        func,
+                        waiting[offset].popleft()
+                    )
+                    running[future] = offset
+                    in_flight[offset] += 1
+                    progressed = True
+
+        try:
+            fill()
+
+            while running:
+                done, not_done = wait(list(running),
+                                      return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    in_flight[running.pop(future)] -= 1
+
+                # Keep the pool busy before handing anything back.
+                fill()
+
+                for future in done:
+                    yield future.result()
+        finally:
+            # If the caller bailed early, don't leave queued work behind.
+            for future in running:
+                future.cancel()
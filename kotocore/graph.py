@@ -0,0 +1,285 @@
+import collections
+import functools
+
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from kotocore.adaptive import check_workers, tracked, worker_limit
+from kotocore.exceptions import GraphError
+from kotocore.utils.concurrency import on_worker_thread, submit_call
+
+
+class Ref(object):
+    """
+    A placeholder for (part of) another step's output, resolved just before
+    the dependent step runs.
+
+    Usage::
+
+        >>> Ref('create_queue', 'QueueUrl')
+
+    :param step_name: The name of the step whose output is wanted.
+    :type step_name: string
+
+    :param *path: (Optional) Keys/indexes to drill into the output with. With
+        no path, the whole output is used.
+    """
+    def __init__(self, step_name, *path):
+        self.step_name = step_name
+        self.path = path
+
+    def __repr__(self):
+        return 'Ref({0})'.format(
+            ', '.join([repr(bit) for bit in (self.step_name,) + self.path])
+        )
+
+    def resolve(self, results):
+        value = results[self.step_name]
+
+        for bit in self.path:
+            value = value[bit]
+
+        return value
+
+
+class Step(object):
+    """
+    A single call within a ``TaskGraph``.
+    """
+    def __init__(self, name, func, depends_on=None, params=None):
+        self.name = name
+        self.func = func
+        self.params = params or {}
+        self.depends_on = set(depends_on or [])
+
+        # Anything referenced in the params is an implicit dependency.
+        for value in self.params.values():
+            if isinstance(value, Ref):
+                self.depends_on.add(value.step_name)
+
+    def __repr__(self):
+        return '<Step: {0}>'.format(self.name)
+
+    def build_params(self, results):
+        params = {}
+
+        for key, value in self.params.items():
+            if isinstance(value, Ref):
+                value = value.resolve(results)
+
+            params[key] = value
+
+        return params
+
+
+class TaskGraph(object):
+    """
+    Runs a set of dependent calls, running independent branches concurrently
+    on a shared executor.
+
+    Outputs flow into later steps through ``Ref`` placeholders, which also
+    imply the dependency.
+
+    Typically created via ``Session.graph``, rather than directly.
+
+    Usage::
+
+        >>> graph = session.graph(max_workers=4)
+        >>> graph.add('queue', sqs.create_queue, queue_name='jobs')
+        >>> graph.add(
+        ...     'attrs',
+        ...     sqs.set_queue_attributes,
+        ...     queue_url=Ref('queue', 'QueueUrl'),
+        ...     attributes={'VisibilityTimeout': '60'}
+        ... )
+        >>> graph.add(
+        ...     'subscribe',
+        ...     sns.subscribe,
+        ...     depends_on=['attrs'],
+        ...     topic_arn=topic_arn,
+        ...     protocol='sqs',
+        ...     endpoint=queue_arn
+        ... )
+        >>> results = graph.run()
+        >>> results['queue']['QueueUrl']
+
+    If any step fails, nothing depending on it runs. Once everything that
+    can run has finished, a ``GraphError`` is raised.
+    """
+    def __init__(self, executor, max_workers):
+        """
+        Creates a new ``TaskGraph`` instance.
+
+        :param executor: The executor to run the steps on.
+        :type executor: <concurrent.futures.Executor> instance
+
+        :param max_workers: The most steps to have running at once, or an
+            ``AdaptiveLimit`` to size that by.
+        :type max_workers: integer or <kotocore.adaptive.AdaptiveLimit>
+            instance
+        """
+        check_workers(max_workers)
+
+        self.executor = executor
+        self.max_workers = max_workers
+        self.steps = collections.OrderedDict()
+
+    def add(self, step_name, func, depends_on=None, **params):
+        """
+        Adds a step to the graph.
+
+        :param step_name: A unique name for the step. Used by ``Ref`` &
+            ``depends_on``.
+        :type step_name: string
+
+        :param func: The callable to run. Typically a ``Connection`` or
+            ``Resource`` method.
+        :type func: callable
+
+        :param depends_on: (Optional) Names of steps that must succeed before
+            this one runs, beyond the ones referenced via ``Ref``.
+        :type depends_on: list
+
+        :param **params: (Optional) Keyword arguments for the call. ``Ref``
+            values are swapped for the referenced output.
+        :type **params: dict
+
+        :returns: The new ``Step``
+        """
+        if step_name in self.steps:
+            msg = "A step named '{0}' already exists."
+            raise GraphError(msg.format(step_name))
+
+        step = Step(step_name, func, depends_on=depends_on, params=params)
+        self.steps[step_name] = step
+        return step
+
+    def order(self):
+        """
+        Returns the step names in an order that satisfies the dependencies.
+
+        Raises ``GraphError`` for unknown dependencies or cycles.
+
+        :rtype: list
+        """
+        for step in self.steps.values():
+            for dep in step.depends_on:
+                if not dep in self.steps:
+                    msg = "Step '{0}' depends on unknown step '{1}'."
+                    raise GraphError(msg.format(step.name, dep))
+
+        ordered = []
+        remaining = dict([
+            (name, set(step.depends_on)) for name, step in self.steps.items()
+        ])
+
+        while remaining:
+            ready = [
+                name for name in self.steps
+                if name in remaining and not remaining[name]
+            ]
+
+            if not ready:
+                msg = "The steps form a cycle: {0}."
+                raise GraphError(msg.format(', '.join(sorted(remaining))))
+
+            for name in ready:
+                ordered.append(name)
+                del remaining[name]
+
+            for deps in remaining.values():
+                deps.difference_update(ready)
+
+        return ordered
+
+    def run(self):
+        """
+        Runs every step, respecting the dependencies.
+
+        :returns: A dictionary of step names to their outputs
+        :rtype: dict
+        """
+        order = self.order()
+        results = {}
+        errors = {}
+
+        if on_worker_thread():
+            # Already running on the pool. Queueing onto it again could
+            # deadlock, so run the steps inline, in order.
+            for name in order:
+                step = self.steps[name]
+
+                if not step.depends_on.issubset(results):
+                    continue
+
+                try:
+                    results[name] = step.func(**step.build_params(results))
+                except Exception as err:
+                    errors[name] = err
+        else:
+            self._run_on_executor(order, results, errors)
+
+        if errors:
+            skipped = [name for name in order if not name in results and
+                       not name in errors]
+            raise GraphError(
+                "{0} step(s) failed & {1} were skipped.".format(
+                    len(errors),
+                    len(skipped)
+                ),
+                errors=errors,
+                results=results,
+                skipped=skipped
+            )
+
+        return results
+
+    def _run_on_executor(self, order, results, errors):
+        waiting = list(order)
+        running = {}
+
+        def ready(name):
+            return self.steps[name].depends_on.issubset(results)
+
+        def blocked(name):
+            return bool(self.steps[name].depends_on.intersection(errors))
+
+        while True:
+            # Don't bother with anything downstream of a failure.
+            waiting = [name for name in waiting if not blocked(name)]
+
+            for name in list(waiting):
+                if len(running) >= worker_limit(self.max_workers):
+                    break
+
+                if ready(name):
+                    step = self.steps[name]
+                    waiting.remove(name)
+
+                    try:
+                        params = step.build_params(results)
+                    except Exception as err:
+                        # Typically a ``Ref`` into output that wasn't there.
+                        errors[name] = err
+                        continue
+
+                    future = submit_call(
+                        self.executor,
+                        tracked(
+                            self.max_workers,
+                            functools.partial(step.func, **params)
+                        )
+                    )
+                    running[future] = name
+
+            if not running:
+                break
+
+            done, not_done = wait(list(running), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                name = running.pop(future)
+
+                try:
+                    results[name] = future.result()
+                except Exception as err:
+                    errors[name] = err
@@ -0,0 +1,350 @@
+"""
+Hedged requests, which trade a little extra load for a shorter latency tail
+on reads.
+"""
+import collections
+import math
+import threading
+import time
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from kotocore.deadlines import carry_deadline
+from kotocore.retries import IDEMPOTENT_PREFIXES
+from kotocore.utils.constants import DEFAULT_MAX_WORKERS
+
+
+class HedgingPolicy(object):
+    """
+    Sends a second, identical request when a call runs slower than usual,
+    taking whichever response comes back first.
+
+    The delay before hedging is a percentile of the recent latencies for
+    that operation, so only the slowest calls get a hedge. The number of
+    hedges is capped as a share of all calls, so a slow service doesn't see
+    its load doubled.
+
+    Only operations that are safe to send twice are hedged. By default,
+    those are the read-only ones (``get_``, ``head_``, ``list_``,
+    ``describe_``, etc.). Pass ``operations`` to choose them explicitly.
+
+    Usage::
+
+        >>> policy = HedgingPolicy(
+        ...     operations={
+        ...         's3': ['get_object', 'head_object'],
+        ...         'dynamodb': ['get_item'],
+        ...     },
+        ...     percentile=95,
+        ...     max_ratio=0.05
+        ... )
+        >>> session = Session(hedging_policy=policy)
+        >>> policy.stats()['s3']['get_object']['hedge_wins']
+        12
+
+    """
+    def __init__(self, operations=None, percentile=95, max_ratio=0.1,
+                 window=200, min_samples=20, min_delay=0.0,
+                 max_workers=None):
+        """
+        Creates a new ``HedgingPolicy`` instance.
+
+        :param operations: (Optional) The operation names to hedge, keyed by
+            service name. Default is ``None`` (all read-only operations).
+        :type operations: dict
+
+        :param percentile: (Optional) The percentile of recent latency to
+            wait before hedging. Default is ``95``.
+        :type percentile: float
+
+        :param max_ratio: (Optional) The most hedges, as a share of all the
+            calls made for an operation. Default is ``0.1``.
+        :type max_ratio: float
+
+        :param window: (Optional) How many recent latencies to keep per
+            operation. Default is ``200``.
+        :type window: integer
+
+        :param min_samples: (Optional) How many latencies an operation needs
+            before it's hedged. Default is ``20``.
+        :type min_samples: integer
+
+        :param min_delay: (Optional) The least time (in seconds) to wait
+            before hedging. Default is ``0.0``.
+        :type min_delay: float
+
+        :param max_workers: (Optional) The size of the thread pool the
+            requests being hedged run on. Default is ``None``, where each
+            ``Session`` given the policy sizes it (see ``size_for``).
+        :type max_workers: integer
+        """
+        if not 0 < percentile < 100:
+            raise ValueError("'percentile' must be between 0 & 100.")
+
+        if not 0 <= max_ratio <= 1:
+            raise ValueError("'max_ratio' must be between 0 & 1.")
+
+        self.operations = None
+
+        if operations is not None:
+            self.operations = dict([
+                (service_name, frozenset(names))
+                for service_name, names in operations.items()
+            ])
+
+        self.percentile = percentile
+        self.max_ratio = max_ratio
+        self.window = window
+        self.min_samples = max(1, min_samples)
+        self.min_delay = min_delay
+        self.max_workers = max_workers
+        # Whether ``max_workers`` was chosen, rather than left to sessions.
+        self._fixed_size = max_workers is not None
+        self._latencies = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def should_hedge(self, service_name, operation_name):
+        """
+        Returns whether calls to an operation may be hedged at all.
+
+        :rtype: boolean
+        """
+        if self.operations is None:
+            return operation_name.startswith(IDEMPOTENT_PREFIXES)
+
+        return operation_name in self.operations.get(service_name, ())
+
+    def hedge_delay(self, service_name, operation_name):
+        """
+        Returns how long (in seconds) to wait before hedging a call, or
+        ``None`` if there isn't enough history yet.
+
+        :rtype: float
+        """
+        with self._lock:
+            latencies = self._latencies.get((service_name, operation_name))
+
+            if latencies is None or len(latencies) < self.min_samples:
+                return None
+
+            ordered = sorted(latencies)
+
+        offset = int(math.ceil(self.percentile / 100.0 * len(ordered))) - 1
+        return max(self.min_delay, ordered[max(0, offset)])
+
+    def record(self, service_name, operation_name, latency):
+        """
+        Adds the latency of a successful request to the history.
+        """
+        key = (service_name, operation_name)
+
+        with self._lock:
+            latencies = self._latencies.get(key)
+
+            if latencies is None:
+                latencies = self._latencies[key] = collections.deque(
+                    maxlen=self.window
+                )
+
+            latencies.append(latency)
+
+    def started(self, service_name, operation_name):
+        # Counts a call, for the ``max_ratio`` cap.
+        with self._lock:
+            self._stats_for(service_name, operation_name)['calls'] += 1
+
+    def allow_hedge(self, service_name, operation_name):
+        """
+        Takes a hedge from the ``max_ratio`` allowance, if there's one left.
+
+        :rtype: boolean
+        """
+        with self._lock:
+            stats = self._stats_for(service_name, operation_name)
+
+            if stats['hedged'] + 1 > self.max_ratio * stats['calls']:
+                stats['denied'] += 1
+                return False
+
+            stats['hedged'] += 1
+            return True
+
+    def finished(self, service_name, operation_name, hedge_won=False,
+                 cancelled=False):
+        # Counts the outcome of a hedged call.
+        with self._lock:
+            stats = self._stats_for(service_name, operation_name)
+
+            if hedge_won:
+                stats['hedge_wins'] += 1
+
+            if cancelled:
+                stats['cancelled'] += 1
+
+    def call(self, service_name, operation_name, func):
+        """
+        Calls ``func``, hedging it if it's slow.
+
+        The first successful response wins. The other request is cancelled
+        if it hasn't started, or its response is ignored. If both fail, the
+        first error is raised.
+
+        The delay before hedging only counts from when the request actually
+        starts, so time spent queued for a thread never triggers a hedge.
+
+        :param func: Makes the request. Called from the policy's thread pool.
+        :type func: callable
+
+        :returns: Whatever ``func`` returns
+        """
+        if not self.should_hedge(service_name, operation_name):
+            return func()
+
+        self.started(service_name, operation_name)
+        delay = self.hedge_delay(service_name, operation_name)
+
+        if delay is None:
+            # Still learning what's normal for this operation.
+            return self._timed(service_name, operation_name, func)
+
+        # The requests run on other threads, so take the deadline along.
+        func = carry_deadline(func)
+        executor = self.get_executor()
+        started = threading.Event()
+
+        def send_primary():
+            started.set()
+            return self._timed(service_name, operation_name, func)
+
+        primary = executor.submit(send_primary)
+        started.wait()
+        done, not_done = wait([primary], timeout=delay)
+
+        if done or not self.allow_hedge(service_name, operation_name):
+            return primary.result()
+
+        hedge = executor.submit(
+            self._timed,
+            service_name,
+            operation_name,
+            func
+        )
+        pending = set([primary, hedge])
+        first_error = None
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                if future.exception() is None:
+                    cancelled = False
+
+                    for other in pending:
+                        cancelled = other.cancel() or cancelled
+
+                    self.finished(
+                        service_name,
+                        operation_name,
+                        hedge_won=future is hedge,
+                        cancelled=cancelled
+                    )
+                    return future.result()
+
+                if first_error is None:
+                    first_error = future.exception()
+
+        self.finished(service_name, operation_name)
+        raise first_error
+
+    def size_for(self, max_workers):
+        """
+        Makes room in the thread pool for ``max_workers`` hedged calls at
+        once (two threads apiece). ``Session`` calls this with its own
+        ``max_workers``, so the pool keeps up with the session.
+
+        Does nothing if ``max_workers`` was given to the policy, or once the
+        pool has been created.
+
+        :param max_workers: The most concurrent calls to make room for.
+        :type max_workers: integer
+        """
+        with self._lock:
+            if self._fixed_size or self._executor is not None:
+                return
+
+            self.max_workers = max(self.max_workers or 0, max_workers * 2)
+
+    def get_executor(self):
+        """
+        Returns the thread pool hedged calls run on, creating it on first
+        use.
+
+        :rtype: <concurrent.futures.ThreadPoolExecutor> instance
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers or DEFAULT_MAX_WORKERS * 2
+                )
+
+            return self._executor
+
+    def close(self):
+        """
+        Shuts down the thread pool (if one was created).
+
+        Safe to call more than once. A fresh pool is created on demand.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def stats(self):
+        """
+        Returns the stats per service, then per operation: ``calls``,
+        ``hedged``, ``denied`` (by ``max_ratio``), ``hedge_wins``,
+        ``cancelled`` (losing requests that never went out) & the current
+        ``hedge_delay``.
+
+        :rtype: dict
+        """
+        with self._lock:
+            stats = dict([
+                (key, dict(values)) for key, values in self._stats.items()
+            ])
+
+        results = {}
+
+        for (service_name, operation_name), values in stats.items():
+            values['hedge_delay'] = self.hedge_delay(
+                service_name,
+                operation_name
+            )
+            results.setdefault(service_name, {})[operation_name] = values
+
+        return results
+
+    def _timed(self, service_name, operation_name, func):
+        start = time.time()
+        result = func()
+        self.record(service_name, operation_name, time.time() - start)
+        return result
+
+    def _stats_for(self, service_name, operation_name):
+        # Called with the lock held.
+        key = (service_name, operation_name)
+
+        if key not in self._stats:
+            self._stats[key] = {
+                'calls': 0,
+                'hedged': 0,
+                'denied': 0,
+                'hedge_wins': 0,
+                'cancelled': 0,
+            }
+
+        return self._stats[key]
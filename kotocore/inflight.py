@@ -0,0 +1,350 @@
+"""
+Caps on in-flight calls per endpoint (service & region), so a session stays
+within connection pool sizes & doesn't swamp small control-plane services.
+"""
+import collections
+import contextlib
+import threading
+import time
+
+from kotocore.deadlines import bound_timeout, current_deadline
+from kotocore.exceptions import ConcurrencyLimitTimeout
+from kotocore.utils.constants import NOTHING_PROVIDED
+
+
+class _Waiter(object):
+    # A caller queued for a slot. ``notify`` is called (with the lock held)
+    # once the slot is theirs, & returns ``False`` if they've gone away.
+    def __init__(self, notify):
+        self.notify = notify
+        self.granted = False
+        self.queued_at = time.time()
+
+
+class EndpointSemaphore(object):
+    """
+    Lets at most ``limit`` calls run at once, handing slots to waiting
+    callers in arrival order.
+
+    Blocking callers use ``acquire``. Others (like ``asyncio`` code) use
+    ``request`` with a callback.
+    """
+    def __init__(self, limit):
+        if limit < 1:
+            raise ValueError("'limit' must be at least 1.")
+
+        self.limit = limit
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        self._waiters = collections.deque()
+        self._stats = {
+            'acquired': 0,
+            'waited': 0,
+            'timeouts': 0,
+            'wait_total': 0.0,
+            'wait_max': 0.0,
+            'max_in_flight': 0,
+        }
+
+    def request(self, notify):
+        """
+        Takes a slot if one is free, or queues for one.
+
+        :param notify: Called (from whichever thread releases the slot) once
+            the slot is handed over. Returns ``False`` if the caller no
+            longer wants it.
+        :type notify: callable
+
+        :returns: ``None`` if a slot was taken straight away, otherwise the
+            queued waiter (to pass to ``cancel``)
+        """
+        with self._lock:
+            if self.in_flight < self.limit and not self._waiters:
+                self.in_flight += 1
+                self._record(0.0)
+                return None
+
+            waiter = _Waiter(notify)
+            self._waiters.append(waiter)
+            return waiter
+
+    def cancel(self, waiter):
+        """
+        Gives up on a queued request.
+
+        :returns: ``True`` if it was cancelled, or ``False`` if the slot had
+            already been handed over (so the caller now holds it)
+        :rtype: boolean
+        """
+        with self._lock:
+            if waiter.granted:
+                return False
+
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+            self._stats['timeouts'] += 1
+            return True
+
+    def acquire(self, timeout=None):
+        """
+        Blocks until a slot is free.
+
+        :param timeout: (Optional) The most seconds to wait. Default is
+            ``None`` (wait forever).
+        :type timeout: float
+
+        :returns: How long (in seconds) the caller waited
+        :rtype: float
+        """
+        start = time.time()
+        event = threading.Event()
+
+        def notify():
+            event.set()
+            return True
+
+        waiter = self.request(notify)
+
+        if waiter is None:
+            return 0.0
+
+        if not event.wait(timeout) and self.cancel(waiter):
+            raise ConcurrencyLimitTimeout(
+                "Timed out after {0}s waiting for one of {1} slots.".format(
+                    timeout,
+                    self.limit
+                )
+            )
+
+        return time.time() - start
+
+    def release(self):
+        """
+        Frees a slot, handing it to the next waiter (if any).
+        """
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+
+                if waiter.notify():
+                    waiter.granted = True
+                    self._record(time.time() - waiter.queued_at)
+                    return
+
+            self.in_flight -= 1
+
+    def stats(self):
+        """
+        Returns the semaphore's ``limit``, current ``in_flight`` & ``queued``
+        counts, plus the lifetime ``acquired``, ``waited``, ``timeouts``
+        (including cancelled waits), ``wait_total``, ``wait_max`` &
+        ``max_in_flight``.
+
+        ``saturation`` is the share of acquisitions that had to wait.
+
+        :rtype: dict
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['limit'] = self.limit
+            stats['in_flight'] = self.in_flight
+            stats['queued'] = len(self._waiters)
+
+        stats['saturation'] = 0.0
+
+        if stats['acquired']:
+            stats['saturation'] = float(stats['waited']) / stats['acquired']
+
+        return stats
+
+    def _record(self, wait):
+        # Called with the lock held.
+        stats = self._stats
+        stats['acquired'] += 1
+        stats['max_in_flight'] = max(stats['max_in_flight'], self.in_flight)
+
+        if wait > 0:
+            stats['waited'] += 1
+            stats['wait_total'] += wait
+            stats['wait_max'] = max(stats['wait_max'], wait)
+
+
+class ConcurrencyLimiter(object):
+    """
+    Holds the in-flight limits for a session.
+
+    Limits are keyed by service name or ``(service_name, operation_name)``
+    & apply separately to each endpoint (region). A call holds a slot from
+    every limit that matches it, for as long as the request takes.
+
+    Usage::
+
+        >>> limiter = ConcurrencyLimiter({
+        ...     'support': 2,
+        ...     'elasticache': 4,
+        ...     ('dynamodb', 'create_table'): 1,
+        ... }, default=50, timeout=30)
+        >>> session = Session(concurrency_limiter=limiter)
+        >>> limiter.stats()[('support', 'us-east-1', None)]['saturation']
+        0.25
+    """
+    semaphore_class = EndpointSemaphore
+
+    def __init__(self, limits=None, default=None, timeout=None):
+        """
+        Creates a new ``ConcurrencyLimiter`` instance.
+
+        :param limits: (Optional) Maps service names or ``(service_name,
+            operation_name)`` tuples to the most calls in flight per endpoint.
+        :type limits: dict
+
+        :param default: (Optional) The limit for services not listed in
+            ``limits``. Default is ``None`` (no limit).
+        :type default: integer
+
+        :param timeout: (Optional) The most seconds a call waits for a slot
+            before ``ConcurrencyLimitTimeout`` is raised. Default is ``None``
+            (wait forever).
+        :type timeout: float
+        """
+        self.limits = {}
+        self.default = default
+        self.timeout = timeout
+        self.semaphores = {}
+        self._lock = threading.Lock()
+
+        for key, limit in (limits or {}).items():
+            if not isinstance(key, (tuple, list)):
+                key = (key, None)
+
+            if limit < 1:
+                raise ValueError("Limits must be at least 1.")
+
+            self.limits[tuple(key)] = limit
+
+    def semaphores_for(self, service_name, region_name, operation_name):
+        """
+        Returns the semaphores a call must hold, in the order to take them
+        (service-wide first).
+
+        :rtype: list
+        """
+        found = []
+        service_limit = self.limits.get((service_name, None), self.default)
+        op_limit = self.limits.get((service_name, operation_name))
+
+        for key, limit in (
+            ((service_name, region_name, None), service_limit),
+            ((service_name, region_name, operation_name), op_limit),
+        ):
+            if limit is None:
+                continue
+
+            semaphore = self.semaphores.get(key)
+
+            if semaphore is None:
+                with self._lock:
+                    semaphore = self.semaphores.setdefault(
+                        key,
+                        self.semaphore_class(limit)
+                    )
+
+            found.append(semaphore)
+
+        return found
+
+    def acquire(self, service_name, region_name, operation_name,
+                timeout=NOTHING_PROVIDED):
+        """
+        Blocks until the call holds a slot from every matching limit.
+
+        If a deadline is in effect (see ``kotocore.deadlines``) & passes
+        before the timeout, ``DeadlineExceeded`` is raised instead.
+
+        :param timeout: (Optional) Overrides the limiter's ``timeout`` for
+            this call. The timeout covers all the slots together.
+        :type timeout: float
+
+        :returns: The semaphores held, to pass to ``release``
+        :rtype: list
+        """
+        if timeout is NOTHING_PROVIDED:
+            timeout = self.timeout
+
+        timeout, by_deadline = bound_timeout(timeout)
+        deadline = None
+
+        if timeout is not None:
+            deadline = time.time() + timeout
+
+        held = []
+
+        try:
+            for semaphore in self.semaphores_for(
+                service_name,
+                region_name,
+                operation_name
+            ):
+                remaining = None
+
+                if deadline is not None:
+                    remaining = max(0.0, deadline - time.time())
+
+                semaphore.acquire(timeout=remaining)
+                held.append(semaphore)
+        except ConcurrencyLimitTimeout:
+            self.release(held)
+
+            if by_deadline:
+                raise current_deadline().exceeded()
+
+            raise
+        except Exception:
+            self.release(held)
+            raise
+
+        return held
+
+    def release(self, held):
+        """
+        Frees the slots returned by ``acquire``.
+
+        :param held: The semaphores held.
+        :type held: list
+        """
+        for semaphore in reversed(held):
+            semaphore.release()
+
+    @contextlib.contextmanager
+    def limit(self, service_name, region_name, operation_name):
+        """
+        Holds the slots for a call for the duration of a ``with`` block.
+
+        Usage::
+
+            >>> with limiter.limit('support', 'us-east-1', 'describe_cases'):
+            ...     do_the_call()
+
+        """
+        held = self.acquire(service_name, region_name, operation_name)
+
+        try:
+            yield
+        finally:
+            self.release(held)
+
+    def stats(self):
+        """
+        Returns the stats (see ``EndpointSemaphore.stats``) per endpoint,
+        keyed by ``(service_name, region_name, operation_name)``, with
+        ``None`` as the operation for service-wide limits.
+
+        :rtype: dict
+        """
+        with self._lock:
+            semaphores = list(self.semaphores.items())
+
+        return dict([
+            (key, semaphore.stats()) for key, semaphore in semaphores
+        ])
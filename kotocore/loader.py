@@ -1,5 +1,6 @@
 import glob
 import os
+import threading
 
 from kotocore.utils.constants import DEFAULT_RESOURCE_JSON_DIR
 from kotocore.exceptions import NoResourceJSONFound
@@ -47,6 +48,7 @@ class ResourceJSONLoader(object):
         """
         self.data_dirs = data_dirs
         self._loaded_data = {}
+        self._lock = threading.Lock()
 
         if self.data_dirs is None:
             self.data_dirs = self.default_data_dirs
@@ -178,9 +180,26 @@ class ResourceJSONLoader(object):
         """
         # Fetch from the cache first if it's there.
         if cached:
-            if service_name in self._loaded_data:
-                if api_version in self._loaded_data[service_name]:
-                    return self._loaded_data[service_name][api_version]
+            # The cache is never changed in place (a new copy is swapped in
+            # instead), so reading it needs no lock.
+            versions = self._loaded_data.get(service_name, {})
+
+            if api_version in versions:
+                return versions[api_version]
+
+            # Load it under the lock, so concurrent callers share one copy.
+            with self._lock:
+                versions = self._loaded_data.get(service_name, {})
+
+                if api_version in versions:
+                    return versions[api_version]
+
+                data = self.load(service_name, api_version, cached=False)
+                loaded = dict(self._loaded_data)
+                loaded[service_name] = dict(versions)
+                loaded[service_name][api_version] = data
+                self._loaded_data = loaded
+                return data
 
         data = {}
         options = self.get_available_options(service_name)
@@ -196,10 +215,6 @@ class ResourceJSONLoader(object):
             data['__file__'] = match
             data['api_version'] = version
 
-        if cached:
-            self._loaded_data.setdefault(service_name, {})
-            self._loaded_data[service_name][api_version] = data
-
         return data
 
     def __contains__(self, service_name):
@@ -0,0 +1,606 @@
+"""
+Composable, backpressured stages for streaming work through ``kotocore``.
+
+Each stage runs in its own thread & hands items to the next through a
+bounded queue. A slow stage fills its inbound queue, which blocks the stage
+before it, so memory stays bounded no matter how big the source is.
+"""
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from kotocore.adaptive import AdaptiveLimit, check_workers
+from kotocore.exceptions import PipelineError
+from kotocore.utils import six
+from kotocore.utils.concurrency import map_calls
+
+
+DEFAULT_QUEUE_SIZE = 100
+
+# How often (in seconds) blocked stages check whether the pipeline stopped.
+POLL_INTERVAL = 0.05
+
+# Marks the end of the stream.
+_DONE = object()
+
+
+class _Stopped(Exception):
+    pass
+
+
+class StageQueue(object):
+    """
+    A bounded queue between two stages, which tracks its occupancy.
+    """
+    def __init__(self, maxsize, stop_event):
+        self.maxsize = maxsize
+        self.stop_event = stop_event
+        self._queue = six.moves.queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self.max_depth = 0
+        self._depth_total = 0
+        self._samples = 0
+
+    def put(self, item):
+        while True:
+            if self.stop_event.is_set():
+                raise _Stopped()
+
+            try:
+                self._queue.put(item, timeout=POLL_INTERVAL)
+                break
+            except six.moves.queue.Full:
+                continue
+
+        depth = self._queue.qsize()
+
+        with self._lock:
+            self.max_depth = max(self.max_depth, depth)
+            self._depth_total += depth
+            self._samples += 1
+
+    def get(self, timeout=None):
+        """
+        Returns the next item, or raises ``queue.Empty`` if ``timeout``
+        (in seconds) passes first.
+        """
+        if timeout is not None:
+            deadline = time.time() + timeout
+
+        while True:
+            if self.stop_event.is_set():
+                raise _Stopped()
+
+            wait = POLL_INTERVAL
+
+            if timeout is not None:
+                wait = min(wait, deadline - time.time())
+
+                if wait <= 0:
+                    raise six.moves.queue.Empty()
+
+            try:
+                return self._queue.get(timeout=wait)
+            except six.moves.queue.Empty:
+                continue
+
+    def __iter__(self):
+        while True:
+            item = self.get()
+
+            if item is _DONE:
+                return
+
+            yield item
+
+    def stats(self):
+        with self._lock:
+            mean = 0.0
+
+            if self._samples:
+                mean = float(self._depth_total) / self._samples
+
+            return {
+                'size': self.maxsize,
+                'depth': self._queue.qsize(),
+                'max_depth': self.max_depth,
+                'mean_depth': mean,
+            }
+
+
+class Stage(object):
+    """
+    A common base class for pipeline stages.
+
+    Subclasses implement ``process``, reading from ``inbox`` (``None`` for a
+    source) & calling ``emit`` for each outbound item.
+    """
+    kind = 'stage'
+
+    def __init__(self, name=None):
+        self.name = name
+        self.items_in = 0
+        self.items_out = 0
+        self.started_at = None
+        self.finished_at = None
+        self.inbox = None
+        self.outbox = None
+        self.executor = None
+
+    def __repr__(self):
+        return '<{0}: {1}>'.format(self.__class__.__name__, self.name)
+
+    def received(self):
+        # Counts items as they're pulled from the inbox.
+        for item in self.inbox:
+            self.items_in += 1
+            yield item
+
+    def emit(self, item):
+        self.outbox.put(item)
+        self.items_out += 1
+
+    def process(self):
+        raise NotImplementedError(
+            "Subclasses of 'Stage' must implement 'process'."
+        )
+
+    def run(self):
+        self.started_at = time.time()
+
+        try:
+            self.process()
+
+            if self.outbox is not None:
+                self.outbox.put(_DONE)
+        finally:
+            self.finished_at = time.time()
+
+    def stats(self):
+        """
+        Returns the stage's counts, timing & throughput (outbound items per
+        second).
+
+        :rtype: dict
+        """
+        elapsed = 0.0
+
+        if self.started_at is not None:
+            elapsed = (self.finished_at or time.time()) - self.started_at
+
+        throughput = 0.0
+
+        if elapsed:
+            throughput = self.items_out / elapsed
+
+        return {
+            'kind': self.kind,
+            'items_in': self.items_in,
+            'items_out': self.items_out,
+            'elapsed': elapsed,
+            'throughput': throughput,
+        }
+
+
+class SourceStage(Stage):
+    kind = 'source'
+
+    def __init__(self, source, name=None):
+        super(SourceStage, self).__init__(name=name)
+        self.source = source
+
+    def process(self):
+        for item in self.source:
+            self.emit(item)
+
+
+class _CallingStage(Stage):
+    # Shared by the stages that call something per item.
+    def __init__(self, func, workers=1, param=None, ordered=False,
+                 name=None):
+        super(_CallingStage, self).__init__(name=name)
+
+        check_workers(workers, name='workers')
+
+        self.func = func
+        self.workers = workers
+        self.param = param
+        self.ordered = ordered
+
+    def call(self, item):
+        if self.param is not None:
+            return self.func(**{self.param: item})
+
+        return self.func(item)
+
+    def results(self):
+        if self.workers == 1:
+            for item in self.received():
+                yield self.call(item)
+
+            return
+
+        def call(item):
+            return self.call(item)
+
+        # Lets priority-aware executors classify the calls as the real thing.
+        call.__wrapped__ = self.func
+        results = map_calls(
+            self.executor,
+            call,
+            ({'item': item} for item in self.received()),
+            self.workers,
+            ordered=self.ordered,
+            catch=()
+        )
+
+        try:
+            for result in results:
+                yield result
+        finally:
+            results.close()
+
+
+class MapStage(_CallingStage):
+    kind = 'map'
+
+    def process(self):
+        for result in self.results():
+            self.emit(result)
+
+
+class SinkStage(_CallingStage):
+    kind = 'sink'
+
+    def process(self):
+        for result in self.results():
+            self.items_out += 1
+
+
+class FilterStage(Stage):
+    kind = 'filter'
+
+    def __init__(self, predicate, name=None):
+        super(FilterStage, self).__init__(name=name)
+        self.predicate = predicate
+
+    def process(self):
+        for item in self.received():
+            if self.predicate(item):
+                self.emit(item)
+
+
+class BatchStage(Stage):
+    kind = 'batch'
+
+    def __init__(self, count=None, max_bytes=None, size_of=len,
+                 interval=None, name=None):
+        super(BatchStage, self).__init__(name=name)
+
+        if count is None and max_bytes is None and interval is None:
+            raise ValueError(
+                "At least one of 'count', 'max_bytes' or 'interval' is "
+                "required."
+            )
+
+        self.count = count
+        self.max_bytes = max_bytes
+        self.size_of = size_of
+        self.interval = interval
+
+    def process(self):
+        batch = []
+        batch_bytes = 0
+        flush_at = None
+
+        while True:
+            timeout = None
+
+            if batch and flush_at is not None:
+                timeout = max(0, flush_at - time.time())
+
+            try:
+                item = self.inbox.get(timeout=timeout)
+            except six.moves.queue.Empty:
+                # Time's up for the partial batch.
+                self.emit(batch)
+                batch, batch_bytes, flush_at = [], 0, None
+                continue
+
+            if item is _DONE:
+                break
+
+            self.items_in += 1
+            size = 0
+
+            if self.max_bytes is not None:
+                size = self.size_of(item)
+
+                # Would overflow, so send what we have first.
+                if batch and batch_bytes + size > self.max_bytes:
+                    self.emit(batch)
+                    batch, batch_bytes, flush_at = [], 0, None
+
+            if not batch and self.interval is not None:
+                flush_at = time.time() + self.interval
+
+            batch.append(item)
+            batch_bytes += size
+
+            if self.count is not None and len(batch) >= self.count:
+                self.emit(batch)
+                batch, batch_bytes, flush_at = [], 0, None
+
+        if batch:
+            self.emit(batch)
+
+
+class Pipeline(object):
+    """
+    Streams items from a source through a series of stages.
+
+    Usage::
+
+        >>> pipe = Pipeline(executor=session.get_executor())
+        >>> pipe.source(bucket.objects)
+        >>> pipe.map(lambda obj: obj.get(), workers=16)
+        >>> pipe.filter(lambda obj: obj.content_type == 'text/csv')
+        >>> pipe.batch(count=25, interval=1.0)
+        >>> pipe.sink(table.batch_write, param='items')
+        >>> pipe.run()
+        >>> pipe.stats()['map-1']['throughput']
+        312.5
+
+    Every stage method returns the pipeline, so they can also be chained.
+    """
+    def __init__(self, executor=None, queue_size=DEFAULT_QUEUE_SIZE):
+        """
+        Creates a new ``Pipeline`` instance.
+
+        :param executor: (Optional) The executor for stages with more than
+            one worker. By default, a private pool is created for each run.
+        :type executor: <concurrent.futures.Executor> instance
+
+        :param queue_size: (Optional) The most items to hold between any two
+            stages. Default is ``kotocore.pipeline.DEFAULT_QUEUE_SIZE``.
+        :type queue_size: integer
+        """
+        if queue_size < 1:
+            raise ValueError("'queue_size' must be at least 1.")
+
+        self.executor = executor
+        self.queue_size = queue_size
+        self.stages = []
+        self.queues = []
+
+    def add(self, stage):
+        """
+        Appends a stage, naming it ``<kind>-<position>`` if it has no name.
+
+        :param stage: The stage to add.
+        :type stage: <kotocore.pipeline.Stage> instance
+
+        :returns: The pipeline
+        """
+        if not self.stages and not isinstance(stage, SourceStage):
+            raise ValueError('The first stage must be a source.')
+
+        if self.stages and isinstance(stage, SourceStage):
+            raise ValueError('A pipeline can only have one source.')
+
+        if self.stages and isinstance(self.stages[-1], SinkStage):
+            raise ValueError('No stages can follow a sink.')
+
+        if stage.name is None:
+            stage.name = '{0}-{1}'.format(stage.kind, len(self.stages))
+
+        if stage.name in [existing.name for existing in self.stages]:
+            raise ValueError(
+                "A stage named '{0}' already exists.".format(stage.name)
+            )
+
+        self.stages.append(stage)
+        return self
+
+    def source(self, source, name=None):
+        """
+        Starts the pipeline with the items from an iterable (Ex. a
+        ``Collection`` or a generator).
+
+        :returns: The pipeline
+        """
+        return self.add(SourceStage(source, name=name))
+
+    def map(self, func, workers=1, param=None, ordered=False, name=None):
+        """
+        Replaces each item with ``func(item)``.
+
+        :param func: The callable to run.
+        :type func: callable
+
+        :param workers: (Optional) The most calls to have in flight at once,
+            or an ``AdaptiveLimit`` to size that by. Default is ``1``.
+        :type workers: integer or <kotocore.adaptive.AdaptiveLimit> instance
+
+        :param param: (Optional) Passes the item as this keyword argument
+            instead (Ex. ``param='key'`` calls ``func(key=item)``), which
+            suits ``Connection`` & ``Resource`` methods.
+        :type param: string
+
+        :param ordered: (Optional) Whether to keep the input order with
+            several workers. Default is ``False``.
+        :type ordered: boolean
+
+        :returns: The pipeline
+        """
+        return self.add(MapStage(
+            func,
+            workers=workers,
+            param=param,
+            ordered=ordered,
+            name=name
+        ))
+
+    def filter(self, predicate, name=None):
+        """
+        Keeps only the items where ``predicate(item)`` is true.
+
+        :returns: The pipeline
+        """
+        return self.add(FilterStage(predicate, name=name))
+
+    def batch(self, count=None, max_bytes=None, size_of=len, interval=None,
+              name=None):
+        """
+        Groups items into lists, sent on when any limit is reached.
+
+        :param count: (Optional) The most items per batch.
+        :type count: integer
+
+        :param max_bytes: (Optional) The most bytes per batch, as measured by
+            ``size_of``.
+        :type max_bytes: integer
+
+        :param size_of: (Optional) Returns the size of an item in bytes.
+            Default is ``len``.
+        :type size_of: callable
+
+        :param interval: (Optional) The most seconds to hold a partial batch.
+        :type interval: float
+
+        :returns: The pipeline
+        """
+        return self.add(BatchStage(
+            count=count,
+            max_bytes=max_bytes,
+            size_of=size_of,
+            interval=interval,
+            name=name
+        ))
+
+    def sink(self, func, workers=1, param=None, name=None):
+        """
+        Ends the pipeline by calling ``func(item)`` on each item (Ex. a
+        ``Resource`` method).
+
+        Takes the same ``workers`` & ``param`` options as ``map``.
+
+        :returns: The pipeline
+        """
+        return self.add(SinkStage(
+            func,
+            workers=workers,
+            param=param,
+            name=name
+        ))
+
+    def run(self):
+        """
+        Runs the pipeline until the source is exhausted & every item has
+        reached the sink.
+
+        If any stage fails, the whole pipeline is stopped & a
+        ``PipelineError`` is raised.
+
+        :returns: The stats (see ``stats``)
+        :rtype: dict
+        """
+        if not self.stages or not isinstance(self.stages[-1], SinkStage):
+            raise ValueError('The last stage must be a sink.')
+
+        stop_event = threading.Event()
+        errors = []
+        executor = self.executor
+        own_executor = None
+
+        if executor is None:
+            workers = 0
+
+            for stage in self.stages:
+                stage_workers = getattr(stage, 'workers', 0)
+
+                if isinstance(stage_workers, AdaptiveLimit):
+                    # Leave room for the limit to grow.
+                    stage_workers = stage_workers.maximum
+
+                workers += stage_workers
+
+            executor = own_executor = ThreadPoolExecutor(
+                max_workers=max(1, workers)
+            )
+
+        self.queues = [
+            StageQueue(self.queue_size, stop_event)
+            for i in range(len(self.stages) - 1)
+        ]
+
+        for offset, stage in enumerate(self.stages):
+            stage.executor = executor
+            stage.inbox = None
+            stage.outbox = None
+
+            if offset > 0:
+                stage.inbox = self.queues[offset - 1]
+
+            if offset < len(self.queues):
+                stage.outbox = self.queues[offset]
+
+        def run_stage(stage):
+            try:
+                stage.run()
+            except _Stopped:
+                pass
+            except Exception as err:
+                errors.append((stage.name, err))
+                stop_event.set()
+
+        threads = [
+            threading.Thread(target=run_stage, args=(stage,))
+            for stage in self.stages
+        ]
+
+        try:
+            for thread in threads:
+                thread.daemon = True
+                thread.start()
+
+            for thread in threads:
+                thread.join()
+        finally:
+            stop_event.set()
+
+            if own_executor is not None:
+                own_executor.shutdown(wait=True)
+
+        if errors:
+            msg = "{0} stage(s) of the pipeline failed: {1}".format(
+                len(errors),
+                '; '.join([
+                    '{0} -> {1!r}'.format(name, err) for name, err in errors
+                ])
+            )
+            raise PipelineError(msg, errors=errors, stats=self.stats())
+
+        return self.stats()
+
+    def stats(self):
+        """
+        Returns metrics per stage, keyed by stage name.
+
+        Each has the stage's ``kind``, ``items_in``, ``items_out``,
+        ``elapsed`` (seconds) & ``throughput`` (items out per second). All
+        but the sink also have an ``outbox`` with the occupancy of the queue
+        after them (``size``, ``depth``, ``max_depth`` & ``mean_depth``).
+
+        :rtype: dict
+        """
+        stats = {}
+
+        for offset, stage in enumerate(self.stages):
+            stats[stage.name] = stage.stats()
+
+            if offset < len(self.queues):
+                stats[stage.name]['outbox'] = self.queues[offset].stats()
+
+        return stats
@@ -0,0 +1,419 @@
+"""
+Client-side rate limits, so calls are paced under the service's limits rather
+than bursting into throttling.
+"""
+import mmap
+import os
+import re
+import struct
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from kotocore.deadlines import sleep_within
+
+
+class TokenBucket(object):
+    """
+    Paces calls at a steady ``rate`` per second, allowing short bursts of up
+    to ``burst`` calls.
+
+    Callers reserve tokens up front & are told how long to wait, so waiting
+    callers are spread out evenly (in arrival order) instead of all waking up
+    at once.
+    """
+    def __init__(self, rate, burst=1, clock=time.time):
+        """
+        Creates a new ``TokenBucket`` instance.
+
+        :param rate: How many tokens are added per second.
+        :type rate: float
+
+        :param burst: (Optional) The most tokens the bucket holds. Default is
+            ``1``, for strictly even pacing.
+        :type burst: float
+
+        :param clock: (Optional) Returns the current time in seconds. Default
+            is ``time.time``.
+        :type clock: callable
+        """
+        if rate <= 0:
+            raise ValueError("'rate' must be positive.")
+
+        if burst < 1:
+            raise ValueError("'burst' must be at least 1.")
+
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.clock = clock
+        self.tokens = self.burst
+        self.updated_at = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=1):
+        """
+        Takes tokens from the bucket, going into debt if need be.
+
+        :param tokens: (Optional) How many tokens to take. Default is ``1``.
+        :type tokens: float
+
+        :returns: How long (in seconds) the caller must wait before going
+            ahead
+        :rtype: float
+        """
+        with self._lock:
+            now = self.clock()
+            elapsed = max(0.0, now - self.updated_at)
+            self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+            self.updated_at = now
+            self.tokens -= tokens
+
+            if self.tokens >= 0:
+                return 0.0
+
+            return -self.tokens / self.rate
+
+
+class RateLimiter(object):
+    """
+    Holds the token buckets for a session & matches calls to them.
+
+    Limits are keyed by service name, ``(service_name, region_name)`` or
+    ``(service_name, region_name, operation_name)``, where ``None`` for the
+    region matches every region. Each key gets one bucket, shared by every
+    call it matches. A call waits for all the buckets that match it.
+
+    Usage::
+
+        >>> limiter = RateLimiter({
+        ...     # All of IAM, across regions.
+        ...     'iam': 5,
+        ...     # SES sending in one region, allowing bursts of 10.
+        ...     ('ses', 'us-east-1', 'send_email'): (14, 10),
+        ...     # Table creation in any region.
+        ...     ('dynamodb', None, 'create_table'): 0.5,
+        ... })
+        >>> session = Session(rate_limiter=limiter)
+        >>> limiter.stats()[('iam', None, None)]['wait_total']
+        1.8
+    """
+    bucket_class = TokenBucket
+
+    def __init__(self, limits=None, sleep=time.sleep):
+        """
+        Creates a new ``RateLimiter`` instance.
+
+        :param limits: (Optional) Maps keys (see above) to a rate per second
+            or a ``(rate, burst)`` tuple.
+        :type limits: dict
+
+        :param sleep: (Optional) Waits for the blocking ``acquire``. Default
+            is ``time.sleep``.
+        :type sleep: callable
+        """
+        self.sleep = sleep
+        self.buckets = {}
+        self._lock = threading.Lock()
+        self._stats = {}
+
+        for key, limit in (limits or {}).items():
+            self.set_limit(key, limit)
+
+    def set_limit(self, key, limit):
+        """
+        Adds (or replaces) a limit.
+
+        :param key: A service name, ``(service_name, region_name)`` or
+            ``(service_name, region_name, operation_name)``.
+        :type key: string or tuple
+
+        :param limit: A rate per second or a ``(rate, burst)`` tuple.
+        :type limit: float or tuple
+        """
+        key = self.normalize_key(key)
+
+        if isinstance(limit, (tuple, list)):
+            bucket = self.build_bucket(key, limit[0], burst=limit[1])
+        else:
+            bucket = self.build_bucket(key, limit)
+
+        with self._lock:
+            self.buckets[key] = bucket
+            self._stats[key] = {
+                'rate': bucket.rate,
+                'acquired': 0,
+                'waited': 0,
+                'wait_total': 0.0,
+                'wait_max': 0.0,
+            }
+
+    def build_bucket(self, key, rate, burst=1):
+        """
+        Creates the bucket for a limit.
+
+        :param key: The normalized key for the limit.
+        :type key: tuple
+
+        :rtype: <kotocore.ratelimit.TokenBucket> instance
+        """
+        return self.bucket_class(rate, burst=burst)
+
+    def normalize_key(self, key):
+        if not isinstance(key, (tuple, list)):
+            key = (key,)
+
+        key = tuple(key) + (None,) * (3 - len(key))
+
+        if len(key) != 3:
+            msg = "Rate limit keys have at most 3 parts, not {0!r}."
+            raise ValueError(msg.format(key))
+
+        return key
+
+    def matching(self, service_name, region_name, operation_name):
+        """
+        Returns the keys of every bucket that applies to a call.
+
+        :rtype: list
+        """
+        matches = []
+
+        for key in self.buckets:
+            for wanted, actual in zip(key, (service_name, region_name,
+                                            operation_name)):
+                if wanted is not None and wanted != actual:
+                    break
+            else:
+                matches.append(key)
+
+        return matches
+
+    def reserve(self, service_name, region_name, operation_name):
+        """
+        Reserves a token from every matching bucket, without waiting.
+
+        :returns: How long (in seconds) the call must wait before going ahead
+        :rtype: float
+        """
+        waits = []
+
+        for key in self.matching(service_name, region_name, operation_name):
+            waits.append((key, self.buckets[key].reserve()))
+
+        delay = max([wait for key, wait in waits] or [0.0])
+
+        with self._lock:
+            for key, wait in waits:
+                stats = self._stats[key]
+                stats['acquired'] += 1
+
+                if wait > 0:
+                    stats['waited'] += 1
+                    stats['wait_total'] += wait
+                    stats['wait_max'] = max(stats['wait_max'], wait)
+
+        return delay
+
+    def acquire(self, service_name, region_name, operation_name):
+        """
+        Blocks until the call may go ahead.
+
+        With ``asyncio``, use ``await asyncio.sleep(limiter.reserve(...))``
+        instead.
+
+        If a deadline is in effect (see ``kotocore.deadlines``) & the wait
+        would run past it, ``DeadlineExceeded`` is raised instead.
+
+        :returns: How long (in seconds) the call waited
+        :rtype: float
+        """
+        delay = self.reserve(service_name, region_name, operation_name)
+
+        if delay > 0:
+            sleep_within(delay, sleep=self.sleep)
+
+        return delay
+
+    def stats(self):
+        """
+        Returns the waiting per limit, keyed by the normalized
+        ``(service_name, region_name, operation_name)`` key.
+
+        Each has the ``rate``, how many calls ``acquired`` a token, how many
+        of those ``waited``, plus ``wait_total`` & ``wait_max`` (in seconds).
+
+        :rtype: dict
+        """
+        with self._lock:
+            return dict([
+                (key, dict(stats)) for key, stats in self._stats.items()
+            ])
+
+
+class SharedTokenBucket(TokenBucket):
+    """
+    A ``TokenBucket`` whose state lives in a memory-mapped file, so every
+    process on the host using the same ``path`` draws from the one bucket.
+
+    Updates are serialized with an exclusive ``flock`` on the file. Every
+    process should use the same ``rate`` & ``burst`` for a given path.
+
+    Requires ``fcntl`` (i.e. not Windows).
+    """
+    # The tokens left & when they were last topped up.
+    state_format = 'dd'
+    state_size = struct.calcsize(state_format)
+
+    def __init__(self, rate, burst=1, path=None, clock=time.time):
+        """
+        Creates a new ``SharedTokenBucket`` instance.
+
+        :param path: The file holding the bucket's state. Created if it
+            doesn't exist.
+        :type path: string
+
+        See ``TokenBucket`` for the other parameters.
+        """
+        if fcntl is None:
+            raise RuntimeError(
+                "'SharedTokenBucket' requires 'fcntl', which isn't "
+                "available on this platform."
+            )
+
+        if path is None:
+            raise ValueError("'path' is required.")
+
+        super(SharedTokenBucket, self).__init__(rate, burst=burst, clock=clock)
+        self.path = path
+        self._pid = None
+        self._fd = None
+        self._map = None
+        self._open()
+
+    def _open(self):
+        # A forked child shares the parent's open file, & with it the
+        # ``flock``, so each process needs its own.
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+
+        try:
+            if os.fstat(self._fd).st_size < self.state_size:
+                # First one here, so start with a full bucket.
+                os.write(self._fd, struct.pack(
+                    self.state_format,
+                    self.burst,
+                    self.clock()
+                ))
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+        self._map = mmap.mmap(self._fd, self.state_size)
+
+    def close(self):
+        """
+        Releases the file. The state stays on disk for other processes.
+        """
+        if self._map is not None:
+            self._map.close()
+            os.close(self._fd)
+            self._map = self._fd = None
+
+    def reserve(self, tokens=1):
+        if self._pid != os.getpid():
+            self._open()
+
+        # ``flock`` only excludes other processes, not our own threads.
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+
+            try:
+                available, updated_at = struct.unpack(
+                    self.state_format,
+                    self._map[:self.state_size]
+                )
+                now = self.clock()
+                elapsed = max(0.0, now - updated_at)
+                available = min(self.burst, available + elapsed * self.rate)
+                available -= tokens
+                self._map[:self.state_size] = struct.pack(
+                    self.state_format,
+                    available,
+                    max(now, updated_at)
+                )
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+        if available >= 0:
+            return 0.0
+
+        return -available / self.rate
+
+
+class SharedRateLimiter(RateLimiter):
+    """
+    A ``RateLimiter`` whose buckets are shared by every process on the host
+    (see ``SharedTokenBucket``), for when many worker processes call the same
+    account.
+
+    Usage::
+
+        >>> session = Session(rate_limiter=SharedRateLimiter({'iam': 5}))
+
+    Each process configures the same limits & finds the others' buckets by
+    key in ``directory``. ``stats`` only covers this process' calls.
+    """
+    bucket_class = SharedTokenBucket
+
+    def __init__(self, limits=None, sleep=time.sleep, directory=None):
+        """
+        Creates a new ``SharedRateLimiter`` instance.
+
+        :param directory: (Optional) Where the bucket files live. Default is
+            ``kotocore-ratelimit`` within the system's temporary directory.
+        :type directory: string
+
+        See ``RateLimiter`` for the other parameters.
+        """
+        if directory is None:
+            directory = os.path.join(
+                tempfile.gettempdir(),
+                'kotocore-ratelimit'
+            )
+
+        self.directory = directory
+
+        if not os.path.isdir(self.directory):
+            try:
+                os.makedirs(self.directory)
+            except OSError:
+                # Another process may have beaten us to it.
+                if not os.path.isdir(self.directory):
+                    raise
+
+        super(SharedRateLimiter, self).__init__(limits=limits, sleep=sleep)
+
+    def bucket_path(self, key):
+        """
+        Returns the file for a limit's bucket.
+
+        :param key: The normalized key for the limit.
+        :type key: tuple
+
+        :rtype: string
+        """
+        bits = [re.sub(r'[^A-Za-z0-9_-]', '_', bit or 'all') for bit in key]
+        return os.path.join(self.directory, '.'.join(bits) + '.bucket')
+
+    def build_bucket(self, key, rate, burst=1):
+        return self.bucket_class(
+            rate,
+            burst=burst,
+            path=self.bucket_path(key)
+        )
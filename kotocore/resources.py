@@ -1,9 +1,12 @@
+import threading
+
 from kotocore.utils.constants import DEFAULT_DOCSTRING
 from kotocore.exceptions import NoSuchMethod, NoRelation
 from kotocore.introspection import Introspection
 from kotocore.loader import ResourceJSONLoader
 from kotocore.utils.mangle import to_snake_case
 from kotocore.utils import six
+from kotocore.utils.pickling import BuiltClass
 
 
 class ResourceDetails(object):
@@ -15,6 +18,7 @@ class ResourceDetails(object):
     service_name = ''
     resource_name = ''
     session = None
+    docstrings_updated = False
 
     def __init__(self, session, service_name, resource_name, loader=None):
         """
@@ -43,6 +47,7 @@ class ResourceDetails(object):
         self.loader = loader
         self._api_version = None
         self._loaded_data = None
+        self._load_lock = threading.Lock()
 
     def __str__(self):
         return u'<{0}: {1} - {2}>'.format(
@@ -59,9 +64,14 @@ class ResourceDetails(object):
         A decorator to ensure the resource data is loaded.
         """
         def _wrapper(self, *args, **kwargs):
-            # If we don't have data, go load it.
+            # If we don't have data, go load it (once, even if several
+            # threads get here together).
             if self._loaded_data is None:
-                self._loaded_data = self.loader.load(self.service_name)
+                with self._load_lock:
+                    if self._loaded_data is None:
+                        self._loaded_data = self.loader.load(
+                            self.service_name
+                        )
 
             return func(self, *args, **kwargs)
 
@@ -111,7 +121,9 @@ class ResourceDetails(object):
         :returns: The service's version
         :rtype: string
         """
-        self._api_version = self._loaded_data.get('api_version', '')
+        if self._api_version is None:
+            self._api_version = self._loaded_data.get('api_version', '')
+
         return self._api_version
 
     @property
@@ -170,9 +182,14 @@ class ResourceDetails(object):
         return self.resource_data.get('relations', {})
 
 
+@six.add_metaclass(BuiltClass)
 class Resource(object):
     """
     A common base class for all the ``Resource`` objects.
+
+    Instances can be pickled. Only the instance data & the connection's
+    region are kept, with the class rebuilt by the default session on the
+    receiving side.
     """
     def __init__(self, connection=None, **kwargs):
         """
@@ -202,8 +219,11 @@ class Resource(object):
                 self._details.service_name
             )
 
-        # Now that we have a connection, we can update docstrings.
-        self._update_docstrings()
+        # Now that we have a connection, we can update docstrings. The
+        # methods live on the class, so this only needs doing once.
+        if not self._details.docstrings_updated:
+            self._update_docstrings()
+            self._details.docstrings_updated = True
 
     def __str__(self):
         return "{0}: {1} in {2}".format(
@@ -212,6 +232,18 @@ class Resource(object):
             self._connection.region_name
         )
 
+    def __reduce__(self):
+        return (_rebuild_resource, (
+            self.__class__,
+            self._connection,
+            self._data
+        ))
+
+    @classmethod
+    def _from_session(cls, session, service_name, name):
+        # Used when unpickling, to find the matching class in the session.
+        return session.get_resource(service_name, name, base_class=cls)
+
     def __getattr__(self, name):
         """
         Attempts to return either the related object or instance data for a
@@ -225,8 +257,9 @@ class Resource(object):
             # Check if we already have built version.
             if not name in self._relations:
                 # There's not a previously built object.
-                # Lazily build it & assign it here.
-                self._relations[name] = self.build_relation(name)
+                # Lazily build it & assign it here. If another thread beat
+                # us to it, theirs wins, so everyone sees the same object.
+                self._relations.setdefault(name, self.build_relation(name))
 
             return self._relations[name]
 
@@ -341,22 +374,7 @@ class Resource(object):
             # This is the typical case, where we're not explicitly given a
             # class to build with. Hit the session & look up what we should
             # be loading.
-            if rel_data['class_type'] == 'collection':
-                klass = self._details.session.get_collection(
-                    self._details.service_name,
-                    rel_data['class']
-                )
-            elif rel_data['class_type'] == 'resource':
-                klass = self._details.session.get_resource(
-                    self._details.service_name,
-                    rel_data['class']
-                )
-            else:
-                msg = "Unknown class '{0}' for '{1}'.".format(
-                    rel_data['class_type'],
-                    name
-                )
-                raise NoRelation(msg)
+            klass = self._get_relation_class(name, rel_data)
 
         # Instantiate & return it.
         kwargs = {}
@@ -371,6 +389,35 @@ class Resource(object):
 
         return klass(connection=self._connection, **kwargs)
 
+    def _get_relation_class(self, name, rel_data):
+        """
+        Looks up the class for a relation from the session.
+
+        :param name: The name of the relation from the ResourceJSON
+        :type name: string
+
+        :param rel_data: The relation's data from the ResourceJSON
+        :type rel_data: dict
+
+        :returns: A ``Resource`` or ``Collection`` subclass
+        """
+        if rel_data['class_type'] == 'collection':
+            return self._details.session.get_collection(
+                self._details.service_name,
+                rel_data['class']
+            )
+        elif rel_data['class_type'] == 'resource':
+            return self._details.session.get_resource(
+                self._details.service_name,
+                rel_data['class']
+            )
+
+        msg = "Unknown class '{0}' for '{1}'.".format(
+            rel_data['class_type'],
+            name
+        )
+        raise NoRelation(msg)
+
     def full_update_params(self, conn_method_name, params):
         """
         When a API method on the resource is called, this goes through the
@@ -519,6 +566,16 @@ class Resource(object):
         return result
 
 
+def _rebuild_resource(klass, connection, data):
+    # Skips ``__init__``, since the connection is already in hand & the
+    # docstrings are updated by the first regular instance.
+    resource = klass.__new__(klass)
+    resource._relations = {}
+    resource._data = data
+    resource._connection = connection
+    return resource
+
+
 class ResourceFactory(object):
     """
     Generates the underlying ``Resource`` classes based off the ``ResourceJSON``
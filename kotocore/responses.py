@@ -0,0 +1,405 @@
+"""
+A response cache for read-only operations, so repeated calls for data that
+rarely changes are answered locally.
+"""
+import collections
+import copy
+import sys
+import threading
+import time
+
+from kotocore.coalesce import canonical
+from kotocore.retries import IDEMPOTENT_PREFIXES
+
+
+# Parameters named like these identify the resource a call is about.
+IDENTIFIER_NAMES = frozenset([
+    'arn',
+    'bucket',
+    'id',
+    'key',
+    'name',
+])
+IDENTIFIER_SUFFIXES = (
+    '_arn',
+    '_arns',
+    '_id',
+    '_ids',
+    '_name',
+    '_names',
+    '_url',
+)
+
+
+def approximate_size(value):
+    """
+    Returns roughly how many bytes a parsed response takes up.
+
+    :rtype: integer
+    """
+    size = sys.getsizeof(value)
+
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += approximate_size(key) + approximate_size(item)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            size += approximate_size(item)
+
+    return size
+
+
+class ResponseCache(object):
+    """
+    Caches the responses of read-only operations, keyed by service, region,
+    operation, parameters & credentials.
+
+    Entries expire after their operation's TTL. The cache is bounded by the
+    number of entries & (roughly) their size, evicting the least recently
+    used first.
+
+    A call to any other (writing) operation invalidates the entries for the
+    same service & region that share one of its resource identifiers (Ex. a
+    ``queue_url`` or ``role_name``), plus any without identifiers, like
+    listings. A read that was already in flight when such a write finished
+    isn't cached (see ``generation``), as it may predate the write.
+
+    Responses that can't be copied (Ex. S3's streamed ``get_object``
+    bodies) are never cached.
+
+    By default, the read-only operations (``get_``, ``list_``,
+    ``describe_``, etc.) are cached. Pass ``operations`` to choose them
+    explicitly. Individual calls can skip the cache with ``_cache=False``.
+
+    Usage::
+
+        >>> cache = ResponseCache(
+        ...     ttl=60,
+        ...     ttls={
+        ...         ('sqs', 'get_queue_url'): 3600,
+        ...         'elasticache': 10,
+        ...     },
+        ...     max_entries=5000,
+        ...     max_bytes=50 * 1024 * 1024
+        ... )
+        >>> session = Session(response_cache=cache)
+        >>> cache.stats()['hits']
+        1294
+
+    """
+    def __init__(self, ttl=60.0, ttls=None, max_entries=1000, max_bytes=None,
+                 operations=None, clock=time.time):
+        """
+        Creates a new ``ResponseCache`` instance.
+
+        :param ttl: (Optional) How many seconds responses are kept for.
+            Default is ``60.0``.
+        :type ttl: float
+
+        :param ttls: (Optional) TTLs for particular services or operations,
+            keyed by service name or ``(service_name, operation_name)``. A
+            TTL of ``0`` stops those responses being cached. Default is
+            ``None``.
+        :type ttls: dict
+
+        :param max_entries: (Optional) The most responses kept. Default is
+            ``1000``.
+        :type max_entries: integer
+
+        :param max_bytes: (Optional) Roughly the most memory (in bytes) the
+            responses may take up. Default is ``None`` (no limit).
+        :type max_bytes: integer
+
+        :param operations: (Optional) The operation names to cache, keyed by
+            service name. Default is ``None`` (all read-only operations).
+        :type operations: dict
+
+        :param clock: (Optional) Returns the current time in seconds.
+            Default is ``time.time``.
+        :type clock: callable
+        """
+        if max_entries < 1:
+            raise ValueError("'max_entries' must be at least 1.")
+
+        self.ttl = ttl
+        self.ttls = dict(ttls or {})
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.operations = None
+        self.clock = clock
+
+        if operations is not None:
+            self.operations = dict([
+                (service_name, frozenset(names))
+                for service_name, names in operations.items()
+            ])
+
+        # Maps keys to ``(expires_at, size, identifiers, parsed)``, least
+        # recently used first.
+        self._entries = collections.OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'invalidations': 0,
+        }
+        self._operation_stats = {}
+        # Bumped per ``(service_name, region_name)`` by each invalidation.
+        self._generations = {}
+
+    def should_cache(self, service_name, operation_name):
+        """
+        Returns whether an operation is read-only (& so may be cached).
+
+        :rtype: boolean
+        """
+        if self.operations is None:
+            return operation_name.startswith(IDEMPOTENT_PREFIXES)
+
+        return operation_name in self.operations.get(service_name, ())
+
+    def ttl_for(self, service_name, operation_name):
+        """
+        Returns how many seconds an operation's responses are kept for.
+
+        :rtype: float
+        """
+        for key in ((service_name, operation_name), service_name):
+            if key in self.ttls:
+                return self.ttls[key]
+
+        return self.ttl
+
+    def key_for(self, service_name, region_name, operation_name, params,
+                identity=None):
+        """
+        Returns the key for a call's response, or ``None`` if it can't be
+        cached (Ex. its parameters aren't hashable).
+
+        :param params: The prepared parameters for the call.
+        :type params: dict
+
+        :param identity: (Optional) Identifies the credentials the call is
+            made with, such as the access key. Default is ``None``.
+        :type identity: string
+
+        :rtype: tuple
+        """
+        try:
+            params = canonical(params)
+        except TypeError:
+            return None
+
+        return (service_name, region_name, operation_name, params, identity)
+
+    def identifiers_for(self, params):
+        """
+        Returns the values of the parameters that identify resources (see
+        ``IDENTIFIER_NAMES`` & ``IDENTIFIER_SUFFIXES``).
+
+        :rtype: frozenset
+        """
+        identifiers = set()
+
+        for name, value in params.items():
+            if name not in IDENTIFIER_NAMES and \
+                    not name.endswith(IDENTIFIER_SUFFIXES):
+                continue
+
+            if not isinstance(value, (list, tuple, set, frozenset)):
+                value = [value]
+
+            for item in value:
+                try:
+                    hash(item)
+                except TypeError:
+                    continue
+
+                identifiers.add(item)
+
+        return frozenset(identifiers)
+
+    def get(self, key):
+        """
+        Returns a copy of the cached response for ``key``, or ``None``.
+
+        :rtype: dict
+        """
+        service_name, operation_name = key[0], key[2]
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and entry[0] <= self.clock():
+                self._discard(key)
+                self._stats['expirations'] += 1
+                entry = None
+
+            if entry is None:
+                self._count(service_name, operation_name, 'misses')
+                return None
+
+            # Now the most recently used.
+            self._entries[key] = self._entries.pop(key)
+            self._count(service_name, operation_name, 'hits')
+            parsed = entry[3]
+
+        return copy.deepcopy(parsed)
+
+    def generation(self, service_name, region_name):
+        """
+        Returns how many times the entries for ``service_name`` in
+        ``region_name`` have been invalidated.
+
+        Take it before sending a read & pass it to ``set``, so the response
+        is dropped if a write invalidated the cache in the meantime.
+
+        :rtype: integer
+        """
+        with self._lock:
+            return self._generations.get((service_name, region_name), 0)
+
+    def set(self, key, params, parsed, generation=None):
+        """
+        Caches a copy of a response, evicting others to make room if need
+        be.
+
+        Responses that can't be copied aren't cached (rather than raising).
+
+        :param params: The prepared parameters the call was made with.
+        :type params: dict
+
+        :param parsed: The parsed response.
+        :type parsed: dict
+
+        :param generation: (Optional) The ``generation`` taken before the
+            call was sent. If the entries have been invalidated since, the
+            response isn't cached. Default is ``None`` (always cached).
+        :type generation: integer
+        """
+        ttl = self.ttl_for(key[0], key[2])
+
+        if not ttl or ttl <= 0:
+            return
+
+        try:
+            parsed = copy.deepcopy(parsed)
+            size = approximate_size(parsed)
+        except Exception:
+            # Ex. a streamed body, which can only be read once.
+            return
+
+        if self.max_bytes is not None and size > self.max_bytes:
+            # Would push everything else out.
+            return
+
+        entry = (
+            self.clock() + ttl,
+            size,
+            self.identifiers_for(params),
+            parsed,
+        )
+
+        with self._lock:
+            current = self._generations.get((key[0], key[1]), 0)
+
+            if generation is not None and generation != current:
+                # Fetched before a write that may have changed it.
+                return
+
+            self._discard(key)
+            self._entries[key] = entry
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+                self._stats['evictions'] += 1
+
+    def invalidate(self, service_name, region_name, params):
+        """
+        Drops the entries a write to ``service_name`` in ``region_name`` may
+        have changed: those sharing a resource identifier with ``params``,
+        plus those without identifiers. If ``params`` has no identifiers,
+        every entry for the service & region is dropped.
+
+        :param params: The prepared parameters of the write.
+        :type params: dict
+
+        :returns: How many entries were dropped
+        :rtype: integer
+        """
+        identifiers = self.identifiers_for(params)
+        scope = (service_name, region_name)
+
+        with self._lock:
+            self._generations[scope] = self._generations.get(scope, 0) + 1
+            stale = []
+
+            for key, entry in self._entries.items():
+                if key[0] != service_name or key[1] != region_name:
+                    continue
+
+                if not identifiers or not entry[2] or \
+                        identifiers & entry[2]:
+                    stale.append(key)
+
+            for key in stale:
+                self._discard(key)
+
+            self._stats['invalidations'] += len(stale)
+            return len(stale)
+
+    def clear(self):
+        """
+        Drops every entry.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """
+        Returns the cache-wide ``hits``, ``misses``, ``evictions`` (to stay
+        within the bounds), ``expirations``, ``invalidations``, current
+        ``entries`` & approximate ``bytes``, plus the ``hits`` & ``misses``
+        per service, then per operation, under ``operations``.
+
+        :rtype: dict
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = self._bytes
+            operations = {}
+
+            for (service_name, operation_name), values in \
+                    self._operation_stats.items():
+                operations.setdefault(service_name, {})[operation_name] = (
+                    dict(values)
+                )
+
+        stats['operations'] = operations
+        return stats
+
+    def _discard(self, key):
+        # Called with the lock held.
+        entry = self._entries.pop(key, None)
+
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def _count(self, service_name, operation_name, outcome):
+        # Called with the lock held.
+        self._stats[outcome] += 1
+        key = (service_name, operation_name)
+
+        if key not in self._operation_stats:
+            self._operation_stats[key] = {'hits': 0, 'misses': 0}
+
+        self._operation_stats[key][outcome] += 1
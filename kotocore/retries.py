@@ -0,0 +1,404 @@
+"""
+Retries for failed calls, with exponential backoff, full jitter & a retry
+budget.
+"""
+import random
+import threading
+import time
+
+from kotocore.deadlines import sleep_within
+from kotocore.exceptions import ServerError
+
+
+# The service rejected the request without acting on it, so retrying is safe
+# for any operation.
+THROTTLING_CODES = frozenset([
+    'BandwidthLimitExceeded',
+    'LimitExceededException',
+    'PriorRequestNotComplete',
+    'ProvisionedThroughputExceededException',
+    'RequestLimitExceeded',
+    'RequestThrottled',
+    'RequestThrottledException',
+    'SlowDown',
+    'ThrottledException',
+    'Throttling',
+    'ThrottlingException',
+    'TooManyRequestsException',
+])
+
+# Something went wrong on the way/server side. The request may or may not have
+# been acted on, so these are only retried for idempotent operations.
+TRANSIENT_CODES = frozenset([
+    'ConnectionError',
+    'InternalError',
+    'InternalFailure',
+    'InternalServerError',
+    'RequestTimeout',
+    'RequestTimeoutException',
+    'ServiceUnavailable',
+    'ServiceUnavailableException',
+    'Unavailable',
+])
+
+# Extra codes for specific services, in the same form as the ``codes`` option
+# to ``RetryPolicy``.
+DEFAULT_SERVICE_CODES = {
+    'dynamodb': {
+        'throttling': ['ProvisionedThroughputExceededException'],
+    },
+    'sqs': {
+        'throttling': ['AWS.SimpleQueueService.ThrottledException'],
+        'transient': ['AWS.SimpleQueueService.InternalError'],
+    },
+    'elastictranscoder': {
+        'transient': ['ServiceUnavailableException'],
+    },
+}
+
+# Operations with these prefixes only read, so repeating them is harmless.
+IDEMPOTENT_PREFIXES = (
+    'batch_get_',
+    'check_',
+    'describe_',
+    'get_',
+    'head_',
+    'list_',
+    'query',
+    'read_',
+    'scan',
+)
+
+# Writes that are still safe to repeat (the second call lands in the same
+# state), keyed by service.
+DEFAULT_IDEMPOTENT = {
+    's3': [
+        'delete_bucket', 'delete_object', 'put_bucket_acl',
+        'put_bucket_cors', 'put_bucket_policy', 'put_bucket_tagging',
+        'put_bucket_website', 'put_object', 'put_object_acl',
+    ],
+    'sqs': [
+        'change_message_visibility', 'delete_message', 'delete_queue',
+        'set_queue_attributes',
+    ],
+    'sns': ['delete_topic', 'set_topic_attributes', 'unsubscribe'],
+    'dynamodb': ['delete_item', 'put_item'],
+}
+
+
+class RetryBudget(object):
+    """
+    Caps how many retries can happen, so that a struggling service isn't
+    swamped with retries on top of the regular load.
+
+    Each retry withdraws ``retry_cost`` tokens & each success deposits
+    ``success_refund``, up to ``capacity``. When the budget is empty, failures
+    are raised straight away until enough calls succeed again.
+    """
+    def __init__(self, capacity=500, retry_cost=5, success_refund=1):
+        self.capacity = capacity
+        self.retry_cost = retry_cost
+        self.success_refund = success_refund
+        self.tokens = capacity
+        self._lock = threading.Lock()
+
+    def withdraw(self):
+        """
+        Takes the cost of one retry, if there's enough left.
+
+        :returns: Whether the retry may go ahead
+        :rtype: boolean
+        """
+        with self._lock:
+            if self.tokens < self.retry_cost:
+                return False
+
+            self.tokens -= self.retry_cost
+            return True
+
+    def deposit(self):
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + self.success_refund)
+
+
+class RetryPolicy(object):
+    """
+    Decides which failed calls to retry & how long to wait before each retry.
+
+    Throttling errors are retried for any operation, since the request was
+    turned away before it did anything. Transient errors (timeouts, internal
+    errors, dropped connections) are only retried for idempotent operations.
+
+    Usage::
+
+        >>> policy = RetryPolicy(
+        ...     max_attempts=5,
+        ...     codes={'s3': {'transient': ['NoSuchUpload']}},
+        ...     idempotent={'sqs': {'send_message': True}}
+        ... )
+        >>> session = Session(retry_policy=policy)
+        >>> policy.stats()['s3']['get_object']['retries']
+        2
+
+    Sessions don't retry unless given a policy (or ``retry_policy=True``
+    for the default one). To turn retries off for a policy that's shared,
+    use ``RetryPolicy(max_attempts=1)``.
+    """
+    def __init__(self, max_attempts=3, base_delay=0.05, max_delay=20.0,
+                 codes=None, idempotent=None, budget=None, sleep=time.sleep,
+                 random=random.random):
+        """
+        Creates a new ``RetryPolicy`` instance.
+
+        :param max_attempts: (Optional) The most attempts per call, including
+            the first. Default is ``3``.
+        :type max_attempts: integer
+
+        :param base_delay: (Optional) The backoff (in seconds) before the
+            first retry, doubling with each attempt after. Default is
+            ``0.05``.
+        :type base_delay: float
+
+        :param max_delay: (Optional) The most backoff (in seconds) before any
+            retry. Default is ``20.0``.
+        :type max_delay: float
+
+        :param codes: (Optional) Error codes to add, keyed by service name,
+            then by ``throttling`` or ``transient``. A ``*`` service applies
+            to all of them. Merged onto ``DEFAULT_SERVICE_CODES``.
+        :type codes: dict
+
+        :param idempotent: (Optional) Whether operations are safe to repeat,
+            keyed by service name, then operation name. Overrides both the
+            prefixes & ``DEFAULT_IDEMPOTENT``.
+        :type idempotent: dict
+
+        :param budget: (Optional) The retry budget. Default is a new
+            ``RetryBudget``.
+        :type budget: <kotocore.retries.RetryBudget> instance
+
+        :param sleep: (Optional) Waits for the backoff. Default is
+            ``time.sleep``.
+        :type sleep: callable
+
+        :param random: (Optional) Returns a float in ``[0, 1)``, for the
+            jitter. Default is ``random.random``.
+        :type random: callable
+        """
+        if max_attempts < 1:
+            raise ValueError("'max_attempts' must be at least 1.")
+
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget or RetryBudget()
+        self.sleep = sleep
+        self.random = random
+        self.service_codes = {}
+
+        for extra in (DEFAULT_SERVICE_CODES, codes or {}):
+            for service_name, kinds in extra.items():
+                known = self.service_codes.setdefault(service_name, {})
+
+                for kind, names in kinds.items():
+                    if not kind in ('throttling', 'transient'):
+                        msg = "Unknown kind of error code '{0}'."
+                        raise ValueError(msg.format(kind))
+
+                    known.setdefault(kind, set()).update(names)
+
+        self.idempotent_ops = {}
+
+        for service_name, op_names in DEFAULT_IDEMPOTENT.items():
+            self.idempotent_ops[service_name] = dict([
+                (op_name, True) for op_name in op_names
+            ])
+
+        for service_name, ops in (idempotent or {}).items():
+            self.idempotent_ops.setdefault(service_name, {}).update(ops)
+
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def codes_for(self, service_name, kind):
+        """
+        Returns the retryable error codes of one kind (``throttling`` or
+        ``transient``) for a service.
+
+        :rtype: set
+        """
+        if kind == 'throttling':
+            codes = set(THROTTLING_CODES)
+        else:
+            codes = set(TRANSIENT_CODES)
+
+        for name in ('*', service_name):
+            codes.update(self.service_codes.get(name, {}).get(kind, ()))
+
+        return codes
+
+    def is_idempotent(self, service_name, operation_name):
+        """
+        Returns whether an operation is safe to repeat.
+
+        :rtype: boolean
+        """
+        known = self.idempotent_ops.get(service_name, {})
+
+        if operation_name in known:
+            return known[operation_name]
+
+        return operation_name.startswith(IDEMPOTENT_PREFIXES)
+
+    def is_retryable(self, service_name, operation_name, error):
+        """
+        Returns whether a failure is worth retrying (ignoring the attempts
+        made & the budget).
+
+        :param error: The exception the attempt failed with.
+        :type error: Exception
+
+        :rtype: boolean
+        """
+        if isinstance(error, ServerError):
+            code = error.code
+        elif isinstance(error, EnvironmentError):
+            # Covers socket & connection errors from the transport.
+            code = 'ConnectionError'
+        else:
+            return False
+
+        if code in self.codes_for(service_name, 'throttling'):
+            return True
+
+        if code in self.codes_for(service_name, 'transient'):
+            return self.is_idempotent(service_name, operation_name)
+
+        return False
+
+    def backoff(self, attempt):
+        """
+        Returns the backoff (in seconds) after a failed attempt, using full
+        jitter (a random delay between zero & the exponential cap).
+
+        :param attempt: How many attempts have been made so far.
+        :type attempt: integer
+
+        :rtype: float
+        """
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return self.random() * ceiling
+
+    def next_delay(self, service_name, operation_name, error, attempt):
+        """
+        Decides whether to retry a failed attempt, recording the outcome.
+
+        :param error: The exception the attempt failed with.
+        :type error: Exception
+
+        :param attempt: How many attempts have been made so far.
+        :type attempt: integer
+
+        :returns: The backoff (in seconds) before retrying, or ``None`` if the
+            error should be raised
+        :rtype: float
+        """
+        if not self.is_retryable(service_name, operation_name, error):
+            self._record(service_name, operation_name, 'failures')
+            return None
+
+        if attempt >= self.max_attempts:
+            self._record(service_name, operation_name, 'exhausted')
+            return None
+
+        if not self.budget.withdraw():
+            self._record(service_name, operation_name, 'budget_denied')
+            return None
+
+        delay = self.backoff(attempt)
+        self._record(
+            service_name,
+            operation_name,
+            'retries',
+            backoff_time=delay
+        )
+        return delay
+
+    def succeeded(self, service_name, operation_name):
+        """
+        Records a successful call, refilling the budget a little.
+        """
+        self.budget.deposit()
+        self._record(service_name, operation_name, 'successes')
+
+    def call(self, service_name, operation_name, func):
+        """
+        Calls ``func``, retrying it until it succeeds or the policy gives up.
+
+        If a deadline is in effect (see ``kotocore.deadlines``) & the next
+        backoff would run past it, ``DeadlineExceeded`` is raised instead.
+
+        :param func: Makes one attempt, raising on failure.
+        :type func: callable
+
+        :returns: Whatever ``func`` returns
+        """
+        attempt = 1
+
+        while True:
+            try:
+                result = func()
+            except Exception as err:
+                delay = self.next_delay(
+                    service_name,
+                    operation_name,
+                    err,
+                    attempt
+                )
+
+                if delay is None:
+                    raise
+
+                sleep_within(delay, sleep=self.sleep)
+                attempt += 1
+                continue
+
+            self.succeeded(service_name, operation_name)
+            return result
+
+    def stats(self):
+        """
+        Returns the counts per operation, keyed by service name, then
+        operation name.
+
+        Each has the number of ``successes``, ``retries``, ``failures`` (not
+        retryable), ``exhausted`` (out of attempts) & ``budget_denied``, plus
+        the total ``backoff_time`` (in seconds).
+
+        :rtype: dict
+        """
+        with self._lock:
+            return dict([
+                (service_name, dict([
+                    (op_name, dict(counts)) for op_name, counts in ops.items()
+                ]))
+                for service_name, ops in self._stats.items()
+            ])
+
+    def _record(self, service_name, operation_name, key, backoff_time=0.0):
+        with self._lock:
+            ops = self._stats.setdefault(service_name, {})
+            counts = ops.get(operation_name)
+
+            if counts is None:
+                counts = ops[operation_name] = {
+                    'successes': 0,
+                    'retries': 0,
+                    'failures': 0,
+                    'exhausted': 0,
+                    'budget_denied': 0,
+                    'backoff_time': 0.0,
+                }
+
+            counts[key] += 1
+            counts['backoff_time'] += backoff_time
@@ -0,0 +1,457 @@
+"""
+A priority-aware executor, so that slow control-plane calls (listing IAM
+users, creating buckets, etc.) can't starve latency-critical data-plane
+calls (receiving SQS messages, fetching S3 objects, etc.) sharing the same
+pool.
+"""
+import collections
+import threading
+import time
+
+from concurrent.futures import Executor, Future
+
+from kotocore.exceptions import NoResourceJSONFound
+from kotocore.utils.concurrency import describe_call
+from kotocore.utils.constants import DEFAULT_MAX_WORKERS
+from kotocore.utils.mangle import to_snake_case
+
+
+CONTROL = 'control'
+DATA = 'data'
+
+# Sensible defaults, used when neither the user's mapping nor the
+# ResourceJSON say otherwise. Keys are either a service name or a
+# ``(service_name, operation_name)`` pair.
+DEFAULT_PRIORITIES = {
+    'cloudsearch': CONTROL,
+    'elasticache': CONTROL,
+    'iam': CONTROL,
+    'support': CONTROL,
+    ('dynamodb', 'create_table'): CONTROL,
+    ('dynamodb', 'delete_table'): CONTROL,
+    ('dynamodb', 'update_table'): CONTROL,
+    ('s3', 'create_bucket'): CONTROL,
+    ('s3', 'delete_bucket'): CONTROL,
+    ('sns', 'create_topic'): CONTROL,
+    ('sns', 'delete_topic'): CONTROL,
+    ('sqs', 'create_queue'): CONTROL,
+    ('sqs', 'delete_queue'): CONTROL,
+}
+
+
+class Classifier(object):
+    """
+    Decides which priority class an operation belongs to.
+
+    Checked in order:
+
+    * the user-supplied ``mapping``
+    * a ``priority`` on the operation within the ResourceJSON
+    * ``kotocore.scheduler.DEFAULT_PRIORITIES``
+    * the ``default`` class
+
+    Usage::
+
+        >>> classifier = Classifier({
+        ...     'glacier': 'control',
+        ...     ('s3', 'list_objects'): 'control',
+        ... })
+        >>> classifier.classify('s3', 'get_object')
+        'data'
+
+    """
+    def __init__(self, mapping=None, loader=None, default=DATA):
+        """
+        Creates a new ``Classifier`` instance.
+
+        :param mapping: (Optional) Priority classes keyed by either a service
+            name or a ``(service_name, operation_name)`` pair. Operation names
+            are the ``Connection`` method names. Ex. ``list_objects``
+        :type mapping: dict
+
+        :param loader: (Optional) The ``ResourceJSONLoader`` to look for
+            ``priority`` metadata with. By default, this is
+            ``kotocore.loader.default_loader``.
+        :type loader: <kotocore.loader.ResourceJSONLoader> instance
+
+        :param default: (Optional) The class for anything unclassified.
+            Default is ``data``.
+        :type default: string
+        """
+        self.mapping = dict(mapping or {})
+        self.loader = loader
+        self.default = default
+        self._from_json = {}
+
+        if self.loader is None:
+            import kotocore.loader
+            self.loader = kotocore.loader.default_loader
+
+    def classify(self, service_name, operation_name):
+        """
+        Returns the priority class for an operation.
+
+        :param service_name: The name of the service. Ex. ``s3``. May be
+            ``None`` if unknown.
+        :type service_name: string
+
+        :param operation_name: The name of the operation. Ex. ``get_object``.
+            May be ``None`` if unknown.
+        :type operation_name: string
+
+        :rtype: string
+        """
+        if service_name is None:
+            return self.default
+
+        key = (service_name, operation_name)
+
+        for mapping in (self.mapping, self._json_priorities(service_name)):
+            if key in mapping:
+                return mapping[key]
+
+            if service_name in mapping:
+                return mapping[service_name]
+
+        if key in DEFAULT_PRIORITIES:
+            return DEFAULT_PRIORITIES[key]
+
+        return DEFAULT_PRIORITIES.get(service_name, self.default)
+
+    def _json_priorities(self, service_name):
+        # Builds (& memoizes) the ``priority`` settings on any operations in
+        # the service's ResourceJSON.
+        priorities = self._from_json.get(service_name)
+
+        if priorities is not None:
+            return priorities
+
+        priorities = {}
+
+        try:
+            data = self.loader.load(service_name)
+        except NoResourceJSONFound:
+            data = {}
+
+        for section in ('resources', 'collections'):
+            for class_data in data.get(section, {}).values():
+                for op in class_data.get('operations', {}).values():
+                    if 'priority' in op:
+                        op_name = to_snake_case(op['api_name'])
+                        priorities[(service_name, op_name)] = op['priority']
+
+        self._from_json[service_name] = priorities
+        return priorities
+
+
+class _Task(object):
+    def __init__(self, priority_class, service_name, future, fn, args, kwargs):
+        self.priority_class = priority_class
+        self.service_name = service_name
+        self.future = future
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.queued_at = time.time()
+
+    def run(self):
+        if not self.future.set_running_or_notify_cancel():
+            return
+
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except BaseException as err:
+            self.future.set_exception(err)
+        else:
+            self.future.set_result(result)
+
+
+class PriorityScheduler(Executor):
+    """
+    A thread pool that queues work by priority class.
+
+    Each class has its own queue & concurrency quota. Whenever a thread frees
+    up, it takes work from the first class (in the order given) that has
+    something queued & is under its quota. Within a class, services take
+    turns in proportion to their weights (weighted fair sharing), so one busy
+    service can't crowd out the rest.
+
+    It's a regular ``concurrent.futures.Executor``, so it can stand in for a
+    ``ThreadPoolExecutor``. Calls are classified with ``describe_call`` (Ex.
+    ``pool.submit(s3_conn.get_object, ...)`` is known to be S3's
+    ``get_object``). Use ``submit_for`` to name the operation explicitly.
+
+    Usage::
+
+        >>> pool = PriorityScheduler(
+        ...     max_workers=16,
+        ...     quotas={'data': 16, 'control': 2},
+        ...     service_weights={'sqs': 3},
+        ... )
+        >>> future = pool.submit(sqs_conn.receive_message, queue_url=url)
+        >>> pool.stats()['data']['queued']
+        0
+
+    """
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, quotas=None,
+                 classifier=None, service_weights=None):
+        """
+        Creates a new ``PriorityScheduler`` instance.
+
+        :param max_workers: (Optional) The number of threads. Default is
+            ``kotocore.utils.constants.DEFAULT_MAX_WORKERS``.
+        :type max_workers: integer
+
+        :param quotas: (Optional) The most calls each class may have running
+            at once, in priority order (a list of pairs, or a dictionary
+            where its order is kept). By default, neither class is capped,
+            so data-plane calls simply come first when threads free up.
+            Pass a lower ``control`` quota to keep control-plane calls from
+            taking over the pool.
+        :type quotas: list or dict
+
+        :param classifier: (Optional) Decides each call's class. By default,
+            this is a plain ``Classifier``.
+        :type classifier: <kotocore.scheduler.Classifier> instance
+
+        :param service_weights: (Optional) Relative shares for services within
+            a class. Unlisted services have a weight of ``1``.
+        :type service_weights: dict
+        """
+        if max_workers < 1:
+            raise ValueError("'max_workers' must be at least 1.")
+
+        if quotas is None:
+            quotas = [
+                (DATA, max_workers),
+                (CONTROL, max_workers),
+            ]
+
+        self._max_workers = max_workers
+        self.quotas = collections.OrderedDict(quotas)
+        self.classifier = classifier
+        self.service_weights = dict(service_weights or {})
+
+        if self.classifier is None:
+            self.classifier = Classifier()
+
+        self._cond = threading.Condition()
+        self._threads = []
+        self._idle = 0
+        self._shutdown = False
+        # Per class, a queue per service & how much service each has had.
+        self._queues = dict([(name, {}) for name in self.quotas])
+        self._served = dict([(name, {}) for name in self.quotas])
+        self._running = dict([(name, 0) for name in self.quotas])
+        self._counts = dict([
+            (name, {
+                'submitted': 0,
+                'completed': 0,
+                'wait_total': 0.0,
+                'wait_max': 0.0,
+            })
+            for name in self.quotas
+        ])
+
+    @property
+    def max_workers(self):
+        """
+        Returns the number of threads.
+
+        :rtype: integer
+        """
+        return self._max_workers
+
+    def classify(self, service_name, operation_name):
+        """
+        Returns the priority class for an operation, falling back to the
+        lowest-priority class if the classifier names an unknown one.
+
+        :rtype: string
+        """
+        priority_class = self.classifier.classify(service_name, operation_name)
+
+        if not priority_class in self.quotas:
+            priority_class = list(self.quotas)[-1]
+
+        return priority_class
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Schedules ``fn(*args, **kwargs)``, classifying it by the call itself
+        (see ``describe_call``).
+
+        :returns: A future for the result
+        :rtype: <concurrent.futures.Future> instance
+        """
+        service_name, operation_name = describe_call(fn)
+        return self.submit_for(
+            service_name,
+            operation_name,
+            fn,
+            *args,
+            **kwargs
+        )
+
+    def submit_for(self, service_name, operation_name, fn, *args, **kwargs):
+        """
+        Schedules ``fn(*args, **kwargs)`` as a call to a given operation.
+
+        :param service_name: The name of the service. Ex. ``sqs``. May be
+            ``None``.
+        :type service_name: string
+
+        :param operation_name: The name of the operation. Ex.
+            ``receive_message``. May be ``None``.
+        :type operation_name: string
+
+        :returns: A future for the result
+        :rtype: <concurrent.futures.Future> instance
+        """
+        priority_class = self.classify(service_name, operation_name)
+        future = Future()
+        task = _Task(priority_class, service_name, future, fn, args, kwargs)
+
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError(
+                    'Cannot schedule new calls after shutdown.'
+                )
+
+            queues = self._queues[priority_class]
+
+            if not queues.get(service_name):
+                # A service that was idle rejoins at the current pace, rather
+                # than getting a burst for the time it sat out.
+                served = self._served[priority_class]
+                active = [served.get(name, 0.0) for name in queues]
+
+                if active:
+                    served[service_name] = max(
+                        served.get(service_name, 0.0),
+                        min(active)
+                    )
+
+                queues[service_name] = collections.deque()
+
+            queues[service_name].append(task)
+            self._counts[priority_class]['submitted'] += 1
+            self._cond.notify()
+
+            if not self._idle and len(self._threads) < self._max_workers:
+                thread = threading.Thread(target=self._work)
+                thread.daemon = True
+                self._threads.append(thread)
+                thread.start()
+
+        return future
+
+    def shutdown(self, wait=True):
+        """
+        Stops accepting calls. Anything already queued still runs.
+
+        :param wait: (Optional) Whether to block until all the calls are done.
+            Default is ``True``.
+        :type wait: boolean
+        """
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+            threads = list(self._threads)
+
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def stats(self):
+        """
+        Returns metrics per priority class.
+
+        Each class has its ``quota``, the calls ``queued`` & ``running`` right
+        now, totals for ``submitted`` & ``completed`` & the time calls spent
+        queued (``wait_total``, ``wait_max`` & ``wait_mean``, in seconds).
+
+        :rtype: dict
+        """
+        with self._cond:
+            stats = {}
+
+            for name, quota in self.quotas.items():
+                counts = dict(self._counts[name])
+                started = counts['submitted'] - self._queued(name)
+                counts['quota'] = quota
+                counts['queued'] = self._queued(name)
+                counts['running'] = self._running[name]
+                counts['wait_mean'] = 0.0
+
+                if started:
+                    counts['wait_mean'] = counts['wait_total'] / started
+
+                stats[name] = counts
+
+            return stats
+
+    def _queued(self, priority_class):
+        return sum([
+            len(queue) for queue in self._queues[priority_class].values()
+        ])
+
+    def _next_task(self):
+        # Must be called with the lock held.
+        for name, quota in self.quotas.items():
+            if self._running[name] >= quota:
+                continue
+
+            queues = self._queues[name]
+            waiting = [service for service in queues if queues[service]]
+
+            if not waiting:
+                continue
+
+            served = self._served[name]
+            service_name = min(
+                waiting,
+                key=lambda service: served.get(service, 0.0)
+            )
+            task = queues[service_name].popleft()
+            served[service_name] = served.get(service_name, 0.0) + \
+                1.0 / self.service_weights.get(service_name, 1)
+
+            if not queues[service_name]:
+                del queues[service_name]
+
+            waited = time.time() - task.queued_at
+            counts = self._counts[name]
+            counts['wait_total'] += waited
+            counts['wait_max'] = max(counts['wait_max'], waited)
+            self._running[name] += 1
+            return task
+
+        return None
+
+    def _pending(self):
+        return any([self._queued(name) for name in self.quotas])
+
+    def _work(self):
+        while True:
+            with self._cond:
+                task = self._next_task()
+
+                while task is None:
+                    if self._shutdown and not self._pending():
+                        return
+
+                    self._idle += 1
+                    self._cond.wait()
+                    self._idle -= 1
+                    task = self._next_task()
+
+            try:
+                task.run()
+            finally:
+                with self._cond:
+                    self._running[task.priority_class] -= 1
+                    self._counts[task.priority_class]['completed'] += 1
+                    # A quota slot opened up, which may unblock a waiting
+                    # thread.
+                    self._cond.notify_all()
@@ -1,8 +1,21 @@
+import threading
+import time
+
 import botocore.session
 
+from kotocore.batch import Batch
 from kotocore.cache import ServiceCache
+from kotocore.coalesce import Flight
+from kotocore.deadlines import deadline
+from kotocore.fanout import FanOut
+from kotocore.graph import TaskGraph
+from kotocore.inflight import ConcurrencyLimiter
+from kotocore.pipeline import DEFAULT_QUEUE_SIZE, Pipeline
+from kotocore.ratelimit import RateLimiter
+from kotocore.retries import RetryPolicy
+from kotocore.scheduler import Classifier, PriorityScheduler
+from kotocore.utils.constants import DEFAULT_MAX_WORKERS
 from kotocore.utils.constants import USER_AGENT_NAME, USER_AGENT_VERSION
-from kotocore.exceptions import NotCached
 
 
 class Session(object):
@@ -17,11 +30,28 @@ class Session(object):
         >>> session = Session()
         >>> sqs_conn = session.connect_to('sqs', region_name='us-west-2')
 
+    Building classes & loading their data is always locked, so one session
+    can be shared between threads. Pass ``thread_safe=True`` to also give
+    each thread its own connections from ``connect_to`` (see below), rather
+    than creating one session per thread.
+
     """
     cache_class = ServiceCache
+    scheduler_class = PriorityScheduler
+    retry_policy_class = RetryPolicy
+    rate_limiter_class = RateLimiter
+    concurrency_limiter_class = ConcurrencyLimiter
 
     def __init__(self, session=None, connection_factory=None,
-                 resource_factory=None, collection_factory=None):
+                 resource_factory=None, collection_factory=None,
+                 async_connection_factory=None, async_resource_factory=None,
+                 async_collection_factory=None,
+                 max_workers=DEFAULT_MAX_WORKERS, thread_safe=False,
+                 priorities=None, priority_quotas=None, service_weights=None,
+                 retry_policy=None, rate_limiter=None,
+                 concurrency_limiter=None, hedging_policy=None,
+                 circuit_breakers=None, coalescer=None,
+                 response_cache=None, cache=None):
         """
         Creates a ``Session`` instance.
 
@@ -47,14 +77,152 @@ class Session(object):
             ``Collection`` objects are constructed by the session.
         :type collection_factory: <kotocore.collections.CollectionFactory>
             instance
+
+        :param async_connection_factory: (Optional) Specifies a custom
+            ``AsyncConnectionFactory`` to be used. Useful if you need to change
+            how ``AsyncConnection`` objects are constructed by the session.
+        :type async_connection_factory:
+            <kotocore.aio.connection.AsyncConnectionFactory> instance
+
+        :param async_resource_factory: (Optional) Specifies a custom
+            ``AsyncResourceFactory`` to be used.
+        :type async_resource_factory:
+            <kotocore.aio.resources.AsyncResourceFactory> instance
+
+        :param async_collection_factory: (Optional) Specifies a custom
+            ``AsyncCollectionFactory`` to be used.
+        :type async_collection_factory:
+            <kotocore.aio.collections.AsyncCollectionFactory> instance
+
+        :param max_workers: (Optional) The size of the thread pool the session
+            uses for blocking I/O (for instance, on behalf of
+            ``AsyncConnection`` objects). Default is
+            ``kotocore.utils.constants.DEFAULT_MAX_WORKERS``. Read-only once
+            the session is created.
+        :type max_workers: integer
+
+        :param thread_safe: (Optional) Whether the session is shared between
+            threads. If ``True``, ``connect_to`` hands back the same
+            connection for the same arguments within a thread, but never
+            shares a connection between threads. Default is ``False``
+            (a new connection for every call).
+        :type thread_safe: boolean
+
+        :param priorities: (Optional) Maps services or ``(service_name,
+            operation_name)`` pairs to priority classes (``data`` or
+            ``control``), on top of the defaults. See
+            ``kotocore.scheduler.Classifier``.
+        :type priorities: dict
+
+        :param priority_quotas: (Optional) The most calls each priority class
+            may have running at once, in priority order. Default is ``None``
+            (no cap on either class, with data-plane calls served first).
+            Ex. ``[('data', 16), ('control', 4)]``. See
+            ``kotocore.scheduler.PriorityScheduler``.
+        :type priority_quotas: list or dict
+
+        :param service_weights: (Optional) Relative shares of the pool for
+            services within a priority class. Unlisted services have a weight
+            of ``1``.
+        :type service_weights: dict
+
+        :param retry_policy: (Optional) Decides which failed calls are
+            retried & the backoff between attempts. Pass ``True`` for a
+            ``kotocore.retries.RetryPolicy`` with its default settings.
+            Default is ``None`` (every call is made once, failing on the
+            first error).
+        :type retry_policy: <kotocore.retries.RetryPolicy> instance
+
+        :param rate_limiter: (Optional) Token buckets every call waits on
+            before reaching the transport. Either a
+            ``kotocore.ratelimit.RateLimiter`` or a dictionary of limits to
+            build one from. Default is ``None`` (no limits).
+        :type rate_limiter: <kotocore.ratelimit.RateLimiter> instance or dict
+
+        :param concurrency_limiter: (Optional) Caps on the calls in flight
+            per endpoint, which every call holds a slot from while its
+            request runs. Either a ``kotocore.inflight.ConcurrencyLimiter``
+            or a dictionary of limits to build one from. Default is ``None``
+            (no caps).
+        :type concurrency_limiter:
+            <kotocore.inflight.ConcurrencyLimiter> instance or dict
+
+        :param hedging_policy: (Optional) Sends a second request for slow
+            calls to safe operations, taking whichever answers first. Its
+            thread pool is sized to fit ``max_workers`` (unless the policy
+            sets its own). Default is ``None`` (no hedging).
+        :type hedging_policy: <kotocore.hedging.HedgingPolicy> instance
+
+        :param circuit_breakers: (Optional) Fails calls fast (with
+            ``CircuitOpenError``) to endpoints that keep failing. Default is
+            ``None`` (no breakers).
+        :type circuit_breakers: <kotocore.circuit.CircuitBreakers> instance
+
+        :param coalescer: (Optional) Lets identical read calls made at the
+            same time share one request. Default is ``None`` (no
+            coalescing).
+        :type coalescer: <kotocore.coalesce.Coalescer> instance
+
+        :param response_cache: (Optional) Answers repeated calls to
+            read-only operations locally, until they expire or a write
+            invalidates them. Default is ``None`` (no caching).
+        :type response_cache: <kotocore.responses.ResponseCache> instance
+
+        :param cache: (Optional) Where the classes the session builds are
+            kept. Pass one with ``max_classes`` to bound it. Default is a new
+            (unbounded) ``cache_class``.
+        :type cache: <kotocore.cache.ServiceCache> instance
         """
         super(Session, self).__init__()
         self.core_session = session
         self.connection_factory = connection_factory
         self.resource_factory = resource_factory
         self.collection_factory = collection_factory
+        self.async_connection_factory = async_connection_factory
+        self.async_resource_factory = async_resource_factory
+        self.async_collection_factory = async_collection_factory
+        self._max_workers = max_workers
+        self.thread_safe = thread_safe
+        self.priorities = priorities
+        self.priority_quotas = priority_quotas
+        self.service_weights = service_weights
+        self.retry_policy = retry_policy
+
+        if self.retry_policy is True:
+            self.retry_policy = self.retry_policy_class()
 
-        self.cache = self.cache_class()
+        self.rate_limiter = rate_limiter
+
+        if isinstance(self.rate_limiter, dict):
+            self.rate_limiter = self.rate_limiter_class(self.rate_limiter)
+
+        self.concurrency_limiter = concurrency_limiter
+
+        if isinstance(self.concurrency_limiter, dict):
+            self.concurrency_limiter = self.concurrency_limiter_class(
+                self.concurrency_limiter
+            )
+
+        self.hedging_policy = hedging_policy
+
+        if self.hedging_policy is not None:
+            self.hedging_policy.size_for(self.max_workers)
+
+        self.circuit_breakers = circuit_breakers
+        self.coalescer = coalescer
+        self.response_cache = response_cache
+        self.cache = cache
+
+        if self.cache is None:
+            self.cache = self.cache_class()
+
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        # Guards ``_building``, which maps cache paths to the classes being
+        # built (& the thread building each).
+        self._build_lock = threading.Lock()
+        self._building = {}
+        self._local = threading.local()
 
         if not self.core_session:
             self.core_session = botocore.session.get_session()
@@ -74,6 +242,125 @@ class Session(object):
             from kotocore.collections import CollectionFactory
             self.collection_factory = CollectionFactory(session=self)
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    @property
+    def max_workers(self):
+        """
+        Returns the size of the session's thread pool.
+
+        Read-only, since the pool is sized when it's first created.
+
+        :rtype: integer
+        """
+        return self._max_workers
+
+    def close(self):
+        """
+        Shuts down the session's thread pool (if one was created), waiting for
+        any running work to finish. The ``hedging_policy`` pool (if any) is
+        shut down too.
+
+        Safe to call more than once. If the session is used again afterward,
+        a fresh pool is created on demand.
+
+        Also called when the session is used as a context manager::
+
+            >>> with Session() as session:
+            ...     results = list(conn.map('head_object', keys))
+
+        """
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+        if self.hedging_policy is not None:
+            self.hedging_policy.close()
+
+    def _get_or_build(self, path, build, store):
+        """
+        Returns a class from the cache, building & storing it on a miss.
+
+        Each class is built once, however many threads miss on it at the
+        same moment. The first builds it, while the others wait & get the
+        very same class (so ``isinstance`` checks agree). Building different
+        classes still happens in parallel.
+
+        The time taken is recorded in the cache's stats, as a hit or a miss.
+
+        :param path: Where the class lives in the cache (see
+            ``ServiceCache.path_for``).
+        :type path: tuple
+
+        :param build: Builds a new class.
+        :type build: callable
+
+        :param store: Puts a newly built class in the cache.
+        :type store: callable
+
+        :returns: The class
+        """
+        start = time.time()
+        found = self.cache.find(path)
+
+        if found is not None:
+            self.cache.timed(path[0], True, time.time() - start)
+            return found
+
+        try:
+            return self._build_once(path, build, store)
+        finally:
+            self.cache.timed(path[0], False, time.time() - start)
+
+    def _build_once(self, path, build, store):
+        current = threading.current_thread()
+
+        with self._build_lock:
+            # Another thread may have finished it since we looked.
+            found = self.cache.find(path, record=False)
+
+            if found is not None:
+                return found
+
+            flight, owner = self._building.get(path, (None, None))
+            leader = flight is None
+
+            if leader:
+                flight = Flight()
+                self._building[path] = (flight, current)
+            elif owner is current:
+                # Building it needs itself. Waiting would never end.
+                return build()
+
+        if not leader:
+            # Built by another thread.
+            flight.wait()
+
+            if flight.error is not None:
+                raise flight.error
+
+            return flight.result
+
+        try:
+            new_class = build()
+            store(new_class)
+        except BaseException as err:
+            flight.finish(error=err)
+            raise
+        else:
+            flight.finish(result=new_class)
+            return new_class
+        finally:
+            with self._build_lock:
+                del self._building[path]
+
     def get_connection(self, service_name):
         """
         Returns a ``Connection`` **class** for a given service.
@@ -84,15 +371,46 @@ class Session(object):
 
         :rtype: <kotocore.connection.Connection subclass>
         """
-        try:
-            return self.cache.get_connection(service_name)
-        except NotCached:
-            pass
+        def build():
+            return self.connection_factory.construct_for(service_name)
+
+        return self._get_or_build(
+            self.cache.path_for(service_name, 'connection'),
+            build,
+            lambda new_class: self.cache.set_connection(
+                service_name,
+                new_class
+            )
+        )
+
+    def get_async_connection(self, service_name):
+        """
+        Returns an ``AsyncConnection`` **class** for a given service.
 
-        # We didn't find it. Construct it.
-        new_class = self.connection_factory.construct_for(service_name)
-        self.cache.set_connection(service_name, new_class)
-        return new_class
+        :param service_name: A string that specifies the name of the desired
+            service. Ex. ``sqs``, ``sns``, ``dynamodb``, etc.
+        :type service_name: string
+
+        :rtype: <kotocore.aio.connection.AsyncConnection subclass>
+        """
+        def build():
+            if not self.async_connection_factory:
+                # Imported here, since ``asyncio`` isn't available everywhere.
+                from kotocore.aio.connection import AsyncConnectionFactory
+                self.async_connection_factory = AsyncConnectionFactory(
+                    session=self
+                )
+
+            return self.async_connection_factory.construct_for(service_name)
+
+        return self._get_or_build(
+            self.cache.path_for(service_name, 'async_connection'),
+            build,
+            lambda new_class: self.cache.set_async_connection(
+                service_name,
+                new_class
+            )
+        )
 
     def get_resource(self, service_name, resource_name, base_class=None):
         """
@@ -112,23 +430,27 @@ class Session(object):
 
         :rtype: <kotocore.resources.Resource subclass>
         """
-        try:
-            return self.cache.get_resource(
+        def build():
+            return self.resource_factory.construct_for(
                 service_name,
                 resource_name,
                 base_class=base_class
             )
-        except NotCached:
-            pass
-
-        # We didn't find it. Construct it.
-        new_class = self.resource_factory.construct_for(
-            service_name,
-            resource_name,
-            base_class=base_class
+
+        return self._get_or_build(
+            self.cache.path_for(
+                service_name,
+                'resources',
+                resource_name,
+                base_class=base_class
+            ),
+            build,
+            lambda new_class: self.cache.set_resource(
+                service_name,
+                resource_name,
+                new_class
+            )
         )
-        self.cache.set_resource(service_name, resource_name, new_class)
-        return new_class
 
     def get_collection(self, service_name, collection_name, base_class=None):
         """
@@ -149,23 +471,137 @@ class Session(object):
 
         :rtype: <kotocore.collections.Collection subclass>
         """
-        try:
-            return self.cache.get_collection(
+        def build():
+            return self.collection_factory.construct_for(
+                service_name,
+                collection_name,
+                base_class=base_class
+            )
+
+        return self._get_or_build(
+            self.cache.path_for(
+                service_name,
+                'collections',
+                collection_name,
+                base_class=base_class
+            ),
+            build,
+            lambda new_class: self.cache.set_collection(
+                service_name,
+                collection_name,
+                new_class
+            )
+        )
+
+    def get_async_resource(self, service_name, resource_name,
+                           base_class=None):
+        """
+        Returns an ``AsyncResource`` **class** for a given service.
+
+        Cached alongside the sync variants, keyed by the base class.
+
+        :param service_name: A string that specifies the name of the desired
+            service. Ex. ``sqs``, ``sns``, ``dynamodb``, etc.
+        :type service_name: string
+
+        :param resource_name: A string that specifies the name of the desired
+            class. Ex. ``Queue``, ``Notification``, ``Table``, etc.
+        :type resource_name: string
+
+        :param base_class: (Optional) The base class of the object. Default
+            is ``AsyncResource``.
+        :type base_class: class
+
+        :rtype: <kotocore.aio.resources.AsyncResource subclass>
+        """
+        # Imported here, since ``asyncio`` isn't available everywhere.
+        from kotocore.aio.resources import AsyncResource, AsyncResourceFactory
+
+        if base_class is None:
+            base_class = AsyncResource
+
+        def build():
+            if not self.async_resource_factory:
+                self.async_resource_factory = AsyncResourceFactory(
+                    session=self
+                )
+
+            return self.async_resource_factory.construct_for(
+                service_name,
+                resource_name,
+                base_class=base_class
+            )
+
+        return self._get_or_build(
+            self.cache.path_for(
+                service_name,
+                'resources',
+                resource_name,
+                base_class=base_class
+            ),
+            build,
+            lambda new_class: self.cache.set_resource(
+                service_name,
+                resource_name,
+                new_class
+            )
+        )
+
+    def get_async_collection(self, service_name, collection_name,
+                             base_class=None):
+        """
+        Returns an ``AsyncCollection`` **class** for a given service.
+
+        Cached alongside the sync variants, keyed by the base class.
+
+        :param service_name: A string that specifies the name of the desired
+            service. Ex. ``sqs``, ``sns``, ``dynamodb``, etc.
+        :type service_name: string
+
+        :param collection_name: A string that specifies the name of the desired
+            class. Ex. ``QueueCollection``, ``NotificationCollection``,
+            ``TableCollection``, etc.
+        :type collection_name: string
+
+        :param base_class: (Optional) The base class of the object. Default
+            is ``AsyncCollection``.
+        :type base_class: class
+
+        :rtype: <kotocore.aio.collections.AsyncCollection subclass>
+        """
+        # Imported here, since ``asyncio`` isn't available everywhere.
+        from kotocore.aio.collections import AsyncCollection
+        from kotocore.aio.collections import AsyncCollectionFactory
+
+        if base_class is None:
+            base_class = AsyncCollection
+
+        def build():
+            if not self.async_collection_factory:
+                self.async_collection_factory = AsyncCollectionFactory(
+                    session=self
+                )
+
+            return self.async_collection_factory.construct_for(
                 service_name,
                 collection_name,
                 base_class=base_class
             )
-        except NotCached:
-            pass
-
-        # We didn't find it. Construct it.
-        new_class = self.collection_factory.construct_for(
-            service_name,
-            collection_name,
-            base_class=base_class
+
+        return self._get_or_build(
+            self.cache.path_for(
+                service_name,
+                'collections',
+                collection_name,
+                base_class=base_class
+            ),
+            build,
+            lambda new_class: self.cache.set_collection(
+                service_name,
+                collection_name,
+                new_class
+            )
         )
-        self.cache.set_collection(service_name, collection_name, new_class)
-        return new_class
 
     def connect_to(self, service_name, **kwargs):
         """
@@ -174,6 +610,9 @@ class Session(object):
 
         Forwards ``**kwargs`` like region, keys, etc. on to the constructor.
 
+        In ``thread_safe`` mode, the connection is reused for the same
+        arguments within the calling thread.
+
         :param service_name: A string that specifies the name of the desired
             service. Ex. ``sqs``, ``sns``, ``dynamodb``, etc.
         :type service_name: string
@@ -181,8 +620,233 @@ class Session(object):
         :rtype: <kotocore.connection.Connection> instance
         """
         service_class = self.get_connection(service_name)
+
+        if not self.thread_safe:
+            return service_class.connect_to(**kwargs)
+
+        conns = getattr(self._local, 'connections', None)
+
+        if conns is None:
+            conns = self._local.connections = {}
+
+        try:
+            key = (service_class, tuple(sorted(kwargs.items())))
+            return conns[key]
+        except TypeError:
+            # Unhashable arguments. Don't bother caching.
+            return service_class.connect_to(**kwargs)
+        except KeyError:
+            conn = conns[key] = service_class.connect_to(**kwargs)
+            return conn
+
+    def connect_to_async(self, service_name, **kwargs):
+        """
+        Shortcut method to make instantiating the ``AsyncConnection`` classes
+        easier.
+
+        Forwards ``**kwargs`` like region, executor, etc. on to the
+        constructor.
+
+        Usage::
+
+            >>> sqs_conn = session.connect_to_async('sqs')
+            >>> resp = await sqs_conn.create_queue(queue_name='jobs')
+
+        :param service_name: A string that specifies the name of the desired
+            service. Ex. ``sqs``, ``sns``, ``dynamodb``, etc.
+        :type service_name: string
+
+        :rtype: <kotocore.aio.connection.AsyncConnection> instance
+        """
+        service_class = self.get_async_connection(service_name)
         return service_class.connect_to(**kwargs)
 
+    def get_executor(self):
+        """
+        Returns the thread pool owned by the session, creating it on first
+        use.
+
+        The pool is bounded by ``max_workers`` & shared by everything within
+        the session that needs to run blocking calls concurrently. It's a
+        ``PriorityScheduler``, so control-plane calls can't starve
+        data-plane ones (see the ``priorities``, ``priority_quotas`` &
+        ``service_weights`` options).
+
+        :rtype: <kotocore.scheduler.PriorityScheduler> instance
+        """
+        if self._executor is not None:
+            return self._executor
+
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = self.scheduler_class(
+                    max_workers=self.max_workers,
+                    quotas=self.priority_quotas,
+                    classifier=Classifier(
+                        self.priorities,
+                        loader=self.resource_factory.loader
+                    ),
+                    service_weights=self.service_weights
+                )
+
+        return self._executor
+
+    def batch(self, max_workers=None, defer=False):
+        """
+        Creates a ``Batch``, for running a group of calls concurrently on the
+        session's thread pool.
+
+        Usage::
+
+            >>> with session.batch(max_workers=16) as b:
+            ...     f1 = b.call(bucket.get)
+            ...     f2 = b.call(queue.get_attributes, attribute_names=['All'])
+            >>> f1.result()
+
+        :param max_workers: (Optional) The most calls from the batch to have
+            running at once, or an ``AdaptiveLimit`` to size that by.
+            Default is the session's ``max_workers``.
+        :type max_workers: integer or <kotocore.adaptive.AdaptiveLimit>
+            instance
+
+        :param defer: (Optional) If ``True``, nothing runs until the block
+            exits. Otherwise, calls start as soon as they're submitted.
+            Default is ``False``.
+        :type defer: boolean
+
+        :rtype: <kotocore.batch.Batch> instance
+        """
+        if max_workers is None:
+            max_workers = self.max_workers
+
+        return Batch(self.get_executor(), max_workers, defer=defer)
+
+    def graph(self, max_workers=None):
+        """
+        Creates a ``TaskGraph``, for running dependent calls (like multi-step
+        provisioning) with independent branches run concurrently on the
+        session's thread pool.
+
+        Usage::
+
+            >>> from kotocore.graph import Ref
+            >>> graph = session.graph()
+            >>> graph.add('queue', sqs.create_queue, queue_name='jobs')
+            >>> graph.add(
+            ...     'attrs',
+            ...     sqs.set_queue_attributes,
+            ...     queue_url=Ref('queue', 'QueueUrl'),
+            ...     attributes={'VisibilityTimeout': '60'}
+            ... )
+            >>> results = graph.run()
+
+        :param max_workers: (Optional) The most steps to have running at
+            once, or an ``AdaptiveLimit`` to size that by. Default is the
+            session's ``max_workers``.
+        :type max_workers: integer or <kotocore.adaptive.AdaptiveLimit>
+            instance
+
+        :rtype: <kotocore.graph.TaskGraph> instance
+        """
+        if max_workers is None:
+            max_workers = self.max_workers
+
+        return TaskGraph(self.get_executor(), max_workers)
+
+    def pipeline(self, queue_size=DEFAULT_QUEUE_SIZE):
+        """
+        Creates a ``Pipeline``, for streaming items through composable stages
+        (map, filter, batch & sink), with the concurrent stages run on the
+        session's thread pool.
+
+        Usage::
+
+            >>> pipe = session.pipeline(queue_size=500)
+            >>> pipe.source(bucket.objects).map(fetch, workers=16)
+            >>> pipe.batch(count=25).sink(table.batch_write, param='items')
+            >>> stats = pipe.run()
+
+        :param queue_size: (Optional) The most items to hold between any two
+            stages. Default is ``kotocore.pipeline.DEFAULT_QUEUE_SIZE``.
+        :type queue_size: integer
+
+        :rtype: <kotocore.pipeline.Pipeline> instance
+        """
+        return Pipeline(executor=self.get_executor(), queue_size=queue_size)
+
+    def fan_out(self, targets, max_workers=None, per_target=1):
+        """
+        Creates a ``FanOut``, for running the same calls across many
+        account/region targets concurrently on the session's thread pool.
+
+        The targets all share the classes built by this session.
+
+        Usage::
+
+            >>> fan = session.fan_out([
+            ...     (None, 'us-east-1'),
+            ...     ({'aws_access_key_id': '...',
+            ...       'aws_secret_access_key': '...'}, 'eu-west-1'),
+            ... ])
+            >>> for result in fan.collection('s3', 'BucketCollection'):
+            ...     print(result.target.name, result.ok, result.elapsed)
+
+        :param targets: The targets, either ``kotocore.fanout.Target``
+            instances or ``(credentials, region_name[, name])`` tuples.
+        :type targets: list
+
+        :param max_workers: (Optional) The most calls to have running at
+            once, across all targets, or an ``AdaptiveLimit`` to size that
+            by. Default is the session's ``max_workers``.
+        :type max_workers: integer or <kotocore.adaptive.AdaptiveLimit>
+            instance
+
+        :param per_target: (Optional) The most calls to have running at once
+            against any one target. Default is ``1``.
+        :type per_target: integer
+
+        :rtype: <kotocore.fanout.FanOut> instance
+        """
+        if max_workers is None:
+            max_workers = self.max_workers
+
+        return FanOut(
+            self,
+            targets,
+            self.get_executor(),
+            max_workers,
+            per_target=per_target
+        )
+
+    def deadline(self, seconds):
+        """
+        Bounds how long the calls made within a ``with`` block may take, end
+        to end.
+
+        The deadline covers retries, backoff, rate limit & concurrency limit
+        waits, pagination & (via the socket timeout) the requests
+        themselves. It carries over to calls ``map`` runs on the pool. Once
+        it passes, calls raise ``DeadlineExceeded``. With ``asyncio``, the
+        call's task is cancelled at the deadline.
+
+        Nested deadlines can only shorten the one in effect. A single call
+        can also be given its own via the ``_deadline`` argument.
+
+        Usage::
+
+            >>> with session.deadline(2.5):
+            ...     item = table_conn.get_item(table_name='users', key=key)
+            ...     queue_conn.send_message(queue_url=url, message_body=body)
+
+            >>> conn.get_item(table_name='users', key=key, _deadline=0.5)
+
+        :param seconds: How long from now the calls must finish by.
+        :type seconds: float
+
+        :returns: A context manager, giving the ``kotocore.deadlines.Deadline``
+        """
+        return deadline(seconds)
+
     def get_core_service(self, service_name):
         """
         Returns a ``botocore.service.Service``.
@@ -197,3 +861,42 @@ class Session(object):
         :rtype: <botocore.service.Service subclass>
         """
         return self.core_session.get_service(service_name)
+
+
+_default_session = None
+_default_session_lock = threading.Lock()
+
+
+def get_default_session():
+    """
+    Returns the process-wide default ``Session``, creating it on first use.
+
+    This is the session used when rebuilding unpickled classes.
+
+    :rtype: <kotocore.session.Session> instance
+    """
+    global _default_session
+
+    with _default_session_lock:
+        if _default_session is None:
+            _default_session = Session()
+
+        return _default_session
+
+
+def set_default_session(session):
+    """
+    Replaces the process-wide default ``Session``.
+
+    Usage::
+
+        >>> set_default_session(Session(max_workers=32))
+
+    :param session: The session to use. ``None`` resets it, so a fresh one is
+        created on next use.
+    :type session: <kotocore.session.Session> instance
+    """
+    global _default_session
+
+    with _default_session_lock:
+        _default_session = session
@@ -0,0 +1,451 @@
+"""
+Stand-ins for ``botocore`` & the network, with latency & faults injected on
+demand, for exercising ``kotocore``-based code (retries, hedging, breakers,
+limits) offline.
+
+Usage::
+
+    >>> from kotocore.session import Session
+    >>> from kotocore.testing import Bimodal, FaultInjector, fake_connection
+    >>> injector = FaultInjector(
+    ...     latency=Bimodal(0.005, 0.2, slow_share=0.03),
+    ...     errors={'get_object': {'InternalError': 0.01}},
+    ...     qps={'put_object': 100},
+    ...     seed=42
+    ... )
+    >>> session = Session()
+    >>> s3 = fake_connection(session, 's3', injector=injector, responders={
+    ...     'get_object': lambda **kwargs: {'Body': b'data'},
+    ... })
+    >>> s3.get_object(bucket='assets', key='logo.png')
+    {'Body': b'data'}
+    >>> injector.stats()['get_object']['errors']
+    {'InternalError': 1}
+
+"""
+import collections
+import math
+import random
+import threading
+import time
+
+from botocore import xform_name
+
+from kotocore.utils.constants import DEFAULT_REGION
+
+
+class Fixed(object):
+    """
+    The same latency every time.
+    """
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def sample(self, rng):
+        return self.seconds
+
+
+class LogNormal(object):
+    """
+    A long-tailed latency, as most real services show.
+    """
+    def __init__(self, median, sigma=0.5):
+        """
+        :param median: The median latency (in seconds).
+        :type median: float
+
+        :param sigma: (Optional) How heavy the tail is. Default is ``0.5``.
+        :type sigma: float
+        """
+        if median <= 0:
+            raise ValueError("'median' must be positive.")
+
+        self.median = median
+        self.sigma = sigma
+
+    def sample(self, rng):
+        return rng.lognormvariate(math.log(self.median), self.sigma)
+
+
+class Bimodal(object):
+    """
+    Mostly ``fast``, with a ``slow_share`` of requests taking ``slow``
+    instead (as a GC pause or a bad host would make them).
+    """
+    def __init__(self, fast, slow, slow_share=0.05):
+        """
+        :param fast: The usual latency, as seconds or a distribution.
+        :type fast: float
+
+        :param slow: The latency of the slow requests, as seconds or a
+            distribution.
+        :type slow: float
+
+        :param slow_share: (Optional) The share of requests that are slow.
+            Default is ``0.05``.
+        :type slow_share: float
+        """
+        if not 0 <= slow_share <= 1:
+            raise ValueError("'slow_share' must be between 0 & 1.")
+
+        self.fast = as_latency(fast)
+        self.slow = as_latency(slow)
+        self.slow_share = slow_share
+
+    def sample(self, rng):
+        if rng.random() < self.slow_share:
+            return self.slow.sample(rng)
+
+        return self.fast.sample(rng)
+
+
+def as_latency(value):
+    """
+    Returns a latency distribution, given one or a number of seconds.
+    """
+    if hasattr(value, 'sample'):
+        return value
+
+    return Fixed(value)
+
+
+class FaultInjector(object):
+    """
+    Decides how each fake request behaves: how long it takes, & whether it
+    fails or is throttled.
+
+    Every setting is either one value for all operations or a dictionary
+    keyed by operation name (Ex. ``get_object``), where ``None`` is the
+    fallback for unlisted operations.
+
+    Given a ``seed``, the same sequence of requests sees the same latencies
+    & faults on every run. (Requests made from several threads at once
+    still draw in whatever order they arrive.)
+    """
+    def __init__(self, latency=0.0, errors=None, qps=None, seed=None,
+                 throttle_code='Throttling', clock=time.time,
+                 sleep=time.sleep):
+        """
+        Creates a new ``FaultInjector`` instance.
+
+        :param latency: (Optional) How long requests take, as seconds or a
+            distribution (``Fixed``, ``LogNormal``, ``Bimodal`` or anything
+            with a ``sample(rng)`` method). Default is ``0.0``.
+        :type latency: float, distribution or dict
+
+        :param errors: (Optional) Error codes to fail requests with, mapped
+            to the share of requests that get each (or a dictionary of those
+            keyed by operation name). Default is ``None`` (no errors).
+        :type errors: dict
+
+        :param qps: (Optional) The most requests per second served before
+            the rest are throttled. Default is ``None`` (no ceiling).
+        :type qps: float or dict
+
+        :param seed: (Optional) Seeds the random draws, for repeatable runs.
+            Default is ``None``.
+        :type seed: integer
+
+        :param throttle_code: (Optional) The error code for requests over
+            the ``qps`` ceiling. Default is ``Throttling``.
+        :type throttle_code: string
+
+        :param clock: (Optional) Returns the current time in seconds.
+            Default is ``time.time``.
+        :type clock: callable
+
+        :param sleep: (Optional) Waits out the latency. Default is
+            ``time.sleep``.
+        :type sleep: callable
+        """
+        self.latency = self._per_operation(latency, as_latency)
+        self.errors = {None: errors or {}}
+        self.qps = self._per_operation(qps)
+        self.throttle_code = throttle_code
+        self.clock = clock
+        self.sleep = sleep
+        self.random = random.Random(seed)
+        self._served = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+        if errors and all([
+            hasattr(codes, 'items') for codes in errors.values()
+        ]):
+            # Keyed by operation name.
+            self.errors = dict(errors)
+
+    def _per_operation(self, value, convert=None):
+        if hasattr(value, 'items'):
+            settings = dict(value)
+        else:
+            settings = {None: value}
+
+        if convert is not None:
+            settings = dict([
+                (key, convert(setting))
+                for key, setting in settings.items()
+                if setting is not None
+            ])
+
+        return settings
+
+    def _setting(self, settings, operation_name):
+        return settings.get(operation_name, settings.get(None))
+
+    def choose(self, operation_name):
+        """
+        Draws the outcome of a request, without waiting.
+
+        :returns: The latency (in seconds) & the error code to fail with (or
+            ``None``)
+        :rtype: tuple
+        """
+        latency = self._setting(self.latency, operation_name)
+        codes = self._setting(self.errors, operation_name) or {}
+        qps = self._setting(self.qps, operation_name)
+
+        with self._lock:
+            stats = self._stats_for(operation_name)
+            stats['calls'] += 1
+            delay = 0.0
+            code = None
+
+            if latency is not None:
+                delay = max(0.0, latency.sample(self.random))
+
+            if qps is not None and self._over_ceiling(operation_name, qps):
+                code = self.throttle_code
+                stats['throttled'] += 1
+            else:
+                draw = self.random.random()
+
+                for name, rate in sorted(codes.items()):
+                    if draw < rate:
+                        code = name
+                        break
+
+                    draw -= rate
+
+            if code is not None:
+                stats['errors'][code] = stats['errors'].get(code, 0) + 1
+
+            stats['latency_total'] += delay
+            return delay, code
+
+    def call(self, operation_name, respond):
+        """
+        Waits out a request's latency, then answers it with an error or
+        whatever ``respond()`` returns.
+
+        :param respond: Returns the successful ``(http_response, parsed)``
+            tuple.
+        :type respond: callable
+
+        :returns: An ``(http_response, parsed)`` tuple, as ``botocore``
+            gives
+        :rtype: tuple
+        """
+        delay, code = self.choose(operation_name)
+
+        if delay > 0:
+            self.sleep(delay)
+
+        if code is not None:
+            return (None, {'Errors': [{
+                'Code': code,
+                'Message': 'Injected by kotocore.testing.',
+            }]})
+
+        return respond()
+
+    def stats(self):
+        """
+        Returns the stats per operation: the ``calls`` made, how many were
+        ``throttled``, the count of each error code in ``errors`` (throttles
+        included) & the ``latency_total`` (in seconds).
+
+        :rtype: dict
+        """
+        with self._lock:
+            return dict([
+                (name, dict(stats, errors=dict(stats['errors'])))
+                for name, stats in self._stats.items()
+            ])
+
+    def _over_ceiling(self, operation_name, qps):
+        # Called with the lock held. Only requests that were served count
+        # towards the ceiling, over the last second.
+        now = self.clock()
+        served = self._served.get(operation_name)
+
+        if served is None:
+            served = self._served[operation_name] = collections.deque()
+
+        while served and served[0] <= now - 1.0:
+            served.popleft()
+
+        if len(served) >= qps:
+            return True
+
+        served.append(now)
+        return False
+
+    def _stats_for(self, operation_name):
+        # Called with the lock held.
+        if operation_name not in self._stats:
+            self._stats[operation_name] = {
+                'calls': 0,
+                'throttled': 0,
+                'errors': {},
+                'latency_total': 0.0,
+            }
+
+        return self._stats[operation_name]
+
+
+class FakeTransport(object):
+    """
+    Mixed into a ``Connection`` class (see ``fake_connection``) to answer
+    requests from canned ``responders``, rather than the network.
+    """
+    injector = None
+    responders = {}
+
+    def _make_request(self, op_data, service_params):
+        method_name = op_data['method_name']
+
+        def respond():
+            responder = self.responders.get(method_name)
+
+            if responder is None:
+                return (None, {})
+
+            return (None, responder(**service_params))
+
+        if self.injector is None:
+            return respond()
+
+        return self.injector.call(method_name, respond)
+
+    def _make_paged_request(self, op_data, service_params):
+        return iter([self._make_request(op_data, service_params)])
+
+
+def fake_connection(session, service_name, injector=None, responders=None,
+                    region_name=DEFAULT_REGION):
+    """
+    Returns a connection for a real service (introspected as usual), whose
+    requests never leave the process.
+
+    :param session: The session to build the connection class with.
+    :type session: <kotocore.session.Session> instance
+
+    :param service_name: The name of the service. Ex. ``s3``
+    :type service_name: string
+
+    :param injector: (Optional) Adds latency & faults to the requests.
+        Default is ``None`` (instant success).
+    :type injector: <kotocore.testing.FaultInjector> instance
+
+    :param responders: (Optional) Callables keyed by method name (Ex.
+        ``get_object``), called with the prepared parameters & returning the
+        parsed response. Default is ``None`` (empty responses).
+    :type responders: dict
+
+    :param region_name: (Optional) The region to "connect" to.
+    :type region_name: string
+
+    :rtype: <kotocore.connection.Connection> instance
+    """
+    conn_class = session.get_connection(service_name)
+    fake_class = type(
+        'Fake' + conn_class.__name__,
+        (FakeTransport, conn_class),
+        {'injector': injector, 'responders': responders or {}}
+    )
+    return fake_class(region_name=region_name)
+
+
+class FakeParam(object):
+    """
+    Stands in for a ``botocore`` operation parameter.
+    """
+    def __init__(self, name, required=False, ptype='string',
+                 documentation=None):
+        self.name = name
+        self.py_name = xform_name(name)
+        self.required = required
+        self.type = ptype
+        self.documentation = documentation
+
+
+class FakeOperation(object):
+    """
+    Stands in for a ``botocore`` operation, answering every call with
+    ``result`` (after any faults from ``injector``).
+    """
+    def __init__(self, name, docs='', params=None, output=None, result=None,
+                 injector=None):
+        self.name = name
+        self.py_name = xform_name(name)
+        self.documentation = docs
+        self.params = params
+        self.output = output
+        self.result = result
+        self.injector = injector
+
+        if self.params is None:
+            self.params = []
+
+    def call(self, endpoint, **kwargs):
+        if self.injector is None:
+            return self.result
+
+        return self.injector.call(self.py_name, lambda: self.result)
+
+
+class FakeService(object):
+    """
+    Stands in for a ``botocore`` service, made up of ``operations``.
+    """
+    operations = []
+    api_version = 'fake'
+
+    def __init__(self, endpoint=None):
+        self.endpoint = endpoint
+
+        if self.endpoint is None:
+            self.endpoint = FakeEndpoint()
+
+    def get_endpoint(self, region_name=None):
+        if region_name:
+            self.endpoint.region_name = region_name
+
+        return self.endpoint
+
+    def get_operation(self, operation_name):
+        for op in self.operations:
+            if op.name == operation_name:
+                return op
+
+        return None
+
+
+class FakeEndpoint(object):
+    """
+    Stands in for a ``botocore`` endpoint.
+    """
+    def __init__(self, region_name='us-west-1'):
+        self.region_name = region_name
+
+
+class FakeSession(object):
+    """
+    Stands in for a ``botocore`` session, with a single ``service``.
+    """
+    def __init__(self, service):
+        self.service = service
+
+    def get_service(self, service_name):
+        return self.service
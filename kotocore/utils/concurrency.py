@@ -0,0 +1,294 @@
+"""
+Helpers for running calls concurrently on an executor.
+"""
+import collections
+import functools
+import threading
+
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from kotocore.adaptive import check_workers, tracked, worker_limit
+from kotocore.deadlines import carry_deadline
+from kotocore.exceptions import ServerError
+from kotocore.utils.mangle import to_snake_case
+
+
+# Tracks whether the current thread is running work handed out by
+# ``kotocore`` (i.e. it's a thread in the session's pool).
+_worker_state = threading.local()
+
+
+def on_worker_thread():
+    """
+    Returns whether the current thread is running a call submitted by one of
+    the ``kotocore`` fan-out helpers.
+
+    Those helpers run nested work inline when this is ``True``, since
+    queueing it onto the same bounded pool could deadlock once the pool is
+    full.
+
+    :rtype: boolean
+    """
+    return getattr(_worker_state, 'active', False)
+
+
+def run_as_worker(func, *args, **kwargs):
+    """
+    Calls ``func``, flagging the current thread as a worker for the duration
+    (see ``on_worker_thread``).
+
+    :param func: The callable to run.
+    :type func: callable
+
+    :returns: Whatever ``func`` returns
+    """
+    previous = on_worker_thread()
+    _worker_state.active = True
+
+    try:
+        return func(*args, **kwargs)
+    finally:
+        _worker_state.active = previous
+
+
+def describe_call(func):
+    """
+    Works out which service & operation a callable makes a request to.
+
+    Understands the operation methods on ``Connection``, ``Resource`` &
+    ``Collection`` instances, optionally wrapped in ``functools.partial`` or
+    a wrapper exposing ``__wrapped__``.
+
+    Usage::
+
+        >>> describe_call(s3_conn.get_object)
+        ('s3', 'get_object')
+        >>> describe_call(len)
+        (None, None)
+
+    :param func: The callable to describe.
+    :type func: callable
+
+    :returns: A ``(service_name, operation_name)`` tuple, with ``None`` for
+        anything that can't be worked out
+    :rtype: tuple
+    """
+    while True:
+        if isinstance(func, functools.partial):
+            func = func.func
+        elif getattr(func, '__wrapped__', None) is not None:
+            func = func.__wrapped__
+        else:
+            break
+
+    details = getattr(getattr(func, '__self__', None), '_details', None)
+
+    if details is None:
+        return (None, None)
+
+    name = getattr(func, '__name__', None)
+
+    if getattr(details, 'resource_name', None):
+        ops = details.resource_data.get('operations', {})
+    elif getattr(details, 'collection_name', None):
+        ops = details.collection_data.get('operations', {})
+    else:
+        # Connection methods are named after the operations.
+        return (details.service_name, name)
+
+    if not name in ops:
+        return (details.service_name, None)
+
+    return (details.service_name, to_snake_case(ops[name]['api_name']))
+
+
+def submit_as(executor, description, func, *args, **kwargs):
+    """
+    Submits a call to run as a worker (see ``run_as_worker``).
+
+    Priority-aware executors (those with a ``submit_for`` method, like
+    ``kotocore.scheduler.PriorityScheduler``) are told which operation the
+    call makes.
+
+    :param executor: The executor to submit the call to.
+    :type executor: <concurrent.futures.Executor> instance
+
+    :param description: A ``(service_name, operation_name)`` tuple, as
+        returned by ``describe_call``.
+    :type description: tuple
+
+    :param func: The callable to run.
+    :type func: callable
+
+    :returns: A future for the result
+    :rtype: <concurrent.futures.Future> instance
+    """
+    submit_for = getattr(executor, 'submit_for', None)
+
+    if submit_for is None:
+        return executor.submit(run_as_worker, func, *args, **kwargs)
+
+    service_name, operation_name = description
+    return submit_for(
+        service_name,
+        operation_name,
+        run_as_worker,
+        func,
+        *args,
+        **kwargs
+    )
+
+
+def submit_call(executor, func, *args, **kwargs):
+    """
+    Submits a call to run as a worker, described by ``describe_call``.
+
+    :param executor: The executor to submit the call to.
+    :type executor: <concurrent.futures.Executor> instance
+
+    :param func: The callable to run.
+    :type func: callable
+
+    :returns: A future for the result
+    :rtype: <concurrent.futures.Future> instance
+    """
+    return submit_as(executor, describe_call(func), func, *args, **kwargs)
+
+
+def map_calls(executor, func, kwargs_iterable, max_workers, ordered=True,
+              catch=(ServerError,)):
+    """
+    Calls ``func`` once per set of keyword arguments on an executor, yielding
+    the results as they become available.
+
+    At most ``max_workers`` calls are in flight at once, so the iterable is
+    consumed lazily & large inputs don't flood a shared executor.
+
+    Exceptions listed in ``catch`` are yielded in place of a result, rather
+    than aborting the remaining calls. Anything else is raised.
+
+    If called from a call that is itself running on the pool (see
+    ``on_worker_thread``), the calls are made inline, one at a time, rather
+    than risking a deadlock on a full pool.
+
+    Any deadline in effect (see ``kotocore.deadlines``) carries over to the
+    calls.
+
+    Usage::
+
+        >>> for result in map_calls(pool, conn.head_object, kwargs_list, 8):
+        ...     print(result)
+
+    :param executor: The executor to submit the calls to.
+    :type executor: <concurrent.futures.Executor> instance
+
+    :param func: The callable to run.
+    :type func: callable
+
+    :param kwargs_iterable: An iterable of dictionaries, each being the
+        keyword arguments for one call.
+    :type kwargs_iterable: iterable
+
+    :param max_workers: The most calls to have in flight at once, or an
+        ``AdaptiveLimit`` to size the window by.
+    :type max_workers: integer or <kotocore.adaptive.AdaptiveLimit> instance
+
+    :param ordered: (Optional) Whether the results should be yielded in the
+        same order as the input. If ``False``, results are yielded as they
+        complete. Default is ``True``.
+    :type ordered: boolean
+
+    :param catch: (Optional) The exception classes to yield rather than
+        raise. Default is ``(ServerError,)``.
+    :type catch: tuple
+
+    :returns: A generator of results (or caught exceptions)
+    """
+    check_workers(max_workers)
+    func = carry_deadline(func)
+
+    if on_worker_thread():
+        return _map_inline(func, kwargs_iterable, catch)
+
+    return _map_on_executor(
+        executor,
+        func,
+        kwargs_iterable,
+        max_workers,
+        ordered,
+        catch
+    )
+
+
+def _map_inline(func, kwargs_iterable, catch):
+    for kwargs in kwargs_iterable:
+        try:
+            yield func(**kwargs)
+        except catch as err:
+            yield err
+
+
+def _map_on_executor(executor, func, kwargs_iterable, max_workers, ordered,
+                     catch):
+    kwargs_iter = iter(kwargs_iterable)
+    description = describe_call(func)
+    func = tracked(max_workers, func)
+
+    if ordered:
+        pending = collections.deque()
+    else:
+        pending = set()
+
+    def submit_next():
+        try:
+            kwargs = next(kwargs_iter)
+        except StopIteration:
+            return False
+
+        # Bound up front, so that operation parameters can't clash with
+        # the names ``submit_as`` takes.
+        future = submit_as(
+            executor,
+            description,
+            functools.partial(func, **kwargs)
+        )
+
+        if ordered:
+            pending.append(future)
+        else:
+            pending.add(future)
+
+        return True
+
+    def fill():
+        # An adaptive limit may have grown (or shrunk) since the last call.
+        while len(pending) < worker_limit(max_workers):
+            if not submit_next():
+                break
+
+    def outcome(future):
+        try:
+            return future.result()
+        except catch as err:
+            return err
+
+    try:
+        fill()
+
+        while pending:
+            if ordered:
+                # Wait on the head of the line, to keep the input order.
+                done = [pending.popleft()]
+                wait(done)
+            else:
+                done, not_done = wait(pending, return_when=FIRST_COMPLETED)
+                pending.difference_update(done)
+
+            for future in done:
+                # Keep the window full before handing anything back.
+                fill()
+                yield outcome(future)
+    finally:
+        # If the caller bailed early, don't leave queued work behind.
+        for future in pending:
+            future.cancel()
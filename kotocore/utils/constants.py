@@ -12,6 +12,9 @@ USER_AGENT_VERSION = get_version(full=True)
 
 DEFAULT_REGION = 'us-east-1'
 
+# The size of the ``Session``-owned thread pool used for blocking I/O.
+DEFAULT_MAX_WORKERS = 10
+
 DEFAULT_DOCSTRING = """
 Please make an instance of this class to inspect the docstring.
 
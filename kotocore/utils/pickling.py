@@ -0,0 +1,105 @@
+"""
+Pickle support for the classes the factories build on the fly.
+
+Those classes can't be found by import, so they're pickled as a description
+(service, name, API version & base class) & rebuilt on the receiving side
+through the default session's cache.
+"""
+from kotocore.exceptions import APIVersionMismatchError
+from kotocore.utils import six
+from kotocore.utils.import_utils import import_class
+
+
+class BuiltClass(type):
+    """
+    The metaclass for ``Connection``, ``Resource`` & ``Collection``.
+
+    Present only so that their (dynamically built) subclasses can be given a
+    custom pickle reducer.
+    """
+    pass
+
+
+def _find_base(klass):
+    # The first ancestor that isn't a factory-built class.
+    for parent in klass.__mro__[1:]:
+        if not '_details' in parent.__dict__:
+            return parent
+
+    return object
+
+
+def reduce_class(klass):
+    """
+    Pickles a class by reference.
+
+    Importable classes are pickled by name as usual. Factory-built classes are
+    pickled as the arguments to ``rebuild_class``.
+
+    :param klass: The class to pickle
+    :type klass: class
+
+    :returns: Either the class name or a ``(callable, args)`` tuple
+    """
+    details = klass.__dict__.get('_details')
+
+    if details is None:
+        return klass.__name__
+
+    base_class = _find_base(klass)
+    base_classpath = '{0}.{1}'.format(
+        base_class.__module__,
+        base_class.__name__
+    )
+    name = getattr(details, 'resource_name', None)
+
+    if name is None:
+        name = getattr(details, 'collection_name', None)
+
+    return (rebuild_class, (
+        details.service_name,
+        name,
+        details.api_version,
+        base_classpath
+    ))
+
+
+def rebuild_class(service_name, name, api_version, base_classpath):
+    """
+    Looks up (or builds) a class matching a pickled description, via the
+    default session.
+
+    :param service_name: The name of the service. Ex. ``s3``
+    :type service_name: string
+
+    :param name: The name of the ``Resource`` or ``Collection``. ``None`` for
+        a ``Connection``.
+    :type name: string
+
+    :param api_version: The API version the class was built against. Checked
+        against the rebuilt class.
+    :type api_version: string
+
+    :param base_classpath: The import path of the class it was built on. Ex.
+        ``kotocore.resources.Resource``
+    :type base_classpath: string
+
+    :returns: The rebuilt class
+    """
+    from kotocore.session import get_default_session
+    session = get_default_session()
+    base_class = import_class(base_classpath)
+    klass = base_class._from_session(session, service_name, name)
+
+    if klass._details.api_version != api_version:
+        msg = "{0} was pickled for API version {1}, but {2} is in use.".format(
+            klass.__name__,
+            api_version,
+            klass._details.api_version
+        )
+        raise APIVersionMismatchError(msg)
+
+    return klass
+
+
+six.moves.copyreg.pickle(BuiltClass, reduce_class)
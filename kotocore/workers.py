@@ -0,0 +1,389 @@
+"""
+A process pool for CPU-heavy work on responses (big listings, decoding
+DynamoDB items, etc.), which the GIL keeps threads from spreading across
+cores.
+
+Each worker process keeps one warmed ``Session`` for its lifetime. Jobs go
+in as plain descriptions & results come back as plain data.
+"""
+import collections
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from kotocore.deadlines import current_deadline, deadline
+from kotocore.exceptions import ServerError
+from kotocore.resources import Resource
+from kotocore.session import set_default_session
+
+
+# One session per worker process, built by the first chunk it runs.
+_worker_session = None
+
+
+class Job(collections.namedtuple('Job', [
+        'service_name', 'region_name', 'method_name', 'kwargs',
+        'identifiers'])):
+    """
+    Describes a single call for a ``WorkerPool`` to make.
+
+    ``method_name`` is either an operation on the connection (Ex.
+    ``list_objects``) or a ``Class.method`` pair for a ``Resource`` or
+    ``Collection`` (Ex. ``Table.get`` or ``BucketCollection.each``), in
+    which case ``identifiers`` is used to construct the instance.
+
+    Usage::
+
+        >>> Job('s3', 'us-west-2', 'list_objects', {'bucket': 'logs'})
+        >>> Job('s3', 'us-west-2', 'S3Object.get', identifiers={
+        ...     'bucket': 'logs',
+        ...     'key': 'today.log',
+        ... })
+
+    """
+    def __new__(cls, service_name, region_name, method_name, kwargs=None,
+                identifiers=None):
+        return super(Job, cls).__new__(
+            cls,
+            service_name,
+            region_name,
+            method_name,
+            kwargs or {},
+            identifiers or {}
+        )
+
+
+def to_plain(value):
+    """
+    Converts a result into plain (picklable, session-free) data.
+
+    ``Resource`` instances become a dictionary of their instance data.
+
+    :param value: The data to convert
+    :type value: anything
+
+    :returns: The converted data
+    """
+    if isinstance(value, Resource):
+        value = value._data
+
+    if isinstance(value, dict):
+        return dict([(key, to_plain(val)) for key, val in value.items()])
+
+    if isinstance(value, (list, tuple)):
+        return [to_plain(val) for val in value]
+
+    return value
+
+
+def warm_session(session, service_names):
+    """
+    Builds the connection, resource & collection classes for each service,
+    so that the cost is paid up front.
+
+    :param session: The session to warm.
+    :type session: <kotocore.session.Session> instance
+
+    :param service_names: The services to build classes for. Ex.
+        ``['s3', 'dynamodb']``
+    :type service_names: list
+    """
+    for service_name in service_names:
+        session.get_connection(service_name)
+        data = session.resource_factory.loader.load(service_name)
+
+        for resource_name in data.get('resources', {}):
+            session.get_resource(service_name, resource_name)
+
+        for collection_name in data.get('collections', {}):
+            session.get_collection(service_name, collection_name)
+
+
+def run_job(session, job, postprocess=None):
+    """
+    Runs a single ``Job`` against a session.
+
+    :param session: The session to use.
+    :type session: <kotocore.session.Session> instance
+
+    :param job: The job to run.
+    :type job: <kotocore.workers.Job> instance
+
+    :param postprocess: (Optional) A callable to run on the (plain) result
+        before returning it.
+    :type postprocess: callable
+
+    :returns: The plain result data
+    """
+    conn = session.connect_to(job.service_name, region_name=job.region_name)
+
+    if '.' in job.method_name:
+        class_name, method_name = job.method_name.split('.', 1)
+
+        if class_name.endswith('Collection'):
+            klass = session.get_collection(job.service_name, class_name)
+        else:
+            klass = session.get_resource(job.service_name, class_name)
+
+        target = klass(connection=conn, **job.identifiers)
+    else:
+        target, method_name = conn, job.method_name
+
+    result = to_plain(getattr(target, method_name)(**job.kwargs))
+
+    if postprocess is not None:
+        result = postprocess(result)
+
+    return result
+
+
+def _get_worker_session(session_factory, service_names):
+    # Built lazily (rather than by an executor ``initializer``, which older
+    # ``concurrent.futures`` lack), then kept for the life of the process.
+    global _worker_session
+
+    if _worker_session is None:
+        _worker_session = session_factory()
+        # So that pickled resources sent to the worker use the warm classes.
+        set_default_session(_worker_session)
+        warm_session(_worker_session, service_names)
+
+    return _worker_session
+
+
+def _run_chunk(jobs, postprocess=None, session_factory=None,
+               service_names=(), timeout=None):
+    if session_factory is None:
+        session_factory = _default_session_factory
+
+    session = _get_worker_session(session_factory, service_names)
+    results = []
+
+    # The deadline arrives as plain seconds, since the caller's can't be
+    # pickled.
+    with deadline(timeout):
+        for job in jobs:
+            try:
+                results.append(run_job(session, job, postprocess))
+            except ServerError as err:
+                results.append(err)
+
+    return results
+
+
+def _remaining():
+    # How long the deadline in effect (if any) leaves, as plain data.
+    current = current_deadline()
+
+    if current is None:
+        return None
+
+    return current.remaining()
+
+
+def _default_session_factory():
+    from kotocore.session import Session
+    return Session()
+
+
+class WorkerPool(object):
+    """
+    Runs ``Job`` descriptions across a pool of processes, each with its own
+    warmed ``Session``.
+
+    Usage::
+
+        >>> jobs = [
+        ...     Job('dynamodb', 'us-east-1', 'scan', {
+        ...         'table_name': 'events',
+        ...         'segment': i,
+        ...         'total_segments': 16,
+        ...     })
+        ...     for i in range(16)
+        ... ]
+        >>> with WorkerPool(services=['dynamodb']) as pool:
+        ...     for items in pool.map(jobs, postprocess=decode_items):
+        ...         handle(items)
+
+    """
+    def __init__(self, processes=None, services=None, session_factory=None,
+                 max_in_flight=None):
+        """
+        Creates a new ``WorkerPool`` instance.
+
+        :param processes: (Optional) The number of worker processes. Default
+            is the number of CPUs.
+        :type processes: integer
+
+        :param services: (Optional) The services to build classes for when
+            each worker starts. Ex. ``['s3', 'dynamodb']``
+        :type services: list
+
+        :param session_factory: (Optional) A picklable callable that returns
+            the ``Session`` each worker should use. Default is a plain
+            ``Session()``.
+        :type session_factory: callable
+
+        :param max_in_flight: (Optional) The most chunks to have queued or
+            running at once. Default is twice the number of processes.
+        :type max_in_flight: integer
+        """
+        if session_factory is None:
+            session_factory = _default_session_factory
+
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+
+        if processes < 1:
+            raise ValueError("'processes' must be at least 1.")
+
+        self.services = list(services or [])
+        self.session_factory = session_factory
+        self.processes = processes
+        self.executor = ProcessPoolExecutor(max_workers=self.processes)
+        self.max_in_flight = max_in_flight or self.processes * 2
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def close(self):
+        """
+        Shuts down the worker processes, waiting for queued work to finish.
+        """
+        self.executor.shutdown(wait=True)
+
+    def submit(self, job, postprocess=None):
+        """
+        Runs a single job in a worker.
+
+        :param job: The job to run.
+        :type job: <kotocore.workers.Job> instance
+
+        :param postprocess: (Optional) A picklable callable to run on the
+            result within the worker.
+        :type postprocess: callable
+
+        :returns: A ``Future`` for the plain result (or a ``ServerError``)
+        :rtype: <concurrent.futures.Future> instance
+        """
+        future = self._submit_chunk([job], postprocess)
+        result = future.__class__()
+
+        def unwrap(done):
+            if done.exception() is not None:
+                result.set_exception(done.exception())
+            else:
+                result.set_result(done.result()[0])
+
+        future.add_done_callback(unwrap)
+        return result
+
+    def map(self, jobs, chunksize=1, postprocess=None, ordered=True):
+        """
+        Runs many jobs across the workers, yielding the plain results.
+
+        Jobs are sent to the workers in chunks (to cut down on IPC overhead)
+        & the input is consumed lazily, with at most ``max_in_flight`` chunks
+        outstanding. A ``ServerError`` from any job is yielded in place of
+        its result.
+
+        :param jobs: The jobs to run.
+        :type jobs: iterable
+
+        :param chunksize: (Optional) The number of jobs sent to a worker at
+            once. Default is ``1``.
+        :type chunksize: integer
+
+        :param postprocess: (Optional) A picklable callable to run on each
+            result within the worker.
+        :type postprocess: callable
+
+        :param ordered: (Optional) Whether results should come back in the
+            same order as the jobs. Default is ``True``.
+        :type ordered: boolean
+
+        :returns: A generator of plain results (or ``ServerError`` instances)
+        """
+        if chunksize < 1:
+            raise ValueError("'chunksize' must be at least 1.")
+
+        # Not ``map_calls``, which runs inline on a worker thread (where
+        # there's no worker session) & wraps calls in closures that can't
+        # be pickled.
+        chunks = _chunked(jobs, chunksize)
+
+        if ordered:
+            pending = collections.deque()
+        else:
+            pending = set()
+
+        def fill():
+            while len(pending) < self.max_in_flight:
+                chunk = next(chunks, None)
+
+                if chunk is None:
+                    break
+
+                future = self._submit_chunk(chunk, postprocess)
+
+                if ordered:
+                    pending.append(future)
+                else:
+                    pending.add(future)
+
+        try:
+            fill()
+
+            while pending:
+                if ordered:
+                    done = [pending.popleft()]
+                    wait(done)
+                else:
+                    done, not_done = wait(
+                        pending,
+                        return_when=FIRST_COMPLETED
+                    )
+                    pending.difference_update(done)
+
+                for future in done:
+                    fill()
+
+                    try:
+                        chunk_results = future.result()
+                    except ServerError as err:
+                        yield err
+                        continue
+
+                    for result in chunk_results:
+                        yield result
+        finally:
+            # If the caller bailed early, don't leave queued work behind.
+            for future in pending:
+                future.cancel()
+
+    def _submit_chunk(self, jobs, postprocess=None):
+        return self.executor.submit(
+            _run_chunk,
+            jobs,
+            postprocess,
+            self.session_factory,
+            self.services,
+            _remaining()
+        )
+
+
+def _chunked(iterable, size):
+    chunk = []
+
+    for item in iterable:
+        chunk.append(item)
+
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
@@ -20,6 +20,9 @@ packages = [
     'kotocore.utils',
 ]
 
+if sys.version_info[0] >= 3:
+    packages.append('kotocore.aio')
+
 requires = [
     'botocore==0.63.0',
     'six>=1.4.0',
@@ -28,6 +31,9 @@ requires = [
     'bcdoc==0.12.2',
 ]
 
+if sys.version_info[0] < 3:
+    requires.append('futures>=2.1.3')
+
 setup(
     name='kotocore',
     version=kotocore.get_version(),
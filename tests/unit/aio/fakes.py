@@ -0,0 +1,11 @@
+# Helpers shared by the ``asyncio`` tests.
+import asyncio
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
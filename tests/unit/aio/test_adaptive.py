@@ -0,0 +1,91 @@
+import asyncio
+
+from kotocore.adaptive import AdaptiveLimit
+from kotocore.aio.adaptive import tracked_coroutine
+from kotocore.aio.concurrency import map_coroutines
+from kotocore.exceptions import ServerError
+from kotocore.retries import RetryPolicy
+from kotocore.session import Session
+
+from tests import unittest
+from tests.unit.aio.fakes import run
+from tests.unit.fakes import FakeSession, CappedOperation, flaky_service
+
+
+class TrackedCoroutineTestCase(unittest.TestCase):
+    def test_passthrough(self):
+        async def func():
+            return 1
+
+        self.assertTrue(tracked_coroutine(4, func) is func)
+
+    def test_feeds_the_limit(self):
+        limit = AdaptiveLimit(initial=2)
+
+        async def fail():
+            raise ServerError(code='Throttling', message='Slow down.')
+
+        with self.assertRaises(ServerError):
+            run(tracked_coroutine(limit, fail)())
+
+        self.assertEqual(limit.current, 1)
+        self.assertEqual(limit.stats()['throttled'], 1)
+
+
+class MapCoroutinesTestCase(unittest.TestCase):
+    def test_window_follows_the_limit(self):
+        limit = AdaptiveLimit(initial=1, maximum=4)
+        in_flight = []
+        most = []
+
+        async def func(value):
+            in_flight.append(value)
+            most.append(len(in_flight))
+            await asyncio.sleep(0.001)
+            in_flight.remove(value)
+            return value
+
+        async def main():
+            return [
+                result async for result in map_coroutines(
+                    func,
+                    [{'value': i} for i in range(30)],
+                    limit
+                )
+            ]
+
+        self.assertEqual(run(main()), list(range(30)))
+        self.assertEqual(limit.current, 4)
+        self.assertEqual(max(most), 4)
+
+    def test_capacity_ceiling(self):
+        op = CappedOperation('ListQueues', 4, output=True, result=(None, {}))
+        session = Session(
+            FakeSession(flaky_service(op)),
+            max_workers=16,
+            retry_policy=RetryPolicy(max_attempts=1)
+        )
+        conn = session.connect_to_async('sqs', region_name='us-west-2')
+        limit = AdaptiveLimit(initial=1, maximum=16)
+
+        async def main():
+            return [
+                result async for result in conn.map(
+                    'list_queues',
+                    [{}] * 200,
+                    max_workers=limit
+                )
+            ]
+
+        try:
+            results = run(main())
+        finally:
+            session.close()
+
+        throttled = [
+            result for result in results if isinstance(result, ServerError)
+        ]
+        stats = limit.stats()
+        self.assertTrue(stats['decreases'] >= 1)
+        self.assertTrue(stats['highest'] <= 8)
+        self.assertTrue(len(throttled) < 30)
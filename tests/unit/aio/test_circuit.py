@@ -0,0 +1,95 @@
+import asyncio
+
+from kotocore.aio.circuit import guarded_call
+from kotocore.circuit import CLOSED, HALF_OPEN, OPEN, CircuitBreakers
+from kotocore.exceptions import CircuitOpenError, ServerError
+from kotocore.retries import RetryPolicy
+from kotocore.session import Session
+
+from tests import unittest
+from tests.unit.aio.fakes import run
+from tests.unit.fakes import (
+    FakeSession, FakeClock, FlakyOperation, flaky_service
+)
+
+
+class GuardedCallTestCase(unittest.TestCase):
+    def setUp(self):
+        super(GuardedCallTestCase, self).setUp()
+        self.clock = FakeClock()
+        self.breakers = CircuitBreakers(
+            failure_threshold=1,
+            reset_timeout=10,
+            clock=self.clock
+        )
+        self.breaker = self.breakers.breaker_for('sqs', 'us-east-1')
+
+    def guarded(self, func):
+        return guarded_call(self.breakers, 'sqs', 'us-east-1', func)
+
+    def test_failures_open_it(self):
+        async def fail():
+            raise ServerError(code='ServiceUnavailable', message='Down.')
+
+        async def ok():
+            return 'ok'
+
+        with self.assertRaises(ServerError):
+            run(self.guarded(fail))
+
+        with self.assertRaises(CircuitOpenError):
+            run(self.guarded(ok))
+
+        self.assertEqual(self.breaker.state, OPEN)
+
+    def test_cancelled_probe_frees_its_slot(self):
+        self.breaker.before_call()
+        self.breaker.failed()
+        self.clock.now += 10
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+
+        async def hang():
+            await asyncio.sleep(10)
+
+        async def main():
+            task = asyncio.ensure_future(self.guarded(hang))
+            await asyncio.sleep(0.01)
+            task.cancel()
+
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+            async def ok():
+                return 'ok'
+
+            return await self.guarded(ok)
+
+        self.assertEqual(run(main()), 'ok')
+        self.assertEqual(self.breaker.state, CLOSED)
+
+
+class AsyncConnectionCircuitTestCase(unittest.TestCase):
+    def test_fails_fast(self):
+        op = FlakyOperation(
+            'ListQueues',
+            ['InternalError'] * 5,
+            output=True,
+            result=(None, {})
+        )
+        session = Session(
+            FakeSession(flaky_service(op)),
+            retry_policy=RetryPolicy(max_attempts=1),
+            circuit_breakers=CircuitBreakers(failure_threshold=2)
+        )
+        conn = session.connect_to_async('sqs', region_name='us-west-2')
+
+        async def main():
+            for i in range(2):
+                with self.assertRaises(ServerError):
+                    await conn.list_queues()
+
+            with self.assertRaises(CircuitOpenError):
+                await conn.list_queues()
+
+        run(main())
+        self.assertEqual(op.calls, 2)
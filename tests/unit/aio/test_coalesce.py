@@ -0,0 +1,125 @@
+import asyncio
+
+from kotocore.aio.coalesce import coalesced_call
+from kotocore.coalesce import Coalescer
+from kotocore.exceptions import ServerError
+from kotocore.session import Session
+
+from tests import unittest
+from tests.unit.aio.fakes import run
+from tests.unit.fakes import (
+    FakeParam, FakeSession, LatencyOperation, Uncopyable,
+    flaky_service
+)
+
+
+class CoalescedCallTestCase(unittest.TestCase):
+    def setUp(self):
+        super(CoalescedCallTestCase, self).setUp()
+        self.coalescer = Coalescer()
+        self.key = self.coalescer.key_for('s3', 'us-east-1', 'head_bucket', {
+            'bucket': 'photos',
+        })
+        self.calls = []
+
+    def slow(self, result=None, error=None):
+        async def func():
+            self.calls.append(1)
+            await asyncio.sleep(0.02)
+
+            if error is not None:
+                raise error
+
+            return result
+
+        return func
+
+    def call(self, func):
+        return coalesced_call(
+            self.coalescer,
+            's3',
+            'head_bucket',
+            self.key,
+            func
+        )
+
+    def test_shared(self):
+        async def main():
+            return await asyncio.gather(*[
+                self.call(self.slow(result={'ok': True})) for i in range(5)
+            ])
+
+        results = run(main())
+        self.assertEqual(results, [{'ok': True}] * 5)
+        self.assertEqual(len(self.calls), 1)
+        self.assertFalse(results[0] is results[1])
+        stats = self.coalescer.stats()['s3']['head_bucket']
+        self.assertEqual(stats['coalesced'], 4)
+        self.assertEqual(stats['ratio'], 0.8)
+
+    def test_errors_are_shared(self):
+        error = ServerError(code='NoSuchBucket', message='Nope.')
+
+        async def main():
+            return await asyncio.gather(*[
+                self.call(self.slow(error=error)) for i in range(3)
+            ], return_exceptions=True)
+
+        self.assertEqual(run(main()), [error] * 3)
+        self.assertEqual(len(self.calls), 1)
+
+    def test_uncopyable_result(self):
+        body = Uncopyable()
+
+        async def main():
+            return await asyncio.gather(*[
+                self.call(self.slow(result=body)) for i in range(2)
+            ], return_exceptions=True)
+
+        leader, follower = run(main())
+        self.assertTrue(leader is body)
+        self.assertTrue(isinstance(follower, TypeError))
+
+    def test_cancelling_the_leader(self):
+        async def main():
+            leader = asyncio.ensure_future(self.call(self.slow(result=1)))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(self.call(self.slow(result=2)))
+            await asyncio.sleep(0)
+            leader.cancel()
+            return await follower
+
+        # The request carries on for the others.
+        self.assertEqual(run(main()), 1)
+        self.assertEqual(len(self.calls), 1)
+
+
+class AsyncConnectionCoalescingTestCase(unittest.TestCase):
+    def test_identical_calls(self):
+        op = LatencyOperation(
+            'GetQueueUrl',
+            delay=0.05,
+            params=[FakeParam('QueueName', required=True)],
+            output=True,
+            result=(None, {'QueueUrl': 'http://example.com'})
+        )
+        coalescer = Coalescer()
+        session = Session(FakeSession(flaky_service(op)), coalescer=coalescer)
+        conn = session.connect_to_async('sqs', region_name='us-west-2')
+
+        async def main():
+            return await asyncio.gather(*[
+                conn.get_queue_url(queue_name=name)
+                for name in ['jobs'] * 6 + ['other']
+            ])
+
+        try:
+            results = run(main())
+        finally:
+            session.close()
+
+        self.assertEqual(len(results), 7)
+        self.assertEqual(op.calls, 2)
+        stats = coalescer.stats()['sqs']['get_queue_url']
+        self.assertEqual(stats['requests'], 2)
+        self.assertEqual(stats['coalesced'], 5)
@@ -0,0 +1,251 @@
+import asyncio
+import os
+import threading
+
+from kotocore.aio.collections import AsyncCollection, AsyncCollectionFactory
+from kotocore.aio.resources import AsyncResource, AsyncResourceFactory
+from kotocore.exceptions import NoSuchMethod, ServerError
+from kotocore.loader import ResourceJSONLoader
+from kotocore.session import Session
+
+from tests import unittest
+from tests.unit.aio.fakes import run
+from tests.unit.fakes import FakeParam, FakeOperation, FakeService, FakeSession
+
+
+class PagedOperation(FakeOperation):
+    can_paginate = True
+
+    def __init__(self, *args, **kwargs):
+        self.pages = kwargs.pop('pages', [])
+        super(PagedOperation, self).__init__(*args, **kwargs)
+        self.fetched = 0
+        self.fetched_event = threading.Event()
+
+    def paginate(self, endpoint, **kwargs):
+        return FakePageIterator(self)
+
+
+class FakePageIterator(object):
+    # Like ``botocore.paginate.PageIterator``, this is iterable but is
+    # **NOT** an iterator itself (no ``__next__``).
+    def __init__(self, operation):
+        self.operation = operation
+
+    def __iter__(self):
+        for page in self.operation.pages:
+            self.operation.fetched += 1
+            self.operation.fetched_event.set()
+            yield (None, page)
+
+
+LIST_PIPELINES = PagedOperation(
+    'ListPipelines',
+    " <p>Lists the pipelines.</p>\n ",
+    params=[
+        FakeParam('PageToken', required=False, ptype='string'),
+    ],
+    output=True,
+    pages=[
+        {
+            'Pipelines': [
+                {'Id': '1872baf45', 'Title': 'A pipe'},
+                {'Id': '91646aee7', 'Title': 'Another pipe'},
+            ],
+            'NextPageToken': 'abc',
+        },
+        {
+            'Pipelines': [
+                {'Id': '7a9c3d9e1', 'Title': 'Third pipe'},
+            ],
+            'NextPageToken': 'def',
+        },
+        {
+            'Pipelines': [],
+        },
+    ]
+)
+
+
+class TestCoreService(FakeService):
+    api_version = '2013-11-27'
+    operations = [
+        FakeOperation(
+            'CreatePipeline',
+            " <p>Creates a pipeline.</p>\n ",
+            params=[
+                FakeParam('Name', required=True, ptype='string'),
+            ],
+            output=True,
+            result=(None, {
+                'Pipeline': {
+                    'Id': '1872baf45',
+                    'Name': 'A pipe',
+                },
+            })
+        ),
+        FakeOperation(
+            'ListPresets',
+            " <p>Lists the presets.</p>\n ",
+            params=[],
+            output=True,
+            result=(None, {
+                'Errors': {
+                    'Code': 'AccessDenied',
+                    'Message': 'Nope.',
+                },
+            })
+        ),
+        LIST_PIPELINES,
+    ]
+
+
+# The rest of the operations the test ResourceJSON refers to, so that the
+# docstrings can be found on the connection.
+TestCoreService.operations = TestCoreService.operations + [
+    FakeOperation(api_name, params=[], output=True, result=(None, {}))
+    for api_name in [
+        'CancelJob', 'CreateJob', 'CreatePipeline', 'CreatePreset',
+        'DeletePipeline', 'DeletePreset', 'ListJobsByPipeline',
+        'ListJobsByStatus', 'ListPipelines', 'ListPresets', 'ReadJob',
+        'ReadPipeline', 'ReadPreset', 'TestRole', 'UpdatePipeline',
+        'UpdatePipelineNotifications', 'UpdatePipelineStatus',
+    ]
+    if not api_name in [op.name for op in TestCoreService.operations]
+]
+
+class AsyncCollectionTestCase(unittest.TestCase):
+    def setUp(self):
+        super(AsyncCollectionTestCase, self).setUp()
+        self.test_dirs = [
+            os.path.join(os.path.dirname(os.path.dirname(__file__)), 'test_data')
+        ]
+        self.test_loader = ResourceJSONLoader(self.test_dirs)
+        self.session = Session(FakeSession(TestCoreService()))
+        self.session.async_resource_factory = AsyncResourceFactory(
+            session=self.session,
+            loader=self.test_loader
+        )
+        self.session.async_collection_factory = AsyncCollectionFactory(
+            session=self.session,
+            loader=self.test_loader
+        )
+        self.PipelineCollection = self.session.get_async_collection(
+            'test',
+            'PipelineCollection'
+        )
+        LIST_PIPELINES.fetched = 0
+        LIST_PIPELINES.fetched_event.clear()
+
+    def test_construct_for(self):
+        self.assertTrue(issubclass(self.PipelineCollection, AsyncCollection))
+        self.assertTrue(
+            asyncio.iscoroutinefunction(self.PipelineCollection.create)
+        )
+
+    def test_create(self):
+        coll = self.PipelineCollection()
+        pipe = run(coll.create(name='A pipe'))
+        self.assertTrue(isinstance(pipe, AsyncResource))
+        self.assertEqual(pipe.id, '1872baf45')
+
+    def test_async_for(self):
+        coll = self.PipelineCollection()
+
+        async def consume():
+            return [pipe async for pipe in coll]
+
+        pipes = run(consume())
+        self.assertEqual([pipe.id for pipe in pipes], [
+            '1872baf45',
+            '91646aee7',
+            '7a9c3d9e1',
+        ])
+        self.assertTrue(all(isinstance(pipe, AsyncResource) for pipe in pipes))
+        self.assertEqual(pipes[1].title, 'Another pipe')
+
+    def test_prefetches_next_page(self):
+        coll = self.PipelineCollection()
+
+        async def consume_first():
+            async for pipe in coll:
+                # Give the executor a moment to grab the next page, while
+                # we're still working on the first.
+                for i in range(50):
+                    if LIST_PIPELINES.fetched >= 2:
+                        break
+
+                    await asyncio.sleep(0.01)
+
+                return pipe
+
+        pipe = run(consume_first())
+        self.assertEqual(pipe.id, '1872baf45')
+        self.assertEqual(LIST_PIPELINES.fetched, 2)
+
+    def test_map_resources(self):
+        coll = self.PipelineCollection()
+
+        async def mapped():
+            return [
+                result async for result in
+                coll.map_resources('delete', max_workers=2)
+            ]
+
+        # One call per resource across all the pages, in order.
+        self.assertEqual(run(mapped()), [{}, {}, {}])
+
+    def test_map_resources_streams(self):
+        coll = self.PipelineCollection()
+
+        async def first():
+            mapped = coll.map_resources('delete', max_workers=1)
+
+            async for result in mapped:
+                await mapped.aclose()
+                return result
+
+        # Mapping starts before the last page is fetched.
+        self.assertEqual(run(first()), {})
+        self.assertTrue(LIST_PIPELINES.fetched < len(LIST_PIPELINES.pages))
+
+    def test_sync_iteration(self):
+        coll = self.PipelineCollection()
+
+        with self.assertRaises(TypeError):
+            iter(coll)
+
+    def test_stop_early(self):
+        coll = self.PipelineCollection()
+
+        async def consume_first():
+            async for pipe in coll:
+                # Let the prefetch land before bailing out.
+                await asyncio.sleep(0.05)
+                return pipe
+
+        pipe = run(consume_first())
+        self.assertEqual(pipe.id, '1872baf45')
+
+    def test_iterate_errors(self):
+        PresetCollection = self.session.get_async_collection(
+            'test',
+            'PresetCollection'
+        )
+        coll = PresetCollection()
+
+        async def consume():
+            return [preset async for preset in coll]
+
+        with self.assertRaises(ServerError):
+            run(consume())
+
+        async def consume_missing():
+            return [pipe async for pipe in coll.iterate('nope')]
+
+        with self.assertRaises(NoSuchMethod):
+            run(consume_missing())
+
+
+if __name__ == "__main__":
+    unittest.main()
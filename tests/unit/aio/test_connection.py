@@ -0,0 +1,259 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+from kotocore.aio.connection import AsyncConnection, AsyncConnectionFactory
+from kotocore.exceptions import NoSuchMethod, ServerError
+from kotocore.retries import RetryPolicy
+from kotocore.session import Session
+
+from tests import unittest
+from tests.unit.aio.fakes import run
+from tests.unit.fakes import (
+    FakeParam, FakeOperation, FakeService, FakeSession, FlakyOperation,
+    flaky_service
+)
+
+
+class SlowOperation(FakeOperation):
+    delay = 0.1
+    lock = threading.Lock()
+    in_flight = 0
+    most_in_flight = 0
+
+    def call(self, endpoint, **kwargs):
+        cls = self.__class__
+
+        with cls.lock:
+            cls.in_flight += 1
+            cls.most_in_flight = max(cls.most_in_flight, cls.in_flight)
+
+        try:
+            time.sleep(self.delay)
+            return super(SlowOperation, self).call(endpoint, **kwargs)
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+
+class TestCoreService(FakeService):
+    api_version = '2013-08-23'
+    operations = [
+        FakeOperation(
+            'CreateQueue',
+            " <p>Creates a queue.</p>\n ",
+            params=[
+                FakeParam('QueueName', required=True, ptype='string'),
+                FakeParam('Attributes', required=False, ptype='map'),
+            ],
+            output=True,
+            result=(None, {
+                'QueueUrl': 'http://example.com',
+            })
+        ),
+        FakeOperation(
+            'DeleteQueue',
+            " <p>Deletes a queue.</p>\n ",
+            params=[
+                FakeParam('QueueName', required=True, ptype='string'),
+            ],
+            output=True,
+            result=(None, {
+                'Errors': {
+                    'Code': 'AWS.SimpleQueueService.NonExistentQueue',
+                    'Message': 'The queue does not exist.',
+                },
+            })
+        ),
+        SlowOperation(
+            'GetQueueUrl',
+            " <p>Gets a queue's URL.</p>\n ",
+            params=[
+                FakeParam('QueueName', required=True, ptype='string'),
+            ],
+            output=True,
+            result=(None, {
+                'QueueUrl': 'http://example.com',
+            })
+        ),
+    ]
+
+
+class AsyncConnectionFactoryTestCase(unittest.TestCase):
+    def setUp(self):
+        super(AsyncConnectionFactoryTestCase, self).setUp()
+        self.session = Session(FakeSession(TestCoreService()), max_workers=4)
+        self.acf = AsyncConnectionFactory(session=self.session)
+        self.test_service_class = self.acf.construct_for('test')
+
+    def test_construct_for(self):
+        self.assertEqual(self.test_service_class.__name__, 'TestAsyncConnection')
+        self.assertTrue(issubclass(self.test_service_class, AsyncConnection))
+        self.assertTrue(
+            asyncio.iscoroutinefunction(self.test_service_class.create_queue)
+        )
+        self.assertTrue(
+            ':param queue_name:' in self.test_service_class.create_queue.__doc__
+        )
+
+    def test_call(self):
+        conn = self.test_service_class()
+        self.assertEqual(run(conn.create_queue(queue_name='boo')), {
+            'QueueUrl': 'http://example.com'
+        })
+
+    def test_call_missing_params(self):
+        conn = self.test_service_class()
+
+        with self.assertRaises(TypeError):
+            run(conn.create_queue())
+
+    def test_call_errors(self):
+        conn = self.test_service_class()
+
+        with self.assertRaises(ServerError) as cm:
+            run(conn.delete_queue(queue_name='boo'))
+
+        self.assertEqual(
+            cm.exception.code,
+            'AWS.SimpleQueueService.NonExistentQueue'
+        )
+
+    def test_executor(self):
+        # Defaults to the session's pool.
+        conn = self.test_service_class()
+        self.assertTrue(conn.executor is self.session.get_executor())
+
+        custom = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(custom.shutdown)
+        conn = self.test_service_class(executor=custom)
+        self.assertTrue(conn.executor is custom)
+
+    def test_concurrency_scales_with_pool(self):
+        conn = self.test_service_class()
+        SlowOperation.in_flight = 0
+        SlowOperation.most_in_flight = 0
+
+        async def fan_out():
+            return await asyncio.gather(*[
+                conn.get_queue_url(queue_name='q{0}'.format(i))
+                for i in range(4)
+            ])
+
+        results = run(fan_out())
+        self.assertEqual(len(results), 4)
+        # Four calls on a pool of four should overlap, not serialize.
+        self.assertEqual(SlowOperation.most_in_flight, 4)
+
+    def test_map(self):
+        conn = self.test_service_class()
+
+        async def mapped(method_name, kwargs, **map_kwargs):
+            return [
+                result async for result in
+                conn.map(method_name, kwargs, **map_kwargs)
+            ]
+
+        results = run(mapped('create_queue', [
+            {'queue_name': 'one'},
+            {'queue_name': 'two'},
+        ], max_workers=2))
+        self.assertEqual(results, [
+            {'QueueUrl': 'http://example.com'},
+            {'QueueUrl': 'http://example.com'},
+        ])
+
+        # ``ServerError`` is yielded, not raised.
+        results = run(mapped('delete_queue', [{'queue_name': 'one'}]))
+        self.assertTrue(isinstance(results[0], ServerError))
+
+        with self.assertRaises(NoSuchMethod):
+            conn.map('nope', [])
+
+
+class AsyncRetryTestCase(unittest.TestCase):
+    def test_retries(self):
+        op = FlakyOperation(
+            'ListQueues',
+            ['Throttling', 'InternalError'],
+            output=True,
+            result=(None, {'QueueUrls': []})
+        )
+        policy = RetryPolicy(base_delay=0.001)
+        session = Session(
+            FakeSession(flaky_service(op)),
+            retry_policy=policy
+        )
+        conn = session.connect_to_async('sqs')
+        self.assertEqual(run(conn.list_queues()), {'QueueUrls': []})
+        self.assertEqual(op.calls, 3)
+        stats = policy.stats()['sqs']['list_queues']
+        self.assertEqual(stats['retries'], 2)
+        self.assertEqual(stats['successes'], 1)
+
+    def test_gives_up(self):
+        op = FlakyOperation(
+            'ListQueues',
+            ['AccessDenied'],
+            output=True,
+            result=(None, {})
+        )
+        session = Session(FakeSession(flaky_service(op)))
+        conn = session.connect_to_async('sqs')
+
+        with self.assertRaises(ServerError):
+            run(conn.list_queues())
+
+        self.assertEqual(op.calls, 1)
+
+
+class AsyncRateLimitTestCase(unittest.TestCase):
+    def test_waits_on_the_loop(self):
+        op = FakeOperation('ListQueues', output=True, result=(None, {}))
+        session = Session(
+            FakeSession(flaky_service(op)),
+            rate_limiter={'sqs': 20}
+        )
+        conn = session.connect_to_async('sqs')
+        ticks = []
+
+        async def ticker():
+            # Keeps running while the calls wait, so the loop isn't blocked.
+            for i in range(5):
+                ticks.append(i)
+                await asyncio.sleep(0.01)
+
+        async def main():
+            start = time.time()
+            await asyncio.gather(
+                ticker(),
+                *[conn.list_queues() for i in range(4)]
+            )
+            return time.time() - start
+
+        self.assertTrue(run(main()) >= 0.14)
+        self.assertEqual(ticks, [0, 1, 2, 3, 4])
+        stats = session.rate_limiter.stats()[('sqs', None, None)]
+        self.assertEqual(stats['acquired'], 4)
+        self.assertEqual(stats['waited'], 3)
+
+
+class SessionAsyncTestCase(unittest.TestCase):
+    def test_connect_to_async(self):
+        session = Session(FakeSession(TestCoreService()))
+        conn = session.connect_to_async('test', region_name='us-west-2')
+        self.assertEqual(conn.__class__.__name__, 'TestAsyncConnection')
+        self.assertEqual(conn.region_name, 'us-west-2')
+        # The class is cached separately from the sync one.
+        self.assertTrue(
+            session.get_async_connection('test') is conn.__class__
+        )
+        self.assertNotEqual(
+            session.get_connection('test').__name__,
+            'TestAsyncConnection'
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import asyncio
+
+from kotocore.aio.deadlines import within_deadline
+from kotocore.deadlines import Deadline
+from kotocore.exceptions import DeadlineExceeded
+from kotocore.session import Session
+
+from tests import unittest
+from tests.unit.aio.fakes import run
+from tests.unit.fakes import FakeSession, LatencyOperation, flaky_service
+
+
+class WithinDeadlineTestCase(unittest.TestCase):
+    def test_cancels_at_the_deadline(self):
+        cancelled = []
+
+        async def slow():
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        with self.assertRaises(DeadlineExceeded):
+            run(within_deadline(Deadline(0.02), slow()))
+
+        self.assertEqual(cancelled, [True])
+
+    def test_in_time(self):
+        async def quick():
+            await asyncio.sleep(0.001)
+            return 'done'
+
+        self.assertEqual(run(within_deadline(Deadline(1), quick())), 'done')
+
+    def test_other_timeouts_pass_through(self):
+        async def timing_out():
+            raise asyncio.TimeoutError()
+
+        with self.assertRaises(asyncio.TimeoutError):
+            run(within_deadline(Deadline(1), timing_out()))
+
+
+class AsyncConnectionDeadlineTestCase(unittest.TestCase):
+    def setUp(self):
+        super(AsyncConnectionDeadlineTestCase, self).setUp()
+        self.op = LatencyOperation(
+            'ListQueues',
+            delays=[0.3],
+            output=True,
+            result=(None, {})
+        )
+        self.session = Session(FakeSession(flaky_service(self.op)))
+        self.conn = self.session.connect_to_async(
+            'sqs',
+            region_name='us-west-2'
+        )
+
+    def tearDown(self):
+        self.session.close()
+        super(AsyncConnectionDeadlineTestCase, self).tearDown()
+
+    def timed(self, coro):
+        async def main():
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+
+            with self.assertRaises(DeadlineExceeded):
+                await coro()
+
+            return loop.time() - start
+
+        return run(main())
+
+    def test_per_call_deadline(self):
+        elapsed = self.timed(lambda: self.conn.list_queues(_deadline=0.05))
+        self.assertTrue(elapsed < 0.25)
+
+    def test_session_deadline(self):
+        async def call():
+            with self.session.deadline(0.05):
+                await self.conn.list_queues()
+
+        self.assertTrue(self.timed(call) < 0.25)
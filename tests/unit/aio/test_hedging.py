@@ -0,0 +1,103 @@
+import asyncio
+
+from kotocore.aio.hedging import hedged_call
+from kotocore.exceptions import ServerError
+from kotocore.hedging import HedgingPolicy
+from kotocore.session import Session
+
+from tests import unittest
+from tests.unit.aio.fakes import run
+from tests.unit.fakes import (
+    FakeSession, LatencyOperation, flaky_service, warmed_up
+)
+
+
+class HedgedCallTestCase(unittest.TestCase):
+    def setUp(self):
+        super(HedgedCallTestCase, self).setUp()
+        self.policy = warmed_up(HedgingPolicy(min_samples=5, max_ratio=0.5))
+        self.started = []
+        self.cancelled = []
+
+    def scripted(self, *delays):
+        delays = list(delays)
+
+        async def func():
+            call = len(self.started) + 1
+            self.started.append(call)
+
+            try:
+                await asyncio.sleep(delays.pop(0) if delays else 0.001)
+            except asyncio.CancelledError:
+                self.cancelled.append(call)
+                raise
+
+            return call
+
+        return func
+
+    def test_loser_is_cancelled(self):
+        func = self.scripted(0.5, 0.001)
+        self.assertEqual(
+            run(hedged_call(self.policy, 's3', 'get_object', func)),
+            2
+        )
+        self.assertEqual(self.cancelled, [1])
+        stats = self.policy.stats()['s3']['get_object']
+        self.assertEqual(stats['hedge_wins'], 1)
+        self.assertEqual(stats['cancelled'], 1)
+
+    def test_fast_call_is_not_hedged(self):
+        func = self.scripted(0.0)
+        self.assertEqual(
+            run(hedged_call(self.policy, 's3', 'get_object', func)),
+            1
+        )
+        self.assertEqual(self.started, [1])
+
+    def test_unsafe_operations_are_not_hedged(self):
+        func = self.scripted(0.05)
+        self.assertEqual(
+            run(hedged_call(self.policy, 's3', 'put_object', func)),
+            1
+        )
+        self.assertEqual(self.started, [1])
+
+    def test_both_failing(self):
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ServerError(code='InternalError', message='Oops.')
+
+        with self.assertRaises(ServerError):
+            run(hedged_call(self.policy, 's3', 'get_object', fail))
+
+
+class AsyncConnectionHedgingTestCase(unittest.TestCase):
+    def test_tail_is_hedged(self):
+        op = LatencyOperation(
+            'GetQueueUrl',
+            delays=[0.001] * 10 + [0.5],
+            output=True,
+            result=(None, {'QueueUrl': 'http://example.com'})
+        )
+        policy = HedgingPolicy(min_samples=10, max_ratio=0.5)
+        session = Session(
+            FakeSession(flaky_service(op)),
+            hedging_policy=policy
+        )
+        conn = session.connect_to_async('sqs', region_name='us-west-2')
+
+        async def main():
+            for i in range(10):
+                await conn.get_queue_url(queue_name='jobs')
+
+            start = asyncio.get_running_loop().time()
+            await conn.get_queue_url(queue_name='jobs')
+            return asyncio.get_running_loop().time() - start
+
+        try:
+            self.assertTrue(run(main()) < 0.4)
+        finally:
+            session.close()
+
+        self.assertEqual(policy.stats()['sqs']['get_queue_url']['hedged'], 1)
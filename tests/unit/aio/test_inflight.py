@@ -0,0 +1,115 @@
+import asyncio
+import threading
+
+from kotocore.aio.inflight import acquire_limits, acquire_semaphore
+from kotocore.exceptions import ConcurrencyLimitTimeout
+from kotocore.inflight import ConcurrencyLimiter, EndpointSemaphore
+from kotocore.session import Session
+
+from tests import unittest
+from tests.unit.aio.fakes import run
+from tests.unit.fakes import FakeSession, SlowOperation, flaky_service
+
+
+class AcquireSemaphoreTestCase(unittest.TestCase):
+    def test_waits_without_blocking(self):
+        semaphore = EndpointSemaphore(1)
+        semaphore.acquire()
+        ticks = []
+
+        async def ticker():
+            for i in range(3):
+                ticks.append(i)
+                await asyncio.sleep(0.01)
+
+        async def main():
+            # Released from another thread.
+            threading.Timer(0.05, semaphore.release).start()
+            results = await asyncio.gather(
+                acquire_semaphore(semaphore),
+                ticker()
+            )
+            return results[0]
+
+        self.assertTrue(run(main()) >= 0.04)
+        self.assertEqual(ticks, [0, 1, 2])
+        self.assertEqual(semaphore.stats()['in_flight'], 1)
+
+    def test_timeout(self):
+        semaphore = EndpointSemaphore(1)
+        semaphore.acquire()
+
+        with self.assertRaises(ConcurrencyLimitTimeout):
+            run(acquire_semaphore(semaphore, timeout=0.02))
+
+        self.assertEqual(semaphore.stats()['queued'], 0)
+        semaphore.release()
+        self.assertEqual(semaphore.stats()['in_flight'], 0)
+
+    def test_cancelled_waits_give_up_their_place(self):
+        semaphore = EndpointSemaphore(1)
+        semaphore.acquire()
+
+        async def main():
+            task = asyncio.ensure_future(acquire_semaphore(semaphore))
+            await asyncio.sleep(0.01)
+            task.cancel()
+
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        run(main())
+        self.assertEqual(semaphore.stats()['queued'], 0)
+        semaphore.release()
+        # Nobody is left holding (or owed) the slot.
+        self.assertEqual(semaphore.stats()['in_flight'], 0)
+
+    def test_limiter(self):
+        limiter = ConcurrencyLimiter({'support': 1}, timeout=0.02)
+
+        async def main():
+            held = await acquire_limits(
+                limiter,
+                'support',
+                'us-east-1',
+                'describe_cases'
+            )
+
+            with self.assertRaises(ConcurrencyLimitTimeout):
+                await acquire_limits(
+                    limiter,
+                    'support',
+                    'us-east-1',
+                    'describe_cases'
+                )
+
+            limiter.release(held)
+
+        run(main())
+        stats = limiter.stats()[('support', 'us-east-1', None)]
+        self.assertEqual(stats['in_flight'], 0)
+        self.assertEqual(stats['timeouts'], 1)
+
+
+class AsyncConnectionConcurrencyTestCase(unittest.TestCase):
+    def test_in_flight_is_capped(self):
+        op = SlowOperation('ListQueues', output=True, result=(None, {}))
+        session = Session(
+            FakeSession(flaky_service(op)),
+            concurrency_limiter={'sqs': 2}
+        )
+        conn = session.connect_to_async('sqs', region_name='us-west-2')
+
+        async def main():
+            return await asyncio.gather(
+                *[conn.list_queues() for i in range(6)]
+            )
+
+        self.assertEqual(run(main()), [{}] * 6)
+        self.assertEqual(op.most_in_flight, 2)
+        stats = session.concurrency_limiter.stats()[
+            ('sqs', 'us-west-2', None)
+        ]
+        self.assertEqual(stats['acquired'], 6)
+        self.assertEqual(stats['in_flight'], 0)
+        self.assertEqual(stats['waited'], 4)
@@ -0,0 +1,122 @@
+import asyncio
+import os
+
+from kotocore.aio.collections import AsyncCollection, AsyncCollectionFactory
+from kotocore.aio.resources import AsyncResource, AsyncResourceFactory
+from kotocore.loader import ResourceJSONLoader
+from kotocore.session import Session
+
+from tests import unittest
+from tests.unit.aio.fakes import run
+from tests.unit.fakes import FakeParam, FakeOperation, FakeService, FakeSession
+
+
+class TestCoreService(FakeService):
+    api_version = '2013-11-27'
+    operations = [
+        FakeOperation(
+            'ReadPipeline',
+            " <p>Reads a pipeline.</p>\n ",
+            params=[
+                FakeParam('Id', required=True, ptype='string'),
+            ],
+            output=True,
+            result=(None, {
+                'Pipeline': {
+                    'Id': '1872baf45',
+                    'Title': 'A pipe',
+                },
+            })
+        ),
+        FakeOperation(
+            'DeletePipeline',
+            " <p>Deletes a pipeline.</p>\n ",
+            params=[
+                FakeParam('Id', required=True, ptype='string'),
+            ],
+            output=True,
+            result=(None, {'success': True})
+        ),
+        FakeOperation(
+            'ReadPreset',
+            " <p>Reads a preset.</p>\n ",
+            params=[
+                FakeParam('Id', required=True, ptype='string'),
+            ],
+            output=True,
+            result=(None, {'Preset': {'Id': 'a1b2'}})
+        ),
+        FakeOperation(
+            'ListPipelines',
+            " <p>Lists the pipelines.</p>\n ",
+            params=[],
+            output=True,
+            result=(None, {'Pipelines': []})
+        ),
+    ]
+
+
+# The rest of the operations the test ResourceJSON refers to, so that the
+# docstrings can be found on the connection.
+TestCoreService.operations = TestCoreService.operations + [
+    FakeOperation(api_name, params=[], output=True, result=(None, {}))
+    for api_name in [
+        'CancelJob', 'CreateJob', 'CreatePipeline', 'CreatePreset',
+        'DeletePipeline', 'DeletePreset', 'ListJobsByPipeline',
+        'ListJobsByStatus', 'ListPipelines', 'ListPresets', 'ReadJob',
+        'ReadPipeline', 'ReadPreset', 'TestRole', 'UpdatePipeline',
+        'UpdatePipelineNotifications', 'UpdatePipelineStatus',
+    ]
+    if not api_name in [op.name for op in TestCoreService.operations]
+]
+
+class AsyncResourceTestCase(unittest.TestCase):
+    def setUp(self):
+        super(AsyncResourceTestCase, self).setUp()
+        self.test_dirs = [
+            os.path.join(os.path.dirname(os.path.dirname(__file__)), 'test_data')
+        ]
+        self.test_loader = ResourceJSONLoader(self.test_dirs)
+        self.session = Session(FakeSession(TestCoreService()))
+        self.session.async_resource_factory = AsyncResourceFactory(
+            session=self.session,
+            loader=self.test_loader
+        )
+        self.Pipeline = self.session.get_async_resource('test', 'Pipeline')
+
+    def test_construct_for(self):
+        self.assertTrue(issubclass(self.Pipeline, AsyncResource))
+        self.assertTrue(asyncio.iscoroutinefunction(self.Pipeline.get))
+        # Cached separately from the sync variant.
+        self.assertTrue(
+            self.session.get_async_resource('test', 'Pipeline') is
+            self.Pipeline
+        )
+
+    def test_default_connection(self):
+        pipe = self.Pipeline(id='1872baf45')
+        self.assertEqual(
+            pipe._connection.__class__.__name__,
+            'TestAsyncConnection'
+        )
+
+    def test_operations(self):
+        pipe = self.Pipeline(id='1872baf45')
+        self.assertEqual(run(pipe.delete()), {'success': True})
+
+        # The usual post-processing still applies.
+        run(pipe.get())
+        self.assertEqual(pipe.title, 'A pipe')
+
+    def test_relations_are_async(self):
+        Preset = self.session.get_async_resource('test', 'Preset')
+        self.session.async_collection_factory = AsyncCollectionFactory(
+            session=self.session,
+            loader=self.test_loader
+        )
+        preset = Preset(id='a1b2')
+        self.assertTrue(isinstance(preset.pipelines, AsyncCollection))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+from kotocore.responses import ResponseCache
+from kotocore.session import Session
+
+from tests import unittest
+from tests.unit.aio.fakes import run
+from tests.unit.fakes import (
+    FakeParam, FakeSession, FlakyOperation, Uncopyable, flaky_service,
+    queue_ops
+)
+
+
+class AsyncConnectionCacheTestCase(unittest.TestCase):
+    def test_cached_and_invalidated(self):
+        ops = queue_ops()
+        cache = ResponseCache()
+        session = Session(
+            FakeSession(flaky_service(*ops)),
+            response_cache=cache
+        )
+        conn = session.connect_to_async('sqs', region_name='us-west-2')
+
+        async def main():
+            results = [await conn.list_queues() for i in range(3)]
+            await conn.list_queues(_cache=False)
+            await conn.delete_queue(queue_url='http://example.com/jobs')
+            await conn.list_queues()
+            return results
+
+        try:
+            results = run(main())
+        finally:
+            session.close()
+
+        self.assertEqual(results, [
+            {'QueueUrls': ['http://example.com/jobs']},
+        ] * 3)
+        self.assertEqual(ops[0].calls, 3)
+        stats = cache.stats()
+        self.assertEqual(stats['hits'], 2)
+        self.assertEqual(stats['invalidations'], 1)
+
+    def test_streamed_outputs_are_not_cached(self):
+        op = FlakyOperation(
+            'GetObject',
+            [],
+            params=[FakeParam('Key', required=True)],
+            output={
+                'members': {
+                    'Body': {'type': 'blob', 'streaming': True},
+                },
+            },
+            result=(None, {'Body': Uncopyable()})
+        )
+        cache = ResponseCache()
+        session = Session(
+            FakeSession(flaky_service(op)),
+            response_cache=cache
+        )
+        conn = session.connect_to_async('s3', region_name='us-west-2')
+
+        async def main():
+            return [await conn.get_object(key='cat.png') for i in range(2)]
+
+        try:
+            results = run(main())
+        finally:
+            session.close()
+
+        self.assertEqual(len(results), 2)
+        self.assertEqual(op.calls, 2)
+        self.assertEqual(cache.stats()['entries'], 0)
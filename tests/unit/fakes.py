@@ -1,67 +1,238 @@
-from botocore import xform_name
+# Fakes & helpers shared by the tests. The basic fakes are public, so users
+# can test against them too.
+import os
+import socket
+import threading
+import time
 
+from kotocore.collections import CollectionFactory
+from kotocore.loader import ResourceJSONLoader
+from kotocore.resources import ResourceFactory
+from kotocore.session import Session
+from kotocore.testing import (
+    FakeEndpoint, FakeOperation, FakeParam, FakeService, FakeSession
+)
 
-class FakeParam(object):
-    def __init__(self, name, required=False, ptype='string',
-                 documentation=None):
-        self.name = name
-        self.py_name = xform_name(name)
-        self.required = required
-        self.type = ptype
-        self.documentation = documentation
 
+class Uncopyable(object):
+    # Like a streamed body, which can't be deep-copied.
+    def __deepcopy__(self, memo):
+        raise TypeError('Streams can only be read once.')
 
-class FakeOperation(object):
-    def __init__(self, name, docs='', params=None, output=None, result=None):
-        self.name = name
-        self.py_name = xform_name(name)
-        self.documentation = docs
-        self.params = params
-        self.output = output
-        self.result = result
 
-        if self.params is None:
-            self.params = []
+class FakeClock(object):
+    def __init__(self):
+        self.now = 100.0
 
-        if self.params is None:
-            self.params = {}
+    def __call__(self):
+        return self.now
+
+
+class FlakyOperation(FakeOperation):
+    # Fails with each of ``codes`` in turn, then succeeds.
+    def __init__(self, name, codes, **kwargs):
+        super(FlakyOperation, self).__init__(name, **kwargs)
+        self.codes = list(codes)
+        self.calls = 0
 
     def call(self, endpoint, **kwargs):
-        return self.result
+        self.calls += 1
+
+        if self.codes:
+            code = self.codes.pop(0)
+
+            if code is socket.error:
+                raise socket.error('Connection reset by peer')
+
+            return (None, {
+                'Errors': [{'Code': code, 'Message': 'Try again.'}],
+            })
 
+        return super(FlakyOperation, self).call(endpoint, **kwargs)
 
-class FakeService(object):
-    operations = []
-    api_version = 'fake'
 
-    def __init__(self, endpoint=None):
-        self.endpoint = endpoint
+def flaky_service(*ops):
+    service = FakeService()
+    service.api_version = '2012-11-05'
+    service.operations = list(ops)
+    return service
 
-        if self.endpoint is None:
-            self.endpoint = FakeEndpoint()
 
-    def get_endpoint(self, region_name=None):
-        if region_name:
-            self.endpoint.region_name = region_name
+class LatencyOperation(FakeOperation):
+    # Sleeps for each of ``delays`` in turn, then for ``delay``.
+    def __init__(self, name, delays=(), delay=0.001, **kwargs):
+        super(LatencyOperation, self).__init__(name, **kwargs)
+        self.delays = list(delays)
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.calls = 0
 
-        return self.endpoint
+    def call(self, endpoint, **kwargs):
+        with self.lock:
+            self.calls += 1
+            delay = self.delay
+
+            if self.delays:
+                delay = self.delays.pop(0)
 
-    def get_operation(self, operation_name):
-        for op in self.operations:
-            if op.name == operation_name:
-                return op
+        time.sleep(delay)
+        return super(LatencyOperation, self).call(endpoint, **kwargs)
 
-        return None
 
+def warmed_up(policy, latency=0.001, count=10):
+    for i in range(count):
+        policy.started('s3', 'get_object')
+        policy.record('s3', 'get_object', latency)
 
-class FakeEndpoint(object):
-    def __init__(self, region_name='us-west-1'):
-        self.region_name = region_name
+    return policy
 
 
-class FakeSession(object):
-    def __init__(self, service):
-        self.service = service
+class SlowOperation(FakeOperation):
+    # Tracks how many calls are running at once.
+    def __init__(self, name, delay=0.03, **kwargs):
+        super(SlowOperation, self).__init__(name, **kwargs)
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.most_in_flight = 0
 
-    def get_service(self, service_name):
-        return self.service
+    def call(self, endpoint, **kwargs):
+        with self.lock:
+            self.in_flight += 1
+            self.most_in_flight = max(self.most_in_flight, self.in_flight)
+
+        try:
+            time.sleep(self.delay)
+            return super(SlowOperation, self).call(endpoint, **kwargs)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+class CappedOperation(FakeOperation):
+    # A service with room for ``capacity`` calls at once. Any more are
+    # throttled.
+    def __init__(self, name, capacity, delay=0.005, **kwargs):
+        super(CappedOperation, self).__init__(name, **kwargs)
+        self.capacity = capacity
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.most_in_flight = 0
+
+    def call(self, endpoint, **kwargs):
+        with self.lock:
+            self.in_flight += 1
+            self.most_in_flight = max(self.most_in_flight, self.in_flight)
+            over = self.in_flight > self.capacity
+
+        try:
+            time.sleep(self.delay)
+
+            if over:
+                return (None, {'Errors': [
+                    {'Code': 'Throttling', 'Message': 'Slow down.'},
+                ]})
+
+            return super(CappedOperation, self).call(endpoint, **kwargs)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+def queue_ops():
+    url = [FakeParam('QueueUrl', required=True)]
+    return [
+        FlakyOperation(
+            'ListQueues',
+            [],
+            output=True,
+            result=(None, {'QueueUrls': ['http://example.com/jobs']})
+        ),
+        FlakyOperation(
+            'GetQueueAttributes',
+            [],
+            params=url,
+            output=True,
+            result=(None, {'Attributes': {'DelaySeconds': '0'}})
+        ),
+        FlakyOperation(
+            'DeleteQueue',
+            [],
+            params=url,
+            output=True,
+            result=(None, {})
+        ),
+    ]
+
+
+class PipelineService(FakeService):
+    api_version = '2013-11-27'
+    operations = [
+        FakeOperation(
+            'ReadPipeline',
+            " <p>Reads a pipeline.</p>\n ",
+            params=[
+                FakeParam('Id', required=True, ptype='string'),
+            ],
+            output=True,
+            result=(None, {
+                'Pipeline': {
+                    'Id': '1872baf45',
+                    'Title': 'A pipe',
+                },
+            })
+        ),
+        FakeOperation(
+            'ListPipelines',
+            " <p>Lists the pipelines.</p>\n ",
+            params=[],
+            output=True,
+            result=(None, {
+                'Pipelines': [
+                    {'Id': '1872baf45', 'Title': 'A pipe'},
+                    {'Id': '918ad8a12', 'Title': 'Another pipe'},
+                ],
+            })
+        ),
+        FakeOperation(
+            'TestRole',
+            " <p>Fails.</p>\n ",
+            params=[],
+            output=True,
+            result=(None, {
+                'Errors': [
+                    {'Code': 'Broken', 'Message': 'It broke.'},
+                ],
+            })
+        ),
+    ]
+
+
+PipelineService.operations = PipelineService.operations + [
+    FakeOperation(api_name, params=[], output=True, result=(None, {}))
+    for api_name in [
+        'CancelJob', 'CreateJob', 'CreatePipeline', 'CreatePreset',
+        'DeletePipeline', 'DeletePreset', 'ListJobsByPipeline',
+        'ListJobsByStatus', 'ListPresets', 'ReadJob', 'ReadPreset',
+        'UpdatePipeline', 'UpdatePipelineNotifications',
+        'UpdatePipelineStatus',
+    ]
+]
+
+
+def make_session():
+    # Module-level, so it can be sent to the worker processes.
+    loader = ResourceJSONLoader([
+        os.path.join(os.path.dirname(__file__), 'test_data')
+    ])
+    session = Session(FakeSession(PipelineService()))
+    session.resource_factory = ResourceFactory(
+        session=session,
+        loader=loader
+    )
+    session.collection_factory = CollectionFactory(
+        session=session,
+        loader=loader
+    )
+    return session
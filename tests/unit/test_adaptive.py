@@ -0,0 +1,282 @@
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from kotocore.adaptive import AdaptiveLimit, tracked, worker_limit
+from kotocore.batch import Batch
+from kotocore.exceptions import ServerError
+from kotocore.fanout import FanOut, Target
+from kotocore.graph import TaskGraph
+from kotocore.pipeline import Pipeline
+from kotocore.retries import RetryPolicy
+from kotocore.session import Session
+from kotocore.utils.concurrency import describe_call, map_calls
+
+from tests import unittest
+from tests.unit.fakes import (
+    FakeSession, FakeClock, CappedOperation, flaky_service, make_session
+)
+
+
+def throttle():
+    return ServerError(code='Throttling', message='Slow down.')
+
+
+class AdaptiveLimitTestCase(unittest.TestCase):
+    def setUp(self):
+        super(AdaptiveLimitTestCase, self).setUp()
+        self.clock = FakeClock()
+        self.limit = AdaptiveLimit(
+            initial=2,
+            maximum=4,
+            latency_target=1.0,
+            clock=self.clock
+        )
+
+    def test_grows_while_saturated(self):
+        # Keep the window full, as ``map_calls`` does.
+        tokens = [self.limit.start(), self.limit.start()]
+
+        for i in range(4):
+            self.limit.finish(tokens.pop(0))
+            tokens.append(self.limit.start())
+
+        self.assertEqual(self.limit.current, 3)
+
+        for i in range(20):
+            self.limit.finish(tokens.pop(0))
+
+            while len(tokens) < self.limit.current:
+                tokens.append(self.limit.start())
+
+        self.assertEqual(self.limit.current, 4)
+        stats = self.limit.stats()
+        self.assertEqual(stats['highest'], 4)
+        self.assertEqual(stats['increases'], 2)
+
+    def test_idle_room_does_not_grow(self):
+        for i in range(10):
+            self.limit.finish(self.limit.start())
+
+        self.assertEqual(self.limit.current, 2)
+        self.assertEqual(self.limit.stats()['successes'], 10)
+
+    def test_throttling_cuts_once_per_round(self):
+        limit = AdaptiveLimit(initial=8, clock=self.clock)
+        tokens = [limit.start() for i in range(8)]
+        self.clock.now += 0.1
+
+        for token in tokens:
+            limit.finish(token, error=throttle())
+
+        self.assertEqual(limit.current, 4)
+        # Calls sent after the cut count again.
+        limit.finish(limit.start(), error=throttle())
+        self.assertEqual(limit.current, 2)
+
+        stats = limit.stats()
+        self.assertEqual(stats['throttled'], 9)
+        self.assertEqual(stats['decreases'], 2)
+        self.assertEqual(stats['lowest'], 2)
+        self.assertEqual(stats['in_flight'], 0)
+
+    def test_floor(self):
+        for i in range(5):
+            self.limit.finish(self.limit.start(), error=throttle())
+
+        self.assertEqual(self.limit.current, 1)
+
+    def test_slow_calls_cut(self):
+        token = self.limit.start()
+        self.clock.now += 2
+        self.limit.finish(token)
+        self.assertEqual(self.limit.current, 1)
+        self.assertEqual(self.limit.stats()['slow'], 1)
+
+    def test_other_errors_are_ignored(self):
+        token = self.limit.start()
+        self.limit.finish(
+            token,
+            error=ServerError(code='AccessDenied', message='Nope.')
+        )
+        self.limit.finish(self.limit.start(), error=ValueError())
+        self.assertEqual(self.limit.current, 2)
+        self.assertEqual(self.limit.stats()['decreases'], 0)
+
+    def test_run_waits_for_room(self):
+        limit = AdaptiveLimit(initial=1, maximum=1)
+        token = limit.start()
+        threading.Timer(0.05, limit.finish, args=(token,)).start()
+        start = time.time()
+        self.assertEqual(limit.run(lambda: 'done'), 'done')
+        self.assertTrue(time.time() - start >= 0.04)
+
+    def test_track_reraises(self):
+        def fail():
+            raise throttle()
+
+        with self.assertRaises(ServerError):
+            self.limit.track(fail)
+
+        self.assertEqual(self.limit.current, 1)
+
+    def test_validation(self):
+        with self.assertRaises(ValueError):
+            AdaptiveLimit(initial=0)
+
+        with self.assertRaises(ValueError):
+            AdaptiveLimit(initial=10, maximum=5)
+
+        with self.assertRaises(ValueError):
+            AdaptiveLimit(decrease=1)
+
+    def test_helpers(self):
+        self.assertEqual(worker_limit(3), 3)
+        self.assertEqual(worker_limit(self.limit), 2)
+
+        def func():
+            pass
+
+        self.assertTrue(tracked(3, func) is func)
+        wrapped = tracked(self.limit, func)
+        self.assertFalse(wrapped is func)
+        self.assertEqual(describe_call(wrapped), describe_call(func))
+
+
+class CapacityCeilingTestCase(unittest.TestCase):
+    def test_converges_on_capacity(self):
+        op = CappedOperation('ListQueues', 4, output=True, result=(None, {}))
+        session = Session(
+            FakeSession(flaky_service(op)),
+            max_workers=16,
+            # Let the throttling through to the limit.
+            retry_policy=RetryPolicy(max_attempts=1)
+        )
+        conn = session.connect_to('sqs', region_name='us-west-2')
+        limit = AdaptiveLimit(initial=1, maximum=16)
+
+        try:
+            results = list(conn.map(
+                'list_queues',
+                [{}] * 300,
+                max_workers=limit
+            ))
+        finally:
+            session.close()
+
+        throttled = [
+            result for result in results if isinstance(result, ServerError)
+        ]
+        stats = limit.stats()
+        # It found the ceiling...
+        self.assertTrue(stats['highest'] > 4)
+        self.assertTrue(stats['decreases'] >= 1)
+        # ...& kept hovering around it, rather than running away.
+        self.assertTrue(stats['highest'] <= 8)
+        self.assertTrue(2 <= limit.current <= 5)
+        self.assertTrue(op.most_in_flight <= 8)
+        self.assertEqual(stats['throttled'], len(throttled))
+        self.assertTrue(len(throttled) < 30)
+        self.assertEqual(stats['in_flight'], 0)
+
+    def test_fixed_workers_overload(self):
+        # For contrast, a fixed window above capacity keeps getting
+        # throttled.
+        op = CappedOperation('ListQueues', 4, output=True, result=(None, {}))
+        session = Session(
+            FakeSession(flaky_service(op)),
+            max_workers=16,
+            retry_policy=RetryPolicy(max_attempts=1)
+        )
+        conn = session.connect_to('sqs', region_name='us-west-2')
+
+        try:
+            results = list(conn.map('list_queues', [{}] * 100, max_workers=8))
+        finally:
+            session.close()
+
+        throttled = [
+            result for result in results if isinstance(result, ServerError)
+        ]
+        self.assertTrue(len(throttled) > 30)
+
+
+class IntegrationTestCase(unittest.TestCase):
+    def setUp(self):
+        super(IntegrationTestCase, self).setUp()
+        self.executor = ThreadPoolExecutor(max_workers=8)
+        self.limit = AdaptiveLimit(initial=2, maximum=8)
+
+    def tearDown(self):
+        self.executor.shutdown()
+        super(IntegrationTestCase, self).tearDown()
+
+    def test_map_calls(self):
+        results = list(map_calls(
+            self.executor,
+            lambda value: value * 2,
+            [{'value': i} for i in range(20)],
+            self.limit
+        ))
+        self.assertEqual(results, [i * 2 for i in range(20)])
+        self.assertEqual(self.limit.stats()['successes'], 20)
+
+    def test_batch(self):
+        with Batch(self.executor, self.limit) as batch:
+            futures = [batch.call(lambda i=i: i) for i in range(10)]
+
+        self.assertEqual(
+            [future.result() for future in futures],
+            list(range(10))
+        )
+        self.assertEqual(self.limit.stats()['successes'], 10)
+
+    def test_batch_reports_throttling(self):
+        def fail():
+            raise throttle()
+
+        batch = Batch(self.executor, self.limit)
+        future = batch.call(fail)
+        batch.wait()
+        self.assertTrue(isinstance(future.exception(), ServerError))
+        self.assertEqual(self.limit.stats()['throttled'], 1)
+
+    def test_graph(self):
+        graph = TaskGraph(self.executor, self.limit)
+        graph.add('one', lambda: 1)
+        graph.add('two', lambda: 2, depends_on=['one'])
+        self.assertEqual(graph.run(), {'one': 1, 'two': 2})
+        self.assertEqual(self.limit.stats()['successes'], 2)
+
+    def test_fan_out(self):
+        session = make_session()
+
+        try:
+            fan = FanOut(
+                session,
+                [Target(None, 'us-east-1', 'a'), Target(None, 'eu-west-1')],
+                self.executor,
+                self.limit,
+                per_target=2
+            )
+            results = list(fan.run(
+                lambda target, value: value,
+                [{'value': i} for i in range(3)]
+            ))
+        finally:
+            session.close()
+
+        self.assertEqual(len(results), 6)
+        self.assertTrue(all([result.ok for result in results]))
+        self.assertEqual(self.limit.stats()['successes'], 6)
+
+    def test_pipeline(self):
+        collected = []
+        pipe = Pipeline(queue_size=4)
+        pipe.source(range(20))
+        pipe.map(lambda item: item + 1, workers=self.limit, ordered=True)
+        pipe.sink(collected.append)
+        pipe.run()
+        self.assertEqual(collected, list(range(1, 21)))
+        self.assertEqual(self.limit.stats()['successes'], 20)
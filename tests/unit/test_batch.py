@@ -0,0 +1,140 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+from kotocore.batch import Batch
+from kotocore.exceptions import BatchError, ServerError
+from kotocore.session import Session
+
+from tests import unittest
+from tests.unit.fakes import FakeService, FakeSession
+
+
+class BatchTestCase(unittest.TestCase):
+    def setUp(self):
+        super(BatchTestCase, self).setUp()
+        self.executor = ThreadPoolExecutor(max_workers=8)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.most_in_flight = 0
+
+    def tearDown(self):
+        self.executor.shutdown()
+        super(BatchTestCase, self).tearDown()
+
+    def work(self, value, delay=0.05, fail=False):
+        with self.lock:
+            self.in_flight += 1
+            self.most_in_flight = max(self.most_in_flight, self.in_flight)
+
+        try:
+            time.sleep(delay)
+
+            if fail:
+                raise ServerError(code='Broken', message='It broke.')
+
+            return value
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def test_futures(self):
+        with Batch(self.executor, 4) as b:
+            f1 = b.call(self.work, 1)
+            f2 = b.call(self.work, value=2)
+
+        self.assertEqual(f1.result(), 1)
+        self.assertEqual(f2.result(), 2)
+        self.assertEqual(b.errors, [])
+
+    def test_runs_concurrently(self):
+        with Batch(self.executor, 4) as b:
+            futures = [b.call(self.work, i, delay=0.1) for i in range(4)]
+
+        self.assertEqual(self.most_in_flight, 4)
+        self.assertEqual([f.result() for f in futures], [0, 1, 2, 3])
+
+    def test_nested_batches_run_inline(self):
+        # Every outer call opens its own batch on the same (tiny) pool.
+        # Queueing the inner calls would deadlock, so they run inline.
+        executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(executor.shutdown)
+
+        def outer(value):
+            with Batch(executor, 1) as inner:
+                future = inner.call(self.work, value, delay=0)
+
+            return future.result()
+
+        with Batch(executor, 1) as b:
+            futures = [b.call(outer, i) for i in range(3)]
+
+        self.assertEqual([f.result() for f in futures], [0, 1, 2])
+
+    def test_bounded(self):
+        with Batch(self.executor, 2) as b:
+            for i in range(8):
+                b.call(self.work, i, delay=0.01)
+
+        self.assertTrue(self.most_in_flight <= 2)
+        self.assertEqual(len(b.calls), 8)
+
+    def test_defer(self):
+        with Batch(self.executor, 4, defer=True) as b:
+            future = b.call(self.work, 1, delay=0)
+            time.sleep(0.05)
+            # Nothing has started yet.
+            self.assertFalse(future.done())
+
+        self.assertEqual(future.result(), 1)
+
+    def test_aggregated_errors(self):
+        with self.assertRaises(BatchError) as cm:
+            with Batch(self.executor, 4) as b:
+                ok = b.call(self.work, 1)
+                b.call(self.work, 2, fail=True)
+                b.call(self.work, 3, fail=True)
+
+        self.assertEqual(ok.result(), 1)
+        self.assertEqual(len(cm.exception.errors), 2)
+        call, err = cm.exception.errors[0]
+        self.assertEqual(call.args, (2,))
+        self.assertTrue(isinstance(err, ServerError))
+        self.assertTrue('2 call(s) in the batch failed' in str(cm.exception))
+
+    def test_exception_in_block_cancels_queued(self):
+        with self.assertRaises(RuntimeError):
+            with Batch(self.executor, 1) as b:
+                first = b.call(self.work, 1, delay=0.05)
+                second = b.call(self.work, 2)
+                raise RuntimeError('Oops.')
+
+        self.assertEqual(first.result(), 1)
+        self.assertTrue(second.cancelled())
+
+    def test_invalid_max_workers(self):
+        with self.assertRaises(ValueError):
+            Batch(self.executor, 0)
+
+
+class SessionBatchTestCase(unittest.TestCase):
+    def test_batch(self):
+        session = Session(FakeSession(FakeService()), max_workers=3)
+
+        with session.batch() as b:
+            future = b.call(lambda: 'done')
+
+        self.assertEqual(future.result(), 'done')
+        self.assertEqual(b.max_workers, 3)
+        # The executor belongs to the session & is reused.
+        self.assertTrue(b.executor is session.get_executor())
+
+        with session.batch(max_workers=16) as b2:
+            pass
+
+        self.assertEqual(b2.max_workers, 16)
+        self.assertTrue(b2.executor is b.executor)
+
+
+if __name__ == "__main__":
+    unittest.main()
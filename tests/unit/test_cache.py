@@ -1,3 +1,7 @@
+import gc
+
+import mock
+
 from kotocore.cache import ServiceCache
 from kotocore.collections import Collection
 from kotocore.exceptions import NotCached
@@ -128,6 +132,34 @@ class ServiceCacheTestCase(unittest.TestCase):
             },
         })
 
+    def test_async_connection(self):
+        with self.assertRaises(NotCached):
+            self.cache.get_async_connection('sqs')
+
+        # Lives alongside (not in place of) the sync connection.
+        self.cache.set_connection('sqs', TestConnection)
+        self.cache.set_async_connection('sqs', AnotherTestConnection)
+        self.assertEqual(self.cache.services, {
+            'sqs': {
+                'connection': TestConnection,
+                'async_connection': AnotherTestConnection,
+            },
+        })
+        self.assertEqual(
+            self.cache.get_async_connection('sqs'),
+            AnotherTestConnection
+        )
+
+        self.cache.del_async_connection('sqs')
+        self.assertEqual(self.cache.services, {
+            'sqs': {
+                'connection': TestConnection,
+            },
+        })
+
+        # Delete it again. Shouldn't error.
+        self.cache.del_async_connection('sqs')
+
     def test_get_resource(self):
         self.cache.services = {
             'sqs': {
@@ -161,6 +193,27 @@ class ServiceCacheTestCase(unittest.TestCase):
         with self.assertRaises(NotCached):
             self.cache.get_resource('sns', 'Test')
 
+    def test_find(self):
+        self.cache.set_connection('sqs', TestConnection)
+        self.cache.set_resource('sqs', 'Test', TestResource)
+
+        path = self.cache.path_for('sqs', 'connection')
+        self.assertEqual(path, ('sqs', 'connection'))
+        self.assertEqual(self.cache.find(path), TestConnection)
+
+        path = self.cache.path_for('sqs', 'resources', 'Test')
+        self.assertEqual(path, ('sqs', 'resources', 'Test', 'default'))
+        self.assertEqual(self.cache.find(path), TestResource)
+
+        # Misses don't raise.
+        path = self.cache.path_for('sqs', 'collections', 'Test')
+        self.assertEqual(self.cache.find(path), None)
+        self.assertEqual(self.cache.find(path, record=False), None)
+
+        stats = self.cache.stats()['sqs']
+        self.assertEqual(stats['hits'], 2)
+        self.assertEqual(stats['misses'], 1)
+
     def test_set_resource(self):
         self.assertEqual(len(self.cache.services), 0)
 
@@ -421,3 +474,122 @@ class ServiceCacheTestCase(unittest.TestCase):
                 'connection': TestConnection,
             }
         })
+
+
+class BoundedServiceCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        super(BoundedServiceCacheTestCase, self).setUp()
+        self.cache = ServiceCache(max_classes=3)
+
+    def test_lru_eviction(self):
+        self.cache.set_connection('sqs', TestConnection)
+        self.cache.set_resource('sqs', 'Queue', TestResource)
+        self.cache.set_collection('sqs', 'QueueCollection', TestCollection)
+
+        # Using the connection makes the resource the oldest.
+        self.cache.get_connection('sqs')
+        self.cache.set_connection('sns', AnotherTestConnection)
+
+        with self.assertRaises(NotCached):
+            self.cache.get_resource('sqs', 'Queue')
+
+        self.assertEqual(self.cache.get_connection('sqs'), TestConnection)
+        self.assertEqual(
+            self.cache.get_connection('sns'),
+            AnotherTestConnection
+        )
+        self.assertEqual(
+            self.cache.get_collection('sqs', 'QueueCollection'),
+            TestCollection
+        )
+        stats = self.cache.stats()
+        self.assertEqual(stats['sqs']['evictions'], 1)
+        self.assertEqual(stats['sqs']['classes'], 2)
+        self.assertEqual(stats['sns']['classes'], 1)
+
+    def test_replacing_does_not_evict(self):
+        self.cache.set_connection('sqs', TestConnection)
+        self.cache.set_connection('sqs', AnotherTestConnection)
+        self.cache.set_connection('sns', TestConnection)
+        self.cache.set_connection('s3', TestConnection)
+        self.assertEqual(self.cache.stats()['sqs']['evictions'], 0)
+
+        self.cache.del_connection('sns')
+        self.cache.set_connection('sns', AnotherTestConnection)
+        self.cache.set_connection('sns', TestConnection)
+        self.assertEqual(self.cache.stats()['sqs']['evictions'], 0)
+
+    def test_stats(self):
+        cache = ServiceCache()
+        cache.set_connection('sqs', TestConnection)
+        cache.get_connection('sqs')
+
+        with self.assertRaises(NotCached):
+            cache.get_resource('sqs', 'Queue')
+
+        cache.timed('sqs', True, 0.25)
+        cache.timed('sqs', False, 1.5)
+        self.assertEqual(cache.stats(), {
+            'sqs': {
+                'hits': 1,
+                'misses': 1,
+                'evictions': 0,
+                'classes': 1,
+                'hit_time': 0.25,
+                'miss_time': 1.5,
+            },
+        })
+
+    def test_validation(self):
+        with self.assertRaises(ValueError):
+            ServiceCache(max_classes=0)
+
+
+    def test_eviction_follows_recency(self):
+        cache = ServiceCache(max_classes=50)
+
+        for i in range(100):
+            cache.set_connection('service{0}'.format(i), TestConnection)
+
+            if i >= 25:
+                # Keeps the first few in use.
+                cache.get_connection('service{0}'.format(i % 5))
+
+        # Each insert only drops the oldest, rather than walking every
+        # cached class.
+        with mock.patch.object(cache, '_leaf_paths') as leaf_paths:
+            cache.set_connection('latest', TestConnection)
+
+        self.assertFalse(leaf_paths.called)
+        cached = [
+            service_name
+            for service_name, service in cache.services.items()
+            if service.get('connection')
+        ]
+        self.assertEqual(len(cached), 50)
+
+        for i in range(5):
+            self.assertTrue('service{0}'.format(i) in cached)
+
+        self.assertFalse('service5' in cached)
+        self.assertTrue('service99' in cached)
+
+    def test_custom_bases_are_kept(self):
+        class PluginBase(Resource):
+            pass
+
+        class Queue(PluginBase):
+            pass
+
+        self.cache.set_resource('sqs', 'Queue', Queue)
+        del Queue
+        gc.collect()
+
+        # Still cached, so it isn't rebuilt on the next lookup.
+        queue_class = self.cache.get_resource(
+            'sqs',
+            'Queue',
+            base_class=PluginBase
+        )
+        self.assertEqual(queue_class.__name__, 'Queue')
+        self.assertTrue(issubclass(queue_class, PluginBase))
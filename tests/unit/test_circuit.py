@@ -0,0 +1,246 @@
+import socket
+
+from kotocore.circuit import CLOSED, HALF_OPEN, OPEN, CircuitBreakers
+from kotocore.exceptions import (
+    CircuitOpenError, ConcurrencyLimitTimeout, ServerError
+)
+from kotocore.retries import RetryPolicy
+from kotocore.session import Session
+
+from tests import unittest
+from tests.unit.fakes import (
+    FakeSession, FakeClock, FlakyOperation, flaky_service
+)
+
+
+def fail(code='InternalError'):
+    raise ServerError(code=code, message='Nope.')
+
+
+class CircuitBreakersTestCase(unittest.TestCase):
+    def setUp(self):
+        super(CircuitBreakersTestCase, self).setUp()
+        self.clock = FakeClock()
+        self.events = []
+        self.breakers = CircuitBreakers(
+            failure_threshold=3,
+            min_calls=4,
+            reset_timeout=10,
+            clock=self.clock
+        )
+        self.breakers.add_listener(self.events.append)
+        self.breaker = self.breakers.breaker_for('dynamodb', 'us-east-1')
+
+    def call(self, func):
+        return self.breakers.call('dynamodb', 'us-east-1', func)
+
+    def fail_times(self, count, code='InternalError'):
+        for i in range(count):
+            with self.assertRaises(ServerError):
+                self.call(lambda: fail(code))
+
+    def test_breaker_per_endpoint(self):
+        self.assertTrue(
+            self.breakers.breaker_for('dynamodb', 'us-east-1') is self.breaker
+        )
+        self.assertFalse(
+            self.breakers.breaker_for('dynamodb', 'eu-west-1') is self.breaker
+        )
+
+    def test_opens_on_failures_in_a_row(self):
+        self.fail_times(2)
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.fail_times(1)
+        self.assertEqual(self.breaker.state, OPEN)
+
+        self.clock.now += 4
+
+        with self.assertRaises(CircuitOpenError) as cm:
+            self.call(lambda: 'never')
+
+        self.assertEqual(cm.exception.service_name, 'dynamodb')
+        self.assertEqual(cm.exception.region_name, 'us-east-1')
+        self.assertEqual(cm.exception.retry_after, 6)
+
+        self.assertEqual(len(self.events), 1)
+        event = self.events[0]
+        self.assertEqual(
+            (event.service_name, event.region_name),
+            ('dynamodb', 'us-east-1')
+        )
+        self.assertEqual((event.old_state, event.new_state), (CLOSED, OPEN))
+        self.assertEqual(event.reason, '3 failures in a row')
+        self.assertEqual(list(self.breakers.events), self.events)
+
+        stats = self.breakers.stats()[('dynamodb', 'us-east-1')]
+        self.assertEqual(stats['state'], OPEN)
+        self.assertEqual(stats['failures'], 3)
+        self.assertEqual(stats['rejected'], 1)
+        self.assertEqual(stats['opened'], 1)
+        self.assertEqual(stats['error_rate'], 1.0)
+
+    def test_opens_on_error_rate(self):
+        # Never enough in a row, but half of them failed.
+        for i in range(2):
+            self.call(lambda: 'ok')
+            self.fail_times(1)
+
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertEqual(self.events[0].reason, '2 of the last 4 failed')
+
+    def test_client_errors_do_not_count(self):
+        self.fail_times(5, code='AccessDenied')
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertEqual(self.breaker.stats()['successes'], 5)
+
+    def test_connection_errors_count(self):
+        def reset():
+            raise socket.error('Connection reset by peer')
+
+        for i in range(3):
+            with self.assertRaises(socket.error):
+                self.call(reset)
+
+        self.assertEqual(self.breaker.state, OPEN)
+
+    def test_local_errors_are_ignored(self):
+        def timeout():
+            raise ConcurrencyLimitTimeout('Waited too long.')
+
+        for i in range(5):
+            with self.assertRaises(ConcurrencyLimitTimeout):
+                self.call(timeout)
+
+        stats = self.breaker.stats()
+        self.assertEqual(stats['state'], CLOSED)
+        self.assertEqual(stats['failures'], 0)
+        self.assertEqual(stats['successes'], 0)
+
+    def test_half_open_probe_recovers(self):
+        self.fail_times(3)
+        self.clock.now += 10
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+
+        # One probe at a time.
+        self.breaker.before_call()
+
+        with self.assertRaises(CircuitOpenError):
+            self.call(lambda: 'too soon')
+
+        self.breakers.record(self.breaker)
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertEqual(self.call(lambda: 'ok'), 'ok')
+        self.assertEqual(
+            [(event.old_state, event.new_state) for event in self.events],
+            [(CLOSED, OPEN), (OPEN, HALF_OPEN), (HALF_OPEN, CLOSED)]
+        )
+
+    def test_half_open_probe_fails(self):
+        self.fail_times(3)
+        self.clock.now += 10
+        self.fail_times(1)
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertEqual(self.events[-1].reason, 'probe failed')
+
+        # The timeout starts over.
+        self.clock.now += 5
+        self.assertEqual(self.breaker.state, OPEN)
+        self.clock.now += 5
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+
+    def test_abandoned_probe_frees_its_slot(self):
+        self.fail_times(3)
+        self.clock.now += 10
+
+        with self.assertRaises(KeyboardInterrupt):
+            self.call(self.interrupt)
+
+        self.assertEqual(self.call(lambda: 'ok'), 'ok')
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def interrupt(self):
+        raise KeyboardInterrupt()
+
+    def test_validation(self):
+        with self.assertRaises(ValueError):
+            CircuitBreakers(failure_threshold=0)
+
+        with self.assertRaises(ValueError):
+            CircuitBreakers(half_open_calls=0)
+
+
+class ConnectionCircuitTestCase(unittest.TestCase):
+    def test_fails_fast(self):
+        op = FlakyOperation(
+            'ListQueues',
+            ['InternalError'] * 5,
+            output=True,
+            result=(None, {})
+        )
+        clock = FakeClock()
+        breakers = CircuitBreakers(
+            failure_threshold=3,
+            reset_timeout=10,
+            clock=clock
+        )
+        session = Session(
+            FakeSession(flaky_service(op)),
+            retry_policy=RetryPolicy(max_attempts=1),
+            circuit_breakers=breakers
+        )
+        conn = session.connect_to('sqs', region_name='us-west-2')
+
+        for i in range(3):
+            with self.assertRaises(ServerError):
+                conn.list_queues()
+
+        with self.assertRaises(CircuitOpenError):
+            conn.list_queues()
+
+        # Nothing was sent while it was open.
+        self.assertEqual(op.calls, 3)
+
+        # Other regions carry on.
+        other = session.connect_to('sqs', region_name='eu-west-1')
+
+        with self.assertRaises(ServerError):
+            other.list_queues()
+
+        self.assertEqual(op.calls, 4)
+
+        # The probe fails, so it opens again...
+        clock.now += 10
+
+        with self.assertRaises(ServerError):
+            conn.list_queues()
+
+        with self.assertRaises(CircuitOpenError):
+            conn.list_queues()
+
+        # ...until the endpoint recovers.
+        clock.now += 10
+        op.codes = []
+        self.assertEqual(conn.list_queues(), {})
+        self.assertEqual(
+            breakers.stats()[('sqs', 'us-west-2')]['state'],
+            CLOSED
+        )
+
+    def test_retries_stop_once_open(self):
+        op = FlakyOperation(
+            'ListQueues',
+            ['InternalError'] * 5,
+            output=True,
+            result=(None, {})
+        )
+        session = Session(
+            FakeSession(flaky_service(op)),
+            retry_policy=RetryPolicy(max_attempts=5, sleep=lambda s: None),
+            circuit_breakers=CircuitBreakers(failure_threshold=2)
+        )
+        conn = session.connect_to('sqs', region_name='us-west-2')
+
+        with self.assertRaises(CircuitOpenError):
+            conn.list_queues()
+
+        self.assertEqual(op.calls, 2)
@@ -0,0 +1,297 @@
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from kotocore.coalesce import Coalescer, canonical
+from kotocore.deadlines import deadline
+from kotocore.exceptions import DeadlineExceeded, ServerError
+from kotocore.session import Session
+
+from tests import unittest
+from tests.unit.fakes import (
+    FakeParam, FakeSession, LatencyOperation, Uncopyable,
+    flaky_service
+)
+
+
+def wait_for(check, timeout=2.0):
+    until = time.time() + timeout
+
+    while not check():
+        if time.time() > until:
+            raise AssertionError('Timed out waiting.')
+
+        time.sleep(0.001)
+
+
+class Credentials(object):
+    def __init__(self, access_key):
+        self.access_key = access_key
+
+
+class SignedSession(FakeSession):
+    def __init__(self, service, access_key):
+        super(SignedSession, self).__init__(service)
+        self.credentials = Credentials(access_key)
+
+    def get_credentials(self):
+        return self.credentials
+
+
+class CanonicalTestCase(unittest.TestCase):
+    def test_ordering_is_ignored(self):
+        self.assertEqual(
+            canonical({'a': 1, 'b': [1, {'c': 2, 'd': 3}]}),
+            canonical({'b': [1, {'d': 3, 'c': 2}], 'a': 1})
+        )
+        self.assertEqual(
+            canonical({'names': set(['x', 'y'])}),
+            canonical({'names': set(['y', 'x'])})
+        )
+
+    def test_types_are_kept_apart(self):
+        self.assertNotEqual(canonical({'a': 1}), canonical({'a': True}))
+        self.assertNotEqual(canonical({'a': 1}), canonical({'a': '1'}))
+        self.assertNotEqual(canonical([1, 2]), canonical([2, 1]))
+
+    def test_unhashable(self):
+        with self.assertRaises(TypeError):
+            canonical({'body': bytearray(b'data')})
+
+        coalescer = Coalescer()
+        self.assertEqual(coalescer.key_for(
+            's3',
+            'us-east-1',
+            'get_object',
+            {'body': bytearray(b'data')}
+        ), None)
+
+
+class CoalescerTestCase(unittest.TestCase):
+    def setUp(self):
+        super(CoalescerTestCase, self).setUp()
+        self.coalescer = Coalescer()
+        self.key = self.coalescer.key_for(
+            'sqs',
+            'us-west-2',
+            'get_queue_url',
+            {'queue_name': 'jobs'},
+            identity='AKID'
+        )
+        self.release = threading.Event()
+        self.calls = []
+        self.executor = ThreadPoolExecutor(max_workers=8)
+
+    def tearDown(self):
+        self.release.set()
+        self.executor.shutdown()
+        super(CoalescerTestCase, self).tearDown()
+
+    def blocked(self, result=None, error=None):
+        def func():
+            self.calls.append(1)
+            self.release.wait()
+
+            if error is not None:
+                raise error
+
+            return result
+
+        return func
+
+    def call(self, func):
+        return self.executor.submit(
+            self.coalescer.call,
+            'sqs',
+            'get_queue_url',
+            self.key,
+            func
+        )
+
+    def stats(self):
+        return self.coalescer.stats().get('sqs', {}).get('get_queue_url', {})
+
+    def start(self, func, count):
+        futures = [self.call(func)]
+        wait_for(lambda: self.calls)
+        futures.extend([self.call(func) for i in range(count - 1)])
+        wait_for(lambda: self.stats()['coalesced'] == count - 1)
+        self.release.set()
+        return futures
+
+    def test_identical_calls_share_a_request(self):
+        futures = self.start(self.blocked(result={'QueueUrl': 'u'}), 8)
+        results = [future.result() for future in futures]
+        self.assertEqual(results, [{'QueueUrl': 'u'}] * 8)
+        self.assertEqual(len(self.calls), 1)
+
+        # Each caller has its own copy.
+        results[1]['QueueUrl'] = 'changed'
+        self.assertEqual(results[2], {'QueueUrl': 'u'})
+
+        stats = self.stats()
+        self.assertEqual(stats['calls'], 8)
+        self.assertEqual(stats['requests'], 1)
+        self.assertEqual(stats['coalesced'], 7)
+        self.assertEqual(stats['ratio'], 7 / 8.0)
+
+    def test_errors_are_shared(self):
+        error = ServerError(code='AccessDenied', message='Nope.')
+        futures = self.start(self.blocked(error=error), 4)
+
+        for future in futures:
+            self.assertTrue(future.exception() is error)
+
+        self.assertEqual(len(self.calls), 1)
+
+    def test_uncopyable_result(self):
+        body = Uncopyable()
+        leader, follower = self.start(self.blocked(result=body), 2)
+        self.assertTrue(leader.result(timeout=2) is body)
+
+        # Woken with the error, rather than left waiting.
+        with self.assertRaises(TypeError):
+            follower.result(timeout=2)
+
+    def test_nothing_is_kept(self):
+        self.release.set()
+        self.assertEqual(self.call(self.blocked(result=1)).result(), 1)
+        self.assertEqual(self.call(self.blocked(result=2)).result(), 2)
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(self.stats()['ratio'], 0.0)
+
+    def test_waiting_respects_the_deadline(self):
+        leader = self.call(self.blocked(result=1))
+        wait_for(lambda: self.calls)
+
+        with deadline(0.02):
+            with self.assertRaises(DeadlineExceeded):
+                self.coalescer.call(
+                    'sqs',
+                    'get_queue_url',
+                    self.key,
+                    self.blocked(result=2)
+                )
+
+        self.release.set()
+        self.assertEqual(leader.result(), 1)
+
+    def test_no_key(self):
+        self.assertEqual(self.coalescer.call('s3', 'x', None, lambda: 3), 3)
+        self.assertEqual(self.coalescer.stats(), {})
+
+    def test_should_coalesce(self):
+        self.assertTrue(self.coalescer.should_coalesce('s3', 'head_bucket'))
+        self.assertFalse(self.coalescer.should_coalesce('s3', 'put_object'))
+
+        coalescer = Coalescer(operations={'s3': ['put_object']})
+        self.assertTrue(coalescer.should_coalesce('s3', 'put_object'))
+        self.assertFalse(coalescer.should_coalesce('s3', 'head_bucket'))
+        self.assertFalse(coalescer.should_coalesce('sqs', 'put_object'))
+
+
+class ConnectionCoalescingTestCase(unittest.TestCase):
+    def setUp(self):
+        super(ConnectionCoalescingTestCase, self).setUp()
+        self.op = LatencyOperation(
+            'GetQueueUrl',
+            delay=0.1,
+            params=[FakeParam('QueueName', required=True)],
+            output=True,
+            result=(None, {'QueueUrl': 'http://example.com'})
+        )
+        self.service = flaky_service(self.op)
+        self.coalescer = Coalescer()
+        self.session = Session(
+            FakeSession(self.service),
+            coalescer=self.coalescer
+        )
+
+    def call_all(self, conns, params):
+        with ThreadPoolExecutor(max_workers=len(params)) as executor:
+            futures = [
+                executor.submit(conn.get_queue_url, **kwargs)
+                for conn, kwargs in zip(conns, params)
+            ]
+            return [future.result() for future in futures]
+
+    def test_identical_calls(self):
+        conn = self.session.connect_to('sqs', region_name='us-west-2')
+        results = self.call_all([conn] * 8, [{'queue_name': 'jobs'}] * 8)
+        self.assertEqual(results, [{'QueueUrl': 'http://example.com'}] * 8)
+        self.assertEqual(self.op.calls, 1)
+        stats = self.coalescer.stats()['sqs']['get_queue_url']
+        self.assertEqual(stats['ratio'], 7 / 8.0)
+
+    def test_different_params(self):
+        conn = self.session.connect_to('sqs', region_name='us-west-2')
+        self.call_all([conn] * 2, [{'queue_name': 'a'}, {'queue_name': 'b'}])
+        self.assertEqual(self.op.calls, 2)
+
+    def test_different_regions(self):
+        conns = [
+            self.session.connect_to('sqs', region_name='us-west-2'),
+            self.session.connect_to('sqs', region_name='us-east-1'),
+        ]
+        self.call_all(conns, [{'queue_name': 'jobs'}] * 2)
+        self.assertEqual(self.op.calls, 2)
+
+    def test_different_credentials(self):
+        conns = [
+            self.session.connect_to(
+                'sqs',
+                region_name='us-west-2',
+                core_session=SignedSession(self.service, access_key)
+            )
+            for access_key in ('AKID1', 'AKID2', 'AKID1')
+        ]
+        self.call_all(conns, [{'queue_name': 'jobs'}] * 3)
+        self.assertEqual(self.op.calls, 2)
+
+    def test_streamed_outputs_are_not_coalesced(self):
+        op = LatencyOperation(
+            'GetQueueUrl',
+            delay=0.05,
+            params=[FakeParam('QueueName', required=True)],
+            output={
+                'members': {
+                    'Body': {'type': 'blob', 'streaming': True},
+                },
+            },
+            result=(None, {'Body': Uncopyable()})
+        )
+        session = Session(
+            FakeSession(flaky_service(op)),
+            coalescer=Coalescer()
+        )
+        conn = session.connect_to('sqs', region_name='us-west-2')
+        results = self.call_all([conn] * 4, [{'queue_name': 'jobs'}] * 4)
+        self.assertEqual(len(results), 4)
+        self.assertEqual(op.calls, 4)
+
+    def test_writes_are_not_coalesced(self):
+        op = LatencyOperation(
+            'SendMessage',
+            delay=0.05,
+            output=True,
+            result=(None, {})
+        )
+        session = Session(
+            FakeSession(flaky_service(op)),
+            coalescer=Coalescer()
+        )
+        conn = session.connect_to('sqs', region_name='us-west-2')
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            for future in [
+                executor.submit(
+                    conn.send_message,
+                    queue_url='http://example.com',
+                    message_body='hello'
+                )
+                for i in range(4)
+            ]:
+                future.result()
+
+        self.assertEqual(op.calls, 4)
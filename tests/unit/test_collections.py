@@ -493,6 +493,25 @@ class CollectionTestCase(unittest.TestCase):
         self.assertEqual(pipes[0].id, '1872baf45')
         self.assertEqual(pipes[1].id, '91646aee7')
 
+    def test_map_resources(self):
+        class Getter(object):
+            def __init__(self, name):
+                self.name = name
+
+            def get(self, **kwargs):
+                return (self.name, kwargs)
+
+        results = list(self.collection.map_resources(
+            'get',
+            resources=[Getter('a'), Getter('b')],
+            max_workers=2,
+            verbose=True
+        ))
+        self.assertEqual(results, [
+            ('a', {'verbose': True}),
+            ('b', {'verbose': True}),
+        ])
+
     def build_resource(self):
         # Reach in to fake some data.
         # We'll test proper behavior with the integration tests.
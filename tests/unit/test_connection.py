@@ -1,5 +1,8 @@
+import mock
+import time
+
 from kotocore.connection import ConnectionDetails, ConnectionFactory
-from kotocore.exceptions import ServerError
+from kotocore.exceptions import NoSuchMethod, ServerError
 from kotocore.session import Session
 
 from tests import unittest
@@ -186,7 +189,14 @@ class ConnectionFactoryTestCase(unittest.TestCase):
         self.assertEqual(
             func.__doc__,
             'This is a test.\n:' + \
-            'returns: The response data received\n' + \
+            'param _deadline: (Optional) The most seconds the call may ' + \
+            'take, including retries. Default is ``None``.\n' + \
+            ':type _deadline: float\n\n' + \
+            ':param _cache: (Optional) Whether the response may come ' + \
+            'from the session\'s ``response_cache``. Default is ' + \
+            '``True``.\n' + \
+            ':type _cache: boolean\n\n' + \
+            ':returns: The response data received\n' + \
             ':rtype: dict\n'
         )
 
@@ -278,6 +288,82 @@ class ConnectionFactoryTestCase(unittest.TestCase):
             ':type queue_name: string' in ts.create_queue.__doc__
         )
 
+    def test__make_paged_request(self):
+        ts = self.test_service_class()
+        op_data = ts._get_operation_data('create_queue')
+
+        op = TestCoreService.operations[0]
+
+        # Non-paginated operations give back a single page, but don't hit
+        # the service until it's consumed.
+        with mock.patch.object(op, 'call', wraps=op.call) as call:
+            pages = ts._make_paged_request(op_data, {'queue_name': 'boo'})
+            self.assertEqual(call.call_count, 0)
+            self.assertEqual(list(pages), [
+                (None, {'QueueUrl': 'http://example.com'}),
+            ])
+            self.assertEqual(call.call_count, 1)
+
+    def test_map(self):
+        ts = self.test_service_class()
+        results = list(ts.map('create_queue', [
+            {'queue_name': 'one'},
+            {'queue_name': 'two'},
+        ], max_workers=2))
+        self.assertEqual(results, [
+            {'QueueUrl': 'http://example.com'},
+            {'QueueUrl': 'http://example.com'},
+        ])
+
+        # Unordered.
+        results = list(ts.map('delete_queue', [
+            {'queue_name': 'one'},
+        ], ordered=False))
+        self.assertEqual(results, [{'success': True}])
+
+        with self.assertRaises(NoSuchMethod):
+            ts.map('nope', [])
+
+    def test_map_order_and_errors(self):
+        ts = self.test_service_class()
+        delays = {'slow': 0.1, 'broken': 0.05, 'fast': 0}
+
+        def fake_request(op_data, service_params):
+            name = service_params['queue_name']
+            time.sleep(delays[name])
+
+            if name == 'broken':
+                return (None, {
+                    'Errors': {'Code': 'AccessDenied', 'Message': 'Nope.'}
+                })
+
+            return (None, {'QueueUrl': name})
+
+        ts._make_request = fake_request
+        kwargs = [
+            {'queue_name': 'slow'},
+            {'queue_name': 'broken'},
+            {'queue_name': 'fast'},
+        ]
+
+        # Input order is kept, even though the first call finishes last.
+        results = list(ts.map('create_queue', kwargs, max_workers=3))
+        self.assertEqual(results[0], {'QueueUrl': 'slow'})
+        self.assertTrue(isinstance(results[1], ServerError))
+        self.assertEqual(results[1].code, 'AccessDenied')
+        self.assertEqual(results[2], {'QueueUrl': 'fast'})
+
+        # Unordered comes back in completion order.
+        results = list(ts.map(
+            'create_queue',
+            kwargs,
+            max_workers=3,
+            ordered=False
+        ))
+        self.assertEqual(results[0], {'QueueUrl': 'fast'})
+        self.assertTrue(isinstance(results[1], ServerError))
+        self.assertEqual(results[2], {'QueueUrl': 'slow'})
+
     def test_late_binding(self):
         # If the ``ConnectionDetails`` data changes, it should be reflected in
         # the dynamic methods.
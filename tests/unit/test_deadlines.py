@@ -0,0 +1,241 @@
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from kotocore.deadlines import (
+    Deadline, bound_timeout, carry_deadline, check_deadline, current_deadline,
+    deadline, resolve_deadline, sleep_within
+)
+from kotocore.exceptions import DeadlineExceeded, ServerError
+from kotocore.inflight import ConcurrencyLimiter
+from kotocore.ratelimit import RateLimiter
+from kotocore.retries import RetryPolicy
+from kotocore.session import Session
+
+from tests import unittest
+from tests.unit.fakes import (
+    FakeOperation, FakeSession, FakeClock, FlakyOperation, flaky_service
+)
+
+
+class TimeoutOperation(FakeOperation):
+    # Records the socket timeout each request was sent with.
+    def __init__(self, name, **kwargs):
+        super(TimeoutOperation, self).__init__(name, **kwargs)
+        self.timeouts = []
+
+    def call(self, endpoint, **kwargs):
+        self.timeouts.append(endpoint.timeout)
+        return super(TimeoutOperation, self).call(endpoint, **kwargs)
+
+
+class DeadlineTestCase(unittest.TestCase):
+    def test_deadline(self):
+        clock = FakeClock()
+        limit = Deadline(5, clock=clock)
+        self.assertEqual(limit.remaining(), 5)
+        self.assertFalse(limit.expired)
+        limit.check()
+
+        clock.now += 6
+        self.assertEqual(limit.remaining(), 0)
+        self.assertTrue(limit.expired)
+
+        with self.assertRaises(DeadlineExceeded) as cm:
+            limit.check()
+
+        self.assertEqual(cm.exception.timeout, 5)
+
+    def test_nesting(self):
+        self.assertEqual(current_deadline(), None)
+
+        with deadline(10) as outer:
+            self.assertTrue(current_deadline() is outer)
+
+            # Tighter deadlines take over...
+            with deadline(1) as inner:
+                self.assertFalse(inner is outer)
+                self.assertTrue(current_deadline() is inner)
+
+            # ...but looser ones can't extend it.
+            with deadline(60) as looser:
+                self.assertTrue(looser is outer)
+
+            with deadline(None) as same:
+                self.assertTrue(same is outer)
+
+            self.assertTrue(resolve_deadline() is outer)
+            self.assertTrue(current_deadline() is outer)
+
+        self.assertEqual(current_deadline(), None)
+        self.assertEqual(resolve_deadline(), None)
+
+    def test_per_thread(self):
+        seen = []
+
+        with deadline(10):
+            thread = threading.Thread(
+                target=lambda: seen.append(current_deadline())
+            )
+            thread.start()
+            thread.join()
+
+        self.assertEqual(seen, [None])
+
+    def test_carry_deadline(self):
+        def func():
+            pass
+
+        self.assertTrue(carry_deadline(func) is func)
+
+        with deadline(10) as limit:
+            carried = carry_deadline(current_deadline)
+
+        self.assertTrue(carried.__wrapped__ is current_deadline)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            self.assertTrue(executor.submit(carried).result() is limit)
+
+    def test_sleep_within(self):
+        slept = []
+        sleep_within(5, sleep=slept.append)
+
+        with deadline(1):
+            sleep_within(0.5, sleep=slept.append)
+
+            with self.assertRaises(DeadlineExceeded):
+                sleep_within(2, sleep=slept.append)
+
+        self.assertEqual(slept, [5, 0.5])
+
+    def test_bound_timeout(self):
+        self.assertEqual(bound_timeout(None), (None, False))
+
+        with deadline(1):
+            timeout, by_deadline = bound_timeout(None)
+            self.assertTrue(0 < timeout <= 1)
+            self.assertTrue(by_deadline)
+            self.assertEqual(bound_timeout(0.5), (0.5, False))
+
+    def test_check_deadline(self):
+        check_deadline()
+
+        with deadline(0):
+            with self.assertRaises(DeadlineExceeded):
+                check_deadline()
+
+
+class LimitsTestCase(unittest.TestCase):
+    def test_backoff_stops_at_the_deadline(self):
+        delays = []
+        policy = RetryPolicy(
+            max_attempts=5,
+            base_delay=1,
+            sleep=delays.append,
+            random=lambda: 1.0
+        )
+        calls = []
+
+        def throttled():
+            calls.append(1)
+            raise ServerError(code='Throttling', message='Slow down.')
+
+        with deadline(0.5):
+            with self.assertRaises(DeadlineExceeded):
+                policy.call('sqs', 'send_message', throttled)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(delays, [])
+
+    def test_rate_limit_wait(self):
+        delays = []
+        limiter = RateLimiter({'iam': 1}, sleep=delays.append)
+        limiter.acquire('iam', 'us-east-1', 'list_users')
+
+        with deadline(0.5):
+            with self.assertRaises(DeadlineExceeded):
+                limiter.acquire('iam', 'us-east-1', 'list_users')
+
+        self.assertEqual(delays, [])
+
+    def test_concurrency_wait(self):
+        limiter = ConcurrencyLimiter({'support': 1}, timeout=10)
+        held = limiter.acquire('support', 'us-east-1', 'describe_cases')
+        start = time.time()
+
+        with deadline(0.05):
+            with self.assertRaises(DeadlineExceeded):
+                limiter.acquire('support', 'us-east-1', 'describe_cases')
+
+        self.assertTrue(time.time() - start < 1)
+        limiter.release(held)
+        stats = limiter.stats()[('support', 'us-east-1', None)]
+        self.assertEqual(stats['in_flight'], 0)
+
+
+class ConnectionDeadlineTestCase(unittest.TestCase):
+    def make_conn(self, op, **kwargs):
+        session = Session(FakeSession(flaky_service(op)), **kwargs)
+        return session, session.connect_to('sqs', region_name='us-west-2')
+
+    def test_per_call_deadline_covers_retries(self):
+        op = FlakyOperation(
+            'ListQueues',
+            ['InternalError'] * 20,
+            output=True,
+            result=(None, {})
+        )
+        session, conn = self.make_conn(op, retry_policy=RetryPolicy(
+            max_attempts=20,
+            base_delay=0.02,
+            random=lambda: 1.0
+        ))
+        start = time.time()
+
+        with self.assertRaises(DeadlineExceeded):
+            conn.list_queues(_deadline=0.1)
+
+        self.assertTrue(time.time() - start < 0.2)
+        self.assertTrue(1 < op.calls < 20)
+        # Without one, the retries run their course.
+        op.codes = ['InternalError']
+        self.assertEqual(conn.list_queues(), {})
+
+    def test_expired_deadline_sends_nothing(self):
+        op = FlakyOperation('ListQueues', [], output=True, result=(None, {}))
+        session, conn = self.make_conn(op)
+
+        with session.deadline(0):
+            with self.assertRaises(DeadlineExceeded):
+                conn.list_queues()
+
+        self.assertEqual(op.calls, 0)
+
+    def test_socket_timeout_is_shortened(self):
+        op = TimeoutOperation('ListQueues', output=True, result=(None, {}))
+        service = flaky_service(op)
+        service.endpoint.timeout = 60
+        session = Session(FakeSession(service))
+        conn = session.connect_to('sqs', region_name='us-west-2')
+
+        with session.deadline(2):
+            conn.list_queues()
+
+        self.assertTrue(0 < op.timeouts[0] <= 2)
+
+    def test_map_carries_the_deadline(self):
+        op = FlakyOperation('ListQueues', [], output=True, result=(None, {}))
+        session, conn = self.make_conn(op)
+
+        try:
+            with session.deadline(0):
+                results = conn.map('list_queues', [{}] * 3)
+
+            # Raised from the pool, even though the block has exited.
+            with self.assertRaises(DeadlineExceeded):
+                list(results)
+        finally:
+            session.close()
+
+        self.assertEqual(op.calls, 0)
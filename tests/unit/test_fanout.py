@@ -0,0 +1,261 @@
+import threading
+import time
+
+from kotocore.exceptions import ServerError
+from kotocore.fanout import FanOut, FanOutResult, Target
+from kotocore.session import Session
+from kotocore.utils.concurrency import run_as_worker
+
+from tests import unittest
+from tests.unit.fakes import (
+    FakeOperation, FakeSession, PipelineService, make_session
+)
+
+
+class CountingOperation(FakeOperation):
+    # Tracks how many calls are in flight against one account.
+    def __init__(self, account, tracker, delay=0.0, fail=False):
+        super(CountingOperation, self).__init__(
+            'ListPipelines',
+            params=[],
+            output=True
+        )
+        self.account = account
+        self.tracker = tracker
+        self.delay = delay
+        self.fail = fail
+
+    def call(self, endpoint, **kwargs):
+        self.tracker.enter(self.account)
+
+        try:
+            time.sleep(self.delay)
+
+            if self.fail:
+                return (None, {
+                    'Errors': [{'Code': 'AccessDenied', 'Message': 'Nope.'}],
+                })
+
+            return (None, {
+                'Pipelines': [
+                    {'Id': self.account, 'Title': endpoint.region_name},
+                ],
+            })
+        finally:
+            self.tracker.leave(self.account)
+
+
+class Tracker(object):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.most_in_flight = {}
+        self.total = 0
+        self.most_total = 0
+
+    def enter(self, account):
+        with self.lock:
+            self.in_flight[account] = self.in_flight.get(account, 0) + 1
+            self.most_in_flight[account] = max(
+                self.most_in_flight.get(account, 0),
+                self.in_flight[account]
+            )
+            self.total += 1
+            self.most_total = max(self.most_total, self.total)
+
+    def leave(self, account):
+        with self.lock:
+            self.in_flight[account] -= 1
+            self.total -= 1
+
+
+def account_session(account, tracker, delay=0.0, fail=False):
+    # Each account gets its own ``botocore``-like session & service.
+    service = PipelineService()
+    service.operations = [
+        CountingOperation(account, tracker, delay=delay, fail=fail),
+    ] + [
+        op for op in PipelineService.operations
+        if op.name != 'ListPipelines'
+    ]
+    return FakeSession(service)
+
+
+class FanOutTestCase(unittest.TestCase):
+    def setUp(self):
+        super(FanOutTestCase, self).setUp()
+        self.session = make_session()
+        self.tracker = Tracker()
+        self.targets = [
+            Target(account_session('a', self.tracker), 'us-east-1', 'a'),
+            Target(account_session('b', self.tracker), 'eu-west-1', 'b'),
+            Target(account_session('c', self.tracker), 'us-west-2', 'c'),
+        ]
+
+    def tearDown(self):
+        self.session.close()
+        super(FanOutTestCase, self).tearDown()
+
+    def test_call(self):
+        fan = self.session.fan_out(self.targets)
+        results = dict([
+            (result.target.name, result)
+            for result in fan.call('test', 'list_pipelines')
+        ])
+        self.assertEqual(sorted(results), ['a', 'b', 'c'])
+        self.assertTrue(results['b'].ok)
+        self.assertEqual(results['b'].value['Pipelines'][0], {
+            'Id': 'b',
+            'Title': 'eu-west-1',
+        })
+        self.assertTrue(results['b'].elapsed >= 0)
+
+    def test_classes_are_shared(self):
+        fan = self.session.fan_out(self.targets)
+        conn_class = self.session.get_connection('test')
+        conns = [fan.connect_to(target, 'test') for target in self.targets]
+
+        for conn in conns:
+            self.assertTrue(type(conn) is conn_class)
+
+        self.assertEqual(
+            [conn.region_name for conn in conns],
+            ['us-east-1', 'eu-west-1', 'us-west-2']
+        )
+        # Made once per target & service.
+        self.assertTrue(fan.connect_to(self.targets[0], 'test') is conns[0])
+
+    def test_failures_are_isolated(self):
+        self.targets[1] = Target(
+            account_session('b', self.tracker, fail=True),
+            'eu-west-1',
+            'b'
+        )
+        fan = self.session.fan_out(self.targets)
+        results = dict([
+            (result.target.name, result)
+            for result in fan.call('test', 'list_pipelines')
+        ])
+        self.assertTrue(results['a'].ok)
+        self.assertTrue(results['c'].ok)
+        self.assertFalse(results['b'].ok)
+        self.assertTrue(isinstance(results['b'].error, ServerError))
+        self.assertEqual(results['b'].error.code, 'AccessDenied')
+        self.assertEqual(fan.stats()['b']['errors'], 1)
+        self.assertEqual(fan.stats()['a']['errors'], 0)
+
+    def test_collection(self):
+        fan = self.session.fan_out(self.targets)
+        results = dict([
+            (result.target.name, result.value)
+            for result in fan.collection('test', 'PipelineCollection')
+        ])
+        pipe = results['c'][0]
+        self.assertEqual(pipe.id, 'c')
+        self.assertEqual(pipe.title, 'us-west-2')
+        # Resources keep using the target's connection.
+        self.assertTrue(
+            pipe._connection is fan.connect_to(self.targets[2], 'test')
+        )
+
+    def test_caps(self):
+        self.targets = [
+            Target(
+                account_session(account, self.tracker, delay=0.02),
+                'us-west-2',
+                account
+            )
+            for account in 'abcd'
+        ]
+        fan = self.session.fan_out(self.targets, max_workers=6, per_target=2)
+        results = list(fan.map('test', 'list_pipelines', [{}] * 4))
+        self.assertEqual(len(results), 16)
+        self.assertEqual(self.tracker.most_total, 6)
+
+        for account in 'abcd':
+            self.assertEqual(self.tracker.most_in_flight[account], 2)
+
+        stats = fan.stats()
+        self.assertEqual(stats['d']['calls'], 4)
+        self.assertTrue(stats['d']['elapsed_max'] >= 0.02)
+        self.assertTrue(
+            stats['d']['elapsed_total'] >= stats['d']['elapsed_max']
+        )
+
+    def test_inline_on_worker_thread(self):
+        fan = self.session.fan_out(self.targets)
+        results = run_as_worker(
+            lambda: list(fan.call('test', 'list_pipelines'))
+        )
+        self.assertEqual(
+            [result.target.name for result in results],
+            ['a', 'b', 'c']
+        )
+
+    def test_run(self):
+        fan = self.session.fan_out(self.targets[:1])
+
+        def describe(target, suffix=''):
+            return target.region_name + suffix
+
+        results = list(fan.run(describe, [{'suffix': '!'}, {}]))
+        self.assertEqual(
+            sorted([result.value for result in results]),
+            ['us-east-1', 'us-east-1!']
+        )
+        self.assertTrue(isinstance(results[0], FanOutResult))
+
+    def test_targets(self):
+        fan = FanOut(self.session, [
+            (None, 'us-east-1'),
+            (self.session, 'us-west-2'),
+            ('creds', 'eu-west-1', 'named'),
+        ], self.session.get_executor(), 4)
+        self.assertEqual(
+            [target.name for target in fan.targets],
+            ['0/us-east-1', '1/us-west-2', 'named']
+        )
+        self.assertEqual(fan.targets[0].build_core_session(), None)
+        self.assertTrue(
+            fan.targets[1].build_core_session() is self.session.core_session
+        )
+
+        with self.assertRaises(ValueError):
+            FanOut(self.session, [
+                (None, 'us-east-1', 'x'),
+                (None, 'us-west-2', 'x'),
+            ], self.session.get_executor(), 4)
+
+        with self.assertRaises(ValueError):
+            FanOut(self.session, [], self.session.get_executor(), 4,
+                   per_target=0)
+
+    def test_credentials(self):
+        target = Target({
+            'aws_access_key_id': 'AKIDEXAMPLE',
+            'aws_secret_access_key': 'secret',
+            'aws_session_token': 'token',
+        }, 'us-west-2')
+        creds = target.build_core_session().get_credentials()
+        self.assertEqual(creds.access_key, 'AKIDEXAMPLE')
+        self.assertEqual(creds.secret_key, 'secret')
+        self.assertEqual(creds.token, 'token')
+
+
+class ConnectionCoreSessionTestCase(unittest.TestCase):
+    def test_core_session_override(self):
+        session = make_session()
+        tracker = Tracker()
+        conn_class = session.get_connection('test')
+        conn = conn_class(
+            region_name='us-west-2',
+            core_session=account_session('z', tracker)
+        )
+        self.assertEqual(conn.list_pipelines()['Pipelines'][0]['Id'], 'z')
+        # Without it, the session's own is used.
+        plain = conn_class(region_name='us-west-2')
+        self.assertEqual(plain.core_session, None)
+        self.assertEqual(
+            plain.list_pipelines()['Pipelines'][0]['Id'],
+            '1872baf45'
+        )
@@ -0,0 +1,145 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+from kotocore.exceptions import GraphError, ServerError
+from kotocore.graph import Ref, TaskGraph
+from kotocore.session import Session
+from kotocore.utils.concurrency import run_as_worker
+
+from tests import unittest
+from tests.unit.fakes import FakeService, FakeSession
+
+
+class TaskGraphTestCase(unittest.TestCase):
+    def setUp(self):
+        super(TaskGraphTestCase, self).setUp()
+        self.executor = ThreadPoolExecutor(max_workers=8)
+        self.graph = TaskGraph(self.executor, 4)
+        self.lock = threading.Lock()
+        self.calls = []
+        self.in_flight = 0
+        self.most_in_flight = 0
+
+    def tearDown(self):
+        self.executor.shutdown()
+        super(TaskGraphTestCase, self).tearDown()
+
+    def step(self, label, delay=0.02, fail=False, **kwargs):
+        with self.lock:
+            self.calls.append(label)
+            self.in_flight += 1
+            self.most_in_flight = max(self.most_in_flight, self.in_flight)
+
+        try:
+            time.sleep(delay)
+
+            if fail:
+                raise ServerError(code='Broken', message=label)
+
+            return {'Name': label, 'Params': kwargs}
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def test_outputs_flow_into_dependents(self):
+        self.graph.add('queue', self.step, label='queue')
+        self.graph.add(
+            'attrs',
+            self.step,
+            label='attrs',
+            queue_url=Ref('queue', 'Name')
+        )
+        results = self.graph.run()
+        self.assertEqual(results['attrs']['Params'], {'queue_url': 'queue'})
+        self.assertEqual(self.calls, ['queue', 'attrs'])
+
+    def test_independent_branches_run_concurrently(self):
+        self.graph.add('bucket', self.step, label='bucket')
+
+        for name in ['policy', 'cors', 'website', 'tagging']:
+            self.graph.add(name, self.step, depends_on=['bucket'], label=name)
+
+        results = self.graph.run()
+        self.assertEqual(len(results), 5)
+        self.assertEqual(self.calls[0], 'bucket')
+        self.assertEqual(self.most_in_flight, 4)
+
+    def test_bounded(self):
+        graph = TaskGraph(self.executor, 2)
+
+        for i in range(6):
+            graph.add(str(i), self.step, label=str(i))
+
+        graph.run()
+        self.assertTrue(self.most_in_flight <= 2)
+
+    def test_order(self):
+        self.graph.add('c', self.step, depends_on=['b'], label='c')
+        self.graph.add('b', self.step, label='b', parent=Ref('a'))
+        self.graph.add('a', self.step, label='a')
+        self.assertEqual(self.graph.order(), ['a', 'b', 'c'])
+
+    def test_invalid_graphs(self):
+        self.graph.add('a', self.step, depends_on=['nope'], label='a')
+
+        with self.assertRaises(GraphError) as cm:
+            self.graph.run()
+
+        self.assertTrue('unknown step' in str(cm.exception))
+
+        graph = TaskGraph(self.executor, 2)
+        graph.add('a', self.step, depends_on=['b'], label='a')
+        graph.add('b', self.step, depends_on=['a'], label='b')
+
+        with self.assertRaises(GraphError) as cm:
+            graph.run()
+
+        self.assertTrue('cycle' in str(cm.exception))
+
+        with self.assertRaises(GraphError):
+            graph.add('a', self.step)
+
+    def test_failures_skip_dependents(self):
+        self.graph.add('queue', self.step, label='queue', fail=True)
+        self.graph.add('attrs', self.step, label='attrs', url=Ref('queue'))
+        self.graph.add('other', self.step, label='other')
+
+        with self.assertRaises(GraphError) as cm:
+            self.graph.run()
+
+        err = cm.exception
+        self.assertEqual(list(err.errors.keys()), ['queue'])
+        self.assertTrue(isinstance(err.errors['queue'], ServerError))
+        self.assertEqual(err.skipped, ['attrs'])
+        self.assertEqual(list(err.results.keys()), ['other'])
+        self.assertFalse('attrs' in self.calls)
+
+    def test_bad_ref(self):
+        self.graph.add('queue', self.step, label='queue')
+        self.graph.add('attrs', self.step, label='attrs', url=Ref('queue', 'X'))
+
+        with self.assertRaises(GraphError) as cm:
+            self.graph.run()
+
+        self.assertTrue(isinstance(cm.exception.errors['attrs'], KeyError))
+
+    def test_nested_runs_inline(self):
+        self.graph.add('queue', self.step, label='queue')
+        self.graph.add('attrs', self.step, label='attrs', url=Ref('queue'))
+        results = run_as_worker(self.graph.run)
+        self.assertEqual(sorted(results.keys()), ['attrs', 'queue'])
+
+
+class SessionGraphTestCase(unittest.TestCase):
+    def test_graph(self):
+        with Session(FakeSession(FakeService()), max_workers=3) as session:
+            graph = session.graph()
+            self.assertEqual(graph.max_workers, 3)
+            self.assertTrue(graph.executor is session.get_executor())
+            graph.add('one', lambda: 1)
+            self.assertEqual(graph.run(), {'one': 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
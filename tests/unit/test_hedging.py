@@ -0,0 +1,211 @@
+import threading
+import time
+
+from kotocore.exceptions import ServerError
+from kotocore.hedging import HedgingPolicy
+from kotocore.session import Session
+
+from tests import unittest
+from tests.unit.fakes import (
+    FakeSession, LatencyOperation, flaky_service, warmed_up
+)
+
+
+class Scripted(object):
+    # A callable that sleeps (& optionally fails) as scripted, per call.
+    def __init__(self, *steps):
+        self.steps = list(steps)
+        self.lock = threading.Lock()
+        self.calls = 0
+
+    def __call__(self):
+        with self.lock:
+            self.calls += 1
+            call = self.calls
+            delay, error = (0.001, None)
+
+            if self.steps:
+                delay, error = self.steps.pop(0)
+
+        time.sleep(delay)
+
+        if error is not None:
+            raise error
+
+        return call
+
+
+class HedgingPolicyTestCase(unittest.TestCase):
+    def setUp(self):
+        super(HedgingPolicyTestCase, self).setUp()
+        self.policy = HedgingPolicy(min_samples=5, max_ratio=0.5)
+
+    def tearDown(self):
+        self.policy.close()
+        super(HedgingPolicyTestCase, self).tearDown()
+
+    def test_should_hedge(self):
+        self.assertTrue(self.policy.should_hedge('s3', 'get_object'))
+        self.assertTrue(self.policy.should_hedge('s3', 'head_object'))
+        self.assertFalse(self.policy.should_hedge('s3', 'put_object'))
+
+        policy = HedgingPolicy(operations={'dynamodb': ['get_item']})
+        self.assertTrue(policy.should_hedge('dynamodb', 'get_item'))
+        self.assertFalse(policy.should_hedge('dynamodb', 'query'))
+        self.assertFalse(policy.should_hedge('s3', 'get_object'))
+
+    def test_hedge_delay(self):
+        self.assertEqual(self.policy.hedge_delay('s3', 'get_object'), None)
+
+        for i in range(1, 21):
+            self.policy.record('s3', 'get_object', i / 100.0)
+
+        self.assertEqual(self.policy.hedge_delay('s3', 'get_object'), 0.19)
+
+        policy = HedgingPolicy(min_samples=1, percentile=50, min_delay=0.5)
+        policy.record('s3', 'get_object', 0.1)
+        self.assertEqual(policy.hedge_delay('s3', 'get_object'), 0.5)
+
+    def test_learning_runs_inline(self):
+        threads = []
+        self.policy.call(
+            's3',
+            'get_object',
+            lambda: threads.append(threading.current_thread())
+        )
+        self.assertEqual(threads, [threading.current_thread()])
+        stats = self.policy.stats()['s3']['get_object']
+        self.assertEqual(stats['calls'], 1)
+        self.assertEqual(stats['hedged'], 0)
+
+    def test_unsafe_operations_are_not_hedged(self):
+        func = Scripted()
+        self.assertEqual(self.policy.call('s3', 'put_object', func), 1)
+        self.assertEqual(self.policy.stats(), {})
+
+    def test_slow_call_is_hedged(self):
+        warmed_up(self.policy)
+        func = Scripted((0.5, None))
+        start = time.time()
+        # The hedge (the second call) answers first.
+        self.assertEqual(self.policy.call('s3', 'get_object', func), 2)
+        self.assertTrue(time.time() - start < 0.4)
+        stats = self.policy.stats()['s3']['get_object']
+        self.assertEqual(stats['hedged'], 1)
+        self.assertEqual(stats['hedge_wins'], 1)
+
+    def test_fast_call_is_not_hedged(self):
+        warmed_up(self.policy, latency=0.2)
+        func = Scripted()
+        self.assertEqual(self.policy.call('s3', 'get_object', func), 1)
+        self.assertEqual(func.calls, 1)
+        self.assertEqual(self.policy.stats()['s3']['get_object']['hedged'], 0)
+
+    def test_hedges_are_capped(self):
+        policy = warmed_up(HedgingPolicy(min_samples=5, max_ratio=0.0))
+        func = Scripted((0.05, None))
+        self.assertEqual(policy.call('s3', 'get_object', func), 1)
+        self.assertEqual(func.calls, 1)
+        stats = policy.stats()['s3']['get_object']
+        self.assertEqual(stats['hedged'], 0)
+        self.assertEqual(stats['denied'], 1)
+        policy.close()
+
+    def test_failed_request_falls_back_to_the_other(self):
+        warmed_up(self.policy)
+        error = ServerError(code='InternalError', message='Oops.')
+        func = Scripted((0.05, None), (0.001, error))
+        self.assertEqual(self.policy.call('s3', 'get_object', func), 1)
+        self.assertEqual(
+            self.policy.stats()['s3']['get_object']['hedge_wins'],
+            0
+        )
+
+    def test_both_failing_raises_the_first_error(self):
+        warmed_up(self.policy)
+        first = ServerError(code='InternalError', message='First.')
+        second = ServerError(code='InternalError', message='Second.')
+        func = Scripted((0.05, second), (0.001, first))
+
+        with self.assertRaises(ServerError) as cm:
+            self.policy.call('s3', 'get_object', func)
+
+        self.assertTrue(cm.exception is first)
+
+    def test_queueing_does_not_trigger_a_hedge(self):
+        policy = warmed_up(HedgingPolicy(
+            min_samples=5,
+            max_ratio=0.5,
+            max_workers=1
+        ))
+        self.addCleanup(policy.close)
+        release = threading.Event()
+        policy.get_executor().submit(release.wait)
+        timer = threading.Timer(0.05, release.set)
+        timer.start()
+
+        # Queued well past the hedge delay, but quick once it starts.
+        self.assertEqual(policy.call('s3', 'get_object', Scripted()), 1)
+        timer.join()
+        self.assertEqual(policy.stats()['s3']['get_object']['hedged'], 0)
+
+    def test_sized_by_session(self):
+        def session(policy, max_workers):
+            return Session(
+                FakeSession(flaky_service()),
+                max_workers=max_workers,
+                hedging_policy=policy
+            )
+
+        policy = HedgingPolicy()
+        session(policy, 12)
+        self.assertEqual(policy.max_workers, 24)
+
+        # A smaller session doesn't shrink it.
+        session(policy, 4)
+        self.assertEqual(policy.max_workers, 24)
+
+        # Nor does one override a chosen size.
+        policy = HedgingPolicy(max_workers=3)
+        session(policy, 12)
+        self.assertEqual(policy.max_workers, 3)
+
+    def test_validation(self):
+        with self.assertRaises(ValueError):
+            HedgingPolicy(percentile=100)
+
+        with self.assertRaises(ValueError):
+            HedgingPolicy(max_ratio=2)
+
+
+class ConnectionHedgingTestCase(unittest.TestCase):
+    def test_tail_is_hedged(self):
+        op = LatencyOperation(
+            'GetQueueUrl',
+            delays=[0.001] * 10 + [0.5],
+            output=True,
+            result=(None, {'QueueUrl': 'http://example.com'})
+        )
+        policy = HedgingPolicy(min_samples=10, max_ratio=0.5)
+        session = Session(
+            FakeSession(flaky_service(op)),
+            hedging_policy=policy
+        )
+        conn = session.connect_to('sqs', region_name='us-west-2')
+
+        try:
+            for i in range(10):
+                conn.get_queue_url(queue_name='jobs')
+
+            start = time.time()
+            result = conn.get_queue_url(queue_name='jobs')
+            elapsed = time.time() - start
+        finally:
+            session.close()
+
+        self.assertEqual(result, {'QueueUrl': 'http://example.com'})
+        self.assertTrue(elapsed < 0.4)
+        self.assertEqual(op.calls, 12)
+        stats = policy.stats()['sqs']['get_queue_url']
+        self.assertEqual(stats['calls'], 11)
+        self.assertEqual(stats['hedge_wins'], 1)
@@ -0,0 +1,218 @@
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from kotocore.exceptions import ConcurrencyLimitTimeout
+from kotocore.inflight import ConcurrencyLimiter, EndpointSemaphore
+from kotocore.session import Session
+
+from tests import unittest
+from tests.unit.fakes import (
+    FakeOperation, FakeSession, SlowOperation, flaky_service
+)
+
+
+class EndpointSemaphoreTestCase(unittest.TestCase):
+    def test_limit(self):
+        semaphore = EndpointSemaphore(2)
+        self.assertEqual(semaphore.acquire(), 0.0)
+        self.assertEqual(semaphore.acquire(), 0.0)
+        threading.Timer(0.05, semaphore.release).start()
+        self.assertTrue(semaphore.acquire() >= 0.04)
+        stats = semaphore.stats()
+        self.assertEqual(stats['limit'], 2)
+        self.assertEqual(stats['in_flight'], 2)
+        self.assertEqual(stats['acquired'], 3)
+        self.assertEqual(stats['waited'], 1)
+        self.assertEqual(stats['max_in_flight'], 2)
+        self.assertAlmostEqual(stats['saturation'], 1.0 / 3)
+        self.assertTrue(stats['wait_max'] >= 0.04)
+
+    def test_first_come_first_served(self):
+        semaphore = EndpointSemaphore(1)
+        semaphore.acquire()
+        order = []
+
+        def wait(label):
+            semaphore.acquire()
+            order.append(label)
+            semaphore.release()
+
+        threads = []
+
+        for label in 'abc':
+            thread = threading.Thread(target=wait, args=(label,))
+            thread.start()
+            threads.append(thread)
+            # Make sure they queue in order.
+            while semaphore.stats()['queued'] < len(threads):
+                time.sleep(0.001)
+
+        semaphore.release()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(order, ['a', 'b', 'c'])
+        self.assertEqual(semaphore.stats()['in_flight'], 0)
+
+    def test_timeout(self):
+        semaphore = EndpointSemaphore(1)
+        semaphore.acquire()
+
+        with self.assertRaises(ConcurrencyLimitTimeout):
+            semaphore.acquire(timeout=0.02)
+
+        stats = semaphore.stats()
+        self.assertEqual(stats['timeouts'], 1)
+        self.assertEqual(stats['queued'], 0)
+
+        # Releasing still works with nobody queued.
+        semaphore.release()
+        self.assertEqual(semaphore.stats()['in_flight'], 0)
+
+    def test_validation(self):
+        with self.assertRaises(ValueError):
+            EndpointSemaphore(0)
+
+        with self.assertRaises(ValueError):
+            ConcurrencyLimiter({'support': 0})
+
+
+class ConcurrencyLimiterTestCase(unittest.TestCase):
+    def setUp(self):
+        super(ConcurrencyLimiterTestCase, self).setUp()
+        self.limiter = ConcurrencyLimiter({
+            'support': 1,
+            ('dynamodb', 'create_table'): 1,
+        })
+
+    def test_matching(self):
+        support = self.limiter.semaphores_for(
+            'support',
+            'us-east-1',
+            'describe_cases'
+        )
+        self.assertEqual(len(support), 1)
+        self.assertEqual(support[0].limit, 1)
+        # The same one is handed back each time.
+        self.assertTrue(self.limiter.semaphores_for(
+            'support',
+            'us-east-1',
+            'describe_services'
+        )[0] is support[0])
+        # But each region gets its own.
+        self.assertFalse(self.limiter.semaphores_for(
+            'support',
+            'us-west-2',
+            'describe_cases'
+        )[0] is support[0])
+
+        self.assertEqual(len(self.limiter.semaphores_for(
+            'dynamodb',
+            'us-east-1',
+            'create_table'
+        )), 1)
+        self.assertEqual(self.limiter.semaphores_for(
+            'dynamodb',
+            'us-east-1',
+            'put_item'
+        ), [])
+
+    def test_default(self):
+        limiter = ConcurrencyLimiter({('sqs', 'delete_queue'): 1}, default=8)
+        semaphores = limiter.semaphores_for('sqs', 'us-east-1', 'delete_queue')
+        self.assertEqual(
+            [semaphore.limit for semaphore in semaphores],
+            [8, 1]
+        )
+
+    def test_timeout_covers_every_slot(self):
+        limiter = ConcurrencyLimiter(
+            {'dynamodb': 2, ('dynamodb', 'create_table'): 1},
+            timeout=0.02
+        )
+        held = limiter.acquire('dynamodb', 'us-east-1', 'create_table')
+        self.assertEqual(len(held), 2)
+
+        with self.assertRaises(ConcurrencyLimitTimeout):
+            limiter.acquire('dynamodb', 'us-east-1', 'create_table')
+
+        stats = limiter.stats()
+        # The service-wide slot taken on the way was given back.
+        service_wide = stats[('dynamodb', 'us-east-1', None)]
+        self.assertEqual(service_wide['in_flight'], 1)
+        self.assertEqual(
+            stats[('dynamodb', 'us-east-1', 'create_table')]['timeouts'],
+            1
+        )
+
+        limiter.release(held)
+        self.assertEqual(
+            limiter.stats()[('dynamodb', 'us-east-1', None)]['in_flight'],
+            0
+        )
+
+    def test_context_manager(self):
+        with self.limiter.limit('support', 'us-east-1', 'describe_cases'):
+            self.assertEqual(
+                self.limiter.stats()[('support', 'us-east-1', None)][
+                    'in_flight'
+                ],
+                1
+            )
+
+        self.assertEqual(
+            self.limiter.stats()[('support', 'us-east-1', None)]['in_flight'],
+            0
+        )
+
+
+class ConnectionConcurrencyTestCase(unittest.TestCase):
+    def test_in_flight_is_capped(self):
+        op = SlowOperation('ListQueues', output=True, result=(None, {}))
+        session = Session(
+            FakeSession(flaky_service(op)),
+            concurrency_limiter={'sqs': 2}
+        )
+        self.assertTrue(
+            isinstance(session.concurrency_limiter, ConcurrencyLimiter)
+        )
+        conn = session.connect_to('sqs', region_name='us-west-2')
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(
+                lambda i: conn.list_queues(),
+                range(8)
+            ))
+
+        self.assertEqual(results, [{}] * 8)
+        self.assertEqual(op.most_in_flight, 2)
+        stats = session.concurrency_limiter.stats()[
+            ('sqs', 'us-west-2', None)
+        ]
+        self.assertEqual(stats['acquired'], 8)
+        self.assertEqual(stats['in_flight'], 0)
+        self.assertEqual(stats['max_in_flight'], 2)
+        self.assertTrue(stats['saturation'] > 0)
+
+    def test_released_on_errors(self):
+        op = FakeOperation('ListQueues', output=True, result=(None, {
+            'Errors': [{'Code': 'AccessDenied', 'Message': 'Nope.'}],
+        }))
+        session = Session(
+            FakeSession(flaky_service(op)),
+            concurrency_limiter={'sqs': 1}
+        )
+        conn = session.connect_to('sqs', region_name='us-west-2')
+
+        for i in range(3):
+            with self.assertRaises(Exception):
+                conn.list_queues()
+
+        stats = session.concurrency_limiter.stats()[
+            ('sqs', 'us-west-2', None)
+        ]
+        self.assertEqual(stats['in_flight'], 0)
+        self.assertEqual(stats['acquired'], 3)
@@ -0,0 +1,253 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+from kotocore.exceptions import PipelineError, ServerError
+from kotocore.pipeline import BatchStage, Pipeline, SinkStage, StageQueue
+from kotocore.scheduler import PriorityScheduler
+
+from tests import unittest
+from tests.unit.fakes import make_session
+
+
+class PipelineTestCase(unittest.TestCase):
+    def setUp(self):
+        super(PipelineTestCase, self).setUp()
+        self.executor = ThreadPoolExecutor(max_workers=8)
+        self.lock = threading.Lock()
+        self.sunk = []
+        self.in_flight = 0
+        self.most_in_flight = 0
+
+    def tearDown(self):
+        self.executor.shutdown()
+        super(PipelineTestCase, self).tearDown()
+
+    def collect(self, item):
+        with self.lock:
+            self.sunk.append(item)
+
+    def slow_double(self, item):
+        with self.lock:
+            self.in_flight += 1
+            self.most_in_flight = max(self.most_in_flight, self.in_flight)
+
+        try:
+            time.sleep(0.01)
+            return item * 2
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def test_map_filter_sink(self):
+        pipe = Pipeline(executor=self.executor)
+        pipe.source(range(10))
+        pipe.map(lambda item: item * 3)
+        pipe.filter(lambda item: item % 2 == 0)
+        pipe.sink(self.collect)
+        stats = pipe.run()
+        self.assertEqual(self.sunk, [0, 6, 12, 18, 24])
+        self.assertEqual(stats['source-0']['items_out'], 10)
+        self.assertEqual(stats['map-1']['items_in'], 10)
+        self.assertEqual(stats['filter-2']['items_out'], 5)
+        self.assertEqual(stats['sink-3']['items_in'], 5)
+        self.assertFalse('outbox' in stats['sink-3'])
+
+    def test_chaining(self):
+        stats = Pipeline(executor=self.executor).source([1, 2]).map(
+            lambda item: item + 1,
+            name='add'
+        ).sink(self.collect).run()
+        self.assertEqual(self.sunk, [2, 3])
+        self.assertEqual(stats['add']['kind'], 'map')
+
+    def test_map_concurrency(self):
+        pipe = Pipeline(executor=self.executor)
+        pipe.source(range(20))
+        pipe.map(self.slow_double, workers=4, ordered=True)
+        pipe.sink(self.collect)
+        pipe.run()
+        self.assertEqual(self.sunk, [item * 2 for item in range(20)])
+        self.assertEqual(self.most_in_flight, 4)
+
+    def test_private_executor(self):
+        pipe = Pipeline()
+        pipe.source(range(8))
+        pipe.map(self.slow_double, workers=4)
+        pipe.sink(self.collect)
+        pipe.run()
+        self.assertEqual(sorted(self.sunk), [item * 2 for item in range(8)])
+
+    def test_param(self):
+        def store(key=None):
+            self.collect(key)
+
+        pipe = Pipeline(executor=self.executor)
+        pipe.source(['a', 'b', 'c'])
+        pipe.sink(store, param='key', workers=2)
+        stats = pipe.run()
+        self.assertEqual(sorted(self.sunk), ['a', 'b', 'c'])
+        self.assertEqual(stats['sink-1']['items_out'], 3)
+
+    def test_backpressure(self):
+        produced = []
+
+        def source():
+            for item in range(50):
+                produced.append(item)
+                yield item
+
+        def slow_sink(item):
+            # Nothing can run further ahead than the queues allow.
+            self.assertTrue(len(produced) - item <= 2 * 2 + 3)
+            time.sleep(0.002)
+            self.collect(item)
+
+        pipe = Pipeline(executor=self.executor, queue_size=2)
+        pipe.source(source())
+        pipe.map(lambda item: item)
+        pipe.sink(slow_sink)
+        stats = pipe.run()
+        self.assertEqual(self.sunk, list(range(50)))
+        self.assertEqual(stats['source-0']['outbox']['size'], 2)
+        self.assertTrue(stats['map-1']['outbox']['max_depth'] <= 2)
+        self.assertTrue(stats['map-1']['outbox']['mean_depth'] > 0)
+
+    def test_throughput(self):
+        pipe = Pipeline(executor=self.executor)
+        pipe.source(range(10)).sink(self.collect)
+        stats = pipe.run()
+        self.assertTrue(stats['source-0']['elapsed'] >= 0)
+        self.assertTrue(stats['source-0']['throughput'] > 0)
+
+    def test_batch_by_count(self):
+        pipe = Pipeline(executor=self.executor)
+        pipe.source(range(7)).batch(count=3).sink(self.collect)
+        stats = pipe.run()
+        self.assertEqual(self.sunk, [[0, 1, 2], [3, 4, 5], [6]])
+        self.assertEqual(stats['batch-1']['items_in'], 7)
+        self.assertEqual(stats['batch-1']['items_out'], 3)
+
+    def test_batch_by_bytes(self):
+        pipe = Pipeline(executor=self.executor)
+        pipe.source(['aaaa', 'bb', 'cccc', 'd', 'eeeeee'])
+        pipe.batch(max_bytes=6)
+        pipe.sink(self.collect)
+        pipe.run()
+        self.assertEqual(
+            self.sunk,
+            [['aaaa', 'bb'], ['cccc', 'd'], ['eeeeee']]
+        )
+
+    def test_batch_by_time(self):
+        def trickle():
+            yield 1
+            yield 2
+            time.sleep(0.2)
+            yield 3
+
+        pipe = Pipeline(executor=self.executor)
+        pipe.source(trickle()).batch(count=10, interval=0.05)
+        pipe.sink(self.collect)
+        pipe.run()
+        self.assertEqual(self.sunk, [[1, 2], [3]])
+
+    def test_batch_needs_a_limit(self):
+        with self.assertRaises(ValueError):
+            BatchStage()
+
+    def test_failure_stops_everything(self):
+        def endless():
+            item = 0
+
+            while True:
+                yield item
+                item += 1
+
+        def broken(item):
+            if item == 5:
+                raise ServerError(code='Broken', message='It broke.')
+
+            return item
+
+        pipe = Pipeline(executor=self.executor, queue_size=2)
+        pipe.source(endless()).map(broken, workers=2).sink(self.collect)
+
+        with self.assertRaises(PipelineError) as cm:
+            pipe.run()
+
+        self.assertEqual(len(cm.exception.errors), 1)
+        self.assertEqual(cm.exception.errors[0][0], 'map-1')
+        self.assertEqual(cm.exception.errors[0][1].code, 'Broken')
+        self.assertTrue('map-1' in cm.exception.stats)
+
+    def test_structure_checks(self):
+        pipe = Pipeline(executor=self.executor)
+
+        with self.assertRaises(ValueError):
+            pipe.map(len)
+
+        pipe.source([])
+
+        with self.assertRaises(ValueError):
+            pipe.run()
+
+        with self.assertRaises(ValueError):
+            pipe.source([])
+
+        with self.assertRaises(ValueError):
+            pipe.filter(bool, name='source-0')
+
+        pipe.sink(self.collect)
+
+        with self.assertRaises(ValueError):
+            pipe.filter(bool)
+
+        with self.assertRaises(ValueError):
+            Pipeline(queue_size=0)
+
+        with self.assertRaises(ValueError):
+            SinkStage(len, workers=0)
+
+
+class StageQueueTestCase(unittest.TestCase):
+    def test_occupancy(self):
+        stop_event = threading.Event()
+        stage_queue = StageQueue(3, stop_event)
+        stage_queue.put(1)
+        stage_queue.put(2)
+        self.assertEqual(stage_queue.get(), 1)
+        stats = stage_queue.stats()
+        self.assertEqual(stats['size'], 3)
+        self.assertEqual(stats['depth'], 1)
+        self.assertEqual(stats['max_depth'], 2)
+        self.assertEqual(stats['mean_depth'], 1.5)
+
+
+class SessionPipelineTestCase(unittest.TestCase):
+    def setUp(self):
+        super(SessionPipelineTestCase, self).setUp()
+        self.session = make_session()
+
+    def tearDown(self):
+        self.session.close()
+        super(SessionPipelineTestCase, self).tearDown()
+
+    def test_resources_through_the_pipeline(self):
+        PipelineCollection = self.session.get_collection(
+            'test',
+            'PipelineCollection'
+        )
+        ids = []
+
+        def read(pipeline):
+            return pipeline.get()
+
+        pipe = self.session.pipeline(queue_size=10)
+        self.assertTrue(isinstance(pipe.executor, PriorityScheduler))
+        pipe.source(PipelineCollection(region_name='us-west-2'))
+        pipe.map(read, workers=2)
+        pipe.sink(lambda result: ids.append(result['Pipeline']['Id']))
+        stats = pipe.run()
+        self.assertEqual(ids, ['1872baf45', '1872baf45'])
+        self.assertEqual(stats['map-1']['items_out'], 2)
@@ -0,0 +1,265 @@
+from concurrent.futures import ThreadPoolExecutor
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+
+from kotocore.ratelimit import RateLimiter, SharedRateLimiter
+from kotocore.ratelimit import SharedTokenBucket, TokenBucket, fcntl
+from kotocore.session import Session
+
+from tests import unittest
+from tests.unit.fakes import (
+    FakeOperation, FakeSession, FakeClock, flaky_service
+)
+
+
+class TokenBucketTestCase(unittest.TestCase):
+    def setUp(self):
+        super(TokenBucketTestCase, self).setUp()
+        self.clock = FakeClock()
+
+    def test_steady_pacing(self):
+        bucket = TokenBucket(4, clock=self.clock)
+        # The first goes straight through, then each waits its turn.
+        self.assertEqual(
+            [bucket.reserve() for i in range(4)],
+            [0.0, 0.25, 0.5, 0.75]
+        )
+
+    def test_refills(self):
+        bucket = TokenBucket(2, clock=self.clock)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertEqual(bucket.reserve(), 0.5)
+        self.clock.now += 1.0
+        self.assertEqual(bucket.reserve(), 0.0)
+
+    def test_burst(self):
+        bucket = TokenBucket(1, burst=3, clock=self.clock)
+        self.assertEqual(
+            [bucket.reserve() for i in range(4)],
+            [0.0, 0.0, 0.0, 1.0]
+        )
+        # Never refills past the burst.
+        self.clock.now += 60
+        self.assertEqual(
+            [bucket.reserve() for i in range(4)],
+            [0.0, 0.0, 0.0, 1.0]
+        )
+
+    def test_validation(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(0)
+
+        with self.assertRaises(ValueError):
+            TokenBucket(1, burst=0.5)
+
+
+class RateLimiterTestCase(unittest.TestCase):
+    def setUp(self):
+        super(RateLimiterTestCase, self).setUp()
+        self.delays = []
+        self.limiter = RateLimiter({
+            'iam': 5,
+            ('ses', 'us-east-1'): (10, 2),
+            ('dynamodb', None, 'create_table'): 0.5,
+        }, sleep=self.delays.append)
+
+    def test_keys(self):
+        self.assertEqual(sorted(self.limiter.buckets, key=str), [
+            ('dynamodb', None, 'create_table'),
+            ('iam', None, None),
+            ('ses', 'us-east-1', None),
+        ])
+        ses = self.limiter.buckets[('ses', 'us-east-1', None)]
+        self.assertEqual(ses.burst, 2)
+
+        with self.assertRaises(ValueError):
+            self.limiter.set_limit(('a', 'b', 'c', 'd'), 1)
+
+    def test_matching(self):
+        self.assertEqual(
+            self.limiter.matching('iam', 'us-west-2', 'list_users'),
+            [('iam', None, None)]
+        )
+        self.assertEqual(
+            self.limiter.matching('ses', 'eu-west-1', 'send_email'),
+            []
+        )
+        self.assertEqual(
+            self.limiter.matching('dynamodb', 'eu-west-1', 'create_table'),
+            [('dynamodb', None, 'create_table')]
+        )
+        self.assertEqual(
+            self.limiter.matching('dynamodb', 'eu-west-1', 'put_item'),
+            []
+        )
+
+    def test_every_match_applies(self):
+        self.limiter.set_limit(('ses', None, 'send_email'), 1)
+        self.assertEqual(
+            self.limiter.reserve('ses', 'us-east-1', 'send_email'),
+            0.0
+        )
+        # The stricter bucket wins.
+        self.assertTrue(
+            self.limiter.reserve('ses', 'us-east-1', 'send_email') > 0.9
+        )
+
+    def test_acquire_and_stats(self):
+        for i in range(3):
+            self.limiter.acquire('iam', 'us-east-1', 'list_users')
+
+        self.limiter.acquire('sqs', 'us-east-1', 'list_queues')
+        self.assertEqual(len(self.delays), 2)
+        self.assertTrue(self.delays[0] > 0.15)
+        stats = self.limiter.stats()[('iam', None, None)]
+        self.assertEqual(stats['rate'], 5.0)
+        self.assertEqual(stats['acquired'], 3)
+        self.assertEqual(stats['waited'], 2)
+        self.assertAlmostEqual(stats['wait_total'], sum(self.delays), 2)
+        self.assertAlmostEqual(stats['wait_max'], max(self.delays), 2)
+        self.assertEqual(
+            self.limiter.stats()[('ses', 'us-east-1', None)]['acquired'],
+            0
+        )
+
+
+class ConnectionRateLimitTestCase(unittest.TestCase):
+    def make_session(self, limits):
+        op = FakeOperation('ListQueues', output=True, result=(None, {}))
+        return Session(
+            FakeSession(flaky_service(op)),
+            rate_limiter=limits
+        )
+
+    def test_calls_are_paced(self):
+        session = self.make_session({'sqs': 20})
+        self.assertTrue(isinstance(session.rate_limiter, RateLimiter))
+        conn = session.connect_to('sqs', region_name='us-west-2')
+        start = time.time()
+
+        for i in range(4):
+            conn.list_queues()
+
+        self.assertTrue(time.time() - start >= 0.14)
+        stats = session.rate_limiter.stats()[('sqs', None, None)]
+        self.assertEqual(stats['acquired'], 4)
+        self.assertEqual(stats['waited'], 3)
+
+    def test_threads_share_the_bucket(self):
+        session = self.make_session({('sqs', 'us-west-2'): 50})
+        conn = session.connect_to('sqs', region_name='us-west-2')
+        other = session.connect_to('sqs', region_name='eu-west-1')
+        finished = []
+
+        def call(i):
+            conn.list_queues()
+            finished.append(time.time())
+
+        start = time.time()
+
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            list(executor.map(call, range(20)))
+
+        # 20 calls at 50/s, evenly spaced rather than in a burst.
+        self.assertTrue(max(finished) - start >= 0.35)
+        finished.sort()
+        gaps = [b - a for a, b in zip(finished, finished[1:])]
+        self.assertTrue(max(gaps) < 0.1)
+
+        # Other regions aren't held up.
+        start = time.time()
+        other.list_queues()
+        other.list_queues()
+        self.assertTrue(time.time() - start < 0.02)
+
+    def test_no_limits(self):
+        session = self.make_session(None)
+        self.assertEqual(session.rate_limiter, None)
+        self.assertEqual(session.connect_to('sqs').list_queues(), {})
+
+
+def acquire_many(directory, rate, count):
+    # Runs in a separate process, so it's module-level.
+    limiter = SharedRateLimiter(
+        {('sqs', 'us-west-2'): rate},
+        directory=directory
+    )
+    finished = []
+
+    for i in range(count):
+        limiter.acquire('sqs', 'us-west-2', 'send_message')
+        finished.append(time.time())
+
+    return finished
+
+
+@unittest.skipIf(fcntl is None, 'Requires fcntl.')
+class SharedTokenBucketTestCase(unittest.TestCase):
+    def setUp(self):
+        super(SharedTokenBucketTestCase, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'test.bucket')
+        self.clock = FakeClock()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        super(SharedTokenBucketTestCase, self).tearDown()
+
+    def test_state_is_shared(self):
+        first = SharedTokenBucket(4, path=self.path, clock=self.clock)
+        second = SharedTokenBucket(4, path=self.path, clock=self.clock)
+        self.assertEqual(first.reserve(), 0.0)
+        self.assertEqual(second.reserve(), 0.25)
+        self.assertEqual(first.reserve(), 0.5)
+        self.clock.now += 1.0
+        self.assertEqual(second.reserve(), 0.0)
+        first.close()
+        second.close()
+
+    def test_validation(self):
+        with self.assertRaises(ValueError):
+            SharedTokenBucket(1)
+
+    def test_limiter_paths(self):
+        limiter = SharedRateLimiter({
+            'iam': 5,
+            ('ses', 'us-east-1', 'send_email'): 1,
+        }, directory=os.path.join(self.directory, 'buckets'))
+        self.assertEqual(
+            sorted(os.listdir(limiter.directory)),
+            ['iam.all.all.bucket', 'ses.us-east-1.send_email.bucket']
+        )
+        self.assertTrue(isinstance(
+            limiter.buckets[('iam', None, None)],
+            SharedTokenBucket
+        ))
+        self.assertEqual(limiter.acquire('iam', 'us-east-1', 'list_users'), 0)
+
+    def test_processes_share_the_rate(self):
+        rate = 40.0
+        processes = 4
+        per_process = 15
+        pool = multiprocessing.Pool(processes)
+
+        try:
+            results = [
+                pool.apply_async(
+                    acquire_many,
+                    (self.directory, rate, per_process)
+                )
+                for i in range(processes)
+            ]
+            finished = sorted(sum([
+                result.get(timeout=30) for result in results
+            ], []))
+        finally:
+            pool.close()
+            pool.join()
+
+        # Together, the processes stayed within ~10% of the one limit, rather
+        # than each getting its own.
+        measured = (len(finished) - 1) / (finished[-1] - finished[0])
+        self.assertTrue(rate * 0.9 <= measured <= rate * 1.1, measured)
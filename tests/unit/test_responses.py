@@ -0,0 +1,310 @@
+from kotocore.exceptions import ServerError
+from kotocore.responses import ResponseCache, approximate_size
+from kotocore.retries import RetryPolicy
+from kotocore.session import Session
+
+from tests import unittest
+from tests.unit.fakes import (
+    FakeParam, FakeSession, FakeClock, FlakyOperation, Uncopyable,
+    flaky_service, queue_ops
+)
+
+
+class InterruptedOperation(FlakyOperation):
+    # Runs ``during`` (Ex. a write from elsewhere) while the first call is
+    # in flight.
+    def __init__(self, name, codes, during=None, **kwargs):
+        super(InterruptedOperation, self).__init__(name, codes, **kwargs)
+        self.during = during
+
+    def call(self, endpoint, **kwargs):
+        during, self.during = self.during, None
+
+        if during is not None:
+            during()
+
+        return super(InterruptedOperation, self).call(endpoint, **kwargs)
+
+
+class ResponseCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        super(ResponseCacheTestCase, self).setUp()
+        self.clock = FakeClock()
+        self.cache = ResponseCache(
+            ttl=10,
+            ttls={('sqs', 'get_queue_url'): 100, 'iam': 0},
+            max_entries=3,
+            clock=self.clock
+        )
+
+    def key(self, operation_name='list_queues', params=None,
+            region_name='us-west-2', service_name='sqs'):
+        return self.cache.key_for(
+            service_name,
+            region_name,
+            operation_name,
+            params or {}
+        )
+
+    def test_hit_and_miss(self):
+        key = self.key()
+        self.assertEqual(self.cache.get(key), None)
+        self.cache.set(key, {}, {'QueueUrls': []})
+        self.assertEqual(self.cache.get(key), {'QueueUrls': []})
+        elsewhere = self.key(region_name='eu-west-1')
+        self.assertEqual(self.cache.get(elsewhere), None)
+
+        stats = self.cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 2)
+        self.assertEqual(stats['entries'], 1)
+        self.assertTrue(stats['bytes'] > 0)
+        self.assertEqual(stats['operations']['sqs']['list_queues'], {
+            'hits': 1,
+            'misses': 2,
+        })
+
+    def test_keys_are_canonical(self):
+        self.assertEqual(
+            self.key('get_queue_attributes', {'a': 1, 'b': [1, 2]}),
+            self.key('get_queue_attributes', {'b': [1, 2], 'a': 1})
+        )
+        self.assertEqual(self.key(params={'body': bytearray()}), None)
+
+    def test_copies(self):
+        key = self.key()
+        parsed = {'QueueUrls': ['a']}
+        self.cache.set(key, {}, parsed)
+        parsed['QueueUrls'].append('b')
+        self.cache.get(key)['QueueUrls'].append('c')
+        self.assertEqual(self.cache.get(key), {'QueueUrls': ['a']})
+
+    def test_ttls(self):
+        self.assertEqual(self.cache.ttl_for('sqs', 'get_queue_url'), 100)
+        self.assertEqual(self.cache.ttl_for('sqs', 'list_queues'), 10)
+        self.assertEqual(self.cache.ttl_for('iam', 'get_role'), 0)
+
+        short, long = self.key(), self.key('get_queue_url')
+        self.cache.set(short, {}, {})
+        self.cache.set(long, {}, {})
+        self.clock.now += 11
+        self.assertEqual(self.cache.get(short), None)
+        self.assertEqual(self.cache.get(long), {})
+        self.assertEqual(self.cache.stats()['expirations'], 1)
+
+        # A TTL of ``0`` isn't cached at all.
+        role = self.key('get_role', service_name='iam')
+        self.cache.set(role, {}, {})
+        self.assertEqual(self.cache.get(role), None)
+
+    def test_lru_eviction(self):
+        keys = [self.key(params={'page': i}) for i in range(4)]
+
+        for key in keys[:3]:
+            self.cache.set(key, {}, {})
+
+        # Touch the oldest, so the second goes instead.
+        self.cache.get(keys[0])
+        self.cache.set(keys[3], {}, {})
+        self.assertEqual(self.cache.get(keys[1]), None)
+        self.assertEqual(self.cache.get(keys[0]), {})
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+        self.assertEqual(self.cache.stats()['entries'], 3)
+
+    def test_byte_bound(self):
+        parsed = {'Body': 'x' * 1000}
+        size = approximate_size(parsed)
+        cache = ResponseCache(max_bytes=size * 2 + 10)
+
+        for i in range(3):
+            cache.set(self.key(params={'page': i}), {}, parsed)
+
+        stats = cache.stats()
+        self.assertEqual(stats['entries'], 2)
+        self.assertEqual(stats['bytes'], size * 2)
+        self.assertEqual(stats['evictions'], 1)
+
+        # Too big to keep at all.
+        cache.set(self.key(), {}, {'Body': 'x' * 10000})
+        self.assertEqual(cache.stats()['entries'], 2)
+
+    def test_invalidation(self):
+        cache = ResponseCache()
+        listing = self.key()
+        jobs = self.key('get_queue_attributes', {'queue_url': 'jobs'})
+        mail = self.key('get_queue_attributes', {'queue_url': 'mail'})
+        elsewhere = self.key(region_name='eu-west-1')
+        cache.set(listing, {}, {})
+        cache.set(jobs, {'queue_url': 'jobs'}, {})
+        cache.set(mail, {'queue_url': 'mail'}, {})
+        cache.set(elsewhere, {}, {})
+
+        dropped = cache.invalidate('sqs', 'us-west-2', {
+            'queue_url': 'jobs',
+            'message_body': 'mail',
+        })
+        self.assertEqual(dropped, 2)
+        self.assertEqual(cache.get(listing), None)
+        self.assertEqual(cache.get(jobs), None)
+        self.assertEqual(cache.get(mail), {})
+        self.assertEqual(cache.get(elsewhere), {})
+
+        # A write without identifiers drops the lot.
+        self.assertEqual(cache.invalidate('sqs', 'us-west-2', {}), 1)
+        self.assertEqual(cache.stats()['invalidations'], 3)
+
+    def test_uncopyable(self):
+        key = self.key('get_object', service_name='s3')
+        self.cache.set(key, {}, {'Body': Uncopyable()})
+        self.assertEqual(self.cache.get(key), None)
+        self.assertEqual(self.cache.stats()['entries'], 0)
+
+    def test_generations(self):
+        key = self.key()
+        before = self.cache.generation('sqs', 'us-west-2')
+        self.cache.invalidate('sqs', 'eu-west-1', {})
+        self.assertEqual(self.cache.generation('sqs', 'us-west-2'), before)
+        self.cache.invalidate('sqs', 'us-west-2', {'queue_url': 'mail'})
+        after = self.cache.generation('sqs', 'us-west-2')
+        self.assertEqual(after, before + 1)
+
+        # Fetched before the write, so it may be stale.
+        self.cache.set(key, {}, {'QueueUrls': []}, generation=before)
+        self.assertEqual(self.cache.get(key), None)
+        self.cache.set(key, {}, {'QueueUrls': []}, generation=after)
+        self.assertEqual(self.cache.get(key), {'QueueUrls': []})
+
+    def test_identifiers(self):
+        self.assertEqual(self.cache.identifiers_for({
+            'bucket': 'photos',
+            'key': 'cat.png',
+            'role_name': 'admin',
+            'instance_ids': ['i-1', 'i-2'],
+            'max_items': 10,
+            'tags': [{'Key': 'a'}],
+        }), frozenset(['photos', 'cat.png', 'admin', 'i-1', 'i-2']))
+
+    def test_should_cache(self):
+        self.assertTrue(self.cache.should_cache('iam', 'get_role'))
+        self.assertFalse(self.cache.should_cache('iam', 'delete_role'))
+        cache = ResponseCache(operations={'sqs': ['get_queue_url']})
+        self.assertTrue(cache.should_cache('sqs', 'get_queue_url'))
+        self.assertFalse(cache.should_cache('sqs', 'list_queues'))
+
+    def test_clear(self):
+        self.cache.set(self.key(), {}, {})
+        self.cache.clear()
+        self.assertEqual(self.cache.stats()['entries'], 0)
+        self.assertEqual(self.cache.stats()['bytes'], 0)
+
+
+class ConnectionCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        super(ConnectionCacheTestCase, self).setUp()
+        self.ops = queue_ops()
+        self.cache = ResponseCache()
+        self.session = Session(
+            FakeSession(flaky_service(*self.ops)),
+            response_cache=self.cache
+        )
+        self.conn = self.session.connect_to('sqs', region_name='us-west-2')
+
+    def test_reads_are_cached(self):
+        for i in range(3):
+            self.assertEqual(self.conn.list_queues(), {
+                'QueueUrls': ['http://example.com/jobs'],
+            })
+
+        self.assertEqual(self.ops[0].calls, 1)
+        self.assertEqual(self.cache.stats()['hits'], 2)
+
+    def test_bypass(self):
+        self.conn.list_queues()
+        self.conn.list_queues(_cache=False)
+        self.assertEqual(self.ops[0].calls, 2)
+        stats = self.cache.stats()
+        self.assertEqual(stats['hits'] + stats['misses'], 1)
+
+    def test_writes_invalidate(self):
+        attrs = self.ops[1]
+        self.conn.get_queue_attributes(queue_url='jobs')
+        self.conn.get_queue_attributes(queue_url='mail')
+        self.conn.delete_queue(queue_url='jobs')
+        self.conn.get_queue_attributes(queue_url='jobs')
+        self.conn.get_queue_attributes(queue_url='mail')
+        self.assertEqual(attrs.calls, 3)
+        self.assertEqual(self.cache.stats()['invalidations'], 1)
+
+    def test_failed_writes_invalidate(self):
+        self.conn.list_queues()
+        self.ops[2].codes = ['AccessDenied']
+
+        with self.assertRaises(ServerError):
+            self.conn.delete_queue(queue_url='jobs')
+
+        self.conn.list_queues()
+        self.assertEqual(self.ops[0].calls, 2)
+
+    def test_errors_are_not_cached(self):
+        self.ops[0].codes = ['AccessDenied']
+        self.session.retry_policy = RetryPolicy(max_attempts=1)
+
+        with self.assertRaises(ServerError):
+            self.conn.list_queues()
+
+        self.conn.list_queues()
+        self.conn.list_queues()
+        self.assertEqual(self.ops[0].calls, 2)
+
+    def test_streamed_outputs_are_not_cached(self):
+        op = FlakyOperation(
+            'GetObject',
+            [],
+            params=[FakeParam('Key', required=True)],
+            output={
+                'members': {
+                    'Body': {'type': 'blob', 'streaming': True},
+                },
+            },
+            result=(None, {'Body': Uncopyable()})
+        )
+        session = Session(
+            FakeSession(flaky_service(op)),
+            response_cache=self.cache
+        )
+        conn = session.connect_to('s3', region_name='us-west-2')
+
+        for i in range(2):
+            self.assertTrue(
+                isinstance(conn.get_object(key='cat.png')['Body'], Uncopyable)
+            )
+
+        self.assertEqual(op.calls, 2)
+        stats = self.cache.stats()
+        self.assertEqual(stats['entries'], 0)
+        self.assertEqual(stats['hits'] + stats['misses'], 0)
+
+    def test_reads_racing_a_write_are_not_cached(self):
+        read = InterruptedOperation(
+            'GetQueueAttributes',
+            [],
+            params=[FakeParam('QueueUrl', required=True)],
+            output=True,
+            result=(None, {'Attributes': {'DelaySeconds': '0'}})
+        )
+        self.ops[1] = read
+        session = Session(
+            FakeSession(flaky_service(*self.ops)),
+            response_cache=self.cache
+        )
+        conn = session.connect_to('sqs', region_name='us-west-2')
+        read.during = lambda: conn.delete_queue(queue_url='jobs')
+
+        conn.get_queue_attributes(queue_url='jobs')
+        self.assertEqual(self.ops[2].calls, 1)
+        self.assertEqual(self.cache.stats()['entries'], 0)
+
+        # Later reads are cached as usual.
+        conn.get_queue_attributes(queue_url='jobs')
+        conn.get_queue_attributes(queue_url='jobs')
+        self.assertEqual(read.calls, 2)
@@ -0,0 +1,249 @@
+import socket
+
+from kotocore.exceptions import ServerError
+from kotocore.retries import RetryBudget, RetryPolicy
+from kotocore.session import Session
+
+from tests import unittest
+from tests.unit.fakes import (
+    FakeParam, FakeSession, FlakyOperation, flaky_service
+)
+
+
+def make_policy(**kwargs):
+    delays = []
+    kwargs.setdefault('sleep', delays.append)
+    kwargs.setdefault('random', lambda: 1.0)
+    return RetryPolicy(**kwargs), delays
+
+
+class RetryPolicyTestCase(unittest.TestCase):
+    def setUp(self):
+        super(RetryPolicyTestCase, self).setUp()
+        self.policy, self.delays = make_policy()
+
+    def error(self, code):
+        return ServerError(code=code, message='Nope.')
+
+    def test_throttling_is_always_retryable(self):
+        self.assertTrue(self.policy.is_retryable(
+            'sqs', 'send_message', self.error('Throttling')
+        ))
+        self.assertTrue(self.policy.is_retryable(
+            's3', 'get_object', self.error('SlowDown')
+        ))
+        self.assertTrue(self.policy.is_retryable(
+            'sqs',
+            'send_message',
+            self.error('AWS.SimpleQueueService.ThrottledException')
+        ))
+
+    def test_transient_needs_idempotency(self):
+        unavailable = self.error('ServiceUnavailable')
+        self.assertTrue(self.policy.is_retryable(
+            's3', 'get_object', unavailable
+        ))
+        self.assertTrue(self.policy.is_retryable(
+            's3', 'put_object', unavailable
+        ))
+        self.assertFalse(self.policy.is_retryable(
+            'sqs', 'send_message', unavailable
+        ))
+        self.assertTrue(self.policy.is_retryable(
+            'dynamodb', 'query', socket.error('reset')
+        ))
+        self.assertFalse(self.policy.is_retryable(
+            'dynamodb', 'update_item', socket.error('reset')
+        ))
+
+    def test_other_errors(self):
+        self.assertFalse(self.policy.is_retryable(
+            's3', 'get_object', self.error('NoSuchKey')
+        ))
+        self.assertFalse(self.policy.is_retryable(
+            's3', 'get_object', ValueError('bad')
+        ))
+
+    def test_overrides(self):
+        policy, delays = make_policy(
+            codes={
+                's3': {'transient': ['NoSuchUpload']},
+                '*': {'throttling': ['Busy']},
+            },
+            idempotent={
+                'sqs': {'send_message': True},
+                's3': {'get_object': False},
+            }
+        )
+        self.assertTrue(policy.is_retryable(
+            's3', 'list_parts', self.error('NoSuchUpload')
+        ))
+        self.assertFalse(policy.is_retryable(
+            'sqs', 'list_queues', self.error('NoSuchUpload')
+        ))
+        self.assertTrue(policy.is_retryable(
+            'sns', 'publish', self.error('Busy')
+        ))
+        self.assertTrue(policy.is_idempotent('sqs', 'send_message'))
+        self.assertFalse(policy.is_idempotent('s3', 'get_object'))
+
+        with self.assertRaises(ValueError):
+            RetryPolicy(codes={'s3': {'fatal': ['Boom']}})
+
+        with self.assertRaises(ValueError):
+            RetryPolicy(max_attempts=0)
+
+    def test_backoff_full_jitter(self):
+        policy, delays = make_policy(base_delay=0.1, max_delay=0.5)
+        self.assertEqual(
+            [policy.backoff(attempt) for attempt in range(1, 6)],
+            [0.1, 0.2, 0.4, 0.5, 0.5]
+        )
+        policy.random = lambda: 0.25
+        self.assertEqual(policy.backoff(3), 0.1)
+
+    def test_call_retries_until_success(self):
+        outcomes = [self.error('Throttling'), self.error('Throttling')]
+
+        def attempt():
+            if outcomes:
+                raise outcomes.pop(0)
+
+            return 'ok'
+
+        self.assertEqual(self.policy.call('s3', 'get_object', attempt), 'ok')
+        self.assertEqual(self.delays, [0.05, 0.1])
+        stats = self.policy.stats()['s3']['get_object']
+        self.assertEqual(stats['successes'], 1)
+        self.assertEqual(stats['retries'], 2)
+        self.assertAlmostEqual(stats['backoff_time'], 0.15)
+
+    def test_call_gives_up(self):
+        def attempt():
+            raise self.error('Throttling')
+
+        with self.assertRaises(ServerError):
+            self.policy.call('s3', 'get_object', attempt)
+
+        stats = self.policy.stats()['s3']['get_object']
+        self.assertEqual(stats['retries'], 2)
+        self.assertEqual(stats['exhausted'], 1)
+
+        def fatal():
+            raise self.error('AccessDenied')
+
+        with self.assertRaises(ServerError):
+            self.policy.call('s3', 'get_object', fatal)
+
+        self.assertEqual(
+            self.policy.stats()['s3']['get_object']['failures'],
+            1
+        )
+
+    def test_budget(self):
+        budget = RetryBudget(capacity=10, retry_cost=5, success_refund=1)
+        policy, delays = make_policy(max_attempts=10, budget=budget)
+
+        def attempt():
+            raise self.error('Throttling')
+
+        with self.assertRaises(ServerError):
+            policy.call('sqs', 'list_queues', attempt)
+
+        # Only two retries fit in the budget.
+        self.assertEqual(len(delays), 2)
+        stats = policy.stats()['sqs']['list_queues']
+        self.assertEqual(stats['budget_denied'], 1)
+
+        # Successes slowly refill it.
+        for i in range(5):
+            policy.call('sqs', 'list_queues', lambda: 'ok')
+
+        self.assertEqual(budget.tokens, 5)
+        self.assertTrue(budget.withdraw())
+        self.assertFalse(budget.withdraw())
+
+        for i in range(20):
+            budget.deposit()
+
+        self.assertEqual(budget.tokens, 10)
+
+
+class ConnectionRetryTestCase(unittest.TestCase):
+    def make_conn(self, op, **policy_kwargs):
+        policy, delays = make_policy(**policy_kwargs)
+        session = Session(
+            FakeSession(flaky_service(op)),
+            retry_policy=policy
+        )
+        return session.connect_to('sqs'), policy, delays
+
+    def test_retries_in_the_call_path(self):
+        op = FlakyOperation(
+            'ListQueues',
+            ['Throttling', 'ServiceUnavailable'],
+            output=True,
+            result=(None, {'QueueUrls': []})
+        )
+        conn, policy, delays = self.make_conn(op)
+        self.assertEqual(conn.list_queues(), {'QueueUrls': []})
+        self.assertEqual(op.calls, 3)
+        self.assertEqual(len(delays), 2)
+        self.assertEqual(policy.stats()['sqs']['list_queues']['retries'], 2)
+
+    def test_non_idempotent_not_retried_blindly(self):
+        op = FlakyOperation(
+            'SendMessage',
+            [socket.error],
+            params=[FakeParam('MessageBody', required=True)],
+            output=True,
+            result=(None, {'MessageId': '1'})
+        )
+        conn, policy, delays = self.make_conn(op)
+
+        with self.assertRaises(socket.error):
+            conn.send_message(message_body='hi')
+
+        self.assertEqual(op.calls, 1)
+
+        # But throttling means it was never sent, so that's fine to retry.
+        op.codes = ['RequestThrottled']
+        self.assertEqual(conn.send_message(message_body='hi'), {
+            'MessageId': '1',
+        })
+        self.assertEqual(op.calls, 3)
+
+    def test_retries_off(self):
+        op = FlakyOperation(
+            'ListQueues',
+            ['Throttling'],
+            output=True,
+            result=(None, {})
+        )
+        conn, policy, delays = self.make_conn(op, max_attempts=1)
+
+        with self.assertRaises(ServerError):
+            conn.list_queues()
+
+        self.assertEqual(op.calls, 1)
+
+    def test_no_policy_by_default(self):
+        op = FlakyOperation(
+            'ListQueues',
+            ['Throttling'],
+            output=True,
+            result=(None, {})
+        )
+        session = Session(FakeSession(flaky_service(op)))
+        self.assertEqual(session.retry_policy, None)
+
+        # Fails on the first error, as before retries existed.
+        with self.assertRaises(ServerError):
+            session.connect_to('sqs').list_queues()
+
+        self.assertEqual(op.calls, 1)
+
+    def test_default_policy(self):
+        session = Session(FakeSession(flaky_service()), retry_policy=True)
+        self.assertTrue(isinstance(session.retry_policy, RetryPolicy))
+        self.assertEqual(session.retry_policy.max_attempts, 3)
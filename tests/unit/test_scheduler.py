@@ -0,0 +1,288 @@
+import threading
+import time
+
+from kotocore.scheduler import Classifier, PriorityScheduler
+from kotocore.session import Session
+from kotocore.utils.concurrency import describe_call
+
+from tests import unittest
+from tests.unit.fakes import FakeSession, PipelineService, make_session
+
+
+class FakeLoader(object):
+    def load(self, service_name):
+        return {
+            'resources': {
+                'Job': {
+                    'operations': {
+                        'get': {'api_name': 'ReadJob'},
+                        'cancel': {
+                            'api_name': 'CancelJob',
+                            'priority': 'control',
+                        },
+                    },
+                },
+            },
+        }
+
+
+class ClassifierTestCase(unittest.TestCase):
+    def setUp(self):
+        super(ClassifierTestCase, self).setUp()
+        self.classifier = Classifier({
+            'glacier': 'control',
+            ('test', 'read_job'): 'control',
+            ('iam', 'get_user'): 'data',
+        }, loader=FakeLoader())
+
+    def test_mapping(self):
+        self.assertEqual(
+            self.classifier.classify('glacier', 'list_vaults'),
+            'control'
+        )
+        self.assertEqual(
+            self.classifier.classify('test', 'read_job'),
+            'control'
+        )
+        # Beats the defaults.
+        self.assertEqual(self.classifier.classify('iam', 'get_user'), 'data')
+
+    def test_resource_json(self):
+        self.assertEqual(
+            self.classifier.classify('test', 'cancel_job'),
+            'control'
+        )
+
+    def test_defaults(self):
+        self.assertEqual(
+            self.classifier.classify('iam', 'list_users'),
+            'control'
+        )
+        self.assertEqual(
+            self.classifier.classify('s3', 'create_bucket'),
+            'control'
+        )
+        self.assertEqual(self.classifier.classify('s3', 'get_object'), 'data')
+        self.assertEqual(self.classifier.classify(None, None), 'data')
+
+
+class DescribeCallTestCase(unittest.TestCase):
+    def test_describe_call(self):
+        session = make_session()
+        conn = session.connect_to('test')
+        Pipeline = session.get_resource('test', 'Pipeline')
+        pipe = Pipeline(connection=conn, id='1872baf45')
+
+        self.assertEqual(
+            describe_call(conn.list_pipelines),
+            ('test', 'list_pipelines')
+        )
+        self.assertEqual(describe_call(pipe.get), ('test', 'read_pipeline'))
+        self.assertEqual(describe_call(pipe.get_identifiers), ('test', None))
+        self.assertEqual(describe_call(len), (None, None))
+
+        def wrapper(item):
+            return pipe.get()
+
+        wrapper.__wrapped__ = pipe.get
+        self.assertEqual(describe_call(wrapper), ('test', 'read_pipeline'))
+
+
+class PrioritySchedulerTestCase(unittest.TestCase):
+    def setUp(self):
+        super(PrioritySchedulerTestCase, self).setUp()
+        self.lock = threading.Lock()
+        self.order = []
+        self.in_flight = {}
+        self.most_in_flight = {}
+
+    def scheduler(self, **kwargs):
+        scheduler = PriorityScheduler(**kwargs)
+        self.addCleanup(scheduler.shutdown)
+        return scheduler
+
+    def work(self, label, kind='data', delay=0):
+        with self.lock:
+            self.order.append(label)
+            self.in_flight[kind] = self.in_flight.get(kind, 0) + 1
+            self.most_in_flight[kind] = max(
+                self.most_in_flight.get(kind, 0),
+                self.in_flight[kind]
+            )
+
+        time.sleep(delay)
+
+        with self.lock:
+            self.in_flight[kind] -= 1
+
+        return label
+
+    def block(self, scheduler):
+        # Occupies the (single) thread until the returned event is set, so
+        # that everything submitted meanwhile queues up.
+        started = threading.Event()
+        release = threading.Event()
+
+        def blocker():
+            started.set()
+            release.wait()
+
+        scheduler.submit_for(None, None, blocker)
+        started.wait()
+        return release
+
+    def test_submit(self):
+        scheduler = self.scheduler(max_workers=2)
+        future = scheduler.submit(self.work, 'a')
+        self.assertEqual(future.result(), 'a')
+
+        failed = scheduler.submit(int, 'nope')
+
+        with self.assertRaises(ValueError):
+            failed.result()
+
+    def test_priority_order(self):
+        scheduler = self.scheduler(max_workers=1)
+        release = self.block(scheduler)
+
+        futures = [
+            scheduler.submit_for('iam', 'list_users', self.work, 'c1'),
+            scheduler.submit_for('iam', 'list_users', self.work, 'c2'),
+            scheduler.submit_for('sqs', 'receive_message', self.work, 'd1'),
+            scheduler.submit_for('sqs', 'receive_message', self.work, 'd2'),
+        ]
+        release.set()
+
+        for future in futures:
+            future.result()
+
+        # The data-plane calls jump the queue.
+        self.assertEqual(self.order, ['d1', 'd2', 'c1', 'c2'])
+
+    def test_quotas(self):
+        scheduler = self.scheduler(
+            max_workers=4,
+            quotas=[('data', 4), ('control', 1)]
+        )
+        futures = [
+            scheduler.submit_for(
+                'iam',
+                'list_users',
+                self.work,
+                i,
+                kind='control',
+                delay=0.02
+            )
+            for i in range(4)
+        ]
+        futures.append(scheduler.submit_for(
+            'sqs',
+            'receive_message',
+            self.work,
+            'fast'
+        ))
+
+        self.assertEqual(futures[-1].result(), 'fast')
+
+        for future in futures:
+            future.result()
+
+        self.assertEqual(self.most_in_flight['control'], 1)
+
+    def test_weighted_fair_sharing(self):
+        scheduler = self.scheduler(
+            max_workers=1,
+            service_weights={'s3': 2}
+        )
+        release = self.block(scheduler)
+        futures = [
+            scheduler.submit_for(service, 'get', self.work, service)
+            for service in ['sqs'] * 6 + ['s3'] * 6
+        ]
+        release.set()
+
+        for future in futures:
+            future.result()
+
+        # S3 gets two turns for each of SQS's, until it runs out.
+        self.assertEqual(
+            self.order[:9],
+            ['sqs', 's3', 's3', 'sqs', 's3', 's3', 'sqs', 's3', 's3']
+        )
+
+    def test_stats(self):
+        scheduler = self.scheduler(max_workers=1)
+        release = self.block(scheduler)
+        future = scheduler.submit_for('iam', 'list_users', self.work, 'c')
+
+        stats = scheduler.stats()
+        self.assertEqual(stats['control']['queued'], 1)
+        self.assertEqual(stats['data']['running'], 1)
+        self.assertEqual(stats['control']['quota'], 1)
+
+        time.sleep(0.01)
+        release.set()
+        future.result()
+        scheduler.shutdown()
+
+        stats = scheduler.stats()
+        self.assertEqual(stats['control']['queued'], 0)
+        self.assertEqual(stats['control']['completed'], 1)
+        self.assertTrue(stats['control']['wait_max'] >= 0.01)
+        self.assertEqual(
+            stats['control']['wait_mean'],
+            stats['control']['wait_total']
+        )
+
+    def test_cancel(self):
+        scheduler = self.scheduler(max_workers=1)
+        release = self.block(scheduler)
+        future = scheduler.submit(self.work, 'never')
+        self.assertTrue(future.cancel())
+        release.set()
+        scheduler.shutdown()
+        self.assertEqual(self.order, [])
+
+    def test_shutdown(self):
+        scheduler = self.scheduler(max_workers=1)
+        scheduler.shutdown()
+
+        with self.assertRaises(RuntimeError):
+            scheduler.submit(len, [])
+
+
+class SessionSchedulerTestCase(unittest.TestCase):
+    def test_session_executor(self):
+        session = Session(
+            FakeSession(PipelineService()),
+            max_workers=4,
+            priorities={'test': 'control'},
+            priority_quotas=[('data', 4), ('control', 2)]
+        )
+        self.addCleanup(session.close)
+        executor = session.get_executor()
+
+        self.assertTrue(isinstance(executor, PriorityScheduler))
+        self.assertEqual(executor.max_workers, 4)
+
+        conn = session.connect_to('test')
+        results = list(conn.map('list_pipelines', [{}, {}, {}]))
+        self.assertEqual(len(results), 3)
+
+        stats = executor.stats()
+        self.assertEqual(stats['control']['completed'], 3)
+        self.assertEqual(stats['data']['completed'], 0)
+
+    def test_default_quotas(self):
+        session = Session(FakeSession(PipelineService()), max_workers=8)
+        self.addCleanup(session.close)
+
+        # Control-plane calls aren't capped unless asked for.
+        self.assertEqual(dict(session.get_executor().quotas), {
+            'data': 8,
+            'control': 8,
+        })
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,9 @@
+import threading
+import time
+
 from botocore.service import Service as BotocoreService
 
+from kotocore.cache import ServiceCache
 from kotocore.session import Session
 
 from tests import unittest
@@ -73,6 +77,119 @@ class SessionTestCase(unittest.TestCase):
         self.assertEqual(client.__class__.__name__, 'SqsConnection')
         self.assertEqual(client.region_name, 'us-west-2')
 
+    def test_get_executor(self):
+        self.assertEqual(self.session._executor, None)
+        executor = self.session.get_executor()
+        self.addCleanup(self.session.close)
+        self.assertEqual(executor._max_workers, self.session.max_workers)
+        # It's created once & reused.
+        self.assertTrue(self.session.get_executor() is executor)
+
+    def test_max_workers_read_only(self):
+        self.assertEqual(self.session.max_workers, 10)
+
+        with self.assertRaises(AttributeError):
+            self.session.max_workers = 20
+
+    def test_close(self):
+        executor = self.session.get_executor()
+        self.session.close()
+        self.assertEqual(self.session._executor, None)
+
+        with self.assertRaises(RuntimeError):
+            executor.submit(len, [])
+
+        # Closing again is harmless & the pool is recreated on demand.
+        self.session.close()
+        self.assertFalse(self.session.get_executor() is executor)
+        self.session.close()
+
+    def test_context_manager(self):
+        with Session() as session:
+            executor = session.get_executor()
+
+        with self.assertRaises(RuntimeError):
+            executor.submit(len, [])
+
+    def test_cache_timing(self):
+        self.session.get_connection('sqs')
+        self.session.get_connection('sqs')
+        stats = self.session.cache.stats()['sqs']
+        self.assertEqual(stats['hits'], 1)
+        self.assertTrue(stats['miss_time'] > 0)
+        self.assertTrue(stats['hit_time'] < stats['miss_time'])
+
+    def test_bounded_cache(self):
+        session = Session(cache=ServiceCache(max_classes=1))
+        Queue = session.get_resource('sqs', 'Queue')
+        session.get_connection('sqs')
+        self.assertEqual(session.cache.stats()['sqs']['classes'], 1)
+
+        # Evicted, so it's rebuilt.
+        self.assertFalse(session.get_resource('sqs', 'Queue') is Queue)
+
+    def test_concurrent_builds(self):
+        built = []
+        construct_for = self.session.resource_factory.construct_for
+
+        def slow_construct_for(*args, **kwargs):
+            built.append(args)
+            # Gives the other threads time to miss on it too.
+            time.sleep(0.05)
+            return construct_for(*args, **kwargs)
+
+        self.session.resource_factory.construct_for = slow_construct_for
+        results = []
+
+        def get():
+            results.append(self.session.get_resource('sqs', 'Queue'))
+
+        threads = [threading.Thread(target=get) for i in range(8)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        # Built once, with every thread getting the same class.
+        self.assertEqual(len(built), 1)
+        self.assertEqual(len(results), 8)
+        self.assertEqual(len(set(results)), 1)
+        self.assertTrue(
+            self.session.get_resource('sqs', 'Queue') is results[0]
+        )
+        self.assertEqual(self.session._building, {})
+
+    def test_concurrent_build_errors(self):
+        def broken_construct_for(*args, **kwargs):
+            time.sleep(0.05)
+            raise ValueError('Broken.')
+
+        self.session.connection_factory.construct_for = broken_construct_for
+        errors = []
+
+        def get():
+            try:
+                self.session.get_connection('sqs')
+            except ValueError as err:
+                errors.append(err)
+
+        threads = [threading.Thread(target=get) for i in range(4)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(errors), 4)
+        self.assertEqual(self.session._building, {})
+
+        # Nothing was cached, so the next call tries again.
+        with self.assertRaises(ValueError):
+            self.session.get_connection('sqs')
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,159 @@
+from kotocore.exceptions import ServerError
+from kotocore.retries import RetryPolicy
+from kotocore.session import Session
+from kotocore.testing import (
+    Bimodal, FaultInjector, FakeOperation, FakeSession, Fixed, LogNormal,
+    fake_connection
+)
+
+from tests import unittest
+from tests.unit.fakes import FakeClock, flaky_service
+
+
+def draws(injector, operation_name='get_object', count=200):
+    return [injector.choose(operation_name) for i in range(count)]
+
+
+class LatencyTestCase(unittest.TestCase):
+    def test_fixed(self):
+        injector = FaultInjector(latency=0.25)
+        self.assertEqual(injector.choose('get_object'), (0.25, None))
+        self.assertEqual(Fixed(1).sample(None), 1)
+
+    def test_lognormal(self):
+        injector = FaultInjector(latency=LogNormal(0.01, sigma=1.0), seed=1)
+        latencies = sorted([delay for delay, code in draws(injector)])
+        median = latencies[len(latencies) // 2]
+        self.assertTrue(0.005 < median < 0.02)
+        # A long tail.
+        self.assertTrue(latencies[-1] > 5 * median)
+
+        with self.assertRaises(ValueError):
+            LogNormal(0)
+
+    def test_bimodal(self):
+        injector = FaultInjector(latency=Bimodal(0.01, 1.0, 0.1), seed=1)
+        latencies = [delay for delay, code in draws(injector, count=1000)]
+        self.assertEqual(set(latencies), set([0.01, 1.0]))
+        self.assertTrue(60 < latencies.count(1.0) < 140)
+
+        with self.assertRaises(ValueError):
+            Bimodal(0.01, 1.0, 2)
+
+    def test_per_operation(self):
+        injector = FaultInjector(latency={'get_object': 0.5, None: 0.1})
+        self.assertEqual(injector.choose('get_object'), (0.5, None))
+        self.assertEqual(injector.choose('put_object'), (0.1, None))
+
+    def test_seeded(self):
+        def run(seed):
+            return draws(FaultInjector(
+                latency=LogNormal(0.01),
+                errors={'InternalError': 0.2},
+                seed=seed
+            ))
+
+        self.assertEqual(run(5), run(5))
+        self.assertNotEqual(run(5), run(6))
+
+
+class FaultTestCase(unittest.TestCase):
+    def test_error_rates(self):
+        injector = FaultInjector(errors={
+            'InternalError': 0.1,
+            'ServiceUnavailable': 0.2,
+        }, seed=3)
+        codes = [code for delay, code in draws(injector, count=2000)]
+        self.assertTrue(150 < codes.count('InternalError') < 250)
+        self.assertTrue(330 < codes.count('ServiceUnavailable') < 470)
+        stats = injector.stats()['get_object']
+        self.assertEqual(stats['calls'], 2000)
+        self.assertEqual(
+            stats['errors']['InternalError'],
+            codes.count('InternalError')
+        )
+
+    def test_errors_per_operation(self):
+        injector = FaultInjector(errors={'get_object': {'NoSuchKey': 1.0}})
+        self.assertEqual(injector.choose('get_object'), (0.0, 'NoSuchKey'))
+        self.assertEqual(injector.choose('put_object'), (0.0, None))
+
+    def test_qps_ceiling(self):
+        clock = FakeClock()
+        injector = FaultInjector(qps={'put_object': 3}, clock=clock)
+        codes = [code for delay, code in draws(injector, 'put_object', 5)]
+        self.assertEqual(codes, [None] * 3 + ['Throttling'] * 2)
+        self.assertEqual(injector.choose('get_object'), (0.0, None))
+
+        clock.now += 1.5
+        self.assertEqual(injector.choose('put_object'), (0.0, None))
+        stats = injector.stats()['put_object']
+        self.assertEqual(stats['throttled'], 2)
+        self.assertEqual(stats['errors'], {'Throttling': 2})
+
+    def test_call(self):
+        slept = []
+        injector = FaultInjector(
+            latency=0.1,
+            errors={'get_object': {'InternalError': 1.0}},
+            sleep=slept.append
+        )
+        self.assertEqual(
+            injector.call('get_object', lambda: (None, {'Body': b''})),
+            (None, {'Errors': [{
+                'Code': 'InternalError',
+                'Message': 'Injected by kotocore.testing.',
+            }]})
+        )
+        self.assertEqual(
+            injector.call('put_object', lambda: (None, {})),
+            (None, {})
+        )
+        self.assertEqual(slept, [0.1, 0.1])
+        self.assertEqual(injector.stats()['get_object']['latency_total'], 0.1)
+
+
+class HarnessTestCase(unittest.TestCase):
+    def test_fake_operation(self):
+        injector = FaultInjector(
+            errors={'InternalError': 0.5},
+            seed=2,
+            sleep=lambda delay: None
+        )
+        op = FakeOperation(
+            'ListQueues',
+            output=True,
+            result=(None, {'QueueUrls': []}),
+            injector=injector
+        )
+        session = Session(
+            FakeSession(flaky_service(op)),
+            retry_policy=RetryPolicy(max_attempts=10, sleep=lambda delay: None)
+        )
+        conn = session.connect_to('sqs', region_name='us-west-2')
+
+        for i in range(20):
+            self.assertEqual(conn.list_queues(), {'QueueUrls': []})
+
+        stats = injector.stats()['list_queues']
+        self.assertEqual(stats['calls'], 20 + stats['errors']['InternalError'])
+
+    def test_fake_connection(self):
+        injector = FaultInjector(errors={
+            'get_object': {'NoSuchKey': 1.0},
+        })
+        session = Session()
+        s3 = fake_connection(session, 's3', injector=injector, responders={
+            'head_object': lambda **kwargs: {'ContentLength': 5},
+        })
+        self.assertEqual(
+            s3.head_object(bucket='assets', key='logo.png'),
+            {'ContentLength': 5}
+        )
+        # No responder means an empty response.
+        self.assertEqual(s3.list_buckets(), {})
+
+        with self.assertRaises(ServerError) as cm:
+            s3.get_object(bucket='assets', key='missing.png')
+
+        self.assertEqual(cm.exception.code, 'NoSuchKey')
@@ -0,0 +1,206 @@
+import threading
+import time
+
+from kotocore.cache import ServiceCache
+from kotocore.loader import ResourceJSONLoader
+from kotocore.resources import ResourceFactory
+from kotocore.session import Session
+
+from tests import unittest
+from tests.unit.fakes import FakeSession, PipelineService, make_session
+
+
+class SlowResourceFactory(ResourceFactory):
+    def __init__(self, *args, **kwargs):
+        super(SlowResourceFactory, self).__init__(*args, **kwargs)
+        self.built = 0
+
+    def construct_for(self, *args, **kwargs):
+        self.built += 1
+        # Widen the window for a race.
+        time.sleep(0.01)
+        return super(SlowResourceFactory, self).construct_for(*args, **kwargs)
+
+
+class CountingLoader(ResourceJSONLoader):
+    def __init__(self, *args, **kwargs):
+        super(CountingLoader, self).__init__(*args, **kwargs)
+        self.read = 0
+
+    def get_available_options(self, service_name):
+        self.read += 1
+        time.sleep(0.01)
+        return super(CountingLoader, self).get_available_options(service_name)
+
+
+class ThreadSafetyTestCase(unittest.TestCase):
+    threads = 32
+
+    def setUp(self):
+        super(ThreadSafetyTestCase, self).setUp()
+        self.session = make_session()
+
+    def hammer(self, func):
+        # Starts every thread at once, returning what each got back.
+        start = threading.Event()
+        results = [None] * self.threads
+        errors = []
+
+        def run(offset):
+            start.wait()
+
+            try:
+                results[offset] = func()
+            except Exception as err:
+                errors.append(err)
+
+        workers = [
+            threading.Thread(target=run, args=(i,))
+            for i in range(self.threads)
+        ]
+
+        for worker in workers:
+            worker.start()
+
+        start.set()
+
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual(errors, [])
+        return results
+
+    def test_classes_built_once(self):
+        factory = SlowResourceFactory(
+            session=self.session,
+            loader=self.session.resource_factory.loader
+        )
+        self.session.resource_factory = factory
+
+        results = self.hammer(
+            lambda: self.session.get_resource('test', 'Pipeline')
+        )
+
+        self.assertEqual(factory.built, 1)
+        self.assertEqual(len(set(results)), 1)
+
+    def test_data_loaded_once(self):
+        loader = CountingLoader(self.session.resource_factory.loader.data_dirs)
+        factory = ResourceFactory(session=self.session, loader=loader)
+        Pipeline = factory.construct_for('test', 'Pipeline')
+
+        results = self.hammer(lambda: Pipeline._details.resource_data)
+
+        self.assertEqual(loader.read, 1)
+        self.assertEqual(len(set([id(res) for res in results])), 1)
+
+    def test_collection_iteration(self):
+        PipelineCollection = self.session.get_collection(
+            'test',
+            'PipelineCollection'
+        )
+        pipes = PipelineCollection()
+
+        results = self.hammer(
+            lambda: [pipe.title for pipe in pipes]
+        )
+
+        for result in results:
+            self.assertEqual(result, ['A pipe', 'Another pipe'])
+
+    def test_relations_built_once(self):
+        Preset = self.session.get_resource('test', 'Preset')
+        preset = Preset(id='a1b2')
+
+        results = self.hammer(lambda: preset.pipelines)
+
+        self.assertEqual(len(set([id(res) for res in results])), 1)
+
+
+    def test_cache_snapshots(self):
+        cache = ServiceCache()
+        Pipeline = self.session.get_resource('test', 'Pipeline')
+        names = ['Resource{0}'.format(i) for i in range(self.threads)]
+        offsets = iter(range(self.threads))
+        lock = threading.Lock()
+
+        def write():
+            with lock:
+                name = names[next(offsets)]
+
+            snapshot = cache.services
+            cache.set_resource('test', name, Pipeline)
+            # Earlier snapshots are never changed underneath a reader.
+            return snapshot
+
+        snapshots = self.hammer(write)
+
+        # No write was lost.
+        for name in names:
+            self.assertTrue(cache.get_resource('test', name) is Pipeline)
+
+        for snapshot in snapshots:
+            resources = snapshot.get('test', {}).get('resources', {})
+            self.assertTrue(len(resources) < len(names))
+
+    def test_loader_snapshots(self):
+        loader = self.session.resource_factory.loader
+        before = loader._loaded_data
+        loader.load('test')
+
+        self.assertFalse('test' in before)
+        self.assertTrue('test' in loader._loaded_data)
+
+    def test_docstrings_updated_once(self):
+        Pipeline = self.session.get_resource('test', 'Pipeline')
+        calls = []
+        original = Pipeline._update_docstrings
+
+        def counting(resource):
+            calls.append(resource)
+            return original(resource)
+
+        Pipeline._update_docstrings = counting
+        self.addCleanup(delattr, Pipeline, '_update_docstrings')
+
+        for i in range(3):
+            Pipeline(id=str(i))
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue('Reads a pipeline.' in Pipeline.get.__doc__)
+
+
+class ThreadLocalConnectionsTestCase(unittest.TestCase):
+    def test_default(self):
+        session = Session(FakeSession(PipelineService()))
+        self.assertFalse(session.thread_safe)
+        self.assertFalse(
+            session.connect_to('test') is session.connect_to('test')
+        )
+
+    def test_thread_safe(self):
+        session = Session(FakeSession(PipelineService()), thread_safe=True)
+        conn = session.connect_to('test', region_name='us-west-2')
+
+        # Reused within the thread...
+        self.assertTrue(
+            session.connect_to('test', region_name='us-west-2') is conn
+        )
+        self.assertFalse(
+            session.connect_to('test', region_name='eu-west-1') is conn
+        )
+
+        # ...but never shared with another.
+        seen = []
+        thread = threading.Thread(target=lambda: seen.append(
+            session.connect_to('test', region_name='us-west-2')
+        ))
+        thread.start()
+        thread.join()
+
+        self.assertFalse(seen[0] is conn)
+        self.assertEqual(seen[0].region_name, 'us-west-2')
+
+
+if __name__ == "__main__":
+    unittest.main()
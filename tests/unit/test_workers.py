@@ -0,0 +1,159 @@
+import pickle
+
+from kotocore.deadlines import deadline
+from kotocore.exceptions import ServerError
+from kotocore.utils.concurrency import run_as_worker
+from kotocore.workers import Job, WorkerPool, run_job, to_plain
+from kotocore.workers import warm_session, _chunked
+
+from tests import unittest
+from tests.unit.fakes import make_session
+
+
+def titles(result):
+    return [pipe['title'] for pipe in result]
+
+
+class WorkersTestCase(unittest.TestCase):
+    def setUp(self):
+        super(WorkersTestCase, self).setUp()
+        self.session = make_session()
+
+    def test_job_defaults(self):
+        job = Job('test', 'us-west-2', 'list_pipelines')
+        self.assertEqual(job.kwargs, {})
+        self.assertEqual(job.identifiers, {})
+        self.assertEqual(pickle.loads(pickle.dumps(job)), job)
+
+    def test_warm_session(self):
+        warm_session(self.session, ['test'])
+        cache = self.session.cache
+
+        self.assertTrue(cache.get_connection('test') is not None)
+
+        # These raise ``NotCached`` if they weren't built.
+        for name in ('Pipeline', 'Preset', 'Job'):
+            cache.get_resource('test', name)
+
+        cache.get_collection('test', 'PipelineCollection')
+
+    def test_run_job_connection(self):
+        result = run_job(
+            self.session,
+            Job('test', 'us-west-2', 'list_pipelines')
+        )
+        self.assertEqual(result['Pipelines'][1]['Id'], '918ad8a12')
+
+    def test_run_job_resource(self):
+        result = run_job(
+            self.session,
+            Job('test', 'us-west-2', 'Pipeline.get', identifiers={
+                'id': '1872baf45',
+            })
+        )
+        self.assertEqual(result, {
+            'Pipeline': {'Id': '1872baf45', 'Title': 'A pipe'},
+        })
+
+    def test_run_job_collection(self):
+        result = run_job(
+            self.session,
+            Job('test', 'us-west-2', 'PipelineCollection.each'),
+            postprocess=titles
+        )
+        self.assertEqual(result, ['A pipe', 'Another pipe'])
+
+    def test_to_plain(self):
+        Pipeline = self.session.get_resource('test', 'Pipeline')
+        pipe = Pipeline(id='1872baf45')
+        pipe._data = {'Title': 'A pipe'}
+
+        self.assertEqual(
+            to_plain({'pipes': (pipe,), 'count': 1}),
+            {'pipes': [{'Title': 'A pipe'}], 'count': 1}
+        )
+
+    def test_chunked(self):
+        self.assertEqual(
+            list(_chunked(range(5), 2)),
+            [[0, 1], [2, 3], [4]]
+        )
+
+    def test_server_error_pickles(self):
+        err = ServerError(code='Broken', message='It broke.', full_response={
+            'Errors': [],
+        })
+        copied = pickle.loads(pickle.dumps(err))
+        self.assertEqual(copied.code, 'Broken')
+        self.assertEqual(copied.message, 'It broke.')
+        self.assertEqual(copied.full_response, {'Errors': []})
+
+
+class WorkerPoolTestCase(unittest.TestCase):
+    def setUp(self):
+        super(WorkerPoolTestCase, self).setUp()
+        self.pool = WorkerPool(
+            processes=2,
+            services=['test'],
+            session_factory=make_session,
+            max_in_flight=2
+        )
+
+    def tearDown(self):
+        self.pool.close()
+        super(WorkerPoolTestCase, self).tearDown()
+
+    def test_map(self):
+        jobs = [
+            Job('test', 'us-west-2', 'PipelineCollection.each')
+            for i in range(7)
+        ]
+        jobs.append(Job('test', 'us-west-2', 'test_role'))
+
+        results = list(self.pool.map(jobs, chunksize=3, postprocess=titles))
+
+        self.assertEqual(len(results), 8)
+        self.assertEqual(results[:7], [['A pipe', 'Another pipe']] * 7)
+        self.assertTrue(isinstance(results[7], ServerError))
+        self.assertEqual(results[7].code, 'Broken')
+
+    def test_map_from_worker_thread(self):
+        # Still sent to the processes, rather than run inline.
+        jobs = [Job('test', 'us-west-2', 'PipelineCollection.each')] * 3
+        results = run_as_worker(
+            lambda: list(self.pool.map(jobs, postprocess=titles))
+        )
+        self.assertEqual(results, [['A pipe', 'Another pipe']] * 3)
+
+    def test_map_within_deadline(self):
+        jobs = [Job('test', 'us-west-2', 'list_pipelines')] * 2
+
+        with deadline(30):
+            results = list(self.pool.map(jobs))
+
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0]['Pipelines'][0]['Id'], '1872baf45')
+
+    def test_default_processes(self):
+        pool = WorkerPool()
+
+        try:
+            self.assertTrue(pool.processes >= 1)
+            self.assertEqual(pool.max_in_flight, pool.processes * 2)
+        finally:
+            pool.close()
+
+    def test_map_bad_chunksize(self):
+        with self.assertRaises(ValueError):
+            list(self.pool.map([], chunksize=0))
+
+    def test_submit(self):
+        job = Job('test', 'us-west-2', 'Pipeline.get', identifiers={
+            'id': '1872baf45',
+        })
+        future = self.pool.submit(job)
+        self.assertEqual(future.result()['Pipeline']['Title'], 'A pipe')
+
+
+if __name__ == "__main__":
+    unittest.main()
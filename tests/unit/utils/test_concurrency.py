@@ -0,0 +1,108 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+from kotocore.exceptions import ServerError
+from kotocore.utils.concurrency import map_calls, on_worker_thread
+
+from tests import unittest
+
+
+class MapCallsTestCase(unittest.TestCase):
+    def setUp(self):
+        super(MapCallsTestCase, self).setUp()
+        self.executor = ThreadPoolExecutor(max_workers=4)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.most_in_flight = 0
+
+    def tearDown(self):
+        self.executor.shutdown()
+        super(MapCallsTestCase, self).tearDown()
+
+    def slow_double(self, value, delay=0.0):
+        with self.lock:
+            self.in_flight += 1
+            self.most_in_flight = max(self.most_in_flight, self.in_flight)
+
+        try:
+            time.sleep(delay)
+
+            if value < 0:
+                raise ServerError(code='Negative', message='Nope.')
+
+            return value * 2
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def test_ordered(self):
+        # The earlier calls are the slowest, but order is kept.
+        kwargs = [
+            {'value': i, 'delay': 0.01 * (5 - i)} for i in range(5)
+        ]
+        results = list(map_calls(self.executor, self.slow_double, kwargs, 4))
+        self.assertEqual(results, [0, 2, 4, 6, 8])
+
+    def test_unordered(self):
+        kwargs = [
+            {'value': 1, 'delay': 0.1},
+            {'value': 2, 'delay': 0.0},
+        ]
+        results = list(map_calls(
+            self.executor,
+            self.slow_double,
+            kwargs,
+            4,
+            ordered=False
+        ))
+        self.assertEqual(results, [4, 2])
+
+    def test_server_errors_are_yielded(self):
+        kwargs = [{'value': 1}, {'value': -1}, {'value': 3}]
+        results = list(map_calls(self.executor, self.slow_double, kwargs, 2))
+        self.assertEqual(results[0], 2)
+        self.assertTrue(isinstance(results[1], ServerError))
+        self.assertEqual(results[1].code, 'Negative')
+        self.assertEqual(results[2], 6)
+
+    def test_other_errors_are_raised(self):
+        kwargs = [{'value': 1}, {'nope': 1}]
+
+        with self.assertRaises(TypeError):
+            list(map_calls(self.executor, self.slow_double, kwargs, 2))
+
+    def test_bounded(self):
+        kwargs = [{'value': i, 'delay': 0.01} for i in range(12)]
+        results = list(map_calls(self.executor, self.slow_double, kwargs, 2))
+        self.assertEqual(len(results), 12)
+        self.assertTrue(self.most_in_flight <= 2)
+
+    def test_concurrent(self):
+        kwargs = [{'value': i, 'delay': 0.1} for i in range(4)]
+        list(map_calls(self.executor, self.slow_double, kwargs, 4))
+        self.assertEqual(self.most_in_flight, 4)
+
+    def test_nested_runs_inline(self):
+        executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(executor.shutdown)
+
+        def outer(value):
+            inner = map_calls(executor, self.slow_double, [
+                {'value': value},
+                {'value': -1},
+            ], 1)
+            return list(inner)
+
+        results = list(map_calls(executor, outer, [{'value': 1}], 1))
+        self.assertEqual(results[0][0], 2)
+        self.assertTrue(isinstance(results[0][1], ServerError))
+        self.assertFalse(on_worker_thread())
+
+    def test_invalid_max_workers(self):
+        with self.assertRaises(ValueError):
+            list(map_calls(self.executor, self.slow_double, [], 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
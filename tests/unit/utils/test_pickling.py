@@ -0,0 +1,101 @@
+import pickle
+
+from kotocore.collections import Collection
+from kotocore.connection import Connection
+from kotocore.exceptions import APIVersionMismatchError
+from kotocore.resources import Resource
+from kotocore.session import get_default_session, set_default_session
+from kotocore.utils.pickling import rebuild_class
+
+from tests import unittest
+from tests.unit.fakes import make_session
+
+
+def roundtrip(obj):
+    return pickle.loads(pickle.dumps(obj, pickle.HIGHEST_PROTOCOL))
+
+
+class PicklingTestCase(unittest.TestCase):
+    def setUp(self):
+        super(PicklingTestCase, self).setUp()
+        self.session = make_session()
+        set_default_session(self.session)
+        self.addCleanup(set_default_session, None)
+        self.conn = self.session.connect_to('test', region_name='eu-west-1')
+        self.Pipeline = self.session.get_resource('test', 'Pipeline')
+        self.PipelineCollection = self.session.get_collection(
+            'test',
+            'PipelineCollection'
+        )
+
+    def test_default_session(self):
+        self.assertTrue(get_default_session() is self.session)
+
+    def test_base_classes(self):
+        self.assertTrue(roundtrip(Resource) is Resource)
+        self.assertTrue(roundtrip(Collection) is Collection)
+        self.assertTrue(roundtrip(Connection) is Connection)
+
+    def test_classes(self):
+        self.assertTrue(roundtrip(self.Pipeline) is self.Pipeline)
+        self.assertTrue(
+            roundtrip(self.PipelineCollection) is self.PipelineCollection
+        )
+        self.assertTrue(roundtrip(self.conn.__class__) is self.conn.__class__)
+
+    def test_classes_rebuilt_in_other_session(self):
+        other = make_session()
+        set_default_session(other)
+
+        Pipeline = roundtrip(self.Pipeline)
+        self.assertFalse(Pipeline is self.Pipeline)
+        self.assertTrue(Pipeline is other.get_resource('test', 'Pipeline'))
+
+    def test_connection(self):
+        conn = roundtrip(self.conn)
+        self.assertTrue(conn.__class__ is self.conn.__class__)
+        self.assertEqual(conn.region_name, 'eu-west-1')
+
+    def test_resources(self):
+        pipes = [
+            self.Pipeline(connection=self.conn, id=str(i), title='A pipe')
+            for i in range(3)
+        ]
+        # Relations aren't sent (this one couldn't be pickled anyhow).
+        pipes[0]._relations['jobs'] = lambda: None
+
+        copied = roundtrip(pipes)
+
+        self.assertEqual(len(copied), 3)
+        self.assertTrue(copied[0].__class__ is self.Pipeline)
+        self.assertEqual(copied[2].id, '2')
+        self.assertEqual(copied[2].title, 'A pipe')
+        self.assertEqual(copied[0]._relations, {})
+        # The connection is sent once & shared again afterward.
+        self.assertEqual(copied[0]._connection.region_name, 'eu-west-1')
+        self.assertTrue(copied[0]._connection is copied[2]._connection)
+
+    def test_collection(self):
+        pipes = self.PipelineCollection(connection=self.conn, foo='bar')
+        copied = roundtrip(pipes)
+
+        self.assertTrue(copied.__class__ is self.PipelineCollection)
+        self.assertEqual(copied.foo, 'bar')
+        self.assertEqual(copied._connection.region_name, 'eu-west-1')
+        self.assertEqual(
+            [pipe.title for pipe in copied.each()],
+            ['A pipe', 'Another pipe']
+        )
+
+    def test_api_version_mismatch(self):
+        with self.assertRaises(APIVersionMismatchError):
+            rebuild_class(
+                'test',
+                'Pipeline',
+                '2001-01-01',
+                'kotocore.resources.Resource'
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()